@@ -70,16 +70,62 @@ async def startup_event():
         logger.info(f"Logo found: {LOGO_FILE}")
     else:
         logger.warning(f"Logo file not found at: {LOGO_FILE}")
+    
+    # Datenbank verbinden und Hintergrund-Anreicherung starten
+    from app.database.manager import db_manager
+    from app.core.enrichment import enrichment_queue
+    from app.utils.search.bm25_index import bm25_index
+    await db_manager.connect()
+    db_manager.counters.start()
+    bm25_index.start()
+    await enrichment_queue.start()
+    
+    from app.core.retention import retention_job
+    retention_job.start_schedule()
+    
+    from app.core.health import health_monitor
+    health_monitor.start()
 
 # Shutdown Event
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down Neural Document Acquisition System")
+    
+    # Gepufferte Dokumente schreiben, bevor die Anwendung endet
+    from app.database.ingest_buffer import ingest_buffer
+    from app.core.enrichment import enrichment_queue
+    from app.core.reprocessor import corpus_reprocessor
+    from app.core.importer import directory_importer
+    from app.core.retention import retention_job
+    from app.core.reconciler import file_reconciler
+    from app.core.health import health_monitor
+    await health_monitor.stop()
+    corpus_reprocessor.stop()
+    directory_importer.stop()
+    file_reconciler.stop()
+    retention_job.shutdown()
+    await ingest_buffer.stop()
+    await enrichment_queue.stop()
+    
+    from app.database.manager import db_manager
+    from app.utils.search.bm25_index import bm25_index
+    from app.utils.search.passage_index import passage_index
+    await db_manager.counters.stop()
+    await bm25_index.stop()
+    passage_index.close()
+    
+    # Korpus-Statistiken sichern, damit keine IDF-Updates verloren gehen
+    from app.utils.text.corpus_stats import corpus_stats
+    corpus_stats.save()
+    
+    # Nicht replizierte Fallback-Dokumente bleiben im Journal für den nächsten Start
+    db_manager.fallback_store.close()
+    await db_manager.close()
 
 # Import and register routes
 print("Registering routes...")
 try:
-    from app.api.routes import router
+    from app.api.routes import api_router as router
     app.include_router(router)
     logger.info("API routes registered successfully")
 except Exception as e:
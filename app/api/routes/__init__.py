@@ -3,6 +3,8 @@ from .health import router as health_router
 from .scraping import router as scraping_router
 from .documents import router as documents_router
 from .dashboard import router as dashboard_router
+from .maintenance import router as maintenance_router
+from .stats import router as stats_router
 
 # Hauptrouter erstellen
 api_router = APIRouter()
@@ -11,4 +13,6 @@ api_router = APIRouter()
 api_router.include_router(health_router, tags=["Health"])
 api_router.include_router(scraping_router, tags=["Scraping"])
 api_router.include_router(documents_router, tags=["Documents"])
-api_router.include_router(dashboard_router, tags=["Dashboard"])
\ No newline at end of file
+api_router.include_router(dashboard_router, tags=["Dashboard"])
+api_router.include_router(maintenance_router, tags=["Maintenance"])
+api_router.include_router(stats_router, tags=["Stats"])
\ No newline at end of file
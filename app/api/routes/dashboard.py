@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Request, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi.templating import Jinja2Templates
 from typing import Dict, Any
 import logging
 from app.config import TEMPLATES_DIR, LOGO_FILE
+from app.core.dashboard import dashboard_snapshot
+from app.core.response_cache import conditional_response
 
 router = APIRouter()
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
@@ -23,4 +25,22 @@ async def get_dashboard(request: Request) -> HTMLResponse:
         )
     except Exception as e:
         logger.error(f"Fehler beim Rendern des Dashboards: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal Server Error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+@router.get("/api/dashboard/snapshot")
+async def get_dashboard_snapshot(request: Request) -> Response:
+    """
+    Gibt Scraping-Status, Statistiken, neueste Dokumente und Systemzustand
+    in einer Antwort zurück
+    
+    Der Snapshot wird von allen Clients geteilt und höchstens alle
+    DASHBOARD_SNAPSHOT_TTL Sekunden neu berechnet. Stimmt If-None-Match mit
+    dem ETag überein, wird 304 ohne Body geantwortet.
+    """
+    try:
+        snapshot = await dashboard_snapshot.get()
+    except Exception as e:
+        logger.error(f"Fehler beim Abrufen des Dashboard-Snapshots: {str(e)}")
+        raise HTTPException(status_code=500, detail="Fehler beim Abrufen des Dashboard-Snapshots")
+        
+    return conditional_response(request, snapshot.body, snapshot.etag)
@@ -1,39 +1,288 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, List
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse, Response
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+from email.utils import formatdate
+from pathlib import Path
+import asyncio
 import logging
+import mimetypes
+import stat
+import time
+from app.config import SEARCH_MAX_PER_PAGE, PASSAGE_MAX_RESULTS, SUPPORTED_FILE_TYPES
+from app.core.exporter import corpus_exporter, EXPORT_FORMATS
+from app.core.response_cache import response_cache, etag_matches
+from app.core.retention import retention_job
 from app.database.manager import db_manager
-from models import Document
+from app.utils.file.file_response import (
+    FileRangeResponse,
+    RangeNotSatisfiable,
+    content_disposition,
+    gzip_size,
+    parse_range
+)
+from app.utils.search.bm25_index import bm25_index
+from app.utils.search.passage_index import passage_index
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+FILE_FIELDS = {"file_type": 1, "content_type": 1, "local_path": 1, "content_hash": 1, "archive_path": 1, "archive_size": 1}
+
+def _locate_file(document: Dict) -> Optional[Tuple[Path, bool, int, float]]:
+    """
+    Sucht die Datei eines Dokuments: erst die heruntergeladene Datei, dann
+    die gzip-komprimierte Kopie im Retention-Archiv
+    
+    Returns:
+        Optional[Tuple]: (Pfad, komprimiert, Größe des Inhalts, mtime) oder None
+    """
+    candidates = []
+    if document.get("local_path"):
+        candidates.append((Path(document["local_path"]), False))
+    if document.get("archive_path"):
+        candidates.append((Path(document["archive_path"]), True))
+    if document.get("local_path"):
+        candidates.append((retention_job.archived_file(Path(document["local_path"])), True))
+        
+    for path, compressed in candidates:
+        try:
+            info = path.stat()
+        except OSError:
+            continue
+        if stat.S_ISREG(info.st_mode):
+            if compressed:
+                # Ohne gespeicherte Größe nur der gzip-Trailer (modulo 4 GiB)
+                size = document.get("archive_size") or gzip_size(path)
+            else:
+                size = info.st_size
+            return path, compressed, size, info.st_mtime
+    return None
+
+async def _search_page(query: str, cursor: Optional[str], per_page: int) -> Dict[str, Any]:
+    results, next_cursor = await db_manager.search_documents(
+        query,
+        cursor=cursor,
+        limit=per_page
+    )
+    response = {
+        "results": results,
+        "next_cursor": next_cursor,
+        "per_page": per_page
+    }
+    
+    # Gezählt wird nur einmal pro Suche
+    if cursor is None:
+        total, capped = await db_manager.count_search_results(query)
+        response.update({"total": total, "total_capped": capped})
+        
+    return response
+
 @router.get("/api/documents/search")
 async def search_documents(
+    request: Request,
     query: str,
-    page: int = 1,
+    cursor: Optional[str] = None,
     per_page: int = 10
 ) -> Dict[str, Any]:
-    """Durchsucht die gespeicherten Dokumente"""
+    """
+    Durchsucht die gespeicherten Dokumente (zwischengespeichert, mit ETag)
+    
+    Args:
+        query: Suchbegriffe
+        cursor: next_cursor der vorherigen Seite (leer für die erste Seite)
+        per_page: Treffer je Seite
+        
+    Returns:
+        Dict: Treffer, Cursor der nächsten Seite und (nur auf der ersten
+        Seite) die auf SEARCH_COUNT_CAP begrenzte Trefferzahl
+    """
+    per_page = max(1, min(per_page, SEARCH_MAX_PER_PAGE))
     try:
-        skip = (page - 1) * per_page
-        results = await db_manager.search_documents(
-            query,
-            skip=skip,
-            limit=per_page
+        return await response_cache.respond(
+            request,
+            lambda: _search_page(query, cursor, per_page)
         )
-        total = await db_manager.count_search_results(query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Fehler bei der Dokumentensuche: {str(e)}")
+        raise HTTPException(status_code=500, detail="Fehler bei der Dokumentensuche")
+
+
+@router.get("/api/documents/search/fulltext")
+async def search_fulltext(query: str, limit: int = 10) -> Dict[str, Any]:
+    """
+    Durchsucht den extrahierten Volltext per BM25
+    
+    Args:
+        query: Suchbegriffe (werden wie der Dokumenttext gestemmt)
+        limit: Maximale Trefferanzahl
+        
+    Returns:
+        Dict: Treffer mit Score und Metadaten, absteigend nach Relevanz
+    """
+    limit = max(1, min(limit, SEARCH_MAX_PER_PAGE))
+    try:
+        started = time.perf_counter()
+        hits = await asyncio.to_thread(bm25_index.search, query, limit)
+        search_ms = (time.perf_counter() - started) * 1000
+        
+        documents = await db_manager.get_documents_by_urls([url for url, _ in hits])
+        return {
+            "results": [
+                {**documents.get(url, {"url": url}), "score": score}
+                for url, score in hits
+            ],
+            "search_ms": round(search_ms, 2)
+        }
+    except Exception as e:
+        logger.error(f"Fehler bei der Volltextsuche: {str(e)}")
+        raise HTTPException(status_code=500, detail="Fehler bei der Volltextsuche")
+
+@router.get("/api/documents/search/fulltext/stats")
+async def get_fulltext_index_stats() -> Dict[str, Any]:
+    """Gibt Größe, Segmente und Tombstones des BM25-Index zurück"""
+    return bm25_index.get_stats()
+
+@router.get("/api/documents/passages/similar")
+async def find_similar_passages(text: str, k: int = 10) -> Dict[str, Any]:
+    """
+    Findet Passagen, die einem Text (z.B. einer Klausel) inhaltlich ähneln
+    
+    Args:
+        text: Vergleichstext
+        k: Anzahl der ähnlichsten Passagen
+        
+    Returns:
+        Dict: Passagen mit URL, Passagennummer, Text und Kosinus-Ähnlichkeit
+    """
+    if not passage_index.ready:
+        raise HTTPException(status_code=503, detail="Passagen-Index noch nicht aufgebaut")
         
+    k = max(1, min(k, PASSAGE_MAX_RESULTS))
+    try:
+        started = time.perf_counter()
+        results = await asyncio.to_thread(passage_index.similar, text, k)
         return {
             "results": results,
-            "total": total,
-            "page": page,
-            "per_page": per_page,
-            "pages": (total + per_page - 1) // per_page
+            "search_ms": round((time.perf_counter() - started) * 1000, 2)
         }
     except Exception as e:
-        logger.error(f"Fehler bei der Dokumentensuche: {str(e)}")
-        raise HTTPException(status_code=500, detail="Fehler bei der Dokumentensuche")
+        logger.error(f"Fehler bei der Passagensuche: {str(e)}")
+        raise HTTPException(status_code=500, detail="Fehler bei der Passagensuche")
 
+@router.get("/api/documents/export")
+async def export_documents(
+    format: str = "ndjson",
+    term: Optional[str] = None,
+    file_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    compress: bool = True
+) -> StreamingResponse:
+    """
+    Exportiert die Dokument-Metadaten als Datenstrom
+    
+    Args:
+        format: 'ndjson' oder 'parquet'
+        term: Nur Dokumente dieses Suchbegriffs
+        file_type: Nur Dokumente dieses Dateityps
+        start: Frühester Zeitstempel
+        end: Zeitstempel, vor dem die Dokumente liegen müssen
+        compress: NDJSON gzip-komprimieren
+        
+    Returns:
+        StreamingResponse: Export in Chunks (konstanter Speicherbedarf)
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format muss eines von {EXPORT_FORMATS} sein")
+        
+    query = corpus_exporter.build_query(term, file_type, start, end)
+    if format == "parquet":
+        filename, media_type = "documents.parquet", "application/vnd.apache.parquet"
+    elif compress:
+        filename, media_type = "documents.ndjson.gz", "application/gzip"
+    else:
+        filename, media_type = "documents.ndjson", "application/x-ndjson"
+        
+    return StreamingResponse(
+        corpus_exporter.stream(format, query, compress),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.api_route("/api/documents/{document_id}/file", methods=["GET", "HEAD"])
+async def get_document_file(request: Request, document_id: str) -> Response:
+    """
+    Liefert die gespeicherte Datei eines Dokuments aus
+    
+    Unterstützt einen Byte-Bereich je Anfrage (206/416), If-Range und
+    If-None-Match (304). Der ETag ist der Inhalts-Hash. Archivierte,
+    gzip-komprimierte Dateien werden beim Lesen entpackt.
+    
+    Args:
+        document_id: ID des Dokuments
+        
+    Returns:
+        Response: Dateiinhalt, gestreamt ohne die Datei in den Speicher zu laden
+    """
+    if not db_manager.connected:
+        raise HTTPException(status_code=503, detail="Datenbank nicht verbunden")
+        
+    document = await db_manager.get_document(document_id, FILE_FIELDS)
+    if document is None:
+        raise HTTPException(status_code=404, detail=f"Dokument {document_id} nicht gefunden")
+        
+    located = await asyncio.to_thread(_locate_file, document)
+    if located is None:
+        raise HTTPException(status_code=404, detail=f"Datei zu Dokument {document_id} nicht vorhanden")
+    path, compressed, size, mtime = located
+    
+    filename = Path(document.get("local_path") or path.with_suffix("")).name
+    media_type = (
+        SUPPORTED_FILE_TYPES.get(document.get("file_type"))
+        or document.get("content_type")
+        or mimetypes.guess_type(filename)[0]
+        or "application/octet-stream"
+    )
+    if document.get("content_hash"):
+        etag = f'"{document["content_hash"]}"'
+    else:
+        etag = f'W/"{size:x}-{int(mtime):x}"'
+    headers = {
+        "etag": etag,
+        "last-modified": formatdate(mtime, usegmt=True),
+        "content-disposition": content_disposition(filename),
+        "cache-control": "no-cache"
+    }
+    
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+        
+    # Passt If-Range nicht (Datei geändert oder schwacher ETag), wird die ganze Datei geliefert
+    if_range = request.headers.get("if-range")
+    try:
+        if if_range and (if_range != etag or etag.startswith("W/")):
+            byte_range = None
+        else:
+            byte_range = parse_range(request.headers.get("range"), size)
+    except RangeNotSatisfiable:
+        raise HTTPException(
+            status_code=416,
+            detail="Angeforderter Bereich nicht verfügbar",
+            headers={**headers, "content-range": f"bytes */{size}"}
+        )
+        
+    return FileRangeResponse(
+        path,
+        size,
+        media_type,
+        headers=headers,
+        byte_range=byte_range,
+        compressed=compressed,
+        send_body=request.method != "HEAD"
+    )
 
 @router.delete("/api/documents/{document_id}")
 async def delete_document(document_id: str) -> dict:
@@ -54,18 +303,23 @@ async def delete_document(document_id: str) -> dict:
             "status": "success",
             "message": f"Dokument {document_id} erfolgreich gelöscht"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Fehler beim Löschen des Dokuments: {str(e)}")
         raise HTTPException(status_code=500, detail="Fehler beim Löschen des Dokuments")
 
 @router.get("/api/documents/recent")
-async def get_recent_documents(limit: int = 10):
-    """Holt die neuesten Dokumente"""
-    try:
+async def get_recent_documents(request: Request, limit: int = 10):
+    """Holt die neuesten Dokumente (zwischengespeichert, mit ETag)"""
+    async def recent() -> Dict[str, Any]:
         documents = await db_manager.get_recent_documents(limit=limit)
         return {
             "documents": documents,
             "total_count": await db_manager.get_document_count()
         }
+        
+    try:
+        return await response_cache.respond(request, recent)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,29 +1,35 @@
 from fastapi import APIRouter, HTTPException
 from typing import Dict, Any
 import logging
-from app.core.scraper import scraper_engine
-from app.database.manager import db_manager
-from config import TEMPLATES_DIR
+from app.core.health import health_monitor
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.get("/api/health")
 async def health_check() -> Dict[str, Any]:
-    """Überprüft den Gesundheitszustand des Systems"""
-    try:
-        db_connected = await db_manager.connect()
-        downloads_ok = TEMPLATES_DIR.exists() and TEMPLATES_DIR.is_dir()
-        
-        return {
-            "status": "healthy" if db_connected and downloads_ok else "unhealthy",
-            "database": "connected" if db_connected else "disconnected",
-            "filesystem": "ok" if downloads_ok else "error",
-            "scraping_active": scraper_engine.status.is_running
-        }
-    except Exception as e:
-        logger.error(f"Fehler beim Health Check: {str(e)}")
-        return {
-            "status": "unhealthy",
-            "error": str(e)
-        }
\ No newline at end of file
+    """Gibt den zuletzt im Hintergrund geprüften Systemzustand zurück"""
+    return health_monitor.get_report()
+
+@router.get("/api/health/live")
+async def liveness() -> Dict[str, Any]:
+    """Liveness: Prozess und Health-Prober laufen"""
+    if not health_monitor.is_alive():
+        raise HTTPException(status_code=503, detail="Health-Prober läuft nicht")
+    return {
+        "status": "alive",
+        "uptime_seconds": round(health_monitor.uptime(), 1)
+    }
+
+@router.get("/api/health/ready")
+async def readiness() -> Dict[str, Any]:
+    """Readiness: Datenbank und Dateisystem waren bei der letzten Prüfung verfügbar"""
+    report = health_monitor.get_report()
+    if not report["ready"]:
+        raise HTTPException(status_code=503, detail={
+            "status": "not_ready",
+            "database": report["database"],
+            "filesystem": report["filesystem"],
+            "checked_at": report["checked_at"]
+        })
+    return {"status": "ready", "checked_at": report["checked_at"]}
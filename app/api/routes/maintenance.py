@@ -0,0 +1,269 @@
+from fastapi import APIRouter, HTTPException, BackgroundTasks
+from typing import Dict, Any, Optional
+from pathlib import Path
+import logging
+from app.core.importer import directory_importer
+from app.core.reconciler import file_reconciler
+from app.core.reprocessor import corpus_reprocessor
+from app.core.response_cache import response_cache
+from app.core.retention import retention_job
+from app.database.manager import db_manager
+from app.utils.search.passage_index import passage_index
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.post("/api/maintenance/reprocess")
+async def start_reprocessing(resume: bool = True) -> Dict[str, Any]:
+    """
+    Startet die Nachverarbeitung veralteter Dokumente
+    
+    Args:
+        resume: Beim letzten gespeicherten Fortschritt fortsetzen
+        
+    Returns:
+        Dict: Status des Jobs
+    """
+    try:
+        if corpus_reprocessor.is_running:
+            raise HTTPException(status_code=400, detail="Nachverarbeitung läuft bereits")
+            
+        if not await corpus_reprocessor.start(resume=resume):
+            raise HTTPException(status_code=503, detail="Datenbank nicht verbunden")
+            
+        return {
+            "status": "success",
+            "message": "Nachverarbeitung gestartet",
+            "job": corpus_reprocessor.get_status()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Fehler beim Starten der Nachverarbeitung: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Fehler beim Starten: {str(e)}")
+
+@router.post("/api/maintenance/reprocess/stop")
+async def stop_reprocessing() -> Dict[str, Any]:
+    """Stoppt die Nachverarbeitung, der Fortschritt bleibt erhalten"""
+    corpus_reprocessor.stop()
+    return {
+        "status": "success",
+        "message": "Nachverarbeitung wird gestoppt"
+    }
+
+@router.get("/api/maintenance/reprocess")
+async def get_reprocessing_status() -> Dict[str, Any]:
+    """Gibt den Fortschritt der Nachverarbeitung zurück"""
+    return corpus_reprocessor.get_status()
+
+@router.post("/api/maintenance/retention")
+async def start_retention(days: Optional[int] = None, archive: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    Startet die Bereinigung alter Dokumente samt Dateien
+    
+    Args:
+        days: Aufbewahrungsfrist in Tagen (Standard: RETENTION_DAYS)
+        archive: Vor dem Löschen archivieren (Standard: RETENTION_ARCHIVE)
+        
+    Returns:
+        Dict: Status des Laufs
+    """
+    if days is not None and days < 1:
+        raise HTTPException(status_code=400, detail="Die Frist muss mindestens einen Tag betragen")
+        
+    if retention_job.is_running:
+        raise HTTPException(status_code=400, detail="Bereinigung läuft bereits")
+        
+    if not (days or retention_job.days):
+        raise HTTPException(status_code=400, detail="Keine Aufbewahrungsfrist angegeben")
+        
+    if not retention_job.start(days=days, archive=archive):
+        raise HTTPException(status_code=503, detail="Datenbank nicht verbunden")
+        
+    return {
+        "status": "success",
+        "message": "Bereinigung gestartet",
+        "job": retention_job.get_status()
+    }
+
+@router.post("/api/maintenance/retention/stop")
+async def stop_retention() -> Dict[str, Any]:
+    """Bricht die laufende Bereinigung ab"""
+    retention_job.stop()
+    return {
+        "status": "success",
+        "message": "Bereinigung wird gestoppt"
+    }
+
+@router.get("/api/maintenance/retention")
+async def get_retention_status() -> Dict[str, Any]:
+    """Gibt den Fortschritt der Bereinigung zurück"""
+    return retention_job.get_status()
+
+@router.post("/api/maintenance/orphans")
+async def start_orphan_reconciliation(fix: bool = False, resume: bool = True) -> Dict[str, Any]:
+    """
+    Startet den Abgleich zwischen DOWNLOADS_DIR und Datenbank
+    
+    Args:
+        fix: Verwaiste Dateien löschen und hängende Verweise markieren
+        resume: Beim letzten gespeicherten Checkpoint fortsetzen
+        
+    Returns:
+        Dict: Status des Abgleichs
+    """
+    if file_reconciler.is_running:
+        raise HTTPException(status_code=400, detail="Abgleich läuft bereits")
+        
+    if not file_reconciler.start(fix=fix, resume=resume):
+        raise HTTPException(status_code=503, detail="Datenbank nicht verbunden")
+        
+    return {
+        "status": "success",
+        "message": "Abgleich gestartet",
+        "job": file_reconciler.get_status()
+    }
+
+@router.post("/api/maintenance/orphans/stop")
+async def stop_orphan_reconciliation() -> Dict[str, Any]:
+    """Stoppt den Abgleich, der Checkpoint bleibt erhalten"""
+    file_reconciler.stop()
+    return {
+        "status": "success",
+        "message": "Abgleich wird gestoppt"
+    }
+
+@router.get("/api/maintenance/orphans")
+async def get_orphan_reconciliation_status() -> Dict[str, Any]:
+    """Gibt Fortschritt und Befunde des Abgleichs zurück"""
+    return file_reconciler.get_status()
+
+@router.post("/api/maintenance/import")
+async def start_import(
+    directory: str,
+    term: Optional[str] = None,
+    resume: bool = True,
+    enrich: bool = True
+) -> Dict[str, Any]:
+    """
+    Startet den Import eines lokalen Dokumentverzeichnisses
+    
+    Args:
+        directory: Verzeichnis unterhalb von IMPORT_ROOTS
+        term: Suchbegriff für die importierten Dokumente
+        resume: Beim letzten gespeicherten Checkpoint fortsetzen
+        enrich: Anschließend die Nachverarbeitung starten
+        
+    Returns:
+        Dict: Status des Imports
+    """
+    try:
+        path = Path(directory)
+        if not directory_importer.is_allowed(path):
+            raise HTTPException(status_code=403, detail="Verzeichnis liegt außerhalb der Import-Verzeichnisse")
+            
+        if not path.is_dir():
+            raise HTTPException(status_code=404, detail="Verzeichnis nicht gefunden")
+            
+        if directory_importer.is_running:
+            raise HTTPException(status_code=400, detail="Import läuft bereits")
+            
+        if not await directory_importer.start(path, term=term, resume=resume, enrich=enrich):
+            raise HTTPException(status_code=503, detail="Datenbank nicht verbunden")
+            
+        return {
+            "status": "success",
+            "message": "Import gestartet",
+            "job": directory_importer.get_status()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Fehler beim Starten des Imports: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Fehler beim Starten: {str(e)}")
+
+@router.post("/api/maintenance/import/stop")
+async def stop_import() -> Dict[str, Any]:
+    """Stoppt den Import, der Checkpoint bleibt erhalten"""
+    directory_importer.stop()
+    return {
+        "status": "success",
+        "message": "Import wird gestoppt"
+    }
+
+@router.get("/api/maintenance/import")
+async def get_import_status() -> Dict[str, Any]:
+    """Gibt Fortschritt und Durchsatz des Imports zurück"""
+    return directory_importer.get_status()
+
+@router.post("/api/maintenance/canonical-urls/backfill")
+async def backfill_canonical_urls(
+    background_tasks: BackgroundTasks,
+    only_missing: bool = True
+) -> Dict[str, Any]:
+    """
+    Berechnet die kanonischen URLs bestehender Dokumente neu
+    
+    Args:
+        only_missing: Nur Dokumente ohne kanonische URL bearbeiten
+                      (False nach Änderungen an den Domain-Regeln)
+        
+    Returns:
+        Dict: Status
+    """
+    if not db_manager.connected:
+        raise HTTPException(status_code=503, detail="Datenbank nicht verbunden")
+        
+    background_tasks.add_task(db_manager.backfill_canonical_urls, only_missing)
+    return {
+        "status": "success",
+        "message": "Backfill der kanonischen URLs gestartet"
+    }
+
+@router.get("/api/maintenance/cache")
+async def get_lookup_cache_stats() -> Dict[str, Any]:
+    """Gibt Größe und Trefferquote des Lookup-Caches zurück"""
+    return db_manager.get_cache_stats()
+
+@router.get("/api/maintenance/cache/responses")
+async def get_response_cache_stats() -> Dict[str, Any]:
+    """Gibt Größe, Trefferquote und Schreib-Generation des Antwort-Caches zurück"""
+    return response_cache.get_stats()
+
+@router.post("/api/maintenance/cache/responses/clear")
+async def clear_response_cache() -> Dict[str, Any]:
+    """Verwirft alle zwischengespeicherten API-Antworten"""
+    response_cache.clear()
+    return {
+        "status": "success",
+        "message": "Antwort-Cache geleert"
+    }
+
+@router.post("/api/maintenance/stats/reconcile")
+async def reconcile_statistics(background_tasks: BackgroundTasks) -> Dict[str, Any]:
+    """Berechnet die materialisierten Korpus-Statistiken neu"""
+    if not db_manager.connected:
+        raise HTTPException(status_code=503, detail="Datenbank nicht verbunden")
+        
+    background_tasks.add_task(db_manager.counters.reconcile)
+    return {
+        "status": "success",
+        "message": "Abgleich der Statistiken gestartet"
+    }
+
+@router.post("/api/maintenance/passages/rebuild")
+async def rebuild_passage_index() -> Dict[str, Any]:
+    """Trainiert das Einbettungsmodell neu und baut den Passagen-Index auf"""
+    if not passage_index.start_rebuild(db_manager.iter_document_texts):
+        raise HTTPException(status_code=400, detail="Neuaufbau läuft bereits")
+        
+    return {
+        "status": "success",
+        "message": "Neuaufbau des Passagen-Index gestartet",
+        "job": passage_index.get_status()
+    }
+
+@router.get("/api/maintenance/passages")
+async def get_passage_index_status() -> Dict[str, Any]:
+    """Gibt Build, Größe und Fortschritt des Passagen-Index zurück"""
+    return passage_index.get_status()
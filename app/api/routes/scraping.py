@@ -1,12 +1,13 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Request
 from typing import Dict, Any
 import logging
-from models import (
+from app.models import (
     ScrapingRequest,
     ScrapingStatus,
     ScrapingStats
 )
 from app.core.scraper import scraper_engine
+from app.core.response_cache import response_cache
 from app.database.manager import db_manager
 from app.utils.term.term_expander import term_expander
 
@@ -65,10 +66,10 @@ async def get_status() -> ScrapingStatus:
         raise HTTPException(status_code=500, detail="Fehler beim Abrufen des Status")
 
 @router.get("/api/scraping/stats")
-async def get_stats() -> ScrapingStats:
-    """Gibt Statistiken über alle gescrapten Dokumente zurück"""
+async def get_stats(request: Request) -> ScrapingStats:
+    """Gibt Statistiken über alle gescrapten Dokumente zurück (zwischengespeichert, mit ETag)"""
     try:
-        return await db_manager.get_statistics()
+        return await response_cache.respond(request, db_manager.get_statistics)
     except Exception as e:
         logger.error(f"Fehler beim Abrufen der Statistiken: {str(e)}")
         raise HTTPException(status_code=500, detail="Fehler beim Abrufen der Statistiken")
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, HTTPException
+from typing import Dict, Any, Optional
+from datetime import datetime, timedelta, timezone
+import logging
+from app.database.manager import db_manager
+from app.database.rollups import GRANULARITIES, DIMENSIONS
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("/api/stats/rollups")
+async def get_rollups(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    granularity: Optional[str] = None,
+    dimension: str = "all",
+    key: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Gibt Ingest-Zeitreihen aus den vorverdichteten Rollups zurück
+    
+    Args:
+        start: Beginn des Zeitraums (Standard: vor 24 Stunden; ohne Zeitzone lokale Zeit)
+        end: Ende des Zeitraums (Standard: jetzt; ohne Zeitzone lokale Zeit)
+        granularity: 'minute', 'hour' oder 'day' (Standard: nach Zeitraum)
+        dimension: 'all', 'term', 'file_type' oder 'domain'
+        key: Wert der Dimension, z.B. ein Suchbegriff
+        
+    Returns:
+        Dict: Buckets (UTC) mit Dokumenten, Bytes, Fehlern und Fehlerquote
+    """
+    # Naive und zeitzonenbehaftete Angaben vor dem Vergleich vereinheitlichen
+    end = (end or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    start = start.astimezone(timezone.utc) if start else end - timedelta(days=1)
+    
+    if granularity is not None and granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"Unbekannte Granularität: {granularity}")
+    if dimension not in DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"Unbekannte Dimension: {dimension}")
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start muss vor end liegen")
+    if not db_manager.connected:
+        raise HTTPException(status_code=503, detail="Datenbank nicht verbunden")
+        
+    try:
+        return await db_manager.rollups.query(start, end, granularity, dimension, key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Fehler beim Abrufen der Rollups: {str(e)}")
+        raise HTTPException(status_code=500, detail="Fehler beim Abrufen der Rollups")
@@ -3,6 +3,6 @@ WebSocket-Modul für Echtzeit-Updates des Dashboards.
 """
 
 from .handler import websocket_manager
-from ..routes import router
+from .routes import router
 
 __all__ = ['websocket_manager', 'router']
\ No newline at end of file
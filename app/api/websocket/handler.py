@@ -10,7 +10,7 @@ from datetime import datetime
 from fastapi import WebSocket
 from dataclasses import dataclass
 from app.core.scraper import scraper_engine
-from app.database.manager import db_manager
+from app.core.dashboard import dashboard_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -67,11 +67,13 @@ class WebSocketManager:
     async def send_initial_state(self, websocket: WebSocket):
         """Initialen Status an neuen Client senden"""
         try:
+            # Geteilter Snapshot statt eigener Statistik-Abfrage je Verbindung
+            snapshot = await dashboard_snapshot.get()
             message = WebSocketMessage(
                 type="initial_state",
                 data={
                     "scraping_status": scraper_engine.status.dict(),
-                    "stats": (await db_manager.get_statistics()).dict(),
+                    "stats": snapshot.data["stats"],
                     "connected_at": self.client_info[websocket]["connected_at"],
                     "client_id": self.client_info[websocket]["id"]
                 }
@@ -8,25 +8,77 @@ from .logging import LOG_LEVEL, LOG_FORMAT, LOG_DIR, logger
 
 # Dann die anderen Module
 from .settings import (
-    BASE_DIR, DOWNLOADS_DIR, STATIC_DIR, TEMPLATES_DIR, LOGS_DIR,
-    GOOGLE_API_KEY, GOOGLE_CSE_ID, MONGODB_URI, DB_NAME,
+    BASE_DIR, DOWNLOADS_DIR, STATIC_DIR, TEMPLATES_DIR, LOGS_DIR, LOG_FILE, DATA_DIR,
+    GOOGLE_API_KEY, GOOGLE_CSE_ID, STORAGE_BACKEND, MONGODB_URI, DB_NAME,
+    SQLITE_PATH, SQLITE_CACHE_SIZE_MB,
     LOGO_FILE, MAX_PARALLEL_DOWNLOADS, DEFAULT_SIMILARITY_THRESHOLD,
-    MAX_RETRIES, REQUEST_TIMEOUT, BATCH_SIZE, CACHE_ENABLED,
-    CACHE_DURATION
+    MAX_RETRIES, REQUEST_TIMEOUT, BATCH_SIZE, DEDUP_GATE_MAX_ENTRIES, FALLBACK_JOURNAL_FILE,
+    FALLBACK_MEMORY_LIMIT, FALLBACK_REPLAY_BATCH_SIZE, INGEST_BATCH_SIZE,
+    INGEST_FLUSH_INTERVAL, ENRICHMENT_CONCURRENCY, ENRICHMENT_PROCESS_WORKERS,
+    ENRICHMENT_QUEUE_SIZE, ENRICHMENT_MAX_TEXT_LENGTH, ENRICHMENT_MAX_ATTEMPTS,
+    ENRICHMENT_RETRY_INTERVAL, REPROCESS_BATCH_SIZE,
+    REPROCESS_CONCURRENCY, REPROCESS_MAX_DOCS_PER_SECOND, REPROCESS_PAUSE_INTERVAL,
+    RETENTION_DAYS, RETENTION_ARCHIVE, RETENTION_ARCHIVE_DIR, RETENTION_INTERVAL,
+    RETENTION_BATCH_SIZE, RETENTION_MAX_DOCS_PER_SECOND,
+    STATS_RECONCILE_INTERVAL, STATS_HLL_PRECISION, ROLLUP_RETENTION_DAYS,
+    ROLLUP_MAX_BUCKETS, SEARCH_MAX_PER_PAGE, SEARCH_COUNT_CAP,
+    CACHE_ENABLED, LOOKUP_CACHE_SIZE, LOOKUP_CACHE_TTL, LOOKUP_CACHE_NEGATIVE_TTL,
+    RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL, URL_RULE_CACHE_SIZE,
+    CACHE_DURATION, CORPUS_STATS_FILE, CORPUS_STATS_BUCKETS,
+    CORPUS_STATS_SAVE_INTERVAL, KEYWORD_TOP_K, LANGUAGE_CACHE_SIZE,
+    LANGUAGE_MIN_EVIDENCE, BM25_INDEX_DIR, BM25_SEGMENT_SIZE, BM25_FLUSH_INTERVAL,
+    BM25_MAX_SEGMENTS, BM25_MERGE_FACTOR, BM25_K1, BM25_B, STEM_CACHE_SIZE,
+    PASSAGE_INDEX_DIR, PASSAGE_WORDS, PASSAGE_OVERLAP, PASSAGE_DIMENSIONS,
+    PASSAGE_HASH_FEATURES, PASSAGE_TRAIN_SAMPLE, PASSAGE_NPROBE, PASSAGE_MAX_RESULTS,
+    EXPORT_BATCH_SIZE, EXPORT_PARQUET_COMPRESSION,
+    IMPORT_ROOTS, IMPORT_WORKERS, IMPORT_BATCH_SIZE, IMPORT_MIN_FILE_SIZE, IMPORT_MAX_FILE_SIZE,
+    ORPHAN_BATCH_SIZE, ORPHAN_SORT_RUN_SIZE, ORPHAN_GRACE_PERIOD, ORPHAN_SAMPLE_SIZE,
+    HEALTH_PROBE_INTERVAL, HEALTH_PROBE_TIMEOUT, HEALTH_DB_FAILURE_THRESHOLD, HEALTH_MIN_FREE_DISK_MB, HEALTH_QUOTA_WARNING_RATIO,
+    DASHBOARD_SNAPSHOT_TTL, DASHBOARD_RECENT_LIMIT, FILE_SERVE_CHUNK_SIZE
 )
 
 from .constants import (
     SUPPORTED_FILE_TYPES, MATRIX_COLORS, DOMAIN_TERMS,
-    API_COST_PER_REQUEST, CHUNK_SIZE, MEMORY_LIMIT
+    API_COST_PER_REQUEST, CHUNK_SIZE, MEMORY_LIMIT,
+    ENRICHMENT_STAGE_VERSIONS, ENRICHMENT_VERSION, URL_IGNORED_PARAMETERS,
+    URL_IGNORED_PARAMETER_PREFIXES, URL_DEFAULT_CANONICALIZATION_RULE,
+    URL_CANONICALIZATION_RULES, SEARCH_RESULT_FIELDS, EXPORT_FIELDS, PAYLOAD_COLLECTIONS,
+    STORED_FIELD_NAMES, DICTIONARY_FIELDS
 )
 
 __all__ = [
     'LOG_LEVEL', 'LOG_FORMAT', 'LOG_DIR', 'logger',
-    'BASE_DIR', 'DOWNLOADS_DIR', 'STATIC_DIR', 'TEMPLATES_DIR', 'LOGS_DIR',
-    'GOOGLE_API_KEY', 'GOOGLE_CSE_ID', 'MONGODB_URI', 'DB_NAME',
+    'BASE_DIR', 'DOWNLOADS_DIR', 'STATIC_DIR', 'TEMPLATES_DIR', 'LOGS_DIR', 'LOG_FILE', 'DATA_DIR',
+    'GOOGLE_API_KEY', 'GOOGLE_CSE_ID', 'STORAGE_BACKEND', 'MONGODB_URI', 'DB_NAME',
+    'SQLITE_PATH', 'SQLITE_CACHE_SIZE_MB',
     'LOGO_FILE', 'MAX_PARALLEL_DOWNLOADS', 'DEFAULT_SIMILARITY_THRESHOLD',
-    'MAX_RETRIES', 'REQUEST_TIMEOUT', 'BATCH_SIZE', 'CACHE_ENABLED',
-    'CACHE_DURATION',
+    'MAX_RETRIES', 'REQUEST_TIMEOUT', 'BATCH_SIZE', 'DEDUP_GATE_MAX_ENTRIES', 'FALLBACK_JOURNAL_FILE',
+    'FALLBACK_MEMORY_LIMIT', 'FALLBACK_REPLAY_BATCH_SIZE', 'INGEST_BATCH_SIZE',
+    'INGEST_FLUSH_INTERVAL', 'ENRICHMENT_CONCURRENCY', 'ENRICHMENT_PROCESS_WORKERS',
+    'ENRICHMENT_QUEUE_SIZE', 'ENRICHMENT_MAX_TEXT_LENGTH', 'ENRICHMENT_MAX_ATTEMPTS',
+    'ENRICHMENT_RETRY_INTERVAL', 'REPROCESS_BATCH_SIZE',
+    'REPROCESS_CONCURRENCY', 'REPROCESS_MAX_DOCS_PER_SECOND', 'REPROCESS_PAUSE_INTERVAL',
+    'RETENTION_DAYS', 'RETENTION_ARCHIVE', 'RETENTION_ARCHIVE_DIR', 'RETENTION_INTERVAL',
+    'RETENTION_BATCH_SIZE', 'RETENTION_MAX_DOCS_PER_SECOND',
+    'STATS_RECONCILE_INTERVAL', 'STATS_HLL_PRECISION', 'ROLLUP_RETENTION_DAYS',
+    'ROLLUP_MAX_BUCKETS', 'SEARCH_MAX_PER_PAGE', 'SEARCH_COUNT_CAP',
+    'CACHE_ENABLED', 'LOOKUP_CACHE_SIZE', 'LOOKUP_CACHE_TTL', 'LOOKUP_CACHE_NEGATIVE_TTL',
+    'RESPONSE_CACHE_SIZE', 'RESPONSE_CACHE_TTL', 'URL_RULE_CACHE_SIZE',
+    'CACHE_DURATION', 'CORPUS_STATS_FILE', 'CORPUS_STATS_BUCKETS',
+    'CORPUS_STATS_SAVE_INTERVAL', 'KEYWORD_TOP_K', 'LANGUAGE_CACHE_SIZE',
+    'LANGUAGE_MIN_EVIDENCE', 'BM25_INDEX_DIR', 'BM25_SEGMENT_SIZE', 'BM25_FLUSH_INTERVAL',
+    'BM25_MAX_SEGMENTS', 'BM25_MERGE_FACTOR', 'BM25_K1', 'BM25_B', 'STEM_CACHE_SIZE',
+    'PASSAGE_INDEX_DIR', 'PASSAGE_WORDS', 'PASSAGE_OVERLAP', 'PASSAGE_DIMENSIONS',
+    'PASSAGE_HASH_FEATURES', 'PASSAGE_TRAIN_SAMPLE', 'PASSAGE_NPROBE', 'PASSAGE_MAX_RESULTS',
+    'EXPORT_BATCH_SIZE', 'EXPORT_PARQUET_COMPRESSION',
+    'IMPORT_ROOTS', 'IMPORT_WORKERS', 'IMPORT_BATCH_SIZE', 'IMPORT_MIN_FILE_SIZE', 'IMPORT_MAX_FILE_SIZE',
+    'ORPHAN_BATCH_SIZE', 'ORPHAN_SORT_RUN_SIZE', 'ORPHAN_GRACE_PERIOD', 'ORPHAN_SAMPLE_SIZE',
+    'HEALTH_PROBE_INTERVAL', 'HEALTH_PROBE_TIMEOUT', 'HEALTH_DB_FAILURE_THRESHOLD', 'HEALTH_MIN_FREE_DISK_MB', 'HEALTH_QUOTA_WARNING_RATIO',
+    'DASHBOARD_SNAPSHOT_TTL', 'DASHBOARD_RECENT_LIMIT', 'FILE_SERVE_CHUNK_SIZE',
     'SUPPORTED_FILE_TYPES', 'MATRIX_COLORS', 'DOMAIN_TERMS',
-    'API_COST_PER_REQUEST', 'CHUNK_SIZE', 'MEMORY_LIMIT'
+    'API_COST_PER_REQUEST', 'CHUNK_SIZE', 'MEMORY_LIMIT',
+    'ENRICHMENT_STAGE_VERSIONS', 'ENRICHMENT_VERSION', 'URL_IGNORED_PARAMETERS',
+    'URL_IGNORED_PARAMETER_PREFIXES', 'URL_DEFAULT_CANONICALIZATION_RULE',
+    'URL_CANONICALIZATION_RULES', 'SEARCH_RESULT_FIELDS', 'EXPORT_FIELDS', 'PAYLOAD_COLLECTIONS',
+    'STORED_FIELD_NAMES', 'DICTIONARY_FIELDS'
 ] 
\ No newline at end of file
@@ -34,9 +34,89 @@ DOMAIN_TERMS = {
     ]
 }
 
+# URL-Kanonisierung
+# Parameter, die den Dokumentinhalt nicht verändern und entfernt werden
+URL_IGNORED_PARAMETERS = {
+    'fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga', 'ref',
+    'download', 'dl', 'inline', 'sessionid', 'sid', 'phpsessid'
+}
+URL_IGNORED_PARAMETER_PREFIXES = ('utm_',)
+
+# Standardregeln, pro Domain (inkl. Subdomains) in URL_CANONICALIZATION_RULES überschreibbar
+URL_DEFAULT_CANONICALIZATION_RULE = {
+    'unify_scheme': True,        # http und https gleich behandeln
+    'strip_www': True,           # www.example.org == example.org
+    'strip_trailing_slash': True,
+    'sort_query': True,
+    'drop_parameters': [],       # zusätzliche zu entfernende Parameter
+    'keep_parameters': []        # Parameter, die trotz Ignorier-Liste erhalten bleiben
+}
+URL_CANONICALIZATION_RULES = {
+    # Beispiel: 'gesetze-im-internet.de': {'strip_trailing_slash': False},
+}
+
 # API Kostenberechnung
 API_COST_PER_REQUEST = 0.005
 
 # Performance-Einstellungen
 CHUNK_SIZE = 8192  # Bytes f��r Streaming-Downloads
-MEMORY_LIMIT = 1024 * 1024 * 1024  # 1GB Speicherlimit 
\ No newline at end of file
+MEMORY_LIMIT = 1024 * 1024 * 1024  # 1GB Speicherlimit
+
+# Versionen der Anreicherungsstufen
+# Beim Ändern einer Stufe deren Version erhöhen, damit bestehende Dokumente
+# als veraltet erkannt werden
+ENRICHMENT_STAGE_VERSIONS = {
+    'text': 1,
+    'keywords': 1,
+    'language': 1,
+    'near_duplicates': 1,
+    'fulltext': 1,
+    'passages': 1
+}
+ENRICHMENT_VERSION = sum(ENRICHMENT_STAGE_VERSIONS.values())
+
+# Schwere Felder, die getrennt von den Metadaten gespeichert und nur bei
+# Bedarf geladen werden (Collection bzw. Tabelle -> Felder, Schlüssel url)
+PAYLOAD_COLLECTIONS = {
+    'document_text': ('text',),
+    'document_features': (
+        'simhash', 'near_duplicate_family', 'near_duplicate_of', 'near_duplicate_similarity'
+    )
+}
+
+# Kurze Feldnamen der gespeicherten Dokumente (Feld -> gespeicherter Name);
+# nicht aufgeführte Felder werden unter ihrem Namen gespeichert
+STORED_FIELD_NAMES = {
+    'canonical_url': 'cu',
+    'content_type': 'ct',
+    'content_hash': 'ch',
+    'file_type': 'ft',
+    'term': 'tm',
+    'domain': 'dm',
+    'timestamp': 'ts',
+    'local_path': 'lp',
+    'download_time': 'dl',
+    'language': 'lg',
+    'keywords': 'kw',
+    'stage_versions': 'sv',
+    'enrichment_version': 'ev',
+    'enrichment_state': 'es',
+    'enriched_at': 'ea',
+    'file_missing': 'fm'
+}
+
+# Felder, deren Werte als Codes aus Wörterbuch-Tabellen gespeichert werden
+DICTIONARY_FIELDS = ('term', 'domain', 'content_type')
+
+# Felder in Suchergebnissen (ohne Volltext und andere schwere Felder)
+SEARCH_RESULT_FIELDS = (
+    'url', 'title', 'snippet', 'file_type', 'size',
+    'timestamp', 'term', 'language', 'keywords'
+)
+
+# Felder im Metadaten-Export (ohne Volltext und Fingerprints)
+EXPORT_FIELDS = (
+    'url', 'canonical_url', 'title', 'snippet', 'file_type', 'content_type',
+    'size', 'timestamp', 'term', 'domain', 'language', 'keywords', 'hash',
+    'download_time', 'local_path'
+)
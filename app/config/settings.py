@@ -18,14 +18,19 @@ DOWNLOADS_DIR = BASE_DIR / "downloads"
 STATIC_DIR = BASE_DIR / "static"
 TEMPLATES_DIR = BASE_DIR / "templates"
 LOGS_DIR = BASE_DIR / "logs"
+LOG_FILE = LOGS_DIR / "app.log"
+DATA_DIR = BASE_DIR / "data"
 
 # API Konfiguration
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 GOOGLE_CSE_ID = os.getenv('SEARCH_ENGINE_ID')
 
 # Datenbankeinstellungen
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', "mongo")  # 'mongo' oder 'sqlite'
 MONGODB_URI = os.getenv('MONGODB_URI', "mongodb://mongodb:27017/")
 DB_NAME = "document_scraper"
+SQLITE_PATH = Path(os.getenv('SQLITE_PATH', DATA_DIR / "documents.sqlite3"))
+SQLITE_CACHE_SIZE_MB = 64  # Seiten-Cache der SQLite-Verbindung
 
 # Logo-Einstellungen
 LOGO_FILE = STATIC_DIR / "images" / "logo.png"
@@ -36,7 +41,125 @@ DEFAULT_SIMILARITY_THRESHOLD = 0.85
 MAX_RETRIES = 3
 REQUEST_TIMEOUT = 30
 BATCH_SIZE = 10
+DEDUP_GATE_MAX_ENTRIES = 200_000  # Bekannte Schlüssel im Speicher vor dem Download-Check
+
+# Fallback-Speicher, solange MongoDB nicht erreichbar ist
+FALLBACK_JOURNAL_FILE = DATA_DIR / "fallback_journal.ndjson"
+FALLBACK_MEMORY_LIMIT = 10_000  # Dokumente im Speicher, der Rest wird aus dem Journal gelesen
+FALLBACK_REPLAY_BATCH_SIZE = 500  # Dokumente je Bulk-Write beim Replay
+
+# Ingest-Einstellungen (gepufferte Bulk-Writes)
+INGEST_BATCH_SIZE = 50  # Flush, sobald so viele Dokumente gepuffert sind
+INGEST_FLUSH_INTERVAL = 0.5  # Spätestens nach X Sekunden flushen
+
+# Anreicherung (Text, Keywords, Sprache, Beinahe-Duplikate) im Hintergrund
+ENRICHMENT_CONCURRENCY = 4  # Gleichzeitig angereicherte Dokumente
+ENRICHMENT_PROCESS_WORKERS = 2  # Prozesse für die Textextraktion
+ENRICHMENT_QUEUE_SIZE = 1000
+ENRICHMENT_MAX_TEXT_LENGTH = 500_000  # Zeichen
+ENRICHMENT_MAX_ATTEMPTS = 3  # Versuche, bevor ein Dokument 'failed' bleibt
+ENRICHMENT_RETRY_INTERVAL = 600  # Sekunden zwischen zwei Läufen über ausstehende Dokumente
+
+# Nachverarbeitung des Bestands bei neuen Stufen-Versionen
+REPROCESS_BATCH_SIZE = 100  # Dokumente je Cursor-Batch
+REPROCESS_CONCURRENCY = 4  # Gleichzeitig verarbeitete Dokumente je Batch
+REPROCESS_MAX_DOCS_PER_SECOND = 20  # Drosselung der Mongo-Last
+REPROCESS_PAUSE_INTERVAL = 10  # Sekunden Wartezeit, solange gescrapt wird
+
+# Aufbewahrung: alte Dokumente samt Dateien löschen oder archivieren
+RETENTION_DAYS = int(os.getenv('RETENTION_DAYS', 0)) or None  # None = keine automatische Bereinigung
+RETENTION_ARCHIVE = os.getenv('RETENTION_ARCHIVE', 'false').lower() == 'true'  # Archivieren statt löschen
+RETENTION_ARCHIVE_DIR = DATA_DIR / "archive"
+RETENTION_INTERVAL = 24 * 3600  # Sekunden zwischen automatischen Läufen
+RETENTION_BATCH_SIZE = 200  # Dokumente je Lösch-Statement
+RETENTION_MAX_DOCS_PER_SECOND = 50  # Drosselung, damit die Collection reaktionsfähig bleibt
+
+# Materialisierte Korpus-Statistiken
+STATS_RECONCILE_INTERVAL = 3600  # Sekunden zwischen vollständigen Abgleichen
+STATS_HLL_PRECISION = 12  # 2^12 Register, ca. 1,6 % Fehler bei eindeutigen Domains
+
+# Zeitliche Rollups (Aufbewahrung je Granularität in Tagen, None = unbegrenzt)
+ROLLUP_RETENTION_DAYS = {
+    'minute': 2,
+    'hour': 90,
+    'day': None
+}
+ROLLUP_MAX_BUCKETS = 2000  # Höchstens so viele Buckets je Abfrage
+
+# Dokumentensuche
+SEARCH_MAX_PER_PAGE = 100
+SEARCH_COUNT_CAP = 1000  # Trefferzahl wird nur bis zu dieser Grenze exakt ermittelt
 
 # Cache-Einstellungen
 CACHE_ENABLED = True
-CACHE_DURATION = 3600  # 1 Stunde 
\ No newline at end of file
+CACHE_DURATION = 3600  # 1 Stunde
+LOOKUP_CACHE_SIZE = 50_000  # Zwischengespeicherte Dokument-Lookups (URL/Hash)
+LOOKUP_CACHE_TTL = 300  # Sekunden für gefundene Dokumente
+LOOKUP_CACHE_NEGATIVE_TTL = 60  # Sekunden für "nicht vorhanden"
+RESPONSE_CACHE_SIZE = 512  # Zwischengespeicherte API-Antworten (LRU)
+RESPONSE_CACHE_TTL = 300  # Sekunden; begrenzt die Verzögerung bei Schreibzugriffen anderer Prozesse
+URL_RULE_CACHE_SIZE = 10_000  # Zwischengespeicherte Kanonisierungsregeln pro Host (LRU)
+
+# Keyword-Extraktion (TF-IDF gegen Korpus-Statistiken)
+CORPUS_STATS_FILE = DATA_DIR / "corpus_stats.npz"
+CORPUS_STATS_BUCKETS = 2 ** 20  # Größe des gehashten Dokumentfrequenz-Arrays
+CORPUS_STATS_SAVE_INTERVAL = 100  # Speichern nach X neuen Dokumenten
+KEYWORD_TOP_K = 10
+
+# Volltextindex (BM25)
+BM25_INDEX_DIR = DATA_DIR / "bm25"
+BM25_SEGMENT_SIZE = 5000  # Dokumente je Segment, bevor der Puffer geschrieben wird
+BM25_FLUSH_INTERVAL = 60  # Sekunden, nach denen ein nicht leerer Puffer geschrieben wird
+BM25_MAX_SEGMENTS = 8  # Darüber werden Segmente im Hintergrund zusammengeführt
+BM25_MERGE_FACTOR = 4  # Anzahl der kleinsten Segmente je Merge
+BM25_K1 = 1.2
+BM25_B = 0.75
+STEM_CACHE_SIZE = 200_000  # Zwischengespeicherte Wortstämme
+
+# Passagen-Index (LSA-Einbettungen, Ähnlichkeitssuche)
+PASSAGE_INDEX_DIR = DATA_DIR / "passages"
+PASSAGE_WORDS = 120  # Wörter je Passage
+PASSAGE_OVERLAP = 20  # Überlappung aufeinanderfolgender Passagen
+PASSAGE_DIMENSIONS = 128  # Dimensionen der Einbettung (TruncatedSVD)
+PASSAGE_HASH_FEATURES = 2 ** 18  # Größe des gehashten Vokabulars
+PASSAGE_TRAIN_SAMPLE = 50_000  # Passagen für das Training beim Neuaufbau
+PASSAGE_NPROBE = 8  # Durchsuchte IVF-Listen je Anfrage
+PASSAGE_MAX_RESULTS = 50
+
+# Export der Dokument-Metadaten (NDJSON/Parquet)
+EXPORT_BATCH_SIZE = 5000  # Dokumente je Cursor-Batch bzw. Parquet-Row-Group
+EXPORT_PARQUET_COMPRESSION = "zstd"
+
+# Import lokaler Dokumentverzeichnisse
+IMPORT_ROOTS = [
+    Path(root) for root in os.getenv('IMPORT_ROOTS', str(BASE_DIR / "imports")).split(os.pathsep)
+    if root
+]  # Über die API importierbare Verzeichnisse (die CLI ist nicht beschränkt)
+IMPORT_WORKERS = os.cpu_count() or 2  # Prozesse für Prüfung, Hashing und Textextraktion
+IMPORT_BATCH_SIZE = 500  # Dateien je Bulk-Write und Checkpoint
+IMPORT_MIN_FILE_SIZE = 100  # Bytes
+IMPORT_MAX_FILE_SIZE = 100 * 1024 * 1024  # 100 MB
+
+# Abgleich zwischen DOWNLOADS_DIR und Datenbank (verwaiste Dateien und Verweise)
+ORPHAN_BATCH_SIZE = 1000  # Einträge je Korrektur-Batch und Checkpoint
+ORPHAN_SORT_RUN_SIZE = 100_000  # Dateinamen je sortiertem Lauf der externen Sortierung
+ORPHAN_GRACE_PERIOD = 3600  # Sekunden; jüngere Dateien werden evtl. noch gespeichert
+ORPHAN_SAMPLE_SIZE = 20  # Beispiele je Kategorie im Bericht
+
+# Health-Prüfung im Hintergrund
+HEALTH_PROBE_INTERVAL = 15  # Sekunden zwischen zwei Prüfungen
+HEALTH_PROBE_TIMEOUT = 3  # Sekunden für den Datenbank-Ping
+HEALTH_DB_FAILURE_THRESHOLD = 3  # Aufeinanderfolgende Ping-Fehler, ab denen die Datenbank als getrennt gilt
+HEALTH_MIN_FREE_DISK_MB = 1024  # Darunter gilt der Speicherplatz als knapp
+HEALTH_QUOTA_WARNING_RATIO = 0.1  # Anteil verbleibender Suchanfragen, ab dem gewarnt wird
+
+# Dashboard-Snapshot
+DASHBOARD_SNAPSHOT_TTL = 2  # Sekunden, die ein berechneter Snapshot geteilt wird
+DASHBOARD_RECENT_LIMIT = 10  # Neueste Dokumente im Snapshot
+
+# Auslieferung gespeicherter Dateien
+FILE_SERVE_CHUNK_SIZE = 256 * 1024  # Bytes je Lesevorgang, wenn der Server kein sendfile anbietet
+
+# Spracherkennung
+LANGUAGE_CACHE_SIZE = 10000  # Zwischengespeicherte Ergebnisse (nach Text-Hash)
+LANGUAGE_MIN_EVIDENCE = 3  # Mindestanzahl Indikatoren für den DE/EN-Schnelltest 
\ No newline at end of file
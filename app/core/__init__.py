@@ -7,6 +7,15 @@ Enthält die zentrale Logik für Scraping, Downloads und Dokumentenverarbeitung.
 from .scraper import scraper_engine
 from .downloader import document_downloader
 from .processor import document_processor
+from .enrichment import enrichment_queue, document_enricher
+from .reprocessor import corpus_reprocessor
+from .importer import directory_importer
+from .retention import retention_job
+from .reconciler import file_reconciler
+from .health import health_monitor
+from .dashboard import dashboard_snapshot
+from .response_cache import response_cache
+from .dedup_gate import dedup_gate
 from .status_manager import StatusManager
 
 __version__ = '2.0.0'
@@ -15,5 +24,15 @@ __all__ = [
     'scraper_engine',
     'document_downloader',
     'document_processor',
+    'enrichment_queue',
+    'document_enricher',
+    'corpus_reprocessor',
+    'directory_importer',
+    'retention_job',
+    'file_reconciler',
+    'health_monitor',
+    'dashboard_snapshot',
+    'response_cache',
+    'dedup_gate',
     'StatusManager',
 ]
\ No newline at end of file
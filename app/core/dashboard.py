@@ -0,0 +1,102 @@
+# app/core/dashboard.py
+"""
+Dashboard Snapshot.
+Fasst Scraping-Status, Statistiken, neueste Dokumente und Systemzustand in
+einer Antwort zusammen, die für kurze Zeit von allen Dashboards geteilt wird.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from app.config import DASHBOARD_SNAPSHOT_TTL, DASHBOARD_RECENT_LIMIT
+from app.database.manager import db_manager
+from .health import health_monitor
+from .response_cache import serialize, make_etag
+from .scraper import scraper_engine
+
+logger = logging.getLogger(__name__)
+
+class Snapshot(NamedTuple):
+    """Berechneter Snapshot: Daten, fertig serialisierter Body und ETag"""
+    data: Dict
+    body: bytes
+    etag: str
+    expires: float
+
+class DashboardSnapshot:
+    """
+    Gemeinsamer, kurzlebiger Snapshot für alle Dashboards.
+
+    Ein Snapshot wird höchstens einmal pro ttl Sekunden berechnet. Fragen
+    mehrere Clients gleichzeitig nach einem abgelaufenen Snapshot, warten
+    alle auf dieselbe Berechnung (single flight). Die Gesamtzahl stammt aus
+    den gepflegten Zählern statt aus einem count_documents über den Bestand.
+
+    Der ETag wird aus dem Inhalt ohne Erstellungszeitpunkt gebildet, so dass
+    ein neu berechneter, aber unveränderter Snapshot weiter mit 304
+    beantwortet werden kann.
+    """
+
+    def __init__(self, ttl: float = DASHBOARD_SNAPSHOT_TTL, recent_limit: int = DASHBOARD_RECENT_LIMIT):
+        self.ttl = ttl
+        self.recent_limit = recent_limit
+        self.current: Optional[Snapshot] = None
+        self.builds = 0
+        self._refresh: Optional[asyncio.Task] = None
+
+    async def get(self) -> Snapshot:
+        """
+        Liefert den aktuellen Snapshot und berechnet ihn bei Bedarf neu.
+
+        Schlägt die Berechnung fehl, wird der letzte Snapshot weiter
+        ausgeliefert (sofern vorhanden).
+        """
+        if self.current is not None and self.current.expires > time.monotonic():
+            return self.current
+
+        if self._refresh is None:
+            self._refresh = asyncio.create_task(self._build())
+        try:
+            # Ein abgebrochener Request bricht die gemeinsame Berechnung nicht ab
+            return await asyncio.shield(self._refresh)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if self.current is None:
+                raise
+            logger.error(f"Fehler beim Erstellen des Dashboard-Snapshots: {str(e)}")
+            return self.current
+
+    async def _build(self) -> Snapshot:
+        try:
+            stats, recent = await asyncio.gather(
+                db_manager.get_statistics(),
+                db_manager.get_recent_documents(limit=self.recent_limit)
+            )
+            data = jsonable_encoder({
+                "scraping_status": scraper_engine.status,
+                "stats": stats,
+                "recent_documents": {
+                    "documents": recent,
+                    "total_count": stats.total_documents
+                },
+                "health": health_monitor.get_report()
+            })
+
+            etag = make_etag(serialize(data))
+            data["generated_at"] = datetime.now().isoformat()
+            body = serialize(data)
+
+            self.current = Snapshot(data, body, etag, time.monotonic() + self.ttl)
+            self.builds += 1
+            return self.current
+        finally:
+            self._refresh = None
+
+# Globale Instanz
+dashboard_snapshot = DashboardSnapshot()
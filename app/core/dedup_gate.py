@@ -0,0 +1,176 @@
+# app/core/dedup_gate.py
+"""
+Dedup Gate - Duplikatsprüfung vor dem Download.
+Filtert Suchergebnisse, deren URL, kanonische URL oder Snippet bereits
+bekannt ist, bevor Bandbreite für den Download verbraucht wird.
+"""
+
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.config import DEDUP_GATE_MAX_ENTRIES
+from app.database.manager import db_manager
+from app.utils.url.url_canonicalizer import url_canonicalizer
+
+logger = logging.getLogger(__name__)
+
+def snippet_hash(snippet: str) -> str:
+    """Berechnet den Hash eines Such-Snippets (entspricht dem Feld 'hash')"""
+    return hashlib.md5(snippet.encode()).hexdigest()
+
+class DedupGate:
+    """
+    In-Memory-Index bekannter Dokumente mit MongoDB als Rückfallebene.
+
+    Die Indizes bilden URL, kanonische URL und Snippet-Hash auf die
+    Dateigröße ab, damit eingesparte Bytes berichtet werden können.
+    Unbekannte Schlüssel werden pro Suchbegriff in einer einzigen
+    Datenbankabfrage geprüft. Jeder Index hält höchstens max_entries
+    Schlüssel; ist er voll, wird der am längsten nicht genutzte verdrängt.
+    """
+
+    def __init__(self, max_entries: int = DEDUP_GATE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.known_urls: "OrderedDict[str, int]" = OrderedDict()
+        self.known_canonical_urls: "OrderedDict[str, int]" = OrderedDict()
+        self.known_hashes: "OrderedDict[str, int]" = OrderedDict()
+        self.skipped_requests = 0
+        self.skipped_bytes = 0
+
+    def remember(self, url: str, hash_value: Optional[str], size: int = 0):
+        """
+        Merkt sich ein gespeichertes Dokument.
+
+        Args:
+            url: URL des Dokuments
+            hash_value: Snippet-Hash (None bei leerem Snippet)
+            size: Dateigröße in Bytes
+        """
+        self._store(self.known_urls, url, size)
+        self._store(self.known_canonical_urls, url_canonicalizer.canonicalize(url), size)
+        if hash_value:
+            self._store(self.known_hashes, hash_value, size)
+
+    def _store(self, index: "OrderedDict[str, int]", key: str, size: int):
+        """Trägt einen Schlüssel ein und verdrängt bei Bedarf den ältesten (LRU)"""
+        index[key] = size
+        index.move_to_end(key)
+        while len(index) > self.max_entries:
+            # Verdrängte Schlüssel prüft weiterhin die Datenbankabfrage
+            index.popitem(last=False)
+
+    async def filter_results(self, results: List[Dict]) -> Tuple[List[Dict], int, int]:
+        """
+        Entfernt bekannte Dokumente aus den Suchergebnissen.
+
+        Args:
+            results: Suchergebnisse der Custom Search API
+
+        Returns:
+            Tuple[List[Dict], int, int]: (neue Ergebnisse, übersprungene
+            Requests, eingesparte Bytes)
+        """
+        skipped = 0
+        skipped_bytes = 0
+        seen_urls, seen_canonical_urls, seen_hashes = set(), set(), set()
+        candidates = []
+
+        for result in results:
+            url = result.get('link')
+            if not url:
+                continue
+            canonical_url = url_canonicalizer.canonicalize(url)
+            snippet = result.get('snippet') or ''
+            hash_value = snippet_hash(snippet) if snippet else None
+
+            known_size = self._lookup(url, canonical_url, hash_value)
+            if known_size is not None:
+                skipped += 1
+                skipped_bytes += known_size
+                continue
+
+            # Duplikate innerhalb derselben Ergebnisliste
+            if (url in seen_urls or canonical_url in seen_canonical_urls
+                    or (hash_value and hash_value in seen_hashes)):
+                skipped += 1
+                continue
+
+            seen_urls.add(url)
+            seen_canonical_urls.add(canonical_url)
+            if hash_value:
+                seen_hashes.add(hash_value)
+            candidates.append((result, url, canonical_url, hash_value))
+
+        known_by_url, known_by_canonical_url, known_by_hash = await self._query_database(candidates)
+
+        accepted = []
+        for result, url, canonical_url, hash_value in candidates:
+            existing = (
+                known_by_url.get(url)
+                or known_by_canonical_url.get(canonical_url)
+                or (known_by_hash.get(hash_value) if hash_value else None)
+            )
+            if existing:
+                size = existing.get('size') or 0
+                self.remember(existing['url'], existing.get('hash'), size)
+                skipped += 1
+                skipped_bytes += size
+            else:
+                accepted.append(result)
+
+        self.skipped_requests += skipped
+        self.skipped_bytes += skipped_bytes
+        if skipped:
+            logger.info(
+                f"Dedup-Gate: {skipped} bekannte Dokumente übersprungen "
+                f"({skipped_bytes / 1024 / 1024:.2f} MB eingespart)"
+            )
+        return accepted, skipped, skipped_bytes
+
+    def get_stats(self) -> Dict:
+        """
+        Gibt die Statistiken des Gates zurück
+
+        Returns:
+            Dict: Indexgröße und eingesparte Requests/Bytes
+        """
+        return {
+            'known_urls': len(self.known_urls),
+            'known_hashes': len(self.known_hashes),
+            'skipped_requests': self.skipped_requests,
+            'skipped_bytes': self.skipped_bytes
+        }
+
+    def _lookup(self, url: str, canonical_url: str, hash_value: Optional[str]) -> Optional[int]:
+        """Prüft den In-Memory-Index, liefert die bekannte Größe oder None"""
+        for index, key in (
+            (self.known_urls, url),
+            (self.known_canonical_urls, canonical_url),
+            (self.known_hashes, hash_value)
+        ):
+            if key and key in index:
+                index.move_to_end(key)
+                return index[key]
+        return None
+
+    async def _query_database(self, candidates: List[Tuple]) -> Tuple[Dict, Dict, Dict]:
+        """Prüft alle Kandidaten mit einer einzigen Datenbankabfrage"""
+        if not candidates:
+            return {}, {}, {}
+
+        known = await db_manager.find_known_documents(
+            [url for _, url, _, _ in candidates],
+            [hash_value for _, _, _, hash_value in candidates if hash_value],
+            [canonical_url for _, _, canonical_url, _ in candidates]
+        )
+        known_by_url = {doc['url']: doc for doc in known}
+        known_by_canonical_url = {
+            doc['canonical_url']: doc for doc in known if doc.get('canonical_url')
+        }
+        known_by_hash = {doc['hash']: doc for doc in known if doc.get('hash')}
+        return known_by_url, known_by_canonical_url, known_by_hash
+
+# Globale Instanz
+dedup_gate = DedupGate()
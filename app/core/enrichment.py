@@ -0,0 +1,385 @@
+# app/core/enrichment.py
+"""
+Enrichment Queue - zweite Phase der Dokumentverarbeitung.
+Reichert bereits gespeicherte Dokumente im Hintergrund mit Volltext,
+Keywords, Sprache und Beinahe-Duplikat-Familie an und nimmt sie in den
+BM25-Index auf, unabhängig vom Crawling.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.config import (
+    DEFAULT_SIMILARITY_THRESHOLD,
+    ENRICHMENT_CONCURRENCY,
+    ENRICHMENT_PROCESS_WORKERS,
+    ENRICHMENT_QUEUE_SIZE,
+    ENRICHMENT_MAX_TEXT_LENGTH,
+    ENRICHMENT_MAX_ATTEMPTS,
+    ENRICHMENT_RETRY_INTERVAL,
+    ENRICHMENT_STAGE_VERSIONS
+)
+from app.database.manager import db_manager
+from app.utils.file.text_extractor import text_extractor
+from app.utils.language.language_detector import language_detector
+from app.utils.search.bm25_index import bm25_index
+from app.utils.search.passage_index import passage_index
+from app.utils.text.corpus_stats import corpus_stats
+from app.utils.text.fingerprint import simhash, to_hex, from_hex, near_duplicate_index
+from app.utils.text.text_processor import text_processor
+
+logger = logging.getLogger(__name__)
+
+# Für die Spracherkennung genügt der Textanfang
+LANGUAGE_SAMPLE_LENGTH = 5000
+
+def _extract_text(file_path: str, file_type: str, max_length: int) -> str:
+    """Textextraktion als picklebare Funktion für den Prozess-Pool"""
+    return text_extractor.extract(file_path, file_type, max_length)
+
+class DocumentEnricher:
+    """Führt die versionierten Anreicherungsstufen für ein Dokument aus"""
+
+    def __init__(self, process_workers: int = ENRICHMENT_PROCESS_WORKERS):
+        self.process_workers = process_workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self):
+        """Startet den Prozess-Pool für die Textextraktion"""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.process_workers)
+
+    def shutdown(self):
+        """Beendet den Prozess-Pool"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def available_stages(self) -> Dict[str, int]:
+        """
+        Gibt die derzeit ausführbaren Stufen mit ihrer aktuellen Version zurück.
+
+        Die Passagen-Stufe fehlt, solange der Passagen-Index nichts aufnimmt;
+        sie gilt dann für kein Dokument als ausstehend.
+        """
+        return {
+            stage: version for stage, version in ENRICHMENT_STAGE_VERSIONS.items()
+            if stage != 'passages' or passage_index.accepting
+        }
+
+    def outdated_stages(self, document: Dict) -> List[str]:
+        """
+        Ermittelt die ausführbaren Stufen, deren gespeicherte Version veraltet ist.
+
+        Args:
+            document: Gespeichertes Dokument
+
+        Returns:
+            List[str]: Namen der neu auszuführenden Stufen
+        """
+        versions = document.get('stage_versions') or {}
+        return [
+            stage for stage, version in self.available_stages().items()
+            if versions.get(stage, 0) < version
+        ]
+
+    async def load_fingerprints(self):
+        """Füllt den Beinahe-Duplikat-Index mit den gespeicherten Fingerprints"""
+        try:
+            count = 0
+            async for doc in db_manager.iter_payloads(
+                'document_features', ('simhash', 'near_duplicate_family')
+            ):
+                if doc.get('simhash'):
+                    near_duplicate_index.add(
+                        doc['url'],
+                        from_hex(doc['simhash']),
+                        doc.get('near_duplicate_family')
+                    )
+                    count += 1
+            logger.info(f"{count} Fingerprints in den Duplikat-Index geladen")
+        except Exception as e:
+            logger.error(f"Fehler beim Laden der Fingerprints: {str(e)}")
+
+    async def enrich(
+        self,
+        document: Dict,
+        stages: Optional[Iterable[str]] = None,
+        similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD
+    ) -> Dict:
+        """
+        Führt die angegebenen (bzw. veralteten) Stufen für ein Dokument aus.
+
+        Args:
+            document: Gespeichertes Dokument
+            stages: Auszuführende Stufen (Standard: alle veralteten)
+            similarity_threshold: Mindestähnlichkeit für Beinahe-Duplikate
+
+        Returns:
+            Dict: Zu setzende Felder inklusive Anreicherungsstatus
+        """
+        stages = set(self.outdated_stages(document) if stages is None else stages)
+        stage_versions = dict(document.get('stage_versions') or {})
+        updates = {}
+
+        text = document.get('text') or ''
+        if 'text' in stages:
+            text = await self._extract_text(document)
+            updates['text'] = text
+        elif not text and stages:
+            # Der Volltext liegt getrennt von den Metadaten und wird nur bei Bedarf geladen
+            text = await db_manager.get_document_text(document['url'])
+
+        # Ohne extrahierbaren Text wird auf das Snippet zurückgegriffen
+        analysis_text = text or document.get('snippet') or ''
+        tokens = []
+        if stages & {'keywords', 'near_duplicates'}:
+            tokens = await asyncio.to_thread(text_processor.tokenize, analysis_text)
+
+        if 'keywords' in stages:
+            # Dokumentfrequenzen nur bei der ersten Anreicherung fortschreiben
+            if 'keywords' not in stage_versions:
+                corpus_stats.add_document(tokens)
+            keywords = await asyncio.to_thread(text_processor.extract_keywords, analysis_text)
+            updates['keywords'] = [keyword for keyword, _ in keywords]
+
+        if 'language' in stages:
+            # Die Sprachverteilung schreibt der Aufrufer erst nach dem Speichern fort
+            updates['language'] = await asyncio.to_thread(
+                language_detector.detect,
+                analysis_text[:LANGUAGE_SAMPLE_LENGTH]
+            )
+
+        if 'near_duplicates' in stages:
+            updates.update(await self._assign_family(document['url'], tokens, similarity_threshold))
+
+        if 'fulltext' in stages:
+            await asyncio.to_thread(
+                bm25_index.add,
+                document['url'],
+                f"{document.get('title') or ''}\n{analysis_text}"
+            )
+
+        if 'passages' in stages:
+            if passage_index.accepting:
+                # Nur extrahierter Text wird in Passagen zerlegt, nicht das Snippet
+                await asyncio.to_thread(passage_index.add, document['url'], text)
+            else:
+                # Ohne Build nimmt der Index nichts auf; die Stufe bleibt veraltet
+                stages.discard('passages')
+
+        for stage in stages:
+            stage_versions[stage] = ENRICHMENT_STAGE_VERSIONS[stage]
+
+        updates.update({
+            'stage_versions': stage_versions,
+            'enrichment_version': sum(stage_versions.values()),
+            'enrichment_state': 'done',
+            'enriched_at': datetime.now()
+        })
+        return updates
+
+    async def _extract_text(self, document: Dict) -> str:
+        """Extrahiert den Volltext im Prozess-Pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            _extract_text,
+            document['local_path'],
+            document.get('file_type'),
+            ENRICHMENT_MAX_TEXT_LENGTH
+        )
+
+    async def _assign_family(self, url: str, tokens: List[str], similarity_threshold: float) -> Dict:
+        """Ordnet das Dokument über seinen SimHash einer Duplikat-Familie zu"""
+        if not tokens:
+            # Ohne Tokens ist der SimHash 0; alle leeren Dokumente bildeten sonst eine Familie
+            near_duplicate_index.remove(url)
+            return {
+                'simhash': None,
+                'near_duplicate_family': None,
+                'near_duplicate_of': None,
+                'near_duplicate_similarity': None
+            }
+
+        # Hashing und Kandidatensuche laufen außerhalb des Event-Loops
+        fingerprint = await asyncio.to_thread(simhash, tokens)
+        match = await asyncio.to_thread(
+            near_duplicate_index.assign, url, fingerprint, similarity_threshold
+        )
+
+        return {
+            'simhash': to_hex(fingerprint),
+            'near_duplicate_family': match[1] if match else url,
+            'near_duplicate_of': match[0] if match else None,
+            'near_duplicate_similarity': match[2] if match else None
+        }
+
+class EnrichmentQueue:
+    """
+    Hintergrund-Warteschlange für die Anreicherung gespeicherter Dokumente.
+
+    Dokumente werden nach dem Speichern per URL eingereiht und von einer
+    festen Anzahl Worker abgearbeitet. Ist die Warteschlange voll, bleibt
+    das Dokument im Zustand 'pending'. Ein Hintergrundlauf reiht solche
+    Dokumente und fehlgeschlagene mit weniger als ENRICHMENT_MAX_ATTEMPTS
+    Versuchen regelmäßig erneut ein.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = ENRICHMENT_CONCURRENCY,
+        max_size: int = ENRICHMENT_QUEUE_SIZE
+    ):
+        self.concurrency = concurrency
+        self.max_size = max_size
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: List[asyncio.Task] = []
+        self._queued: Set[str] = set()
+        self._bootstrap_task: Optional[asyncio.Task] = None
+        self.processed = 0
+        self.failed = 0
+
+    async def start(self):
+        """Startet Prozess-Pool, Fingerprint-Index und Worker"""
+        if self.queue is not None:
+            return
+
+        self.queue = asyncio.Queue(maxsize=self.max_size)
+        document_enricher.start()
+        self._bootstrap_task = asyncio.create_task(self._bootstrap())
+        logger.info("Enrichment-Queue gestartet")
+
+    async def stop(self):
+        """Stoppt alle Worker und den Prozess-Pool"""
+        tasks = self.workers + ([self._bootstrap_task] if self._bootstrap_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.workers = []
+        self._queued.clear()
+        self._bootstrap_task = None
+        self.queue = None
+        document_enricher.shutdown()
+        logger.info("Enrichment-Queue gestoppt")
+
+    def enqueue(self, url: str, similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD) -> bool:
+        """
+        Reiht ein gespeichertes Dokument zur Anreicherung ein.
+
+        Args:
+            url: URL des Dokuments
+            similarity_threshold: Mindestähnlichkeit für Beinahe-Duplikate
+
+        Returns:
+            bool: False, wenn die Warteschlange nicht läuft oder voll ist
+        """
+        if self.queue is None:
+            return False
+        if url in self._queued:
+            return True
+
+        try:
+            self.queue.put_nowait((url, similarity_threshold))
+            self._queued.add(url)
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"Enrichment-Queue voll, Dokument bleibt ausstehend: {url}")
+            return False
+
+    async def enrich_url(self, url: str, similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD):
+        """Reichert ein einzelnes Dokument an und speichert das Ergebnis"""
+        document = await db_manager.get_document_by_url(url)
+        if not document:
+            logger.warning(f"Anzureicherndes Dokument nicht gefunden: {url}")
+            return
+
+        try:
+            updates = await document_enricher.enrich(
+                document,
+                similarity_threshold=similarity_threshold
+            )
+            self.processed += 1
+        except Exception as e:
+            logger.error(f"Fehler bei der Anreicherung von {url}: {str(e)}")
+            updates = {
+                'enrichment_state': 'failed',
+                'enrichment_error': str(e),
+                'enrichment_attempts': (document.get('enrichment_attempts') or 0) + 1
+            }
+            self.failed += 1
+
+        if await db_manager.update_document(url, updates) and 'language' in updates:
+            await db_manager.counters.record_language_changes(
+                [(document.get('language'), updates['language'])]
+            )
+
+    def get_status(self) -> Dict:
+        """
+        Gibt den Zustand der Warteschlange zurück
+
+        Returns:
+            Dict: Warteschlangenlänge, aktive Worker und Zähler
+        """
+        return {
+            'running': self.queue is not None,
+            'queued': self.queue.qsize() if self.queue else 0,
+            'workers_alive': sum(1 for worker in self.workers if not worker.done()),
+            'processed': self.processed,
+            'failed': self.failed
+        }
+
+    async def _bootstrap(self):
+        """Lädt den Duplikat-Index, startet die Worker und reiht Ausstehendes ein"""
+        await document_enricher.load_fingerprints()
+        self.workers = [
+            asyncio.create_task(self._worker(worker_id))
+            for worker_id in range(self.concurrency)
+        ]
+        while True:
+            try:
+                await self._requeue_pending()
+            except Exception as e:
+                logger.error(f"Fehler beim erneuten Einreihen: {str(e)}")
+            await asyncio.sleep(ENRICHMENT_RETRY_INTERVAL)
+
+    async def _requeue_pending(self):
+        """Reiht ausstehende und erneut zu versuchende Dokumente ein"""
+        queued = 0
+        query = {'$or': [
+            {'enrichment_state': 'pending'},
+            {'enrichment_state': 'failed', 'enrichment_attempts': {'$lt': ENRICHMENT_MAX_ATTEMPTS}},
+            # Vor Einführung des Zählers fehlgeschlagene Dokumente
+            {'enrichment_state': 'failed', 'enrichment_attempts': {'$exists': False}}
+        ]}
+        async for doc in db_manager.iter_documents(query, {'url': 1}):
+            if self.queue is None:
+                break
+            if doc['url'] in self._queued:
+                continue
+            # Bei voller Warteschlange warten, bis die Worker Platz schaffen
+            await self.queue.put((doc['url'], DEFAULT_SIMILARITY_THRESHOLD))
+            self._queued.add(doc['url'])
+            queued += 1
+        if queued:
+            logger.info(f"{queued} ausstehende Dokumente erneut eingereiht")
+
+    async def _worker(self, worker_id: int):
+        """Arbeitet die Warteschlange ab"""
+        while True:
+            url, similarity_threshold = await self.queue.get()
+            try:
+                await self.enrich_url(url, similarity_threshold)
+            except Exception as e:
+                logger.error(f"Enrichment-Worker {worker_id} Fehler: {str(e)}")
+            finally:
+                self._queued.discard(url)
+                self.queue.task_done()
+
+# Globale Instanzen
+document_enricher = DocumentEnricher()
+enrichment_queue = EnrichmentQueue()
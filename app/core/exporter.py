@@ -0,0 +1,228 @@
+# app/core/exporter.py
+"""
+Corpus Exporter.
+Exportiert die Dokument-Metadaten gestreamt als NDJSON (gzip) oder Parquet,
+ohne den Bestand in den Speicher zu laden.
+"""
+
+import json
+import logging
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.config import (
+    EXPORT_BATCH_SIZE,
+    EXPORT_FIELDS,
+    EXPORT_PARQUET_COMPRESSION
+)
+from app.database.manager import db_manager
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('ndjson', 'parquet')
+
+def to_local(timestamp: datetime) -> datetime:
+    """
+    Normalisiert einen Zeitpunkt auf naive lokale Zeit.
+
+    So speichert der Scraper die Zeitstempel; zeitzonenbehaftete Grenzen
+    (z.B. aus der API) würden sonst gegen naive Werte bzw. ISO-Strings
+    ohne Offset verglichen.
+    """
+    return timestamp.astimezone().replace(tzinfo=None)
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+class _ChunkSink:
+    """Schreibziel für pyarrow, das geschriebene Bytes bis zum Abholen puffert"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+class CorpusExporter:
+    """
+    Gestreamter Export der documents-Collection.
+
+    Dokumente werden über einen Cursor in Batches gelesen und sofort als
+    komprimierte Chunks ausgegeben: NDJSON als ein durchgehender gzip-Strom,
+    Parquet mit einer Row Group je Batch. Der Speicherbedarf hängt nur von
+    der Batch-Größe ab, nicht von der Größe des Bestands.
+    """
+
+    def __init__(self, batch_size: int = EXPORT_BATCH_SIZE, fields: Tuple[str, ...] = EXPORT_FIELDS):
+        self.batch_size = batch_size
+        self.fields = fields
+
+    @staticmethod
+    def build_query(
+        term: Optional[str] = None,
+        file_type: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Dict:
+        """
+        Erstellt den Filter für einen Export.
+
+        Args:
+            term: Nur Dokumente dieses Suchbegriffs
+            file_type: Nur Dokumente dieses Dateityps
+            start: Frühester Zeitstempel (inklusive, naiv = lokale Zeit)
+            end: Spätester Zeitstempel (exklusive, naiv = lokale Zeit)
+
+        Returns:
+            Dict: Filter für db_manager.iter_documents
+        """
+        query = {}
+        if term:
+            query['term'] = term
+        if file_type:
+            query['file_type'] = file_type
+        if start or end:
+            # Solange migrate_encoding nicht abgeschlossen ist, prüft der
+            # DocumentCodec (legacy-Modus) zusätzlich die alten ISO-Strings
+            query['timestamp'] = {}
+            if start:
+                query['timestamp']['$gte'] = to_local(start)
+            if end:
+                query['timestamp']['$lt'] = to_local(end)
+        return query
+
+    def stream(self, export_format: str, query: Dict, compress: bool = True) -> AsyncIterator[bytes]:
+        """
+        Liefert den Export als Folge von Byte-Chunks.
+
+        Args:
+            export_format: 'ndjson' oder 'parquet'
+            query: Filter (siehe build_query)
+            compress: NDJSON mit gzip komprimieren (Parquet ist immer komprimiert)
+
+        Raises:
+            ValueError: Bei unbekanntem Format
+        """
+        if export_format == 'ndjson':
+            return self._stream_ndjson(query, compress)
+        if export_format == 'parquet':
+            return self._stream_parquet(query)
+        raise ValueError(f"Unbekanntes Exportformat: {export_format}")
+
+    async def export_to_file(
+        self,
+        path: Path,
+        export_format: str,
+        query: Dict,
+        compress: bool = True
+    ) -> int:
+        """
+        Schreibt einen Export in eine Datei.
+
+        Returns:
+            int: Geschriebene Bytes
+        """
+        written = 0
+        with open(path, 'wb') as output:
+            async for chunk in self.stream(export_format, query, compress):
+                output.write(chunk)
+                written += len(chunk)
+        logger.info(f"Export nach {path} abgeschlossen ({written} Bytes)")
+        return written
+
+    async def _batches(self, query: Dict) -> AsyncIterator[List[Dict]]:
+        """Liest die exportierten Felder batchweise über einen Cursor"""
+        projection = {'_id': 0, **{field: 1 for field in self.fields}}
+        batch = []
+        async for doc in db_manager.iter_documents(query, projection, batch_size=self.batch_size):
+            batch.append(doc)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def _stream_ndjson(self, query: Dict, compress: bool) -> AsyncIterator[bytes]:
+        # wbits=31: gzip-Header, so dass der Strom als .ndjson.gz lesbar ist
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+        exported = 0
+        async for batch in self._batches(query):
+            lines = "".join(
+                json.dumps(doc, default=_json_default, ensure_ascii=False) + "\n"
+                for doc in batch
+            ).encode("utf-8")
+            exported += len(batch)
+            chunk = compressor.compress(lines) if compressor else lines
+            if chunk:
+                yield chunk
+        if compressor:
+            yield compressor.flush()
+        logger.info(f"NDJSON-Export: {exported} Dokumente")
+
+    async def _stream_parquet(self, query: Dict) -> AsyncIterator[bytes]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = self._parquet_schema(pa)
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema, compression=EXPORT_PARQUET_COMPRESSION)
+        exported = 0
+        try:
+            async for batch in self._batches(query):
+                columns = {
+                    field: [self._parquet_value(field, doc.get(field)) for doc in batch]
+                    for field in self.fields
+                }
+                writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+                exported += len(batch)
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+        logger.info(f"Parquet-Export: {exported} Dokumente")
+
+    def _parquet_schema(self, pa):
+        types = {
+            'size': pa.int64(),
+            'download_time': pa.float64(),
+            'timestamp': pa.timestamp('us'),
+            'keywords': pa.list_(pa.string())
+        }
+        return pa.schema([(field, types.get(field, pa.string())) for field in self.fields])
+
+    @staticmethod
+    def _parquet_value(field: str, value):
+        """Vereinheitlicht Werte je Backend (z.B. ISO-Strings aus SQLite)"""
+        if value is None:
+            return None
+        if field == 'timestamp':
+            return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+        if field in ('size', 'download_time', 'keywords'):
+            return value
+        return str(value)
+
+# Globale Instanz
+corpus_exporter = CorpusExporter()
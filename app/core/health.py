@@ -0,0 +1,245 @@
+# app/core/health.py
+"""
+Health Monitor.
+Prüft Datenbank, Speicherplatz, Suchkontingent und Hintergrund-Worker
+periodisch im Hintergrund; die Health-Endpunkte liefern nur das letzte
+Ergebnis aus.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.config import (
+    DOWNLOADS_DIR,
+    HEALTH_DB_FAILURE_THRESHOLD,
+    HEALTH_MIN_FREE_DISK_MB,
+    HEALTH_PROBE_INTERVAL,
+    HEALTH_PROBE_TIMEOUT,
+    HEALTH_QUOTA_WARNING_RATIO
+)
+from app.database.ingest_buffer import ingest_buffer
+from app.database.manager import db_manager
+from app.utils.search.bm25_index import bm25_index
+from . import scraper
+from .enrichment import enrichment_queue
+from .retention import retention_job
+
+logger = logging.getLogger(__name__)
+
+# Ein Prober, der so lange nicht geprüft hat, gilt als hängend
+STALE_AFTER_INTERVALS = 3
+
+def _task_state(task: Optional[asyncio.Task]) -> str:
+    """Zustand eines Hintergrund-Tasks: running, idle oder failed"""
+    if task is None or (task.done() and task.cancelled()):
+        return "idle"
+    if task.done():
+        return "failed" if task.exception() is not None else "idle"
+    return "running"
+
+class HealthMonitor:
+    """
+    Zwischengespeicherter Systemzustand.
+
+    Ein Hintergrund-Task prüft alle interval Sekunden:
+    - Datenbank: Ping über die bestehende Verbindung (mit Timeout); erst
+      nach failure_threshold Fehlschlägen in Folge gilt die Verbindung als
+      getrennt und Schreibzugriffe gehen in den Fallback-Speicher, der
+      Neuaufbau läuft in einem eigenen Task
+    - Dateisystem: DOWNLOADS_DIR vorhanden, beschreibbar, freier Platz
+    - Suchkontingent: verbleibende Anfragen des Tageslimits
+    - Worker: Enrichment-Worker, Index-Wartung, Ingest-Puffer, Statistik-
+      Abgleich und Bereinigung laufen bzw. sind nicht abgestürzt
+
+    Bereit (ready) ist das System, wenn Datenbank und Dateisystem in
+    Ordnung sind; einzelne fehlgeschlagene Pings, knapper Platz, knappes
+    Kontingent oder abgestürzte Worker führen zu 'degraded'.
+    """
+
+    def __init__(
+        self,
+        interval: float = HEALTH_PROBE_INTERVAL,
+        timeout: float = HEALTH_PROBE_TIMEOUT,
+        failure_threshold: int = HEALTH_DB_FAILURE_THRESHOLD,
+        min_free_disk_mb: int = HEALTH_MIN_FREE_DISK_MB,
+        quota_warning_ratio: float = HEALTH_QUOTA_WARNING_RATIO,
+        downloads_dir: Path = DOWNLOADS_DIR
+    ):
+        self.interval = interval
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.db_failures = 0  # Aufeinanderfolgende fehlgeschlagene Pings
+        self.min_free_disk_mb = min_free_disk_mb
+        self.quota_warning_ratio = quota_warning_ratio
+        self.downloads_dir = Path(downloads_dir)
+        self.task: Optional[asyncio.Task] = None
+        self.reconnect_task: Optional[asyncio.Task] = None
+        self.started_at = time.monotonic()
+        self.last_probe: Optional[float] = None
+        self.report: Dict = {
+            "status": "starting",
+            "ready": False,
+            "database": "unknown",
+            "filesystem": "unknown",
+            "checks": {},
+            "checked_at": None
+        }
+
+    def start(self):
+        """Startet die periodische Prüfung"""
+        if self.task is None:
+            self.task = asyncio.create_task(self._probe_loop())
+
+    async def stop(self):
+        """Stoppt die periodische Prüfung"""
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        if self.reconnect_task is not None:
+            self.reconnect_task.cancel()
+            await asyncio.gather(self.reconnect_task, return_exceptions=True)
+            self.reconnect_task = None
+
+    def get_report(self) -> Dict:
+        """Letztes Prüfergebnis (ohne eigene Prüfung)"""
+        return {**self.report, "scraping_active": scraper.scraper_engine.status.is_running}
+
+    def is_alive(self) -> bool:
+        """True, solange der Prober läuft und nicht hängt"""
+        if self.task is None or self.task.done():
+            return False
+        last = self.last_probe if self.last_probe is not None else self.started_at
+        return time.monotonic() - last < self.interval * STALE_AFTER_INTERVALS + self.timeout
+
+    def is_ready(self) -> bool:
+        """True, wenn Datenbank und Dateisystem bei der letzten Prüfung in Ordnung waren"""
+        return self.report["ready"]
+
+    def uptime(self) -> float:
+        return time.monotonic() - self.started_at
+
+    async def probe(self) -> Dict:
+        """Führt alle Prüfungen aus und legt das Ergebnis ab"""
+        started = time.perf_counter()
+        checks = {
+            "database": await self._check_database(),
+            "filesystem": await asyncio.to_thread(self._check_filesystem),
+            "search_quota": self._check_search_quota(),
+            "workers": self._check_workers()
+        }
+
+        ready = checks["database"]["status"] != "error" and checks["filesystem"]["status"] != "error"
+        degraded = (
+            checks["database"]["status"] != "ok"
+            or checks["filesystem"]["status"] != "ok"
+            or checks["search_quota"]["status"] != "ok"
+            or "failed" in checks["workers"].values()
+        )
+        self.report = {
+            "status": "unhealthy" if not ready else "degraded" if degraded else "healthy",
+            "ready": ready,
+            "database": "connected" if checks["database"]["status"] != "error" else "disconnected",
+            "filesystem": "ok" if checks["filesystem"]["status"] != "error" else "error",
+            "checks": checks,
+            "checked_at": datetime.now().isoformat(),
+            "probe_duration_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+        self.last_probe = time.monotonic()
+        return self.report
+
+    async def _probe_loop(self):
+        while True:
+            try:
+                await self.probe()
+            except Exception as e:
+                logger.error(f"Fehler bei der Health-Prüfung: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def _check_database(self) -> Dict:
+        """Ping über die bestehende Verbindung; ohne Verbindung wird der Neuaufbau angestoßen"""
+        result = {"backend": db_manager.backend.name}
+        if not db_manager.connected:
+            self._schedule_reconnect()
+            return {**result, "status": "error", "error": "Keine Verbindung"}
+        try:
+            latency = await asyncio.wait_for(db_manager.ping(), self.timeout)
+            self.db_failures = 0
+            return {**result, "status": "ok", "latency_ms": round(latency, 2)}
+        except asyncio.TimeoutError:
+            error = f"Keine Antwort nach {self.timeout}s"
+        except Exception as e:
+            error = str(e)
+
+        # Einzelne Aussetzer (z.B. Wahl eines neuen Primary) gelten nur als instabil
+        self.db_failures += 1
+        if self.db_failures < self.failure_threshold:
+            logger.warning(
+                f"Datenbank-Ping fehlgeschlagen ({self.db_failures}/{self.failure_threshold}): {error}"
+            )
+            return {**result, "status": "unstable", "error": error, "failures": self.db_failures}
+
+        # Schreibzugriffe bis zum Neuaufbau in den Fallback-Speicher leiten
+        logger.warning(f"Datenbank antwortet nicht, Verbindung wird neu aufgebaut: {error}")
+        db_manager.connected = False
+        self._schedule_reconnect()
+        return {**result, "status": "error", "error": error, "failures": self.db_failures}
+
+    def _schedule_reconnect(self):
+        """Startet den Neuaufbau der Verbindung, falls er nicht schon läuft"""
+        if self.reconnect_task is None or self.reconnect_task.done():
+            self.reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self):
+        try:
+            if await db_manager.reconnect():
+                self.db_failures = 0
+                logger.info("Datenbankverbindung wiederhergestellt")
+        except Exception as e:
+            logger.error(f"Fehler beim Neuaufbau der Datenbankverbindung: {str(e)}")
+
+    def _check_filesystem(self) -> Dict:
+        """Download-Verzeichnis beschreibbar und genügend freier Platz"""
+        if not self.downloads_dir.is_dir() or not os.access(self.downloads_dir, os.W_OK):
+            return {"status": "error", "error": f"{self.downloads_dir} nicht beschreibbar"}
+        free_mb = shutil.disk_usage(self.downloads_dir).free // (1024 * 1024)
+        return {
+            "status": "ok" if free_mb >= self.min_free_disk_mb else "low",
+            "free_mb": free_mb
+        }
+
+    def _check_search_quota(self) -> Dict:
+        """Verbleibende Suchanfragen des Tageslimits"""
+        limit = scraper.MAX_DAILY_REQUESTS
+        remaining = max(limit - scraper.CURRENT_REQUESTS, 0)
+        if remaining == 0:
+            status = "exhausted"
+        elif remaining < limit * self.quota_warning_ratio:
+            status = "low"
+        else:
+            status = "ok"
+        return {"status": status, "remaining": remaining, "limit": limit}
+
+    @staticmethod
+    def _check_workers() -> Dict[str, str]:
+        """Zustand der Hintergrund-Tasks (nur abgestürzte Tasks gelten als Fehler)"""
+        enrichment = "idle"
+        if enrichment_queue.workers:
+            alive = sum(1 for worker in enrichment_queue.workers if not worker.done())
+            enrichment = "running" if alive == len(enrichment_queue.workers) else "failed"
+        return {
+            "enrichment": enrichment,
+            "bm25_maintenance": _task_state(bm25_index.background_task),
+            "ingest_buffer": _task_state(ingest_buffer.background_task),
+            "stats_reconcile": _task_state(db_manager.counters.background_task),
+            "retention_schedule": _task_state(retention_job.schedule_task)
+        }
+
+# Globale Instanz
+health_monitor = HealthMonitor()
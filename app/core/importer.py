@@ -0,0 +1,394 @@
+# app/core/importer.py
+"""
+Directory Importer.
+Importiert lokale Dokumentverzeichnisse (z.B. Archiv-Dumps) ohne Scraping:
+Prüfung, Hashing und Textextraktion laufen parallel in Worker-Prozessen,
+gespeichert wird per Bulk-Write mit Checkpoint für ein Resume.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.config import (
+    ENRICHMENT_MAX_TEXT_LENGTH,
+    ENRICHMENT_STAGE_VERSIONS,
+    IMPORT_BATCH_SIZE,
+    IMPORT_MAX_FILE_SIZE,
+    IMPORT_MIN_FILE_SIZE,
+    IMPORT_ROOTS,
+    IMPORT_WORKERS,
+    SUPPORTED_FILE_TYPES
+)
+from app.database.manager import db_manager
+from app.utils.file.text_extractor import text_extractor
+from .reprocessor import corpus_reprocessor
+
+logger = logging.getLogger(__name__)
+
+JOB_PREFIX = "import:"
+SNIPPET_LENGTH = 200  # Zeichen des Textanfangs als Snippet
+READ_CHUNK_SIZE = 1024 * 1024  # Bytes je Lesezugriff beim Hashing
+
+# Wie bei heruntergeladenen Dokumenten (siehe DocumentProcessor)
+MAGIC_NUMBERS = {
+    'pdf': b'%PDF',
+    'doc': b'\xD0\xCF\x11\xE0',
+    'docx': b'PK\x03\x04'
+}
+
+# Relativer Pfad als Tupel der Namensbestandteile; in dieser Ordnung wird gelaufen
+PathParts = Tuple[str, ...]
+
+def _file_type(name: str) -> Optional[str]:
+    extension = os.path.splitext(name)[1].lower().lstrip('.')
+    return extension if extension in SUPPORTED_FILE_TYPES else None
+
+def _walk(directory: str, after: Optional[PathParts], relative: PathParts = ()) -> Iterator[Tuple[PathParts, str]]:
+    """
+    Durchläuft den Verzeichnisbaum in stabiler, sortierter Reihenfolge.
+
+    Die Reihenfolge entspricht dem Vergleich der Pfad-Tupel, so dass beim
+    Resume ganze Unterbäume vor dem Checkpoint übersprungen werden können,
+    ohne sie erneut aufzulisten.
+    """
+    try:
+        with os.scandir(directory) as iterator:
+            entries = sorted(iterator, key=lambda entry: entry.name)
+    except OSError as e:
+        logger.error(f"Fehler beim Lesen von Verzeichnis {directory}: {str(e)}")
+        return
+
+    for entry in entries:
+        parts = relative + (entry.name,)
+        if after is not None and parts < after[:len(parts)]:
+            continue
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk(entry.path, after, parts)
+            elif entry.is_file() and (after is None or parts > after):
+                yield parts, entry.path
+        except OSError as e:
+            logger.error(f"Fehler beim Lesen von {entry.path}: {str(e)}")
+
+def _next_chunk(paths: Iterator[Tuple[PathParts, str]], size: int) -> Tuple[List[Tuple[PathParts, str]], int]:
+    """Liest die nächsten unterstützten Dateien; liefert (Dateien, Anzahl ignorierter)"""
+    chunk, ignored = [], 0
+    for parts, path in paths:
+        if _file_type(path):
+            chunk.append((parts, path))
+            if len(chunk) >= size:
+                break
+        else:
+            ignored += 1
+    return chunk, ignored
+
+def _inspect_file(path: str, max_text_length: int) -> Dict:
+    """
+    Prüft, hasht und extrahiert eine Datei (picklebar für den Prozess-Pool).
+
+    Returns:
+        Dict: status 'ok' mit file_type, size, content_hash und text,
+        'invalid' bei falscher Größe oder Signatur, 'failed' bei Lesefehlern
+    """
+    try:
+        file_type = _file_type(path)
+        size = os.stat(path).st_size
+        if not file_type or not IMPORT_MIN_FILE_SIZE <= size <= IMPORT_MAX_FILE_SIZE:
+            return {'status': 'invalid'}
+
+        # MD5 wie beim Download, damit Duplikate quellenübergreifend erkannt werden
+        file_hash = hashlib.md5()
+        with open(path, 'rb') as f:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk.startswith(MAGIC_NUMBERS[file_type]):
+                return {'status': 'invalid'}
+            while chunk:
+                file_hash.update(chunk)
+                chunk = f.read(READ_CHUNK_SIZE)
+
+        return {
+            'status': 'ok',
+            'file_type': file_type,
+            'size': size,
+            'content_hash': file_hash.hexdigest(),
+            'text': text_extractor.extract(path, file_type, max_text_length)
+        }
+
+    except OSError as e:
+        return {'status': 'failed', 'error': str(e)}
+
+class DirectoryImporter:
+    """
+    Paralleler Massenimport lokaler Dokumentverzeichnisse.
+
+    Der Verzeichnisbaum wird sortiert durchlaufen und in Batches an einen
+    Prozess-Pool gegeben; während ein Batch gespeichert wird, arbeiten die
+    Worker bereits am nächsten. Je Batch werden Duplikate (Datei-Hash und
+    URL) mit einem Roundtrip gefiltert, die neuen Dokumente per Bulk-Write
+    gespeichert und der letzte Pfad als Checkpoint abgelegt.
+
+    Der Text wird bereits beim Import extrahiert; die übrigen
+    Anreicherungsstufen holt der CorpusReprocessor nach.
+    """
+
+    def __init__(self, workers: int = IMPORT_WORKERS, batch_size: int = IMPORT_BATCH_SIZE):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.task: Optional[asyncio.Task] = None
+        self.status = self._initial_status()
+
+    @property
+    def is_running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    @staticmethod
+    def is_allowed(directory: Path) -> bool:
+        """Prüft, ob ein Verzeichnis unter einem der IMPORT_ROOTS liegt"""
+        directory = directory.resolve()
+        return any(directory.is_relative_to(root.resolve()) for root in IMPORT_ROOTS)
+
+    async def start(
+        self,
+        directory: Path,
+        term: Optional[str] = None,
+        resume: bool = True,
+        enrich: bool = True
+    ) -> bool:
+        """
+        Startet den Import im Hintergrund.
+
+        Args:
+            directory: Zu importierendes Verzeichnis
+            term: Suchbegriff, unter dem die Dokumente abgelegt werden
+            resume: Beim zuletzt gespeicherten Checkpoint fortsetzen
+            enrich: Nach dem Import die Nachverarbeitung starten
+
+        Returns:
+            bool: False, wenn bereits ein Import läuft oder keine DB verbunden ist
+        """
+        if self.is_running or not db_manager.connected:
+            return False
+
+        self.task = asyncio.create_task(self.run(directory, term, resume, enrich))
+        return True
+
+    def stop(self):
+        """Stoppt den Import; der Checkpoint bleibt für ein Resume erhalten"""
+        if self.is_running:
+            self.task.cancel()
+
+    def get_status(self) -> Dict:
+        """Gibt Fortschritt und Durchsatz zurück"""
+        status = dict(self.status)
+        status["running"] = self.is_running or status["running"]
+
+        elapsed = 0.0
+        if status["started_at"] is not None:
+            end = status["completed_at"] or datetime.now()
+            elapsed = (end - status["started_at"]).total_seconds()
+        status["elapsed_seconds"] = round(elapsed, 1)
+        status["files_per_second"] = round(status["processed"] / elapsed, 1) if elapsed else 0.0
+        status["mb_per_second"] = round(status["bytes"] / elapsed / 1024 / 1024, 2) if elapsed else 0.0
+        return status
+
+    async def run(
+        self,
+        directory: Path,
+        term: Optional[str] = None,
+        resume: bool = True,
+        enrich: bool = True
+    ) -> Dict:
+        """
+        Führt den Import im Vordergrund aus (für die CLI).
+
+        Args:
+            directory: Zu importierendes Verzeichnis
+            term: Suchbegriff (Standard: "import:<Verzeichnisname>")
+            resume: Beim zuletzt gespeicherten Checkpoint fortsetzen
+            enrich: Nach dem Import die Nachverarbeitung starten
+
+        Returns:
+            Dict: Abschließender Status
+        """
+        directory = Path(directory).resolve()
+        job_name = f"{JOB_PREFIX}{directory}"
+        term = term or f"{JOB_PREFIX}{directory.name}"
+
+        after = None
+        if resume:
+            state = await db_manager.get_job_state(job_name)
+            if state and state.get("last_path"):
+                after = tuple(state["last_path"])
+
+        self.status = self._initial_status()
+        self.status.update({
+            "running": True,
+            "directory": str(directory),
+            "term": term,
+            "started_at": datetime.now(),
+            "last_path": "/".join(after) if after else None
+        })
+        logger.info(f"Import von {directory} gestartet" + (f" nach {self.status['last_path']}" if after else ""))
+
+        loop = asyncio.get_running_loop()
+        executor = ProcessPoolExecutor(max_workers=self.workers)
+        paths = _walk(str(directory), after)
+        pending = None
+
+        try:
+            if not directory.is_dir():
+                raise ValueError(f"Kein Verzeichnis: {directory}")
+
+            while True:
+                chunk, ignored = await asyncio.to_thread(_next_chunk, paths, self.batch_size)
+                self.status["ignored"] += ignored
+                if not chunk:
+                    break
+
+                futures = [
+                    loop.run_in_executor(executor, _inspect_file, path, ENRICHMENT_MAX_TEXT_LENGTH)
+                    for _, path in chunk
+                ]
+                # Der vorherige Batch wird gespeichert, während die Worker rechnen
+                if pending:
+                    await self._commit(job_name, term, *pending)
+                pending = (chunk, futures)
+
+            if pending:
+                await self._commit(job_name, term, *pending)
+                pending = None
+
+            await db_manager.save_job_state(job_name, {
+                "last_path": None,
+                "imported": self.status["imported"],
+                "completed_at": datetime.now()
+            })
+            self.status["completed_at"] = datetime.now()
+            logger.info(
+                f"Import von {directory} abgeschlossen: {self.status['imported']} Dokumente, "
+                f"{self.status['duplicates']} Duplikate, {self.status['rejected']} ungültig, "
+                f"{self.status['failed']} Fehler"
+            )
+
+            if enrich and self.status["imported"]:
+                await corpus_reprocessor.start(resume=False)
+
+        except asyncio.CancelledError:
+            logger.info("Import gestoppt, Checkpoint gespeichert")
+            raise
+        except Exception as e:
+            logger.error(f"Fehler beim Import von {directory}: {str(e)}")
+            self.status["error"] = str(e)
+        finally:
+            if pending:
+                for future in pending[1]:
+                    future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.status["running"] = False
+
+        return self.get_status()
+
+    async def _commit(self, job_name: str, term: str, chunk: List[Tuple[PathParts, str]], futures: List):
+        """Wartet auf die Worker eines Batches, filtert Duplikate, speichert und setzt den Checkpoint"""
+        results = await asyncio.gather(*futures, return_exceptions=True)
+
+        records = {}
+        for (_, path), result in zip(chunk, results):
+            if isinstance(result, BaseException) or result['status'] == 'failed':
+                error = result if isinstance(result, BaseException) else result['error']
+                logger.error(f"Fehler beim Import von {path}: {str(error)}")
+                self.status["failed"] += 1
+            elif result['status'] == 'invalid':
+                self.status["rejected"] += 1
+            else:
+                self.status["bytes"] += result['size']
+                # Identische Dateien innerhalb des Batches nur einmal übernehmen
+                records.setdefault(result['content_hash'], self._build_record(path, result, term))
+
+        candidates = list(records.values())
+        known_hashes = await db_manager.find_known_content_hashes(list(records))
+        known_urls = {
+            doc["url"] for doc in
+            await db_manager.find_known_documents([record["url"] for record in candidates], [])
+        }
+        new_records = [
+            record for record in candidates
+            if record["content_hash"] not in known_hashes and record["url"] not in known_urls
+        ]
+
+        stored = await db_manager.store_documents(new_records)
+        if not all(stored):
+            # Ohne Checkpoint wird der Batch beim Resume wiederholt
+            raise RuntimeError(f"Bulk-Write unvollständig ({sum(stored)} von {len(stored)} Dokumenten)")
+
+        last_path = chunk[-1][0]
+        self.status["imported"] += len(new_records)
+        self.status["duplicates"] += sum(
+            1 for result in results
+            if isinstance(result, dict) and result['status'] == 'ok'
+        ) - len(new_records)
+        self.status["processed"] += len(chunk)
+        self.status["last_path"] = "/".join(last_path)
+        await db_manager.save_job_state(job_name, {
+            "last_path": list(last_path),
+            "imported": self.status["imported"]
+        })
+
+    @staticmethod
+    def _build_record(path: str, result: Dict, term: str) -> Dict:
+        """Erstellt den Datensatz; die Textstufe gilt als erledigt"""
+        file_path = Path(path)
+        url = file_path.as_uri()
+        text = result['text']
+        stage_versions = {'text': ENRICHMENT_STAGE_VERSIONS['text']}
+        return {
+            'url': url,
+            'canonical_url': url,
+            'domain': 'local',
+            'title': file_path.stem.replace('_', ' '),
+            'snippet': text[:SNIPPET_LENGTH],
+            'local_path': str(file_path),
+            'content_type': SUPPORTED_FILE_TYPES[result['file_type']],
+            'size': result['size'],
+            'timestamp': datetime.now(),
+            'term': term,
+            'file_type': result['file_type'],
+            # Kein Snippet-Hash (Textanfänge wie Briefköpfe sind nicht eindeutig), sondern der Dateihash
+            'hash': result['content_hash'],
+            'content_hash': result['content_hash'],
+            'download_time': 0,
+            'source': 'import',
+            'text': text,
+            # Die übrigen Stufen übernimmt der Reprocessor, nicht die Enrichment-Queue
+            'enrichment_state': 'imported',
+            'enrichment_version': sum(stage_versions.values()),
+            'stage_versions': stage_versions
+        }
+
+    @staticmethod
+    def _initial_status() -> Dict:
+        return {
+            "running": False,
+            "directory": None,
+            "term": None,
+            "processed": 0,
+            "imported": 0,
+            "duplicates": 0,
+            "rejected": 0,
+            "ignored": 0,
+            "failed": 0,
+            "bytes": 0,
+            "last_path": None,
+            "started_at": None,
+            "completed_at": None,
+            "error": None
+        }
+
+# Globale Instanz
+directory_importer = DirectoryImporter()
@@ -3,53 +3,69 @@ import logging
 import asyncio
 from typing import Optional, Dict
 from datetime import datetime
-import hashlib
-from langdetect import detect
+from urllib.parse import urlparse
 import aiofiles
 
-from config import DOWNLOADS_DIR, SUPPORTED_FILE_TYPES
+from app.config import DOWNLOADS_DIR, SUPPORTED_FILE_TYPES
 from app.database.manager import db_manager
-from app.utils.text.text_processor import text_processor
+from app.database.ingest_buffer import ingest_buffer
 from app.utils.file.file_processor import file_processor
+from app.utils.url.url_canonicalizer import url_canonicalizer
+from .enrichment import enrichment_queue
+from .dedup_gate import dedup_gate, snippet_hash
 
 logger = logging.getLogger(__name__)
 
 class DocumentProcessor:
-    """Verarbeitet und analysiert heruntergeladene Dokumente"""
+    """
+    Verarbeitet heruntergeladene Dokumente (erste Phase).
+    
+    Gespeichert wird sofort ein minimaler Datensatz; Volltext, Keywords,
+    Sprache und Beinahe-Duplikate ergänzt die Enrichment-Queue danach.
+    """
     
     async def process(
         self,
         doc_info: Dict,
         term: str,
         similarity_threshold: float,
-        snippet: str
-    ) -> bool:
-        """Verarbeitet ein heruntergeladenes Dokument"""
+        snippet: str,
+        title: str = ""
+    ) -> Optional[Dict]:
+        """
+        Verarbeitet ein heruntergeladenes Dokument
+        
+        Returns:
+            Optional[Dict]: Zum Speichern eingereihte Metadaten oder None
+        """
         try:
             # Basis-Validierung
             if not await self._validate_document(doc_info):
-                return False
+                return None
                 
             # Extrahiere Metadaten
-            metadata = await self._extract_metadata(doc_info, term, snippet)
+            metadata = await self._extract_metadata(doc_info, term, snippet, title)
             
-            # Prüfe auf Duplikate
-            if await self._is_duplicate(metadata, similarity_threshold):
+            # Prüfe auf exakte Duplikate
+            if await self._is_duplicate(metadata):
                 logger.info(f"Duplikat gefunden für: {doc_info['url']}")
                 await self._cleanup_duplicate(doc_info['local_path'])
-                return False
+                return None
                 
-            # Speichere in Datenbank
-            if await db_manager.store_document(metadata):
-                logger.info(f"Dokument erfolgreich verarbeitet: {doc_info['url']}")
-                return True
+            # Speichere gebündelt in der Datenbank; Dedup-Gate und Enrichment
+            # folgen erst, wenn der Flush das Dokument tatsächlich gespeichert hat
+            def on_stored():
+                dedup_gate.remember(metadata['url'], metadata['hash'], metadata['size'])
+                enrichment_queue.enqueue(metadata['url'], similarity_threshold)
                 
-            return False
+            await ingest_buffer.add(metadata, on_stored)
+            logger.info(f"Dokument erfolgreich verarbeitet: {doc_info['url']}")
+            return metadata
             
         except Exception as e:
             logger.error(f"Fehler bei der Dokumentverarbeitung: {str(e)}")
             await self._cleanup_failed(doc_info['local_path'])
-            return False
+            return None
             
     async def _validate_document(self, doc_info: Dict) -> bool:
         """Validiert ein Dokument"""
@@ -70,31 +86,37 @@ class DocumentProcessor:
             logger.error(f"Fehler bei der Dokumentvalidierung: {str(e)}")
             return False
             
-    async def _extract_metadata(self, doc_info: Dict, term: str, snippet: str) -> Dict:
-        """Extrahiert Metadaten aus dem Dokument"""
+    async def _extract_metadata(
+        self,
+        doc_info: Dict,
+        term: str,
+        snippet: str,
+        title: str = ""
+    ) -> Dict:
+        """Erstellt den minimalen Datensatz, der sofort gespeichert wird"""
         try:
-            # Basis-Metadaten
-            metadata = {
+            return {
                 'url': doc_info['url'],
+                'canonical_url': url_canonicalizer.canonicalize(doc_info['url']),
+                'domain': urlparse(doc_info['url']).netloc.lower(),
+                'title': title,
+                'snippet': snippet,
                 'local_path': str(DOWNLOADS_DIR / doc_info['local_path']),
                 'content_type': doc_info['content_type'],
                 'size': doc_info['size'],
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': datetime.now(),
                 'term': term,
                 'file_type': file_processor.get_file_type(doc_info['url'], 
-                                                        doc_info['content_type'])
+                                                        doc_info['content_type']),
+                'hash': self._calculate_hash(snippet) if snippet else None,
+                'content_hash': doc_info.get('hash'),
+                'download_time': doc_info.get('download_time', 0),
+                # Anreicherung erfolgt asynchron über die Enrichment-Queue
+                'enrichment_state': 'pending',
+                'enrichment_version': 0,
+                'stage_versions': {}
             }
             
-            # Erweiterte Metadaten
-            metadata.update({
-                'keywords': await self._extract_keywords(snippet),
-                'language': await self._detect_language(snippet),
-                'hash': self._calculate_hash(snippet),
-                'download_time': doc_info.get('download_time', 0)
-            })
-            
-            return metadata
-            
         except Exception as e:
             logger.error(f"Fehler bei der Metadaten-Extraktion: {str(e)}")
             return {}
@@ -135,53 +157,30 @@ class DocumentProcessor:
             logger.error(f"Fehler bei der Formatverifizierung: {str(e)}")
             return False
             
-    async def _is_duplicate(self, metadata: Dict, similarity_threshold: float) -> bool:
-        """Prüft, ob das Dokument ein Duplikat ist"""
+    async def _is_duplicate(self, metadata: Dict) -> bool:
+        """
+        Prüft, ob das Dokument ein exaktes Duplikat ist.
+        
+        Beinahe-Duplikate werden erst bei der Anreicherung über den
+        SimHash des Volltexts einer Familie zugeordnet.
+        """
         try:
-            # Prüfe exakte Duplikate über Hash
-            existing_doc = await db_manager.get_document_by_hash(metadata['hash'])
-            if existing_doc:
+            if await db_manager.get_document_by_canonical_url(metadata['canonical_url']):
                 return True
                 
-            # Prüfe ähnliche Dokumente
-            similar_docs = await db_manager.get_similar_documents(
-                metadata['term'],
-                metadata['hash']
-            )
-            
-            for doc in similar_docs:
-                similarity = text_processor.calculate_similarity(
-                    metadata.get('snippet', ''),
-                    doc.get('snippet', '')
-                )
-                if similarity > similarity_threshold:
-                    return True
-                    
-            return False
+            # Leere Snippets sind kein Hinweis auf identische Dokumente
+            if not metadata.get('hash'):
+                return False
+            existing_doc = await db_manager.get_document_by_hash(metadata['hash'])
+            return existing_doc is not None
             
         except Exception as e:
             logger.error(f"Fehler bei der Duplikatsprüfung: {str(e)}")
             return False
             
-    async def _extract_keywords(self, text: str) -> list:
-        """Extrahiert Keywords aus dem Text"""
-        try:
-            keywords = text_processor.extract_keywords(text)
-            return [keyword for keyword, _ in keywords]
-        except Exception as e:
-            logger.error(f"Fehler bei der Keyword-Extraktion: {str(e)}")
-            return []
-            
-    async def _detect_language(self, text: str) -> str:
-        """Erkennt die Sprache des Textes"""
-        try:
-            return detect(text)
-        except:
-            return 'unknown'
-            
     def _calculate_hash(self, text: str) -> str:
         """Berechnet einen Hash für den Text"""
-        return hashlib.md5(text.encode()).hexdigest()
+        return snippet_hash(text)
         
     async def _cleanup_duplicate(self, file_path: str):
         """Löscht duplizierte Dateien"""
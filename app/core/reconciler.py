@@ -0,0 +1,327 @@
+# app/core/reconciler.py
+"""
+File Reconciler.
+Gleicht die Dateien in DOWNLOADS_DIR mit den gespeicherten Dokumenten ab:
+Dateien ohne Dokument (verwaist) und Dokumente ohne Datei (hängende Verweise).
+"""
+
+import asyncio
+import heapq
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, TextIO
+
+from app.config import (
+    DOWNLOADS_DIR,
+    ORPHAN_BATCH_SIZE,
+    ORPHAN_GRACE_PERIOD,
+    ORPHAN_SAMPLE_SIZE,
+    ORPHAN_SORT_RUN_SIZE
+)
+from app.database.manager import db_manager
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "orphans"
+LISTING_CHUNK_SIZE = 1000  # Pfade je Thread-Aufruf beim Lesen der Auflistung
+
+def _write_run(paths: List[str]) -> TextIO:
+    """Schreibt einen sortierten Lauf in eine temporäre Datei"""
+    run = tempfile.TemporaryFile('w+', encoding='utf-8', errors='surrogateescape')
+    run.writelines(path + "\n" for path in paths)
+    run.seek(0)
+    return run
+
+def _sorted_paths(directory: str, after: Optional[str], run_size: int) -> Iterator[str]:
+    """
+    Liefert die Dateipfade eines Verzeichnisses sortiert.
+
+    Große Verzeichnisse werden extern sortiert: sortierte Läufe von
+    run_size Pfaden landen in temporären Dateien und werden per heapq.merge
+    zusammengeführt, so dass nie die ganze Auflistung im Speicher liegt.
+    """
+    runs, chunk = [], []
+    try:
+        with os.scandir(directory) as iterator:
+            for entry in iterator:
+                if "\n" in entry.name or not entry.is_file(follow_symlinks=False):
+                    continue
+                if after is None or entry.path > after:
+                    chunk.append(entry.path)
+                    if len(chunk) >= run_size:
+                        chunk.sort()
+                        runs.append(_write_run(chunk))
+                        chunk = []
+        chunk.sort()
+        if not runs:
+            yield from chunk
+            return
+
+        runs.append(_write_run(chunk))
+        yield from heapq.merge(*((line.rstrip("\n") for line in run) for run in runs))
+    finally:
+        for run in runs:
+            run.close()
+
+def _take(iterator: Iterator[str], size: int) -> List[str]:
+    return [path for _, path in zip(range(size), iterator)]
+
+class FileReconciler:
+    """
+    Merge-Join zwischen Verzeichnisauflistung und Datenbank.
+
+    Beide Seiten werden aufsteigend nach Pfad gelesen: die Auflistung von
+    DOWNLOADS_DIR extern sortiert, die Dokumente über einen Cursor auf dem
+    Index von local_path. Ein einziger gemeinsamer Durchlauf ordnet jede
+    Datei und jeden Verweis zu, ohne eine Seite vollständig zu laden.
+
+    Verwaiste Dateien, die jünger als die Karenzzeit sind, werden nicht
+    gemeldet (sie können noch auf ihr Speichern warten). Im Korrekturmodus
+    werden verwaiste Dateien gelöscht und hängende Verweise mit
+    file_missing markiert. Der zuletzt abgeglichene Pfad wird je Batch als
+    Checkpoint gespeichert.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = ORPHAN_BATCH_SIZE,
+        run_size: int = ORPHAN_SORT_RUN_SIZE,
+        grace_period: float = ORPHAN_GRACE_PERIOD,
+        sample_size: int = ORPHAN_SAMPLE_SIZE
+    ):
+        self.batch_size = batch_size
+        self.run_size = run_size
+        self.grace_period = grace_period
+        self.sample_size = sample_size
+        self.task: Optional[asyncio.Task] = None
+        self.status = self._initial_status()
+
+    @property
+    def is_running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def start(self, fix: bool = False, resume: bool = True) -> bool:
+        """
+        Startet den Abgleich im Hintergrund.
+
+        Args:
+            fix: Verwaiste Dateien löschen und hängende Verweise markieren
+            resume: Beim zuletzt gespeicherten Checkpoint fortsetzen
+
+        Returns:
+            bool: False, wenn der Abgleich bereits läuft oder keine DB verbunden ist
+        """
+        if self.is_running or not db_manager.connected:
+            return False
+
+        self.task = asyncio.create_task(self.run(fix, resume))
+        return True
+
+    def stop(self):
+        """Stoppt den Abgleich; der Checkpoint bleibt für ein Resume erhalten"""
+        if self.is_running:
+            self.task.cancel()
+
+    def get_status(self) -> Dict:
+        """Gibt Fortschritt und Befunde zurück"""
+        status = dict(self.status)
+        status["running"] = self.is_running or status["running"]
+        return status
+
+    async def run(self, fix: bool = False, resume: bool = True) -> Dict:
+        """
+        Führt den Abgleich im Vordergrund aus.
+
+        Args:
+            fix: Verwaiste Dateien löschen und hängende Verweise markieren
+            resume: Beim zuletzt gespeicherten Checkpoint fortsetzen
+
+        Returns:
+            Dict: Abschließender Status
+        """
+        after = None
+        if resume:
+            state = await db_manager.get_job_state(JOB_NAME)
+            if state and state.get("last_path"):
+                after = state["last_path"]
+
+        self.status = self._initial_status()
+        self.status.update({
+            "running": True,
+            "fix": fix,
+            "started_at": datetime.now(),
+            "last_path": after
+        })
+
+        directory = str(DOWNLOADS_DIR)
+        # Bereichsabfrage auf dem Index: alle Pfade unterhalb von DOWNLOADS_DIR
+        bounds = {"$gt": after} if after is not None else {"$gte": directory + os.sep}
+        bounds["$lt"] = directory + chr(ord(os.sep) + 1)
+        documents = self._direct_children(
+            db_manager.iter_documents(
+                {"local_path": bounds},
+                {"url": 1, "local_path": 1, "file_missing": 1},
+                batch_size=self.batch_size,
+                sort="local_path"
+            ),
+            directory
+        )
+        files = self._iter_files(directory, after)
+        orphans: List[str] = []
+        dangling: List[Dict] = []
+        compared = 0
+
+        try:
+            file = await self._next(files)
+            document = await self._next(documents)
+            while file is not None or document is not None:
+                if document is None or (file is not None and file < document["local_path"]):
+                    orphans.append(file)
+                    last_path = file
+                    file = await self._next(files)
+                elif file is None or document["local_path"] < file:
+                    dangling.append(document)
+                    last_path = document["local_path"]
+                    document = await self._next(documents)
+                else:
+                    # Mehrere Dokumente können auf dieselbe Datei verweisen
+                    last_path = file
+                    while document is not None and document["local_path"] == file:
+                        self.status["matched"] += 1
+                        document = await self._next(documents)
+                    file = await self._next(files)
+
+                compared += 1
+                if compared >= self.batch_size:
+                    await self._flush(orphans, dangling, fix, last_path)
+                    orphans, dangling, compared = [], [], 0
+
+            await self._flush(orphans, dangling, fix, None)
+            self.status["completed_at"] = datetime.now()
+            await db_manager.save_job_state(JOB_NAME, {
+                "last_path": None,
+                "orphaned_files": self.status["orphaned_files"],
+                "dangling_documents": self.status["dangling_documents"],
+                "completed_at": self.status["completed_at"]
+            })
+            logger.info(
+                f"Abgleich abgeschlossen: {self.status['matched']} zugeordnet, "
+                f"{self.status['orphaned_files']} verwaiste Dateien, "
+                f"{self.status['dangling_documents']} hängende Verweise"
+            )
+
+        except asyncio.CancelledError:
+            logger.info("Abgleich gestoppt, Checkpoint gespeichert")
+            raise
+        except Exception as e:
+            logger.error(f"Fehler beim Abgleich der Dateien: {str(e)}")
+            self.status["error"] = str(e)
+        finally:
+            await files.aclose()
+            await documents.aclose()
+            self.status["running"] = False
+
+        return self.get_status()
+
+    async def _iter_files(self, directory: str, after: Optional[str]):
+        """Sortierte Auflistung, in Blöcken in einem Thread gelesen"""
+        listing = _sorted_paths(directory, after, self.run_size)
+        try:
+            while True:
+                chunk = await asyncio.to_thread(_take, listing, LISTING_CHUNK_SIZE)
+                if not chunk:
+                    break
+                for path in chunk:
+                    yield path
+        finally:
+            listing.close()
+
+    @staticmethod
+    async def _direct_children(documents, directory: str):
+        """Überspringt Verweise in Unterverzeichnisse; die Dateiliste ist nicht rekursiv"""
+        prefix_length = len(directory) + 1
+        try:
+            async for document in documents:
+                if os.sep not in document["local_path"][prefix_length:]:
+                    yield document
+        finally:
+            await documents.aclose()
+
+    @staticmethod
+    async def _next(iterator):
+        try:
+            return await iterator.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    async def _flush(self, orphans: List[str], dangling: List[Dict], fix: bool, last_path: Optional[str]):
+        """Wertet einen Batch aus, korrigiert (optional) und setzt den Checkpoint"""
+        self.status["orphan_candidates"] += len(orphans)
+        if orphans:
+            confirmed, removed = await asyncio.to_thread(self._handle_orphans, orphans, fix)
+            self.status["orphaned_files"] += len(confirmed)
+            self.status["recent_files"] += len(orphans) - len(confirmed)
+            self.status["files_removed"] += removed
+            self._sample("orphan_samples", confirmed)
+
+        if dangling:
+            self.status["dangling_documents"] += len(dangling)
+            self._sample("dangling_samples", [document["url"] for document in dangling])
+            if fix:
+                self.status["documents_flagged"] += await db_manager.update_documents([
+                    (document["url"], {"file_missing": True})
+                    for document in dangling if not document.get("file_missing")
+                ])
+
+        if last_path is not None:
+            self.status["last_path"] = last_path
+            await db_manager.save_job_state(JOB_NAME, {"last_path": last_path, "fix": fix})
+
+    def _handle_orphans(self, paths: List[str], fix: bool):
+        """Filtert Dateien innerhalb der Karenzzeit und löscht (optional) den Rest"""
+        threshold = time.time() - self.grace_period
+        confirmed, removed = [], 0
+        for path in paths:
+            try:
+                if os.stat(path).st_mtime > threshold:
+                    continue
+                confirmed.append(path)
+                if fix:
+                    os.unlink(path)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.error(f"Fehler beim Entfernen der verwaisten Datei {path}: {str(e)}")
+        return confirmed, removed
+
+    def _sample(self, key: str, values: List[str]):
+        free = self.sample_size - len(self.status[key])
+        if free > 0:
+            self.status[key] = self.status[key] + values[:free]
+
+    @staticmethod
+    def _initial_status() -> Dict:
+        return {
+            "running": False,
+            "fix": False,
+            "matched": 0,
+            "orphan_candidates": 0,
+            "orphaned_files": 0,
+            "recent_files": 0,
+            "files_removed": 0,
+            "dangling_documents": 0,
+            "documents_flagged": 0,
+            "orphan_samples": [],
+            "dangling_samples": [],
+            "last_path": None,
+            "started_at": None,
+            "completed_at": None,
+            "error": None
+        }
+
+# Globale Instanz
+file_reconciler = FileReconciler()
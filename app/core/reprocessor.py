@@ -0,0 +1,230 @@
+# app/core/reprocessor.py
+"""
+Corpus Reprocessor.
+Bringt bestehende Dokumente nach Änderungen an Anreicherungsstufen auf den
+aktuellen Stand, ohne erneut zu scrapen.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.config import (
+    ENRICHMENT_STAGE_VERSIONS,
+    ENRICHMENT_VERSION,
+    REPROCESS_BATCH_SIZE,
+    REPROCESS_CONCURRENCY,
+    REPROCESS_MAX_DOCS_PER_SECOND,
+    REPROCESS_PAUSE_INTERVAL
+)
+from app.database.manager import db_manager
+from .enrichment import document_enricher
+from .scraper import scraper_engine
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "reprocess"
+
+class CorpusReprocessor:
+    """
+    Hintergrund-Job für die versionierte Nachverarbeitung des Bestands.
+
+    Dokumente, bei denen mindestens eine ausführbare Stufe veraltet ist,
+    werden seitenweise nach _id gelesen; pro Dokument laufen nur diese
+    Stufen. Derzeit nicht ausführbare Stufen (Passagen ohne Index) zählen
+    nicht als ausstehend. Die Ergebnisse werden je Seite per Bulk-Write
+    zurückgeschrieben. Der Fortschritt wird nach jeder Seite gespeichert,
+    solange gescrapt wird pausiert der Job.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = REPROCESS_BATCH_SIZE,
+        concurrency: int = REPROCESS_CONCURRENCY,
+        max_docs_per_second: float = REPROCESS_MAX_DOCS_PER_SECOND
+    ):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_docs_per_second = max_docs_per_second
+        self.task: Optional[asyncio.Task] = None
+        self.status = self._initial_status()
+
+    @property
+    def is_running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    async def start(self, resume: bool = True) -> bool:
+        """
+        Startet die Nachverarbeitung im Hintergrund.
+
+        Args:
+            resume: Beim zuletzt gespeicherten Fortschritt fortsetzen
+
+        Returns:
+            bool: False, wenn der Job bereits läuft oder keine DB verbunden ist
+        """
+        if self.is_running or not db_manager.connected:
+            return False
+
+        stages = sorted(document_enricher.available_stages())
+        after_id = None
+        if resume:
+            state = await db_manager.get_job_state(JOB_NAME)
+            # Ein Checkpoint gilt nur für Version und Stufen, mit denen er erstellt wurde
+            if (state and state.get("target_version") == ENRICHMENT_VERSION
+                    and state.get("stages") == stages):
+                after_id = state.get("last_id")
+
+        self.status = self._initial_status()
+        self.status.update({"running": True, "started_at": datetime.now(), "last_id": after_id})
+        document_enricher.start()
+        self.task = asyncio.create_task(self._run(after_id, stages))
+        return True
+
+    def stop(self):
+        """Stoppt den Job; der Fortschritt bleibt für ein Resume erhalten"""
+        if self.is_running:
+            self.task.cancel()
+
+    def get_status(self) -> Dict:
+        """Gibt den aktuellen Fortschritt zurück"""
+        status = dict(self.status)
+        status["running"] = self.is_running
+        if status["last_id"] is not None:
+            status["last_id"] = str(status["last_id"])
+        return status
+
+    @staticmethod
+    def _build_query(stages: List[str]) -> Dict:
+        """Filter für Dokumente mit mindestens einer veralteten Stufe aus stages"""
+        return {
+            # Grobfilter über den Index; die Summe liegt unter dem Ziel, sobald eine Stufe fehlt
+            "enrichment_version": {"$lt": ENRICHMENT_VERSION},
+            # Ausstehende Dokumente bearbeitet die Enrichment-Queue (sonst liefe z.B. keywords doppelt)
+            "enrichment_state": {"$ne": "pending"},
+            "$or": [
+                condition
+                for stage in stages
+                for condition in (
+                    {f"stage_versions.{stage}": {"$lt": ENRICHMENT_STAGE_VERSIONS[stage]}},
+                    {f"stage_versions.{stage}": {"$exists": False}}
+                )
+            ]
+        }
+
+    async def _run(self, after_id, stages: List[str]):
+        """Hauptschleife: Seite laden, Stufen ausführen, Bulk-Write, Checkpoint"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        query = self._build_query(stages)
+
+        try:
+            while True:
+                await self._wait_for_idle_scraper()
+                batch_start = time.monotonic()
+
+                documents = await db_manager.get_documents_page(
+                    query, after_id=after_id, limit=self.batch_size
+                )
+                if not documents:
+                    break
+
+                results = await asyncio.gather(*[
+                    self._reprocess_document(document, stages, semaphore)
+                    for document in documents
+                ])
+                updates = [update for update in results if update is not None]
+                if updates and not await db_manager.update_documents(updates):
+                    # Checkpoint nicht fortschreiben, sonst würde die Seite übersprungen
+                    raise RuntimeError("Bulk-Write der Nachverarbeitung fehlgeschlagen")
+                await db_manager.counters.record_language_changes([
+                    (document.get("language"), result[1]["language"])
+                    for document, result in zip(documents, results)
+                    if result is not None and "language" in result[1]
+                ])
+
+                after_id = documents[-1]["_id"]
+                self.status["processed"] += len(updates)
+                self.status["failed"] += len(documents) - len(updates)
+                self.status["last_id"] = after_id
+                await db_manager.save_job_state(JOB_NAME, {
+                    "last_id": after_id,
+                    "target_version": ENRICHMENT_VERSION,
+                    "stages": stages,
+                    "processed": self.status["processed"]
+                })
+
+                await self._throttle(len(documents), time.monotonic() - batch_start)
+
+            await db_manager.save_job_state(JOB_NAME, {
+                "last_id": None,
+                "target_version": ENRICHMENT_VERSION,
+                "stages": stages,
+                "completed_at": datetime.now()
+            })
+            self.status["completed_at"] = datetime.now()
+            logger.info(
+                f"Nachverarbeitung abgeschlossen: {self.status['processed']} Dokumente, "
+                f"{self.status['failed']} Fehler"
+            )
+
+        except asyncio.CancelledError:
+            logger.info("Nachverarbeitung gestoppt, Fortschritt gespeichert")
+            raise
+        except Exception as e:
+            logger.error(f"Fehler bei der Nachverarbeitung: {str(e)}")
+            self.status["error"] = str(e)
+
+    async def _reprocess_document(
+        self,
+        document: Dict,
+        stages: List[str],
+        semaphore: asyncio.Semaphore
+    ) -> Optional[Tuple[str, Dict]]:
+        """Führt die veralteten Stufen eines Dokuments aus (nur die des Laufs)"""
+        async with semaphore:
+            try:
+                outdated = [
+                    stage for stage in document_enricher.outdated_stages(document)
+                    if stage in stages
+                ]
+                updates = await document_enricher.enrich(document, stages=outdated)
+                return document["url"], updates
+            except Exception as e:
+                logger.error(f"Fehler bei der Nachverarbeitung von {document.get('url')}: {str(e)}")
+                return None
+
+    async def _wait_for_idle_scraper(self):
+        """Pausiert, solange ein Scraping-Prozess Mongo-I/O benötigt"""
+        while scraper_engine.status.is_running:
+            if not self.status["paused"]:
+                logger.info("Nachverarbeitung pausiert, Scraping aktiv")
+            self.status["paused"] = True
+            await asyncio.sleep(REPROCESS_PAUSE_INTERVAL)
+        self.status["paused"] = False
+
+    async def _throttle(self, documents: int, elapsed: float):
+        """Begrenzt den Durchsatz auf max_docs_per_second"""
+        if self.max_docs_per_second <= 0:
+            return
+        minimum_duration = documents / self.max_docs_per_second
+        if elapsed < minimum_duration:
+            await asyncio.sleep(minimum_duration - elapsed)
+
+    @staticmethod
+    def _initial_status() -> Dict:
+        return {
+            "running": False,
+            "paused": False,
+            "target_version": ENRICHMENT_VERSION,
+            "processed": 0,
+            "failed": 0,
+            "last_id": None,
+            "started_at": None,
+            "completed_at": None,
+            "error": None
+        }
+
+# Globale Instanz
+corpus_reprocessor = CorpusReprocessor()
@@ -0,0 +1,113 @@
+# app/core/response_cache.py
+"""
+Response Cache.
+Zwischenspeicher für fertig serialisierte Antworten lesender API-Endpunkte
+mit ETag und bedingten Anfragen (304 Not Modified).
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+from app.config import CACHE_ENABLED, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+from app.database.manager import db_manager
+from app.utils.cache.ttl_cache import TTLCache, MISSING
+
+logger = logging.getLogger(__name__)
+
+def serialize(data: Any) -> bytes:
+    """Serialisiert wie die JSONResponse von FastAPI"""
+    return json.dumps(
+        jsonable_encoder(data),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+def make_etag(content: bytes) -> str:
+    """Schwacher ETag aus dem Inhalt"""
+    return 'W/"' + hashlib.sha256(content).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Schwacher ETag-Vergleich für If-None-Match (Liste oder '*')"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in (tag.removeprefix("W/") for tag in tags)
+
+def conditional_response(request: Request, body: bytes, etag: str) -> Response:
+    """
+    Antwortet mit dem Body oder, wenn der Client ihn schon hat, mit 304.
+
+    Cache-Control: no-cache lässt den Browser die Antwort speichern, aber
+    vor jeder Verwendung per If-None-Match prüfen.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+class ResponseCache:
+    """
+    LRU-Cache für JSON-Antworten lesender Endpunkte.
+
+    Der Schlüssel besteht aus Pfad und sortierten Query-Parametern sowie der
+    Schreib-Generation des DatabaseManager, die jedes Speichern, Ändern und
+    Löschen erhöht. Einträge früherer Generationen werden so nie mehr
+    getroffen und nach und nach verdrängt. Die Ablaufzeit begrenzt, wie
+    lange Schreibzugriffe anderer Prozesse unbemerkt bleiben.
+
+    Der ETag wird aus dem Inhalt gebildet; auch nach einer Invalidierung
+    wird eine unveränderte Antwort deshalb mit 304 beantwortet.
+    """
+
+    def __init__(self, max_size: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL):
+        self.entries = TTLCache(max_size, ttl)
+
+    @staticmethod
+    def key(request: Request) -> Hashable:
+        """Cache-Schlüssel einer Anfrage"""
+        return (
+            db_manager.generation,
+            request.url.path,
+            tuple(sorted(request.query_params.multi_items()))
+        )
+
+    async def respond(self, request: Request, compute: Callable[[], Awaitable[Any]]) -> Response:
+        """
+        Liefert die zwischengespeicherte Antwort oder berechnet sie.
+
+        Fehler aus compute (z.B. HTTPException) werden nicht gespeichert
+        und an den Aufrufer weitergereicht.
+
+        Args:
+            request: Aktuelle Anfrage (Schlüssel und If-None-Match)
+            compute: Berechnet die Antwortdaten
+
+        Returns:
+            Response: JSON-Antwort mit ETag oder 304
+        """
+        key = self.key(request)
+        entry: Tuple[bytes, str] = self.entries.get(key) if CACHE_ENABLED else MISSING
+        if entry is MISSING:
+            body = serialize(await compute())
+            entry = (body, make_etag(body))
+            if CACHE_ENABLED:
+                self.entries.set(key, entry)
+        return conditional_response(request, *entry)
+
+    def clear(self):
+        """Verwirft alle Antworten"""
+        self.entries.clear()
+
+    def get_stats(self) -> Dict:
+        """Gibt Größe und Trefferquote des Caches zurück"""
+        return {**self.entries.get_stats(), "generation": db_manager.generation}
+
+# Globale Instanz
+response_cache = ResponseCache()
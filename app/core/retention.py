@@ -0,0 +1,322 @@
+# app/core/retention.py
+"""
+Retention Job.
+Entfernt Dokumente nach Ablauf der Aufbewahrungsfrist samt heruntergeladener
+Datei, wahlweise nach Übernahme in ein komprimiertes Archiv.
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import shutil
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.config import (
+    DOWNLOADS_DIR,
+    RETENTION_ARCHIVE,
+    RETENTION_ARCHIVE_DIR,
+    RETENTION_BATCH_SIZE,
+    RETENTION_DAYS,
+    RETENTION_INTERVAL,
+    RETENTION_MAX_DOCS_PER_SECOND,
+    REPROCESS_PAUSE_INTERVAL
+)
+from app.database.manager import db_manager, PAYLOAD_FIELDS
+from .scraper import scraper_engine
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "retention"
+
+# Für Löschen, Zähler, Cache und Dateien benötigte Felder
+RETENTION_FIELDS = {
+    "url": 1, "canonical_url": 1, "hash": 1, "size": 1, "file_type": 1,
+    "term": 1, "language": 1, "local_path": 1
+}
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+class RetentionJob:
+    """
+    Gedrosselte, batchweise Bereinigung abgelaufener Dokumente.
+
+    Statt eines einzelnen delete_many über den ganzen Bestand werden die
+    abgelaufenen Dokumente seitenweise per Keyset-Paginierung gelesen und
+    in kleinen Batches gelöscht (ein Statement je Batch, begrenzt auf
+    max_docs_per_second). Jede Seite nutzt einen eigenen kurzlebigen
+    Cursor, so dass Drosselung und Pausen keinen Cursor offen halten; nach
+    jedem Batch wird ein Checkpoint gespeichert, an dem ein abgebrochener
+    Lauf fortgesetzt wird. Während gescrapt wird, pausiert der Job. Nach
+    dem Löschen werden die zugehörigen Dateien in DOWNLOADS_DIR entfernt;
+    importierte Dateien außerhalb davon bleiben unberührt.
+
+    Im Archiv-Modus werden die vollständigen Datensätze vor dem Löschen als
+    gzip-NDJSON und die Dateien gzip-komprimiert unter archive_dir abgelegt.
+    Bricht ein Lauf zwischen Archivieren und Löschen ab, werden die
+    betroffenen Dokumente beim nächsten Lauf erneut archiviert.
+
+    Ein TTL-Index kommt nicht in Frage: Er löscht ungedrosselt und ohne
+    Rücksicht auf laufendes Scraping, und Dateien bzw. Archiv würden nicht
+    mitgepflegt.
+    """
+
+    def __init__(
+        self,
+        days: Optional[int] = RETENTION_DAYS,
+        archive: bool = RETENTION_ARCHIVE,
+        archive_dir: Path = RETENTION_ARCHIVE_DIR,
+        batch_size: int = RETENTION_BATCH_SIZE,
+        max_docs_per_second: float = RETENTION_MAX_DOCS_PER_SECOND,
+        interval: float = RETENTION_INTERVAL
+    ):
+        self.days = days
+        self.archive = archive
+        self.archive_dir = Path(archive_dir)
+        self.batch_size = batch_size
+        self.max_docs_per_second = max_docs_per_second
+        self.interval = interval
+        self.task: Optional[asyncio.Task] = None
+        self.schedule_task: Optional[asyncio.Task] = None
+        self.status = self._initial_status()
+
+    @property
+    def is_running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def start_schedule(self):
+        """Startet die regelmäßige Bereinigung, sofern eine Frist konfiguriert ist"""
+        if self.days and self.schedule_task is None:
+            self.schedule_task = asyncio.create_task(self._schedule())
+
+    def start(self, days: Optional[int] = None, archive: Optional[bool] = None) -> bool:
+        """
+        Startet einen Bereinigungslauf im Hintergrund.
+
+        Args:
+            days: Aufbewahrungsfrist in Tagen (Standard: RETENTION_DAYS)
+            archive: Archivieren statt löschen (Standard: RETENTION_ARCHIVE)
+
+        Returns:
+            bool: False, wenn bereits ein Lauf aktiv ist, keine Frist gesetzt
+            oder keine DB verbunden ist
+        """
+        days = days or self.days
+        if self.is_running or not days or not db_manager.connected:
+            return False
+
+        self.task = asyncio.create_task(
+            self.run(days, self.archive if archive is None else archive)
+        )
+        return True
+
+    def stop(self):
+        """Bricht den laufenden Lauf ab; bereits gelöschte Batches bleiben gelöscht"""
+        if self.is_running:
+            self.task.cancel()
+
+    def shutdown(self):
+        """Beendet Zeitplan und laufenden Lauf"""
+        if self.schedule_task is not None:
+            self.schedule_task.cancel()
+            self.schedule_task = None
+        self.stop()
+
+    def get_status(self) -> Dict:
+        """Gibt den Fortschritt des letzten bzw. laufenden Laufs zurück"""
+        status = dict(self.status)
+        status["running"] = self.is_running
+        status["scheduled"] = self.schedule_task is not None
+        return status
+
+    async def run(self, days: int, archive: bool = False) -> Dict:
+        """
+        Führt einen Bereinigungslauf aus.
+
+        Ein abgebrochener Lauf wird mit seiner Frist nach dem letzten
+        Checkpoint fortgesetzt.
+
+        Args:
+            days: Dokumente, die älter als days Tage sind, werden entfernt
+            archive: Vor dem Löschen archivieren
+
+        Returns:
+            Dict: Abschließender Status
+        """
+        cutoff = datetime.now() - timedelta(days=days)
+        after_id = None
+        state = await db_manager.get_job_state(JOB_NAME)
+        if state and state.get("last_id") is not None:
+            cutoff, after_id = state["cutoff"], state["last_id"]
+            if isinstance(cutoff, str):
+                # SQLite speichert den Job-Status als JSON
+                cutoff = datetime.fromisoformat(cutoff)
+        query = {"timestamp": {"$lt": cutoff}}
+        # Im Archiv-Modus wird der vollständige Datensatz benötigt (ausgelagerte Felder lädt _remove_batch)
+        projection = None if archive else RETENTION_FIELDS
+
+        self.status = self._initial_status()
+        self.status.update({"cutoff": cutoff, "archive": archive, "started_at": datetime.now()})
+        logger.info(
+            f"Bereinigung von Dokumenten vor {cutoff:%Y-%m-%d} gestartet"
+            + (" (Fortsetzung)" if after_id is not None else "")
+        )
+
+        try:
+            while True:
+                await self._wait_for_idle_scraper()
+                documents = await db_manager.get_documents_page(
+                    query, after_id=after_id, limit=self.batch_size, projection=projection
+                )
+                if not documents:
+                    break
+
+                await self._remove_batch(documents, archive)
+                after_id = documents[-1]["_id"]
+                await db_manager.save_job_state(JOB_NAME, {
+                    "last_id": after_id,
+                    "cutoff": cutoff,
+                    "deleted": self.status["deleted"]
+                })
+
+            self.status["completed_at"] = datetime.now()
+            await db_manager.save_job_state(JOB_NAME, {
+                "last_id": None,
+                "cutoff": cutoff,
+                "deleted": self.status["deleted"],
+                "completed_at": self.status["completed_at"]
+            })
+            logger.info(
+                f"Bereinigung abgeschlossen: {self.status['deleted']} Dokumente, "
+                f"{self.status['files_removed']} Dateien entfernt, "
+                f"{self.status['archived']} archiviert"
+            )
+
+        except asyncio.CancelledError:
+            logger.info("Bereinigung abgebrochen")
+            raise
+        except Exception as e:
+            logger.error(f"Fehler bei der Bereinigung: {str(e)}")
+            self.status["error"] = str(e)
+
+        return self.get_status()
+
+    async def _schedule(self):
+        """Führt die Bereinigung im festen Intervall aus"""
+        while True:
+            if self.start():
+                await asyncio.shield(self.task)
+            await asyncio.sleep(self.interval)
+
+    async def _remove_batch(self, documents: List[Dict], archive: bool):
+        """Archiviert (optional), löscht und entfernt die Dateien eines Batches"""
+        batch_start = time.monotonic()
+
+        if archive:
+            payloads = await db_manager.get_payloads(
+                [document["url"] for document in documents], tuple(PAYLOAD_FIELDS)
+            )
+            for document in documents:
+                document.update(payloads.get(document["url"], {}))
+            await asyncio.to_thread(self._archive, documents)
+            self.status["archived"] += len(documents)
+
+        deleted = await db_manager.delete_documents(documents)
+        if not deleted:
+            # Ohne Löschung dürfen die Dateien nicht entfernt werden
+            raise RuntimeError("Batch konnte nicht gelöscht werden")
+        self.status["deleted"] += deleted
+
+        self.status["files_removed"] += await asyncio.to_thread(self._remove_files, documents)
+        await self._throttle(len(documents), time.monotonic() - batch_start)
+
+    def _archive(self, documents: List[Dict]):
+        """Schreibt Datensätze und komprimierte Dateien ins Archiv"""
+        (self.archive_dir / "files").mkdir(parents=True, exist_ok=True)
+
+        for document in documents:
+            source = self._owned_file(document)
+            if source is not None and source.exists():
+                target = self.archived_file(source)
+                with open(source, 'rb') as src, gzip.open(target, 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+                document["archive_path"] = str(target)
+                # ISIZE im gzip-Trailer zählt nur modulo 4 GiB
+                document["archive_size"] = source.stat().st_size
+
+        lines = "".join(
+            json.dumps(document, default=_json_default, ensure_ascii=False) + "\n"
+            for document in documents
+        )
+        # Je Batch ein gzip-Member; aneinandergehängte Member sind gültiges gzip
+        with open(self.archive_dir / f"documents-{datetime.now():%Y%m%d}.ndjson.gz", 'ab') as output:
+            output.write(gzip.compress(lines.encode('utf-8')))
+
+    def archived_file(self, path: Path) -> Path:
+        """Pfad der gzip-komprimierten Archivkopie einer heruntergeladenen Datei"""
+        return self.archive_dir / "files" / f"{path.name}.gz"
+
+    def _remove_files(self, documents: List[Dict]) -> int:
+        """Entfernt die heruntergeladenen Dateien gelöschter Dokumente"""
+        removed = 0
+        for document in documents:
+            path = self._owned_file(document)
+            if path is None:
+                continue
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Fehler beim Löschen der Datei {path}: {str(e)}")
+        return removed
+
+    @staticmethod
+    def _owned_file(document: Dict) -> Optional[Path]:
+        """Pfad der Datei, sofern sie in DOWNLOADS_DIR liegt (nicht bei Importen)"""
+        if not document.get("local_path"):
+            return None
+        path = Path(document["local_path"])
+        return path if path.resolve().is_relative_to(DOWNLOADS_DIR.resolve()) else None
+
+    async def _wait_for_idle_scraper(self):
+        """Pausiert, solange ein Scraping-Prozess die Datenbank benötigt"""
+        while scraper_engine.status.is_running:
+            if not self.status["paused"]:
+                logger.info("Bereinigung pausiert, Scraping aktiv")
+            self.status["paused"] = True
+            await asyncio.sleep(REPROCESS_PAUSE_INTERVAL)
+        self.status["paused"] = False
+
+    async def _throttle(self, documents: int, elapsed: float):
+        """Begrenzt den Durchsatz auf max_docs_per_second"""
+        if self.max_docs_per_second <= 0:
+            return
+        minimum_duration = documents / self.max_docs_per_second
+        if elapsed < minimum_duration:
+            await asyncio.sleep(minimum_duration - elapsed)
+
+    @staticmethod
+    def _initial_status() -> Dict:
+        return {
+            "running": False,
+            "paused": False,
+            "cutoff": None,
+            "archive": False,
+            "deleted": 0,
+            "archived": 0,
+            "files_removed": 0,
+            "started_at": None,
+            "completed_at": None,
+            "error": None
+        }
+
+# Globale Instanz
+retention_job = RetentionJob()
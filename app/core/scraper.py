@@ -13,20 +13,22 @@ import asyncio
 from googleapiclient.discovery import build
 import aiohttp
 from .session import ScrapingSession  # Neue Import-Zeile
-from config import (
+from app.config import (
     GOOGLE_API_KEY, 
     GOOGLE_CSE_ID, 
     MAX_PARALLEL_DOWNLOADS,
     API_COST_PER_REQUEST, 
     BATCH_SIZE
 )
-from models import ScrapingStatus, ScrapingStats, DocumentMetadata
+from app.models import ScrapingStatus, ScrapingStats, DocumentMetadata
 from app.utils.text.text_processor import text_processor
 from app.utils.term.term_expander import term_expander
+from app.utils.url.url_canonicalizer import url_canonicalizer
 from app.utils.rate_limit.rate_limiter import rate_limiter  # Diese Klasse müssen wir noch erstellen
 from app.database.manager import db_manager
 from .downloader import document_downloader
 from .processor import document_processor
+from .dedup_gate import dedup_gate
 
 
 logger = logging.getLogger(__name__)
@@ -142,6 +144,13 @@ class ScraperEngine:
                 logger.warning(f"Keine Ergebnisse gefunden für Term: {term}")
                 return
                 
+            # Bekannte Dokumente vor dem Download aussortieren
+            search_results, skipped, skipped_bytes = await dedup_gate.filter_results(search_results)
+            session.skipped_downloads += skipped
+            session.skipped_bytes += skipped_bytes
+            self.status.skipped_downloads += skipped
+            self.status.skipped_bytes += skipped_bytes
+                
             # Erstelle Download-Tasks
             tasks = []
             for result in search_results:
@@ -151,8 +160,10 @@ class ScraperEngine:
                 
 
                     
-                if result['link'] not in session.processed_urls:
-                    session.processed_urls.add(result['link'])
+                # Frontier über kanonische URLs, damit Schreibvarianten nur einmal laden
+                canonical_url = url_canonicalizer.canonicalize(result['link'])
+                if canonical_url not in session.processed_urls:
+                    session.processed_urls.add(canonical_url)
                     tasks.append(self._process_search_result(
                         session, result, term
                     ))
@@ -213,7 +224,7 @@ class ScraperEngine:
         session: ScrapingSession,
         result: Dict,
         term: str
-    ) -> Optional[DocumentMetadata]:
+    ) -> Optional[Dict]:
         """Verarbeitet ein einzelnes Suchergebnis"""
         try:
             # Download Dokument
@@ -223,6 +234,7 @@ class ScraperEngine:
             )
             
             if not doc_info:
+                await db_manager.rollups.record_failure(term, session.file_type, result['link'])
                 return None
                 
             # Verarbeite Dokument
@@ -230,18 +242,16 @@ class ScraperEngine:
                 doc_info,
                 term=term,
                 similarity_threshold=session.similarity_threshold,
-                snippet=result.get('snippet', '')
+                snippet=result.get('snippet', ''),
+                title=result.get('title', '')
             )
             
-            if processed_doc:
-                # Speichere in Datenbank
-                if await db_manager.store_document(processed_doc):
-                    return processed_doc
-                    
-            return None
+            # Der Processor hat das Dokument bereits über den Ingest-Puffer gespeichert
+            return processed_doc
             
         except Exception as e:
             logger.error(f"Fehler bei der Verarbeitung des Suchergebnisses: {str(e)}")
+            await db_manager.rollups.record_failure(term, session.file_type, result.get('link'))
             return None
             
     async def _cleanup_session(self, session_id: str):
@@ -268,6 +278,7 @@ class ScraperEngine:
             Session {session_id} abgeschlossen:
             - Erfolgreiche Downloads: {session.successful_downloads}
             - Fehlgeschlagene Downloads: {session.failed_downloads}
+            - Übersprungene Duplikate: {session.skipped_downloads} ({session.skipped_bytes / 1024 / 1024:.2f} MB eingespart)
             - Gesamtgröße: {session.total_bytes / 1024 / 1024:.2f} MB
             - Dauer: {duration:.2f} Sekunden
             """)
@@ -286,6 +297,8 @@ class ScraperEngine:
             'file_type': session.file_type,
             'successful_downloads': session.successful_downloads,
             'failed_downloads': session.failed_downloads,
+            'skipped_downloads': session.skipped_downloads,
+            'skipped_bytes': session.skipped_bytes,
             'total_bytes': session.total_bytes,
             'duration': (datetime.now() - session.start_time).total_seconds(),
             'processed_urls': len(session.processed_urls)
@@ -21,6 +21,8 @@ class ScrapingSession:
         processed_urls (Set[str]): Bereits verarbeitete URLs
         successful_downloads (int): Anzahl erfolgreicher Downloads
         failed_downloads (int): Anzahl fehlgeschlagener Downloads
+        skipped_downloads (int): Vor dem Download übersprungene Duplikate
+        skipped_bytes (int): Durch übersprungene Duplikate eingesparte Bytes
         total_bytes (int): Gesamtgröße der heruntergeladenen Dateien
     """
     
@@ -32,6 +34,8 @@ class ScrapingSession:
     processed_urls: Set[str] = field(default_factory=set)  # Fix hier
     successful_downloads: int = 0
     failed_downloads: int = 0
+    skipped_downloads: int = 0
+    skipped_bytes: int = 0
     total_bytes: int = 0
     
     def __post_init__(self):
@@ -61,6 +65,8 @@ class ScrapingSession:
             'file_type': self.file_type,
             'successful_downloads': self.successful_downloads,
             'failed_downloads': self.failed_downloads,
+            'skipped_downloads': self.skipped_downloads,
+            'skipped_bytes': self.skipped_bytes,
             'total_bytes': self.total_bytes,
             'duration': duration,
             'processed_urls': len(self.processed_urls)
@@ -7,7 +7,7 @@ from datetime import datetime
 from typing import Dict, Optional, List, Set
 import logging
 from dataclasses import dataclass, asdict
-from models import ScrapingStatus
+from app.models import ScrapingStatus
 from app.database.manager import db_manager
 
 logger = logging.getLogger(__name__)
@@ -0,0 +1,26 @@
+"""
+Speicher-Backends für Document Scraper.
+Das Backend wird über STORAGE_BACKEND gewählt ('mongo' oder 'sqlite').
+"""
+
+from .base import StorageBackend
+
+def create_backend(name: str) -> StorageBackend:
+    """
+    Erstellt das konfigurierte Speicher-Backend.
+
+    Die Implementierungen werden erst hier importiert, damit SQLite-
+    Installationen ohne MongoDB-Treiber auskommen.
+
+    Raises:
+        ValueError: Bei unbekanntem Backend
+    """
+    if name == "mongo":
+        from .mongo_backend import MongoBackend
+        return MongoBackend()
+    if name == "sqlite":
+        from .sqlite_backend import SQLiteBackend
+        return SQLiteBackend()
+    raise ValueError(f"Unbekanntes Speicher-Backend: {name}")
+
+__all__ = ['StorageBackend', 'create_backend']
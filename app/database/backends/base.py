@@ -0,0 +1,253 @@
+"""
+Schnittstelle der Speicher-Backends.
+Der DatabaseManager kümmert sich um Cache, Fallback-Speicher und Indizes;
+die Backends übernehmen nur das eigentliche Lesen und Schreiben.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.models.schemas import ScrapingStats
+
+# Bucket eines Rollups: (Granularität, Bucket-Beginn, Dimension, Schlüssel)
+RollupBucket = Tuple[str, datetime, str, str]
+
+class StorageBackend(ABC):
+    """
+    Basisklasse für Speicher-Backends.
+
+    Filter werden im MongoDB-Format übergeben; Backends ohne native
+    Unterstützung übersetzen die verwendete Teilmenge (Gleichheit,
+    $lt/$lte/$gt/$gte, $ne, $in, $nin, $exists, $or und $and).
+
+    Dokumente, Filter und Projektionen kommen bereits in der gespeicherten
+    Form an (kurze Feldnamen, Wörterbuch-Codes, siehe DocumentCodec); eigene
+    Abfragen der Backends verwenden stored_field für die Feldnamen.
+
+    Jedes Backend stellt unter counters ein Objekt mit der Schnittstelle
+    von CorpusCounters bereit (attach_codec, start, stop, background_task,
+    record_ingest, record_delete, record_language_changes, get_statistics,
+    reconcile).
+    """
+
+    name = "base"
+    counters = None
+
+    @abstractmethod
+    async def connect(self) -> bool:
+        """Stellt die Verbindung her; False, wenn der Speicher nicht erreichbar ist"""
+
+    async def close(self):
+        """Gibt Verbindungen und Dateien frei"""
+
+    async def reconnect(self) -> bool:
+        """
+        Stellt eine unterbrochene Verbindung wieder her.
+
+        Eine bestehende (evtl. noch von laufenden Abfragen genutzte)
+        Verbindung wird dabei nicht geschlossen.
+        """
+        return await self.connect()
+
+    @abstractmethod
+    async def ping(self):
+        """Prüft die bestehende Verbindung (Exception, wenn der Speicher nicht antwortet)"""
+
+    @abstractmethod
+    async def create_indices(self):
+        """Erstellt die benötigten Indizes (idempotent)"""
+
+    async def drop_legacy_indices(self):
+        """Entfernt Indizes der alten Speicherform (nach abgeschlossener Umstellung)"""
+
+    @abstractmethod
+    async def insert_documents(self, records: List[Dict], strict: bool = False) -> List[bool]:
+        """
+        Fügt Dokumente ein, deren URL noch nicht vorhanden ist.
+
+        Args:
+            records: Zu speichernde Datensätze
+            strict: Fehler außer Duplikaten als Exception weitergeben
+
+        Returns:
+            List[bool]: Je Datensatz, ob er neu gespeichert wurde
+        """
+
+    @abstractmethod
+    async def update_documents(self, updates: List[Tuple[str, Dict]]) -> int:
+        """Setzt Felder mehrerer Dokumente (URL, Felder); liefert die Trefferanzahl"""
+
+    @abstractmethod
+    async def replace_documents(self, documents: List[Dict], expected: Optional[List[Dict]] = None) -> int:
+        """
+        Ersetzt Dokumente vollständig anhand ihrer _id.
+
+        Args:
+            documents: Neue Fassungen (mit _id)
+            expected: Zuvor gelesene Fassungen; ersetzt wird dann nur,
+                solange das gespeicherte Dokument noch genau so aussieht
+
+        Returns:
+            int: Anzahl ersetzter Dokumente
+        """
+
+    @abstractmethod
+    async def find_one(self, field: str, value, projection: Optional[Dict] = None) -> Optional[Dict]:
+        """Sucht ein Dokument über ein Feld"""
+
+    @abstractmethod
+    async def get_document(self, document_id: str, projection: Optional[Dict] = None) -> Optional[Dict]:
+        """Sucht ein Dokument über seine ID; None auch bei ungültiger ID"""
+
+    @abstractmethod
+    async def find_known(
+        self,
+        urls: List[str],
+        hashes: List[str],
+        canonical_urls: List[str],
+        legacy: bool = False
+    ) -> List[Dict]:
+        """
+        Dokumente (url, canonical_url, hash, size) zu URLs, Hashes oder kanonischen URLs.
+
+        Mit legacy werden kanonische URLs auch unter dem alten Feldnamen gesucht.
+        """
+
+    @abstractmethod
+    async def find_by_urls(self, urls: List[str], fields: Tuple[str, ...]) -> Dict[str, Dict]:
+        """Lädt mehrere Dokumente mit Projektion, nach URL"""
+
+    @abstractmethod
+    def iter_documents(
+        self,
+        query: Optional[Dict] = None,
+        projection: Optional[Dict] = None,
+        batch_size: int = 500,
+        sort: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        """Iteriert Dokumente über einen Cursor, optional aufsteigend nach einem Feld"""
+
+    @abstractmethod
+    async def get_documents_page(
+        self,
+        query: Optional[Dict],
+        after_id,
+        limit: int,
+        projection: Optional[Dict] = None
+    ) -> List[Dict]:
+        """Seite von Dokumenten aufsteigend nach _id (Keyset-Paginierung)"""
+
+    @abstractmethod
+    async def delete_document(self, document_id: str) -> Optional[Dict]:
+        """Löscht ein Dokument; liefert url, hash, size usw. oder None"""
+
+    @abstractmethod
+    async def delete_documents(self, query: Dict) -> int:
+        """Löscht alle Dokumente zu einem Filter"""
+
+    @abstractmethod
+    async def search(
+        self,
+        query: str,
+        position: Optional[Dict],
+        limit: int,
+        fields: Tuple[str, ...]
+    ) -> Tuple[List[Dict], Optional[Dict]]:
+        """
+        Volltextsuche über title und snippet, nach Relevanz sortiert.
+
+        Args:
+            query: Suchbegriffe
+            position: Position nach der vorherigen Seite
+            limit: Treffer je Seite
+            fields: Zurückgegebene Felder
+
+        Returns:
+            Tuple[List[Dict], Optional[Dict]]: (Treffer, Position für die
+            nächste Seite oder None)
+
+        Raises:
+            ValueError: Bei ungültiger Position
+        """
+
+    @abstractmethod
+    async def count_search(self, query: str, cap: int) -> int:
+        """Zählt Suchtreffer bis höchstens cap + 1"""
+
+    @abstractmethod
+    async def get_recent_documents(self, limit: int, projection: Optional[Dict] = None) -> List[Dict]:
+        """Neueste Dokumente nach Zeitstempel"""
+
+    @abstractmethod
+    async def count_documents(self) -> int:
+        """Anzahl gespeicherter Dokumente"""
+
+    @abstractmethod
+    async def unset_fields(self, urls: List[str], fields: Tuple[str, ...]) -> int:
+        """Entfernt Felder aus mehreren Dokumenten; liefert die Anzahl geänderter"""
+
+    @abstractmethod
+    async def upsert_payloads(self, collection: str, payloads: List[Tuple[str, Dict]]):
+        """
+        Setzt ausgelagerte Felder (siehe PAYLOAD_COLLECTIONS) je URL.
+
+        Args:
+            collection: Name der Payload-Collection
+            payloads: Liste aus (URL, zu setzende Felder); fehlende Einträge
+                werden angelegt
+        """
+
+    @abstractmethod
+    async def find_payloads(self, collection: str, urls: List[str], fields: Tuple[str, ...]) -> Dict[str, Dict]:
+        """Lädt ausgelagerte Felder mehrerer Dokumente, nach URL"""
+
+    @abstractmethod
+    def iter_payloads(
+        self,
+        collection: str,
+        query: Optional[Dict],
+        fields: Tuple[str, ...],
+        batch_size: int = 500
+    ) -> AsyncIterator[Dict]:
+        """Iteriert die Einträge einer Payload-Collection (url und fields)"""
+
+    @abstractmethod
+    async def delete_payloads(self, collection: str, urls: List[str]) -> int:
+        """Löscht die ausgelagerten Felder mehrerer Dokumente"""
+
+    @abstractmethod
+    async def load_dictionaries(self) -> List[Tuple[str, int, str]]:
+        """Alle Wörterbuch-Einträge (Feld, Code, Wert)"""
+
+    @abstractmethod
+    async def add_dictionary_entries(self, entries: List[Tuple[str, int, str]]) -> bool:
+        """Speichert neue Wörterbuch-Einträge; False, wenn Feld und Code oder Wert bereits vergeben sind"""
+
+    @abstractmethod
+    async def get_job_state(self, job_name: str) -> Optional[Dict]:
+        """Lädt den Fortschritt eines Hintergrund-Jobs"""
+
+    @abstractmethod
+    async def save_job_state(self, job_name: str, state: Dict):
+        """Speichert den Fortschritt eines Hintergrund-Jobs"""
+
+    @abstractmethod
+    async def increment_rollups(self, updates: List[Tuple[RollupBucket, Dict[str, int], Optional[datetime]]]):
+        """Erhöht Rollup-Buckets (Bucket, Inkremente je Metrik, Ablaufzeitpunkt)"""
+
+    @abstractmethod
+    async def find_rollups(
+        self,
+        granularity: str,
+        dimension: str,
+        start: datetime,
+        end: datetime,
+        key: Optional[str],
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """Rollup-Buckets im Zeitraum (naive UTC-Zeit), aufsteigend nach Bucket, höchstens limit"""
+
+    async def get_statistics(self) -> ScrapingStats:
+        """Statistiken des Bestands"""
+        return await self.counters.get_statistics()
@@ -0,0 +1,409 @@
+"""
+MongoDB-Backend für Document Scraper.
+"""
+
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, TEXT, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from pymongo.errors import ServerSelectionTimeoutError as ConnectionError
+
+from app.config import MONGODB_URI, DB_NAME, PAYLOAD_COLLECTIONS, STORED_FIELD_NAMES
+from ..corpus_counters import CorpusCounters
+from ..document_codec import stored_field
+from .base import StorageBackend, RollupBucket
+
+logger = logging.getLogger(__name__)
+
+# Felder, die beim Löschen für Zähler und Cache zurückgegeben werden
+DELETED_DOCUMENT_FIELDS = {
+    stored_field(field): 1
+    for field in ("url", "canonical_url", "hash", "size", "file_type", "term", "language")
+}
+INDEXED_FIELDS = ("canonical_url", "term", "file_type", "hash", "content_hash", "local_path", "timestamp")
+
+class MongoBackend(StorageBackend):
+    """Speichert Dokumente, Jobs, Statistiken und Rollups in MongoDB"""
+
+    name = "mongo"
+
+    def __init__(self, uri: str = MONGODB_URI, db_name: str = DB_NAME):
+        self.uri = uri
+        self.db_name = db_name
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.db = None
+        self.counters = CorpusCounters()  # Materialisierte Statistiken
+
+    async def connect(self) -> bool:
+        try:
+            logger.info(f"Versuche Verbindung mit URI: {self.uri}")
+            await self.close()  # Verbindungspool eines früheren Versuchs freigeben
+            self.client = AsyncIOMotorClient(self.uri)
+            await self.client.server_info()  # Test connection
+            self.db = self.client[self.db_name]
+            self.counters.attach(self.db)
+            logger.info("MongoDB Verbindung erfolgreich hergestellt")
+            return True
+
+        except ConnectionError as e:
+            logger.error(f"MongoDB Verbindungsfehler: {str(e)}")
+            logger.error(f"Verwendete URI: {self.uri}")
+            return False
+
+    async def close(self):
+        if self.client is not None:
+            self.client.close()
+
+    async def reconnect(self) -> bool:
+        if self.client is None:
+            return await self.connect()
+        # Motor baut seinen Verbindungspool selbst neu auf; der Client bleibt
+        # erhalten, damit laufende Cursor und Abfragen weiterarbeiten
+        try:
+            await self.client.server_info()
+            return True
+        except ConnectionError as e:
+            logger.error(f"MongoDB weiterhin nicht erreichbar: {str(e)}")
+            return False
+
+    async def ping(self):
+        await self.db.command("ping")
+
+    async def create_indices(self):
+        await self.db.documents.create_index([("url", ASCENDING)], unique=True)
+        for field in INDEXED_FIELDS:
+            await self.db.documents.create_index([(stored_field(field), ASCENDING)])
+        await self.db.documents.create_index([
+            (stored_field("enrichment_state"), ASCENDING),
+            (stored_field("enrichment_version"), ASCENDING)
+        ])
+        await self.db.documents.create_index([
+            ("snippet", TEXT),
+            ("title", TEXT)
+        ])
+        for collection in PAYLOAD_COLLECTIONS:
+            await self.db[collection].create_index([("url", ASCENDING)], unique=True)
+        await self.db.dictionaries.create_index([("field", ASCENDING), ("value", ASCENDING)], unique=True)
+        await self.db.dictionaries.create_index([("field", ASCENDING), ("code", ASCENDING)], unique=True)
+        await self.db.rollups.create_index([
+            ("granularity", ASCENDING),
+            ("dimension", ASCENDING),
+            ("key", ASCENDING),
+            ("bucket", ASCENDING)
+        ], unique=True)
+        # Feine Buckets werden über einen TTL-Index entfernt
+        await self.db.rollups.create_index("expires_at", expireAfterSeconds=0)
+
+    async def drop_legacy_indices(self):
+        """Entfernt Indizes auf Feldern, die inzwischen unter kurzem Namen gespeichert werden"""
+        async for index in self.db.documents.list_indexes():
+            if set(index["key"]) & STORED_FIELD_NAMES.keys():
+                await self.db.documents.drop_index(index["name"])
+                logger.info(f"Veralteten Index {index['name']} entfernt")
+
+    async def insert_documents(self, records: List[Dict], strict: bool = False) -> List[bool]:
+        operations = [
+            UpdateOne({"url": record["url"]}, {"$setOnInsert": record}, upsert=True)
+            for record in records
+        ]
+        results = [False] * len(records)
+
+        try:
+            result = await self.db.documents.bulk_write(operations, ordered=False)
+            upserted_indices = result.upserted_ids.keys()
+        except BulkWriteError as e:
+            # Teilweise erfolgreich: Fehler (z.B. parallele Duplikate) je Dokument auswerten
+            upserted_indices = [item["index"] for item in e.details.get("upserted", [])]
+            write_errors = e.details.get("writeErrors", [])
+            duplicates = sum(1 for error in write_errors if error.get("code") == 11000)
+            if len(write_errors) > duplicates:
+                if strict:
+                    raise
+                logger.error(
+                    f"Bulk-Write mit {len(write_errors) - duplicates} Fehlern: "
+                    f"{write_errors[0].get('errmsg')}"
+                )
+
+        for index in upserted_indices:
+            results[index] = True
+        return results
+
+    async def update_documents(self, updates: List[Tuple[str, Dict]]) -> int:
+        operations = [
+            UpdateOne({"url": url}, {"$set": fields})
+            for url, fields in updates
+        ]
+        result = await self.db.documents.bulk_write(operations, ordered=False)
+        return result.matched_count
+
+    async def replace_documents(self, documents: List[Dict], expected: Optional[List[Dict]] = None) -> int:
+        if not documents:
+            return 0
+        filters = [{"_id": document["_id"]} for document in documents]
+        if expected is not None:
+            # Vergleich des ganzen Dokuments: jede zwischenzeitliche Änderung verhindert das Ersetzen
+            for query, original in zip(filters, expected):
+                query["$expr"] = {"$eq": ["$$ROOT", {"$literal": original}]}
+        result = await self.db.documents.bulk_write([
+            ReplaceOne(query, document)
+            for query, document in zip(filters, documents)
+        ], ordered=False)
+        return result.matched_count
+
+    async def find_one(self, field: str, value, projection: Optional[Dict] = None) -> Optional[Dict]:
+        return await self.db.documents.find_one({field: value}, projection)
+
+    async def get_document(self, document_id: str, projection: Optional[Dict] = None) -> Optional[Dict]:
+        if not ObjectId.is_valid(document_id):
+            return None
+        return await self.db.documents.find_one({"_id": ObjectId(document_id)}, projection)
+
+    async def find_known(
+        self,
+        urls: List[str],
+        hashes: List[str],
+        canonical_urls: List[str],
+        legacy: bool = False
+    ) -> List[Dict]:
+        canonical_url = stored_field("canonical_url")
+        conditions = []
+        if urls:
+            conditions.append({"url": {"$in": urls}})
+        if hashes:
+            conditions.append({"hash": {"$in": hashes}})
+        if canonical_urls:
+            conditions.append({canonical_url: {"$in": canonical_urls}})
+            if legacy:
+                conditions.append({"canonical_url": {"$in": canonical_urls}})
+        if not conditions:
+            return []
+
+        projection = {"_id": 0, "url": 1, canonical_url: 1, "hash": 1, "size": 1}
+        if legacy:
+            projection["canonical_url"] = 1
+        cursor = self.db.documents.find({"$or": conditions}, projection)
+        return await cursor.to_list(length=None)
+
+    async def find_by_urls(self, urls: List[str], fields: Tuple[str, ...]) -> Dict[str, Dict]:
+        cursor = self.db.documents.find(
+            {"url": {"$in": urls}},
+            {"_id": 0, "url": 1, **{field: 1 for field in fields}}
+        )
+        return {doc["url"]: doc async for doc in cursor}
+
+    async def iter_documents(
+        self,
+        query: Optional[Dict] = None,
+        projection: Optional[Dict] = None,
+        batch_size: int = 500,
+        sort: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        cursor = self.db.documents.find(query or {}, projection).batch_size(batch_size)
+        if sort:
+            cursor = cursor.sort([(sort, ASCENDING), ("_id", ASCENDING)])
+        try:
+            async for doc in cursor:
+                yield doc
+        finally:
+            # Bei vorzeitigem Abbruch den Server-Cursor sofort freigeben
+            await cursor.close()
+
+    async def get_documents_page(
+        self,
+        query: Optional[Dict],
+        after_id,
+        limit: int,
+        projection: Optional[Dict] = None
+    ) -> List[Dict]:
+        page_query = dict(query or {})
+        if after_id is not None:
+            page_query["_id"] = {"$gt": after_id}
+
+        cursor = self.db.documents.find(page_query, projection) \
+            .sort("_id", ASCENDING) \
+            .limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def delete_document(self, document_id: str) -> Optional[Dict]:
+        if not ObjectId.is_valid(document_id):
+            return None
+        return await self.db.documents.find_one_and_delete(
+            {"_id": ObjectId(document_id)},
+            DELETED_DOCUMENT_FIELDS
+        )
+
+    async def delete_documents(self, query: Dict) -> int:
+        result = await self.db.documents.delete_many(query)
+        return result.deleted_count
+
+    async def search(
+        self,
+        query: str,
+        position: Optional[Dict],
+        limit: int,
+        fields: Tuple[str, ...]
+    ) -> Tuple[List[Dict], Optional[Dict]]:
+        pipeline = [
+            {"$match": {"$text": {"$search": query}}},
+            {"$addFields": {"score": {"$meta": "textScore"}}}
+        ]
+        if position:
+            if not ObjectId.is_valid(position.get("id", "")):
+                raise ValueError("Ungültige Position")
+            score, last_id = position["s"], ObjectId(position["id"])
+            pipeline.append({"$match": {"$or": [
+                {"score": {"$lt": score}},
+                {"score": score, "_id": {"$gt": last_id}}
+            ]}})
+        pipeline += [
+            {"$sort": {"score": -1, "_id": 1}},
+            {"$limit": limit + 1},
+            {"$project": {"score": 1, **{field: 1 for field in fields}}}
+        ]
+
+        documents = await self.db.documents.aggregate(pipeline).to_list(length=limit + 1)
+        next_position = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            next_position = {"s": last["score"], "id": str(last["_id"])}
+
+        for doc in documents:
+            doc["_id"] = str(doc["_id"])
+        return documents, next_position
+
+    async def count_search(self, query: str, cap: int) -> int:
+        result = await self.db.documents.aggregate([
+            {"$match": {"$text": {"$search": query}}},
+            {"$limit": cap + 1},
+            {"$count": "total"}
+        ]).to_list(length=1)
+        return result[0]["total"] if result else 0
+
+    async def get_recent_documents(self, limit: int, projection: Optional[Dict] = None) -> List[Dict]:
+        return await self.db.documents.find({}, projection) \
+            .sort(stored_field("timestamp"), -1) \
+            .limit(limit) \
+            .to_list(length=limit)
+
+    async def count_documents(self) -> int:
+        return await self.db.documents.count_documents({})
+
+    async def unset_fields(self, urls: List[str], fields: Tuple[str, ...]) -> int:
+        result = await self.db.documents.update_many(
+            {"url": {"$in": urls}},
+            {"$unset": {field: "" for field in fields}}
+        )
+        return result.modified_count
+
+    async def upsert_payloads(self, collection: str, payloads: List[Tuple[str, Dict]]):
+        operations = [
+            UpdateOne({"url": url}, {"$set": fields}, upsert=True)
+            for url, fields in payloads
+        ]
+        if operations:
+            await self.db[collection].bulk_write(operations, ordered=False)
+
+    async def find_payloads(self, collection: str, urls: List[str], fields: Tuple[str, ...]) -> Dict[str, Dict]:
+        cursor = self.db[collection].find(
+            {"url": {"$in": urls}},
+            {"_id": 0, "url": 1, **{field: 1 for field in fields}}
+        )
+        return {doc["url"]: doc async for doc in cursor}
+
+    async def iter_payloads(
+        self,
+        collection: str,
+        query: Optional[Dict],
+        fields: Tuple[str, ...],
+        batch_size: int = 500
+    ) -> AsyncIterator[Dict]:
+        cursor = self.db[collection].find(
+            query or {},
+            {"_id": 0, "url": 1, **{field: 1 for field in fields}}
+        ).batch_size(batch_size)
+        async for doc in cursor:
+            yield doc
+
+    async def delete_payloads(self, collection: str, urls: List[str]) -> int:
+        result = await self.db[collection].delete_many({"url": {"$in": urls}})
+        return result.deleted_count
+
+    async def load_dictionaries(self) -> List[Tuple[str, int, str]]:
+        cursor = self.db.dictionaries.find({}, {"_id": 0, "field": 1, "code": 1, "value": 1})
+        return [(entry["field"], entry["code"], entry["value"]) async for entry in cursor]
+
+    async def add_dictionary_entries(self, entries: List[Tuple[str, int, str]]) -> bool:
+        try:
+            await self.db.dictionaries.insert_many([
+                {"field": field, "code": code, "value": value}
+                for field, code, value in entries
+            ], ordered=False)
+            return True
+        except BulkWriteError as e:
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+            return False
+
+    async def get_job_state(self, job_name: str) -> Optional[Dict]:
+        return await self.db.jobs.find_one({"_id": job_name})
+
+    async def save_job_state(self, job_name: str, state: Dict):
+        await self.db.jobs.update_one(
+            {"_id": job_name},
+            {"$set": {**state, "updated_at": datetime.now()}},
+            upsert=True
+        )
+
+    async def increment_rollups(self, updates: List[Tuple[RollupBucket, Dict[str, int], Optional[datetime]]]):
+        operations = []
+        for (granularity, bucket, dimension, key), inc, expires_at in updates:
+            update = {"$inc": inc}
+            if expires_at is not None:
+                update["$setOnInsert"] = {"expires_at": expires_at}
+            operations.append(UpdateOne(
+                {"granularity": granularity, "dimension": dimension, "key": key, "bucket": bucket},
+                update,
+                upsert=True
+            ))
+        try:
+            await self.db.rollups.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Parallele Upserts desselben Buckets: der unterlegene scheitert am Unique-Index
+            write_errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in write_errors):
+                raise
+            # Einmal wiederholen; der Bucket existiert jetzt und $inc greift
+            await self.db.rollups.bulk_write(
+                [operations[error["index"]] for error in write_errors],
+                ordered=False
+            )
+
+    async def find_rollups(
+        self,
+        granularity: str,
+        dimension: str,
+        start: datetime,
+        end: datetime,
+        key: Optional[str],
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        query = {
+            "granularity": granularity,
+            "dimension": dimension,
+            "bucket": {"$gte": start, "$lte": end}
+        }
+        if key is not None:
+            query["key"] = key
+
+        cursor = self.db.rollups.find(
+            query,
+            {"_id": 0, "key": 1, "bucket": 1, "documents": 1, "bytes": 1, "failures": 1}
+        ).sort("bucket", ASCENDING)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list(length=None)
@@ -0,0 +1,944 @@
+"""
+SQLite-Backend für Document Scraper.
+Eingebetteter Speicher für Einzelknoten und Benchmarks: WAL-Modus,
+FTS5-Volltextindex und per Trigger gepflegte Statistiken, ohne separaten
+Datenbankserver.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from app.config import SQLITE_PATH, SQLITE_CACHE_SIZE_MB, PAYLOAD_COLLECTIONS
+from app.models.schemas import ScrapingStats
+from ..document_codec import stored_field
+from .base import StorageBackend, RollupBucket
+
+logger = logging.getLogger(__name__)
+
+# Als Spalten abgeleitete und indizierte Felder; alle übrigen liegen nur im JSON.
+# Spalten heißen wie das gespeicherte Feld (siehe STORED_FIELD_NAMES).
+PROMOTED_FIELDS = {
+    stored_field(field): sql_type for field, sql_type in {
+        "url": "TEXT", "canonical_url": "TEXT", "hash": "TEXT", "term": "INTEGER",
+        "file_type": "TEXT", "language": "TEXT", "domain": "INTEGER", "size": "INTEGER",
+        "timestamp": "TEXT", "title": "TEXT", "snippet": "TEXT",
+        "enrichment_state": "TEXT", "enrichment_version": "INTEGER", "content_hash": "TEXT",
+        "local_path": "TEXT"
+    }.items()
+}
+INDEXED_FIELDS = tuple(
+    ", ".join(stored_field(field) for field in fields.split(", "))
+    for fields in (
+        "canonical_url", "hash", "term", "file_type", "timestamp", "content_hash", "local_path",
+        "enrichment_state, enrichment_version"
+    )
+)
+DELETED_DOCUMENT_FIELDS = tuple(
+    stored_field(field)
+    for field in ("url", "canonical_url", "hash", "size", "file_type", "term", "language")
+)
+# Gespeicherte Namen der in Triggern und Abgleich gezählten Spalten
+COUNTED_COLUMNS = {
+    field: stored_field(field) for field in ("file_type", "term", "domain", "language")
+}
+ROLLUP_METRICS = ("documents", "bytes", "failures")
+ROLLUP_PURGE_INTERVAL = 3600  # Sekunden zwischen dem Entfernen abgelaufener Buckets
+FIELD_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z0-9_]+)*")
+
+_COUNTER_DELTAS = """
+    INSERT INTO counters (counter, key, value) VALUES
+        ('overall', 'total_documents', {sign}1),
+        ('overall', 'total_size', {sign}coalesce({row}.size, 0)),
+        ('file_types', coalesce({row}.{file_type}, 'unknown'), {sign}1),
+        ('terms', coalesce({row}.{term}, 'unknown'), {sign}1),
+        ('domains', coalesce({row}.{domain}, ''), {sign}1)
+    ON CONFLICT (counter, key) DO UPDATE SET value = value + excluded.value;
+"""
+_LANGUAGE_DELTA = """
+    INSERT INTO counters (counter, key, value)
+        SELECT 'languages', {row}.{language}, {sign}1 WHERE {row}.{language} IS NOT NULL
+    ON CONFLICT (counter, key) DO UPDATE SET value = value + excluded.value;
+"""
+# Spalten, deren Änderung per Update die Zähler außer der Sprache verschiebt
+UPDATE_COUNTED_COLUMNS = ("size", *(COUNTED_COLUMNS[field] for field in ("file_type", "term", "domain")))
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL,
+    {", ".join(
+        f"{field} {sql_type} GENERATED ALWAYS AS (json_extract(data, '$.{field}')) VIRTUAL"
+        for field, sql_type in PROMOTED_FIELDS.items()
+    )}
+);
+CREATE UNIQUE INDEX IF NOT EXISTS documents_url ON documents (url);
+{"".join(
+    f"CREATE INDEX IF NOT EXISTS documents_{fields.replace(', ', '_')} ON documents ({fields});"
+    for fields in INDEXED_FIELDS
+)}
+
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, snippet,
+    content='documents', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TABLE IF NOT EXISTS counters (
+    counter TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (counter, key)
+) WITHOUT ROWID;
+
+{"".join(
+    f"CREATE TABLE IF NOT EXISTS {collection} (url TEXT PRIMARY KEY, data TEXT NOT NULL);"
+    for collection in PAYLOAD_COLLECTIONS
+)}
+
+CREATE TABLE IF NOT EXISTS dictionaries (
+    field TEXT NOT NULL,
+    code INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (field, code),
+    UNIQUE (field, value)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS jobs (
+    name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS rollups (
+    granularity TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    documents INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0,
+    expires_at TEXT,
+    PRIMARY KEY (granularity, dimension, key, bucket)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rollups_expires_at ON rollups (expires_at) WHERE expires_at IS NOT NULL;
+
+-- Trigger werden neu erstellt, damit sie auf die aktuellen Spaltennamen verweisen
+DROP TRIGGER IF EXISTS documents_after_insert;
+CREATE TRIGGER documents_after_insert AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts (rowid, title, snippet) VALUES (new.id, new.title, new.snippet);
+    {_COUNTER_DELTAS.format(sign="", row="new", **COUNTED_COLUMNS)}
+    {_LANGUAGE_DELTA.format(sign="", row="new", **COUNTED_COLUMNS)}
+END;
+
+DROP TRIGGER IF EXISTS documents_after_delete;
+CREATE TRIGGER documents_after_delete AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, title, snippet)
+        VALUES ('delete', old.id, old.title, old.snippet);
+    {_COUNTER_DELTAS.format(sign="-", row="old", **COUNTED_COLUMNS)}
+    {_LANGUAGE_DELTA.format(sign="-", row="old", **COUNTED_COLUMNS)}
+END;
+
+DROP TRIGGER IF EXISTS documents_after_update_counted;
+CREATE TRIGGER documents_after_update_counted AFTER UPDATE ON documents
+WHEN {" OR ".join(f"old.{column} IS NOT new.{column}" for column in UPDATE_COUNTED_COLUMNS)} BEGIN
+    {_COUNTER_DELTAS.format(sign="-", row="old", **COUNTED_COLUMNS)}
+    {_COUNTER_DELTAS.format(sign="", row="new", **COUNTED_COLUMNS)}
+END;
+
+DROP TRIGGER IF EXISTS documents_after_update_text;
+CREATE TRIGGER documents_after_update_text AFTER UPDATE ON documents
+WHEN old.title IS NOT new.title OR old.snippet IS NOT new.snippet BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, title, snippet)
+        VALUES ('delete', old.id, old.title, old.snippet);
+    INSERT INTO documents_fts (rowid, title, snippet) VALUES (new.id, new.title, new.snippet);
+END;
+
+DROP TRIGGER IF EXISTS documents_after_update_language;
+CREATE TRIGGER documents_after_update_language AFTER UPDATE ON documents
+WHEN old.{COUNTED_COLUMNS["language"]} IS NOT new.{COUNTED_COLUMNS["language"]} BEGIN
+    UPDATE counters SET value = value - 1
+        WHERE counter = 'languages' AND key = old.{COUNTED_COLUMNS["language"]};
+    INSERT INTO counters (counter, key, value)
+        SELECT 'languages', new.{COUNTED_COLUMNS["language"]}, 1
+        WHERE new.{COUNTED_COLUMNS["language"]} IS NOT NULL
+    ON CONFLICT (counter, key) DO UPDATE SET value = value + excluded.value;
+END;
+"""
+
+RECONCILE_COUNTERS = """
+DELETE FROM counters;
+INSERT INTO counters (counter, key, value)
+    SELECT 'overall', 'total_documents', count(*) FROM documents
+    UNION ALL SELECT 'overall', 'total_size', coalesce(sum(size), 0) FROM documents;
+INSERT INTO counters (counter, key, value)
+    SELECT 'file_types', coalesce({file_type}, 'unknown'), count(*) FROM documents GROUP BY 2;
+INSERT INTO counters (counter, key, value)
+    SELECT 'terms', coalesce({term}, 'unknown'), count(*) FROM documents GROUP BY 2;
+INSERT INTO counters (counter, key, value)
+    SELECT 'domains', coalesce({domain}, ''), count(*) FROM documents GROUP BY 2;
+INSERT INTO counters (counter, key, value)
+    SELECT 'languages', {language}, count(*) FROM documents WHERE {language} IS NOT NULL GROUP BY 2;
+""".format(**COUNTED_COLUMNS)
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=_json_default, ensure_ascii=False)
+
+def _to_sql(value):
+    """Wandelt Filterwerte in die im JSON gespeicherte Form"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+def _column(field: str) -> str:
+    """SQL-Ausdruck für ein Dokumentfeld (Spalte oder json_extract)"""
+    if field == "_id":
+        return "id"
+    if field in PROMOTED_FIELDS:
+        return field
+    if not FIELD_PATTERN.fullmatch(field):
+        raise ValueError(f"Ungültiger Feldname: {field}")
+    return f"json_extract(data, '$.{field}')"
+
+def compile_filter(query: Optional[Dict]) -> Tuple[str, List]:
+    """
+    Übersetzt einen MongoDB-Filter in eine WHERE-Bedingung.
+
+    Args:
+        query: Filter (Gleichheit, $lt/$lte/$gt/$gte, $ne, $in, $nin,
+            $exists, $or, $and)
+
+    Returns:
+        Tuple[str, List]: SQL-Bedingung und Parameter
+
+    Raises:
+        ValueError: Bei nicht unterstützten Operatoren
+    """
+    clauses, params = [], []
+    for field, condition in (query or {}).items():
+        if field in ("$or", "$and"):
+            parts = [compile_filter(sub_query) for sub_query in condition]
+            joiner = " OR " if field == "$or" else " AND "
+            clauses.append("(" + joiner.join(f"({sql})" for sql, _ in parts) + ")")
+            for _, sub_params in parts:
+                params.extend(sub_params)
+            continue
+
+        column = _column(field)
+        if not (isinstance(condition, dict) and all(op.startswith("$") for op in condition)):
+            condition = {"$eq": condition}
+
+        for op, value in condition.items():
+            if op in ("$eq", "$ne"):
+                clauses.append(f"{column} {'IS' if op == '$eq' else 'IS NOT'} ?")
+                params.append(_to_sql(value))
+            elif op in ("$lt", "$lte", "$gt", "$gte"):
+                symbol = {"$lt": "<", "$lte": "<=", "$gt": ">", "$gte": ">="}[op]
+                clauses.append(f"{column} {symbol} ?")
+                params.append(_to_sql(value))
+            elif op in ("$in", "$nin"):
+                values = [_to_sql(v) for v in value if v is not None]
+                matches_null = len(values) < len(value)
+                placeholders = ", ".join("?" * len(values))
+                if op == "$in":
+                    clauses.append(
+                        f"({column} IN ({placeholders})"
+                        f"{f' OR {column} IS NULL' if matches_null else ''})"
+                    )
+                else:
+                    # Wie in MongoDB trifft $nin auch fehlende Felder, außer null ist ausgeschlossen
+                    clauses.append(
+                        f"({column} IS {'NOT ' if matches_null else ''}NULL "
+                        f"{'AND' if matches_null else 'OR'} {column} NOT IN ({placeholders}))"
+                    )
+                params.extend(values)
+            elif op == "$exists":
+                if field == "_id":
+                    clauses.append("1" if value else "0")
+                else:
+                    _column(field)
+                    clauses.append(
+                        f"json_type(data, '$.{field}') IS {'NOT ' if value else ''}NULL"
+                    )
+            else:
+                raise ValueError(f"Nicht unterstützter Filter-Operator: {op}")
+
+    return " AND ".join(clauses) or "1", params
+
+def _projection_fields(projection: Optional[Dict]) -> Tuple[Optional[List[str]], List[str], bool]:
+    """
+    Zerlegt eine Projektion in (eingeschlossene Felder oder None für alle,
+    ausgeschlossene Felder, _id zurückgeben).
+    """
+    if not projection:
+        return None, [], True
+    include_id = bool(projection.get("_id", 1))
+    fields = {field: value for field, value in projection.items() if field != "_id"}
+    if fields and all(fields.values()):
+        for field in fields:
+            _column(field)
+        return list(fields), [], include_id
+    return None, [field for field, value in fields.items() if not value], include_id
+
+def _match_expression(query: str) -> str:
+    """FTS5-Ausdruck: Begriffe als Phrasen, ODER-verknüpft wie bei $text"""
+    terms = [term for term in re.findall(r"\w+", query.lower()) if term]
+    return " OR ".join(f'"{term}"' for term in terms)
+
+class SQLiteCounters:
+    """
+    Statistiken für das SQLite-Backend.
+
+    Die Zähler in der Tabelle counters werden von Triggern in derselben
+    Transaktion wie die Dokumentänderung fortgeschrieben; die record_*-
+    Methoden sind deshalb leer. Eindeutige Domains werden exakt gezählt.
+    Suchbegriffe erscheinen als Wörterbuch-Code (dekodiert vom
+    DatabaseManager).
+    """
+
+    def __init__(self, backend: "SQLiteBackend"):
+        self.backend = backend
+
+    @property
+    def background_task(self) -> Optional[asyncio.Task]:
+        """Kein Abgleich nötig, die Trigger halten die Zähler aktuell"""
+        return None
+
+    def attach_codec(self, codec):
+        pass
+
+    def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def record_ingest(self, documents: List[Dict]):
+        pass
+
+    async def record_delete(self, documents: List[Dict]):
+        pass
+
+    async def record_language_changes(self, changes):
+        pass
+
+    async def get_statistics(self) -> ScrapingStats:
+        rows = await self.backend.run(
+            lambda conn: conn.execute(
+                "SELECT counter, key, value FROM counters WHERE value != 0"
+            ).fetchall()
+        )
+        counts: Dict[str, Dict[str, int]] = {}
+        for counter, key, value in rows:
+            counts.setdefault(counter, {})[key] = value
+
+        overall = counts.get("overall", {})
+        return ScrapingStats(
+            total_documents=overall.get("total_documents", 0),
+            documents_per_type=counts.get("file_types", {}),
+            documents_per_term=counts.get("terms", {}),
+            total_size=overall.get("total_size", 0),
+            unique_domains=sum(1 for key, value in counts.get("domains", {}).items() if key and value > 0),
+            language_distribution=counts.get("languages", {})
+        )
+
+    async def reconcile(self):
+        """Berechnet alle Zähler aus der Tabelle documents neu"""
+        started = time.monotonic()
+        await self.backend.run(lambda conn: self.backend.transaction(
+            conn,
+            lambda: [conn.execute(statement) for statement in RECONCILE_COUNTERS.split(";") if statement.strip()]
+        ))
+        logger.info(f"Korpus-Statistiken abgeglichen ({time.monotonic() - started:.1f}s)")
+
+class SQLiteBackend(StorageBackend):
+    """
+    Speichert alle Daten in einer lokalen SQLite-Datei.
+
+    Dokumente liegen als JSON; häufig gefilterte Felder sind als generierte
+    Spalten indiziert. Alle Zugriffe laufen über einen eigenen Thread mit
+    einer Verbindung, Schreibvorgänge eines Aufrufs bilden eine
+    Transaktion. Wiederkehrende Anweisungen werden über den Statement-
+    Cache des sqlite3-Moduls als vorbereitete Statements wiederverwendet.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: Path = SQLITE_PATH, cache_size_mb: int = SQLITE_CACHE_SIZE_MB):
+        self.path = Path(path)
+        self.cache_size_mb = cache_size_mb
+        self.conn: Optional[sqlite3.Connection] = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self.counters = SQLiteCounters(self)
+        self._last_rollup_purge = 0.0
+
+    async def run(self, operation: Callable):
+        """Führt eine Operation mit der Verbindung im SQLite-Thread aus"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, operation, self.conn)
+
+    @staticmethod
+    def transaction(conn: sqlite3.Connection, operation: Callable):
+        """Führt eine Operation in einer Transaktion aus (Rollback bei Fehlern)"""
+        conn.execute("BEGIN")
+        try:
+            result = operation()
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def connect(self) -> bool:
+        if self.conn is not None:
+            return True
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = await self.run(lambda _: self._open())
+            logger.info(f"SQLite-Datenbank geöffnet: {self.path}")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"SQLite Verbindungsfehler: {str(e)}")
+            return False
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=512
+        )
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")  # Im WAL-Modus nur beim Checkpoint fsync
+        conn.execute(f"PRAGMA cache_size = {-self.cache_size_mb * 1024}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA busy_timeout = 5000")
+        return conn
+
+    async def close(self):
+        if self.conn is not None:
+            await self.run(lambda conn: (conn.execute("PRAGMA optimize"), conn.close()))
+            self.conn = None
+        self.executor.shutdown(wait=True)
+
+    async def ping(self):
+        await self.run(lambda conn: conn.execute("SELECT 1").fetchone())
+
+    async def create_indices(self):
+        await self.run(self._add_promoted_columns)
+        await self.run(lambda conn: conn.executescript(SCHEMA))
+        await self.run(self._drop_legacy_columns)
+        await self._purge_rollups()
+
+    @staticmethod
+    def _add_promoted_columns(conn: sqlite3.Connection):
+        """Ergänzt in bestehenden Datenbanken später hinzugekommene Spalten"""
+        existing = {row[1] for row in conn.execute("PRAGMA table_xinfo(documents)")}
+        if not existing:
+            return
+        for field, sql_type in PROMOTED_FIELDS.items():
+            if field not in existing:
+                conn.execute(
+                    f"ALTER TABLE documents ADD COLUMN {field} {sql_type} "
+                    f"GENERATED ALWAYS AS (json_extract(data, '$.{field}')) VIRTUAL"
+                )
+
+    @staticmethod
+    def _drop_legacy_columns(conn: sqlite3.Connection):
+        """Entfernt Spalten (samt Indizes) von Feldern, die inzwischen unter kurzem Namen gespeichert werden"""
+        # Spaltentyp 2/3: generierte Spalte (virtuell bzw. gespeichert)
+        legacy = {
+            row[1] for row in conn.execute("PRAGMA table_xinfo(documents)")
+            if row[6] in (2, 3) and row[1] not in PROMOTED_FIELDS
+        }
+        if not legacy:
+            return
+        for index in conn.execute("PRAGMA index_list(documents)").fetchall():
+            columns = {row[2] for row in conn.execute(f"PRAGMA index_info({index[1]})")}
+            if columns & legacy:
+                conn.execute(f"DROP INDEX {index[1]}")
+        for column in legacy:
+            conn.execute(f"ALTER TABLE documents DROP COLUMN {column}")
+        logger.info(f"Veraltete Spalten entfernt: {', '.join(sorted(legacy))}")
+
+    async def insert_documents(self, records: List[Dict], strict: bool = False) -> List[bool]:
+        payloads = [_dumps(record) for record in records]
+
+        def insert(conn):
+            # Nur doppelte URLs überspringen; andere Constraint-Verletzungen sind Fehler
+            return self.transaction(conn, lambda: [
+                conn.execute(
+                    "INSERT INTO documents (data) VALUES (?) ON CONFLICT (url) DO NOTHING", (payload,)
+                ).rowcount > 0
+                for payload in payloads
+            ])
+
+        try:
+            return await self.run(insert)
+        except sqlite3.Error as e:
+            # Die Transaktion wurde vollständig zurückgerollt
+            if strict:
+                raise
+            logger.error(f"Fehler beim Einfügen von {len(records)} Dokumenten: {str(e)}")
+            return [False] * len(records)
+
+    async def update_documents(self, updates: List[Tuple[str, Dict]]) -> int:
+        statements = []
+        for url, fields in updates:
+            for field in fields:
+                _column(field)
+            paths = ", ".join(f"'$.{field}', json(?)" for field in fields)
+            statements.append((
+                f"UPDATE documents SET data = json_set(data, {paths}) WHERE url = ?",
+                [_dumps(value) for value in fields.values()] + [url]
+            ))
+
+        def update(conn):
+            return self.transaction(conn, lambda: sum(
+                conn.execute(sql, params).rowcount for sql, params in statements
+            ))
+
+        return await self.run(update)
+
+    async def replace_documents(self, documents: List[Dict], expected: Optional[List[Dict]] = None) -> int:
+        rows = [
+            (_dumps({field: value for field, value in document.items() if field != "_id"}), document["_id"])
+            for document in documents
+        ]
+        originals = [
+            {field: value for field, value in original.items() if field != "_id"}
+            for original in expected
+        ] if expected is not None else None
+
+        def unchanged(conn, index: int) -> bool:
+            row = conn.execute("SELECT data FROM documents WHERE id = ?", (rows[index][1],)).fetchone()
+            return row is not None and json.loads(row[0]) == originals[index]
+
+        def replace(conn):
+            return self.transaction(conn, lambda: sum(
+                conn.execute("UPDATE documents SET data = ? WHERE id = ?", row).rowcount
+                for index, row in enumerate(rows)
+                if originals is None or unchanged(conn, index)
+            ))
+
+        return await self.run(replace)
+
+    async def find_one(self, field: str, value, projection: Optional[Dict] = None) -> Optional[Dict]:
+        documents = await self._select(f"{_column(field)} = ?", [_to_sql(value)], projection, limit=1)
+        return documents[0] if documents else None
+
+    async def get_document(self, document_id: str, projection: Optional[Dict] = None) -> Optional[Dict]:
+        if not str(document_id).isdigit():
+            return None
+        documents = await self._select("id = ?", [int(document_id)], projection, limit=1)
+        return documents[0] if documents else None
+
+    async def find_known(
+        self,
+        urls: List[str],
+        hashes: List[str],
+        canonical_urls: List[str],
+        legacy: bool = False
+    ) -> List[Dict]:
+        canonical_url = stored_field("canonical_url")
+        fields = [("url", urls), ("hash", hashes), (canonical_url, canonical_urls)]
+        projection = {"_id": 0, "url": 1, canonical_url: 1, "hash": 1, "size": 1}
+        if legacy:
+            fields.append(("canonical_url", canonical_urls))
+            projection["canonical_url"] = 1
+        query = {"$or": [{field: {"$in": values}} for field, values in fields if values]}
+        if not query["$or"]:
+            return []
+        where, params = compile_filter(query)
+        return await self._select(where, params, projection=projection)
+
+    async def find_by_urls(self, urls: List[str], fields: Tuple[str, ...]) -> Dict[str, Dict]:
+        if not urls:
+            return {}
+        where, params = compile_filter({"url": {"$in": urls}})
+        documents = await self._select(
+            where, params,
+            projection={"_id": 0, "url": 1, **{field: 1 for field in fields}}
+        )
+        return {doc["url"]: doc for doc in documents}
+
+    async def iter_documents(
+        self,
+        query: Optional[Dict] = None,
+        projection: Optional[Dict] = None,
+        batch_size: int = 500,
+        sort: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        if sort:
+            async for doc in self._iter_sorted(query, projection, batch_size, sort):
+                yield doc
+            return
+
+        # Seitenweise per Keyset, damit zwischen den Seiten keine Lesetransaktion offen bleibt
+        include_id = _projection_fields(projection)[2]
+        after_id = None
+        while True:
+            page = await self.get_documents_page(
+                query, after_id, batch_size, {**(projection or {}), "_id": 1}
+            )
+            if not page:
+                break
+            after_id = page[-1]["_id"]
+            for doc in page:
+                if not include_id:
+                    del doc["_id"]
+                yield doc
+
+    async def _iter_sorted(
+        self,
+        query: Optional[Dict],
+        projection: Optional[Dict],
+        batch_size: int,
+        sort: str
+    ) -> AsyncIterator[Dict]:
+        """Keyset-Paginierung über (Sortierfeld, id); NULL sortiert wie in MongoDB zuerst"""
+        include, _, include_id = _projection_fields(projection)
+        column = _column(sort)
+        drop_sort = include is not None and sort not in include
+        page_projection = {**(projection or {}), "_id": 1}
+        if drop_sort:
+            page_projection[sort] = 1
+
+        where, params = compile_filter(query)
+        position = None
+        while True:
+            page_where, page_params = where, list(params)
+            if position is not None:
+                value, last_id = position
+                if value is None:
+                    page_where += f" AND ({column} IS NOT NULL OR id > ?)"
+                    page_params.append(last_id)
+                else:
+                    page_where += f" AND ({column} > ? OR ({column} = ? AND id > ?))"
+                    page_params += [value, value, last_id]
+
+            page = await self._select(
+                page_where, page_params, page_projection, order_by=f"{column}, id", limit=batch_size
+            )
+            if not page:
+                break
+            position = (page[-1].get(sort), page[-1]["_id"])
+            for doc in page:
+                if not include_id:
+                    del doc["_id"]
+                if drop_sort:
+                    doc.pop(sort, None)
+                yield doc
+
+    async def get_documents_page(
+        self,
+        query: Optional[Dict],
+        after_id,
+        limit: int,
+        projection: Optional[Dict] = None
+    ) -> List[Dict]:
+        where, params = compile_filter(query)
+        if after_id is not None:
+            where += " AND id > ?"
+            params.append(after_id)
+        return await self._select(where, params, projection, order_by="id", limit=limit)
+
+    async def delete_document(self, document_id: str) -> Optional[Dict]:
+        if not str(document_id).isdigit():
+            return None
+        columns = ", ".join(DELETED_DOCUMENT_FIELDS)
+        row = await self.run(lambda conn: conn.execute(
+            f"DELETE FROM documents WHERE id = ? RETURNING {columns}", (int(document_id),)
+        ).fetchone())
+        return dict(zip(DELETED_DOCUMENT_FIELDS, row)) if row else None
+
+    async def delete_documents(self, query: Dict) -> int:
+        where, params = compile_filter(query)
+        return await self.run(lambda conn: self.transaction(
+            conn, lambda: conn.execute(f"DELETE FROM documents WHERE {where}", params).rowcount
+        ))
+
+    async def search(
+        self,
+        query: str,
+        position: Optional[Dict],
+        limit: int,
+        fields: Tuple[str, ...]
+    ) -> Tuple[List[Dict], Optional[Dict]]:
+        expression = _match_expression(query)
+        if not expression:
+            return [], None
+
+        # bm25() ist negativ, kleinere Werte sind relevanter
+        keyset, params = "", [expression]
+        if position:
+            if not isinstance(position.get("id"), int) or not isinstance(position.get("s"), (int, float)):
+                raise ValueError("Ungültige Position")
+            keyset = "WHERE hits.rank > ? OR (hits.rank = ? AND hits.id > ?)"
+            params += [position["s"], position["s"], position["id"]]
+
+        include, _, _ = _projection_fields({field: 1 for field in fields})
+        selected = ", ".join(f"d.data -> '$.{field}'" for field in include)
+        sql = f"""
+            WITH hits AS (
+                SELECT rowid AS id, bm25(documents_fts) AS rank
+                FROM documents_fts WHERE documents_fts MATCH ?
+            )
+            SELECT hits.id, hits.rank, {selected}
+            FROM hits JOIN documents d ON d.id = hits.id
+            {keyset}
+            ORDER BY hits.rank, hits.id
+            LIMIT ?
+        """
+        params.append(limit + 1)
+        rows = await self.run(lambda conn: conn.execute(sql, params).fetchall())
+
+        documents = []
+        for row in rows[:limit]:
+            doc = self._decode_fields(include, row[2:])
+            doc.update({"_id": str(row[0]), "score": -row[1]})
+            documents.append(doc)
+
+        next_position = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_position = {"s": last[1], "id": last[0]}
+        return documents, next_position
+
+    async def count_search(self, query: str, cap: int) -> int:
+        expression = _match_expression(query)
+        if not expression:
+            return 0
+        return await self.run(lambda conn: conn.execute(
+            "SELECT count(*) FROM (SELECT 1 FROM documents_fts WHERE documents_fts MATCH ? LIMIT ?)",
+            (expression, cap + 1)
+        ).fetchone()[0])
+
+    async def get_recent_documents(self, limit: int, projection: Optional[Dict] = None) -> List[Dict]:
+        return await self._select(
+            "1", [], projection, order_by=f"{stored_field('timestamp')} DESC", limit=limit
+        )
+
+    async def count_documents(self) -> int:
+        row = await self.run(lambda conn: conn.execute(
+            "SELECT value FROM counters WHERE counter = 'overall' AND key = 'total_documents'"
+        ).fetchone())
+        return row[0] if row else 0
+
+    async def unset_fields(self, urls: List[str], fields: Tuple[str, ...]) -> int:
+        if not urls:
+            return 0
+        for field in fields:
+            _column(field)
+        paths = ", ".join(f"'$.{field}'" for field in fields)
+        where, params = compile_filter({"url": {"$in": urls}})
+        return await self.run(lambda conn: self.transaction(conn, lambda: conn.execute(
+            f"UPDATE documents SET data = json_remove(data, {paths}) WHERE {where}", params
+        ).rowcount))
+
+    async def upsert_payloads(self, collection: str, payloads: List[Tuple[str, Dict]]):
+        rows = [(url, _dumps(fields)) for url, fields in payloads]
+        # json_patch führt die Felder zusammen (null entfernt ein Feld)
+        await self.run(lambda conn: self.transaction(conn, lambda: conn.executemany(
+            f"INSERT INTO {collection} (url, data) VALUES (?, ?) "
+            f"ON CONFLICT (url) DO UPDATE SET data = json_patch(data, excluded.data)",
+            rows
+        )))
+
+    async def find_payloads(self, collection: str, urls: List[str], fields: Tuple[str, ...]) -> Dict[str, Dict]:
+        if not urls:
+            return {}
+        where, params = compile_filter({"url": {"$in": urls}})
+        documents = await self._select_payloads(collection, where, params, fields)
+        return {doc["url"]: doc for doc in documents}
+
+    async def iter_payloads(
+        self,
+        collection: str,
+        query: Optional[Dict],
+        fields: Tuple[str, ...],
+        batch_size: int = 500
+    ) -> AsyncIterator[Dict]:
+        where, params = compile_filter(query)
+        after_url = None
+        while True:
+            page_where, page_params = where, list(params)
+            if after_url is not None:
+                page_where += " AND url > ?"
+                page_params.append(after_url)
+            page = await self._select_payloads(
+                collection, page_where, page_params, fields, order_by="url", limit=batch_size
+            )
+            if not page:
+                break
+            after_url = page[-1]["url"]
+            for doc in page:
+                yield doc
+
+    async def delete_payloads(self, collection: str, urls: List[str]) -> int:
+        if not urls:
+            return 0
+        where, params = compile_filter({"url": {"$in": urls}})
+        return await self.run(lambda conn: self.transaction(
+            conn, lambda: conn.execute(f"DELETE FROM {collection} WHERE {where}", params).rowcount
+        ))
+
+    async def load_dictionaries(self) -> List[Tuple[str, int, str]]:
+        return await self.run(lambda conn: conn.execute(
+            "SELECT field, code, value FROM dictionaries"
+        ).fetchall())
+
+    async def add_dictionary_entries(self, entries: List[Tuple[str, int, str]]) -> bool:
+        def add(conn):
+            try:
+                self.transaction(conn, lambda: conn.executemany(
+                    "INSERT INTO dictionaries (field, code, value) VALUES (?, ?, ?)", entries
+                ))
+                return True
+            except sqlite3.IntegrityError:
+                return False
+
+        return await self.run(add)
+
+    async def get_job_state(self, job_name: str) -> Optional[Dict]:
+        row = await self.run(lambda conn: conn.execute(
+            "SELECT state FROM jobs WHERE name = ?", (job_name,)
+        ).fetchone())
+        return {**json.loads(row[0]), "_id": job_name} if row else None
+
+    async def save_job_state(self, job_name: str, state: Dict):
+        payload = _dumps({**state, "updated_at": datetime.now()})
+        await self.run(lambda conn: conn.execute(
+            "INSERT INTO jobs (name, state) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET state = json_patch(state, excluded.state)",
+            (job_name, payload)
+        ))
+
+    async def increment_rollups(self, updates: List[Tuple[RollupBucket, Dict[str, int], Optional[datetime]]]):
+        rows = [
+            (granularity, dimension, key, bucket.isoformat(),
+             *(inc.get(metric, 0) for metric in ROLLUP_METRICS),
+             expires_at.astimezone(timezone.utc).isoformat() if expires_at else None)
+            for (granularity, bucket, dimension, key), inc, expires_at in updates
+        ]
+        await self.run(lambda conn: self.transaction(conn, lambda: conn.executemany(
+            "INSERT INTO rollups (granularity, dimension, key, bucket, documents, bytes, failures, expires_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (granularity, dimension, key, bucket) DO UPDATE SET "
+            "documents = documents + excluded.documents, "
+            "bytes = bytes + excluded.bytes, "
+            "failures = failures + excluded.failures",
+            rows
+        )))
+        if time.monotonic() - self._last_rollup_purge > ROLLUP_PURGE_INTERVAL:
+            await self._purge_rollups()
+
+    async def find_rollups(
+        self,
+        granularity: str,
+        dimension: str,
+        start: datetime,
+        end: datetime,
+        key: Optional[str],
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        sql = (
+            "SELECT key, bucket, documents, bytes, failures FROM rollups "
+            "WHERE granularity = ? AND dimension = ? AND bucket >= ? AND bucket <= ?"
+        )
+        params = [granularity, dimension, start.isoformat(), end.isoformat()]
+        if key is not None:
+            sql += " AND key = ?"
+            params.append(key)
+        sql += " ORDER BY bucket"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = await self.run(lambda conn: conn.execute(sql, params).fetchall())
+        return [
+            {"key": row[0], "bucket": datetime.fromisoformat(row[1]),
+             **dict(zip(ROLLUP_METRICS, row[2:]))}
+            for row in rows
+        ]
+
+    async def _purge_rollups(self):
+        """Entfernt abgelaufene Rollup-Buckets (Gegenstück zum TTL-Index in MongoDB)"""
+        self._last_rollup_purge = time.monotonic()
+        now = datetime.now(timezone.utc).isoformat()
+        await self.run(lambda conn: conn.execute(
+            "DELETE FROM rollups WHERE expires_at IS NOT NULL AND expires_at < ?", (now,)
+        ))
+
+    async def _select(
+        self,
+        where: str,
+        params: List,
+        projection: Optional[Dict] = None,
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """Lädt Dokumente; eingeschlossene Felder werden einzeln aus dem JSON gelesen"""
+        include, exclude, include_id = _projection_fields(projection)
+        selected = ", ".join(f"data -> '$.{field}'" for field in include) if include else "data"
+        sql = f"SELECT id, {selected} FROM documents WHERE {where}"
+        if order_by:
+            sql += f" ORDER BY {order_by}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        rows = await self.run(lambda conn: conn.execute(sql, params).fetchall())
+
+        documents = []
+        for row in rows:
+            if include:
+                doc = self._decode_fields(include, row[1:])
+            else:
+                doc = json.loads(row[1])
+                for field in exclude:
+                    doc.pop(field, None)
+            if include_id:
+                doc["_id"] = row[0]
+            documents.append(doc)
+        return documents
+
+    async def _select_payloads(
+        self,
+        collection: str,
+        where: str,
+        params: List,
+        fields: Tuple[str, ...],
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """Lädt url und die angegebenen Felder aus einer Payload-Tabelle"""
+        for field in fields:
+            _column(field)
+        selected = ", ".join(f"data -> '$.{field}'" for field in fields)
+        sql = f"SELECT url{', ' + selected if selected else ''} FROM {collection} WHERE {where}"
+        if order_by:
+            sql += f" ORDER BY {order_by}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        rows = await self.run(lambda conn: conn.execute(sql, params).fetchall())
+        return [{"url": row[0], **self._decode_fields(list(fields), row[1:])} for row in rows]
+
+    @staticmethod
+    def _decode_fields(fields: List[str], values) -> Dict:
+        """Fehlende Felder (NULL) entfallen wie bei einer MongoDB-Projektion"""
+        return {
+            field: json.loads(value)
+            for field, value in zip(fields, values)
+            if value is not None
+        }
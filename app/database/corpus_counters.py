@@ -0,0 +1,348 @@
+"""
+Materialisierte Korpus-Statistiken für Document Scraper.
+Zähler werden beim Speichern und Löschen fortgeschrieben, so dass
+Statistik-Abfragen unabhängig von der Korpusgröße ein einzelnes
+Dokument lesen.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from pymongo.errors import DuplicateKeyError
+
+from app.config import STATS_RECONCILE_INTERVAL, STATS_HLL_PRECISION
+from app.models.schemas import ScrapingStats
+from app.utils.sketch.hyperloglog import HyperLogLog
+from .document_codec import stored_field
+
+logger = logging.getLogger(__name__)
+
+STATS_ID = "corpus"
+# Versuche, bis ein Abgleich ohne gleichzeitige Zähleränderung durchläuft
+RECONCILE_ATTEMPTS = 3
+
+# Gezählte Dokumentfelder (gespeicherter Name) und ihr Zähler im Statistik-Dokument
+COUNTED_FIELDS = {
+    stored_field("file_type"): "file_types",
+    stored_field("term"): "terms",
+    stored_field("language"): "languages"
+}
+DOMAIN_FIELD = stored_field("domain")
+LANGUAGE_FIELD = stored_field("language")
+
+def _encode_key(value) -> str:
+    """Macht einen Wert als MongoDB-Feldnamen verwendbar"""
+    key = str(value) if value not in (None, "") else "unknown"
+    key = key.replace(".", "．")
+    return "＄" + key[1:] if key.startswith("$") else key
+
+def _decode_key(key: str) -> str:
+    return key.replace("．", ".").replace("＄", "$")
+
+def document_domain(document: Dict, domains: Optional[Dict[int, str]] = None) -> str:
+    """
+    Domain eines gespeicherten Dokuments als Hostname.
+
+    Wörterbuch-Codes werden über domains aufgelöst; ältere Dokumente ohne
+    gespeicherte Domain liefern den Hostnamen aus der URL, so dass beide
+    Formen im Domain-Sketch denselben Schlüssel ergeben.
+    """
+    domain = document.get(DOMAIN_FIELD)
+    if isinstance(domain, int):
+        return (domains or {}).get(domain, str(domain))
+    return domain or urlparse(document.get("url", "")).netloc.lower()
+
+class CorpusCounters:
+    """
+    Inkrementell gepflegte Statistiken in der Collection 'stats'.
+
+    Gesamtzahl, Größe und die Verteilungen nach Dateityp, Suchbegriff und
+    Sprache werden per $inc fortgeschrieben (Suchbegriffe als Wörterbuch-
+    Code, dekodiert vom DatabaseManager); eindeutige Domains schätzt ein
+    HyperLogLog über die Hostnamen, dessen Register per $max aktualisiert
+    werden. Ein periodischer Abgleich berechnet alles aus der documents-
+    Collection neu und korrigiert so Abweichungen (z.B. nach
+    Massenlöschungen). Fehlt das Statistik-Dokument, legt der Abgleich es
+    beim Start im Hintergrund an.
+    """
+
+    def __init__(
+        self,
+        reconcile_interval: float = STATS_RECONCILE_INTERVAL,
+        precision: int = STATS_HLL_PRECISION
+    ):
+        self.reconcile_interval = reconcile_interval
+        self.precision = precision
+        self.db = None
+        self.codec = None
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self._reconcile_lock = asyncio.Lock()
+
+    def attach(self, db):
+        """Setzt die Datenbank nach erfolgreichem Verbindungsaufbau"""
+        self.db = db
+
+    def attach_codec(self, codec):
+        """Setzt den DocumentCodec, über den Domain-Codes aufgelöst werden"""
+        self.codec = codec
+
+    @property
+    def _domains(self) -> Dict[int, str]:
+        return self.codec.values["domain"] if self.codec else {}
+
+    @property
+    def background_task(self) -> Optional[asyncio.Task]:
+        """Task des periodischen Abgleichs (None, wenn nicht gestartet)"""
+        return self._reconcile_task
+
+    def start(self):
+        """Startet den periodischen Abgleich"""
+        if self._reconcile_task is None:
+            self._reconcile_task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop(self):
+        """Stoppt den periodischen Abgleich"""
+        if self._reconcile_task is not None:
+            self._reconcile_task.cancel()
+            await asyncio.gather(self._reconcile_task, return_exceptions=True)
+            self._reconcile_task = None
+
+    async def record_ingest(self, documents: List[Dict]):
+        """Zählt neu gespeicherte Dokumente (in gespeicherter Form)"""
+        await self._apply(documents, 1)
+
+    async def record_delete(self, documents: List[Dict]):
+        """Zieht gelöschte Dokumente (in gespeicherter Form) ab (das Domain-Sketch korrigiert erst der Abgleich)"""
+        await self._apply(documents, -1)
+
+    async def record_language_changes(self, changes: Iterable[Tuple[Optional[str], str]]):
+        """
+        Verschiebt Dokumente zwischen Sprachen.
+
+        Args:
+            changes: Paare aus (bisherige Sprache oder None, neue Sprache)
+        """
+        increments = Counter()
+        for old, new in changes:
+            if old == new:
+                continue
+            if old:
+                increments[f"languages.{_encode_key(old)}"] -= 1
+            increments[f"languages.{_encode_key(new)}"] += 1
+
+        await self._update({"$inc": {**increments, "seq": 1}} if increments else None)
+
+    async def get_statistics(self) -> ScrapingStats:
+        """
+        Liest die materialisierten Statistiken.
+
+        Returns:
+            ScrapingStats: Statistiken (bis zum ersten Abgleich nur die
+            geschätzte Gesamtzahl)
+        """
+        stats = await self.db.stats.find_one({"_id": STATS_ID})
+        if stats is None:
+            # Kein Abgleich im Request: der Hintergrund-Abgleich legt die Zähler an
+            self.start()
+            stats = {"total_documents": await self.db.documents.estimated_document_count()}
+
+        sketch = HyperLogLog.from_dict(stats.get("domains_hll"), self.precision)
+        return ScrapingStats(
+            total_documents=stats.get("total_documents", 0),
+            documents_per_type=self._decode_counts(stats.get("file_types")),
+            documents_per_term=self._decode_counts(stats.get("terms")),
+            total_size=stats.get("total_size", 0),
+            unique_domains=sketch.count(),
+            language_distribution=self._decode_counts(stats.get("languages"))
+        )
+
+    async def reconcile(self):
+        """
+        Berechnet alle Zähler aus der documents-Collection neu.
+
+        Jedes Update der Zähler erhöht die Sequenznummer seq. Ändert sie sich
+        während der Aggregationen, wird der Abgleich wiederholt; die Korrektur
+        wird nur geschrieben, solange seq unverändert ist. Zählungen, die
+        während des Abgleichs hinzukommen, werden so weder doppelt noch gar
+        nicht erfasst. Offen bleibt das kurze Fenster zwischen dem Schreiben
+        eines Dokuments und dem Fortschreiben seiner Zähler; solche
+        Abweichungen behebt der nächste Abgleich.
+        """
+        async with self._reconcile_lock:
+            for attempt in range(RECONCILE_ATTEMPTS):
+                if await self._reconcile_once():
+                    return
+            logger.warning(
+                f"Korpus-Statistiken nicht abgeglichen: Zähler änderten sich in "
+                f"{RECONCILE_ATTEMPTS} Versuchen während der Aggregation"
+            )
+
+    async def _reconcile_once(self) -> bool:
+        """Ein Abgleichversuch; False, wenn sich die Zähler währenddessen geändert haben"""
+        started = datetime.now()
+        before = await self.db.stats.find_one({"_id": STATS_ID}, {"seq": 1})
+
+        facets = {
+            field: [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+            for field in COUNTED_FIELDS
+        }
+        facets["overall"] = [{"$group": {
+            "_id": None,
+            "total_documents": {"$sum": 1},
+            "total_size": {"$sum": "$size"}
+        }}]
+        pipeline = [{"$facet": facets}]
+        result = (await self.db.documents.aggregate(pipeline).to_list(length=1))[0]
+        overall = result["overall"][0] if result["overall"] else {}
+
+        sketch = await self._build_domain_sketch()
+
+        counts = {
+            "total_documents": overall.get("total_documents", 0),
+            "total_size": overall.get("total_size", 0)
+        }
+        for field, counter in COUNTED_FIELDS.items():
+            for group in result[field]:
+                # Dokumente ohne Sprache sind noch nicht angereichert
+                if group["_id"] is not None or field != LANGUAGE_FIELD:
+                    counts[f"{counter}.{_encode_key(group['_id'])}"] = group["count"]
+
+        stats = await self.db.stats.find_one({"_id": STATS_ID})
+        if (before is None) != (stats is None) or (before or {}).get("seq") != (stats or {}).get("seq"):
+            return False
+
+        current = self._flatten(stats or {})
+        increments = {
+            key: counts.get(key, 0) - current.get(key, 0)
+            for key in counts.keys() | current.keys()
+            if counts.get(key, 0) != current.get(key, 0)
+        }
+        update = {"$set": {
+            "domains_hll": sketch.to_dict(),
+            "reconciled_at": started,
+            "updated_at": datetime.now()
+        }}
+        if increments:
+            update["$inc"] = increments
+
+        seq = (stats or {}).get("seq")
+        try:
+            if stats is None:
+                seq = 0
+                await self.db.stats.insert_one({"_id": STATS_ID, "seq": seq})
+            # Nur schreiben, wenn seit dem Lesen kein Update dazwischenkam
+            written = await self.db.stats.update_one(
+                {"_id": STATS_ID, "seq": seq if seq is not None else {"$exists": False}},
+                update
+            )
+        except DuplicateKeyError:
+            return False
+        if not written.matched_count:
+            return False
+
+        logger.info(
+            f"Korpus-Statistiken abgeglichen: {counts['total_documents']} Dokumente, "
+            f"{len(increments)} Zähler korrigiert "
+            f"({(datetime.now() - started).total_seconds():.1f}s)"
+        )
+        return True
+
+    @staticmethod
+    def _flatten(stats: Dict) -> Dict[str, int]:
+        """Bildet die Zähler des Statistik-Dokuments auf $inc-Pfade ab"""
+        flat = {
+            "total_documents": stats.get("total_documents", 0),
+            "total_size": stats.get("total_size", 0)
+        }
+        for counter in COUNTED_FIELDS.values():
+            for key, count in (stats.get(counter) or {}).items():
+                flat[f"{counter}.{key}"] = count
+        return flat
+
+    async def _build_domain_sketch(self) -> HyperLogLog:
+        """Füllt das Domain-Sketch über eine serverseitige Gruppierung"""
+        sketch = HyperLogLog(self.precision)
+        groups = await self.db.documents.aggregate(
+            [{"$group": {"_id": f"${DOMAIN_FIELD}"}}],
+            allowDiskUse=True
+        ).to_list(length=None)
+
+        # Codes aus anderen Prozessen sind evtl. noch nicht geladen
+        if self.codec and any(
+            isinstance(group["_id"], int) and group["_id"] not in self._domains
+            for group in groups
+        ):
+            await self.codec.load()
+
+        for group in groups:
+            if group["_id"]:
+                sketch.add(document_domain({DOMAIN_FIELD: group["_id"]}, self._domains))
+            else:
+                # Ältere Dokumente ohne gespeicherte Domain
+                async for doc in self.db.documents.find({DOMAIN_FIELD: None}, {"url": 1}):
+                    sketch.add(document_domain(doc))
+        return sketch
+
+    async def _apply(self, documents: List[Dict], sign: int):
+        """Schreibt die Zähler für mehrere Dokumente in einem Update fort"""
+        if not documents:
+            return
+
+        increments = Counter({
+            "total_documents": sign * len(documents),
+            "total_size": sign * sum(doc.get("size") or 0 for doc in documents)
+        })
+        maxima: Dict[str, int] = {}
+        sketch = HyperLogLog(self.precision)
+
+        for doc in documents:
+            for field, counter in COUNTED_FIELDS.items():
+                if field in doc and (doc[field] or field != LANGUAGE_FIELD):
+                    increments[f"{counter}.{_encode_key(doc[field])}"] += sign
+            if sign > 0:
+                index, rank = sketch.register_for(document_domain(doc, self._domains))
+                key = f"domains_hll.{index}"
+                maxima[key] = max(maxima.get(key, 0), rank)
+
+        update = {"$inc": {**increments, "seq": 1}, "$set": {"updated_at": datetime.now()}}
+        if maxima:
+            update["$max"] = maxima
+        await self._update(update)
+
+    async def _update(self, update: Optional[Dict]):
+        """Führt ein Update des Statistik-Dokuments aus (Fehler korrigiert der Abgleich)"""
+        if not update or self.db is None:
+            return
+        try:
+            await self.db.stats.update_one({"_id": STATS_ID}, update, upsert=True)
+        except Exception as e:
+            logger.error(f"Fehler beim Aktualisieren der Korpus-Statistiken: {str(e)}")
+
+    async def _reconcile_loop(self):
+        """Legt fehlende Zähler sofort an und gleicht sie danach in festen Abständen ab"""
+        seeding = True
+        while True:
+            if not seeding:
+                await asyncio.sleep(self.reconcile_interval)
+            if self.db is None:
+                seeding = False
+                continue
+            try:
+                if not seeding or await self.db.stats.find_one({"_id": STATS_ID}, {"_id": 1}) is None:
+                    await self.reconcile()
+            except Exception as e:
+                logger.error(f"Fehler beim Abgleich der Korpus-Statistiken: {str(e)}")
+            seeding = False
+
+    @staticmethod
+    def _decode_counts(counts: Optional[Dict]) -> Dict[str, int]:
+        """Dekodiert Zählerfelder und entfernt auf 0 gefallene Einträge"""
+        return {
+            _decode_key(key): count
+            for key, count in (counts or {}).items()
+            if count > 0
+        }
@@ -0,0 +1,274 @@
+"""
+Kompakte Speicherform für Document Scraper.
+Übersetzt Dokumente, Filter und Projektionen zwischen den Feldnamen der
+Anwendung und der gespeicherten Form: kurze Feldnamen, Codes aus
+Wörterbuch-Tabellen und native Datumswerte.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config import STORED_FIELD_NAMES, DICTIONARY_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Gespeicherter Name -> Feld
+FIELD_NAMES = {stored: field for field, stored in STORED_FIELD_NAMES.items()}
+UNKNOWN_CODE = -1  # Code für unbekannte Werte in Filtern; trifft kein Dokument
+DICTIONARY_RETRIES = 3
+LOGICAL_OPERATORS = ("$or", "$and", "$nor")
+# Felder, die als Datumswert gespeichert werden (ältere Datensätze: ISO-String)
+DATETIME_FIELDS = ("timestamp", "enriched_at")
+
+# Wörterbuch-Eintrag: (Feld, Code, Wert)
+DictionaryEntry = Tuple[str, int, str]
+
+def _matches_missing(op: str, value) -> bool:
+    """Ob ein Filter-Operator auch Dokumente ohne das Feld trifft"""
+    if op == "$exists":
+        return not value
+    values = value if op in ("$in", "$nin") else [value]
+    if op in ("$eq", "$in"):
+        return None in values
+    if op in ("$ne", "$nin"):
+        return None not in values
+    return False
+
+def stored_field(field: str) -> str:
+    """Gespeicherter Name eines (ggf. verschachtelten) Feldes"""
+    head, dot, rest = field.partition(".")
+    return STORED_FIELD_NAMES.get(head, head) + dot + rest
+
+class DocumentCodec:
+    """
+    Übersetzungsschicht zwischen DatabaseManager und Speicher-Backend.
+
+    Felder werden unter kurzen Namen gespeichert (STORED_FIELD_NAMES),
+    Suchbegriffe, Domains und Content-Types als Ganzzahl-Codes
+    (DICTIONARY_FIELDS) und Zeitstempel als Datumswerte statt ISO-Strings.
+    Die Wörterbücher liegen im Backend (Collection bzw. Tabelle
+    'dictionaries') und vollständig im Speicher; neue Werte erhalten vor dem
+    Schreiben über prepare einen Code.
+
+    Beim Lesen werden auch noch nicht migrierte Dokumente (lange Feldnamen,
+    Klartextwerte) unverändert durchgereicht. Solange legacy gesetzt ist
+    (Umstellung des Bestands nicht abgeschlossen), treffen Filter beide
+    Formen.
+    """
+
+    def __init__(self):
+        self.store = None
+        self.codes: Dict[str, Dict[str, int]] = {field: {} for field in DICTIONARY_FIELDS}
+        self.values: Dict[str, Dict[int, str]] = {field: {} for field in DICTIONARY_FIELDS}
+        # Bis die Umstellung bestätigt ist, kann der Bestand noch die alte Form enthalten
+        self.legacy = True
+        self._lock = asyncio.Lock()
+
+    def attach(self, store):
+        """Setzt das Speicher-Backend nach erfolgreichem Verbindungsaufbau"""
+        self.store = store
+
+    async def load(self):
+        """Lädt die Wörterbücher aus dem Speicher-Backend"""
+        for field, code, value in await self.store.load_dictionaries():
+            if field in self.codes:
+                self.codes[field][value] = code
+                self.values[field][code] = value
+
+    async def prepare(self, records: Iterable[Dict]):
+        """
+        Vergibt Codes für noch unbekannte Werte der Wörterbuch-Felder.
+
+        Vergibt ein anderer Prozess parallel dieselben Codes, schlägt das
+        Speichern am eindeutigen Index fehl; dann werden die Wörterbücher
+        neu geladen und die Vergabe wiederholt.
+
+        Raises:
+            RuntimeError: Wenn nach mehreren Versuchen keine Codes vergeben wurden
+        """
+        records = list(records)
+        if not self._new_entries(records):
+            return
+
+        async with self._lock:
+            for _ in range(DICTIONARY_RETRIES):
+                entries = self._new_entries(records)
+                if not entries:
+                    return
+                if await self.store.add_dictionary_entries(entries):
+                    for field, code, value in entries:
+                        self.codes[field][value] = code
+                        self.values[field][code] = value
+                    return
+                await self.load()
+
+        raise RuntimeError("Wörterbuch-Codes konnten nicht vergeben werden")
+
+    def _new_entries(self, records: List[Dict]) -> List[DictionaryEntry]:
+        entries = []
+        for field in DICTIONARY_FIELDS:
+            known = self.codes[field]
+            next_code = max(self.values[field], default=0) + 1
+            new_values = {}
+            for record in records:
+                value = record.get(field)
+                if isinstance(value, str) and value not in known and value not in new_values:
+                    new_values[value] = next_code
+                    next_code += 1
+            entries += [(field, code, value) for value, code in new_values.items()]
+        return entries
+
+    def encode(self, record: Dict) -> Dict:
+        """Wandelt einen Datensatz (oder zu setzende Felder) in die gespeicherte Form um"""
+        encoded = {}
+        for field, value in record.items():
+            if field in self.codes and isinstance(value, str):
+                value = self.codes[field][value]
+            elif field in DATETIME_FIELDS and isinstance(value, str):
+                try:
+                    value = datetime.fromisoformat(value)
+                except ValueError:
+                    pass
+            encoded[stored_field(field)] = value
+        return encoded
+
+    def decode(self, document: Dict) -> Dict:
+        """Wandelt ein gespeichertes Dokument in die Form der Anwendung um"""
+        decoded = {}
+        for name, value in document.items():
+            field = FIELD_NAMES.get(name, name)
+            if field in self.values and isinstance(value, int):
+                value = self.values[field].get(value, value)
+            decoded[field] = value
+        return decoded
+
+    async def decode_documents(self, documents: List[Dict]) -> List[Dict]:
+        """Dekodiert Dokumente; unbekannte Codes (aus anderen Prozessen) laden die Wörterbücher neu"""
+        if any(self._has_unknown_code(document) for document in documents):
+            await self.load()
+        return [self.decode(document) for document in documents]
+
+    def _has_unknown_code(self, document: Dict) -> bool:
+        return any(
+            isinstance(document.get(stored_field(field)), int)
+            and document[stored_field(field)] not in self.values[field]
+            for field in DICTIONARY_FIELDS
+        )
+
+    async def decode_counts(self, field: str, counts: Dict[str, int]) -> Dict[str, int]:
+        """Ersetzt die Codes in den Schlüsseln einer Zählerverteilung durch ihre Werte"""
+        codes = {int(key) for key in counts if key.isdigit()}
+        if not codes <= self.values[field].keys():
+            await self.load()
+
+        decoded: Dict[str, int] = {}
+        for key, count in counts.items():
+            value = self.values[field].get(int(key), key) if key.isdigit() else key
+            decoded[value] = decoded.get(value, 0) + count
+        return decoded
+
+    def encode_value(self, field: str, value):
+        """Filterwert in gespeicherter Form (unbekannte Wörterbuch-Werte treffen nichts)"""
+        if field in self.codes and isinstance(value, str):
+            return self.codes[field].get(value, UNKNOWN_CODE)
+        return value
+
+    def encode_query(self, query: Optional[Dict]) -> Optional[Dict]:
+        """
+        Übersetzt einen MongoDB-Filter in die gespeicherte Form.
+
+        Im legacy-Modus wird jede Bedingung auf einem Feld mit abweichender
+        Speicherform für beide Formen gestellt (siehe _dual_conditions).
+
+        Raises:
+            ValueError: Bei Bereichs-Operatoren auf Wörterbuch-Feldern
+        """
+        if not query:
+            return query
+
+        encoded, dual = {}, []
+        for field, condition in query.items():
+            if field in LOGICAL_OPERATORS:
+                encoded[field] = [self.encode_query(sub_query) for sub_query in condition]
+            elif self.legacy and self.has_legacy_form(field):
+                dual += self._dual_conditions(field, condition)
+            else:
+                encoded[stored_field(field)] = self._encode_condition(field, condition)
+        if dual:
+            encoded["$and"] = encoded.get("$and", []) + dual
+        return encoded
+
+    def has_legacy_form(self, field: str) -> bool:
+        """Ob das Feld in der alten Form anders gespeichert war"""
+        return stored_field(field) != field or field in self.codes or field in DATETIME_FIELDS
+
+    def _dual_conditions(self, field: str, condition) -> List[Dict]:
+        """
+        Bedingungen, die ein Feld in neuer und alter Form prüfen.
+
+        Jedes Dokument liegt in einer der beiden Formen vor, das Feld der
+        anderen fehlt ihm. Operatoren, die fehlende Felder nicht treffen,
+        werden deshalb ODER-verknüpft, die übrigen ($ne, $nin, null,
+        $exists: False) UND-verknüpft.
+        """
+        if not (isinstance(condition, dict) and all(op.startswith("$") for op in condition)):
+            condition = {"$eq": condition}
+
+        conditions = []
+        for op, value in condition.items():
+            new = {stored_field(field): self._encode_condition(field, {op: value})}
+            old = {field: {op: self._legacy_value(field, value)}}
+            if _matches_missing(op, value):
+                conditions += [new, old]
+            else:
+                conditions.append({"$or": [new, old]})
+        return conditions
+
+    @staticmethod
+    def _legacy_value(field: str, value):
+        """Filterwert in der alten Form (Zeitstempel als ISO-String)"""
+        if field in DATETIME_FIELDS:
+            if isinstance(value, datetime):
+                return value.isoformat()
+            if isinstance(value, list):
+                return [item.isoformat() if isinstance(item, datetime) else item for item in value]
+        return value
+
+    def _encode_condition(self, field: str, condition):
+        if field not in self.codes:
+            return condition
+        if not (isinstance(condition, dict) and all(op.startswith("$") for op in condition)):
+            return self.encode_value(field, condition)
+
+        encoded = {}
+        for op, value in condition.items():
+            if op in ("$in", "$nin"):
+                encoded[op] = [self.encode_value(field, item) for item in value]
+            elif op in ("$eq", "$ne"):
+                encoded[op] = self.encode_value(field, value)
+            elif op == "$exists":
+                encoded[op] = value
+            else:
+                raise ValueError(f"Operator {op} wird für das Wörterbuch-Feld {field} nicht unterstützt")
+        return encoded
+
+    def encode_projection(self, projection: Optional[Dict]) -> Optional[Dict]:
+        """Übersetzt die Feldnamen einer Projektion (im legacy-Modus beide Namen)"""
+        if projection is None:
+            return None
+        return {
+            name: value
+            for field, value in projection.items()
+            for name in self.stored_fields((field,))
+        }
+
+    def stored_fields(self, fields: Iterable[str]) -> Tuple[str, ...]:
+        """Gespeicherte Namen von Feldern; im legacy-Modus zusätzlich die alten Namen"""
+        names = []
+        for field in fields:
+            names.append(stored_field(field))
+            if self.legacy and stored_field(field) != field:
+                names.append(field)
+        return tuple(names)
@@ -0,0 +1,262 @@
+"""
+Fallback-Speicher für Document Scraper.
+Hält Dokumente vor, solange MongoDB nicht erreichbar ist, und spielt sie
+nach dem Reconnect gebündelt ein.
+"""
+
+import json
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from app.config import FALLBACK_JOURNAL_FILE, FALLBACK_MEMORY_LIMIT
+
+logger = logging.getLogger(__name__)
+
+class FallbackStore:
+    """
+    Indizierter, speicherbegrenzter Dokumentspeicher mit Journal.
+
+    Jedes Dokument (und jede Änderung) wird als JSON-Zeile an ein
+    Append-Only-Journal angehängt; der Index bildet jede URL auf die
+    Position ihrer aktuellsten Zeile ab. Im Speicher bleiben nur die
+    zuletzt genutzten Dokumente, ältere werden bei Bedarf aus dem Journal
+    gelesen. Lookups über url, canonical_url und hash sind dadurch O(1),
+    und ein Journal aus einem abgebrochenen Lauf wird beim Start
+    wieder eingelesen.
+
+    Überholte Zeilen (frühere Fassungen geänderter Dokumente) werden
+    mitgezählt. Überwiegen sie, wird das Journal kompaktiert, d.h. mit nur
+    der aktuellen Fassung je URL neu geschrieben.
+    """
+
+    def __init__(
+        self,
+        journal_file: Path = FALLBACK_JOURNAL_FILE,
+        memory_limit: int = FALLBACK_MEMORY_LIMIT
+    ):
+        self.journal_file = Path(journal_file)
+        self.memory_limit = memory_limit
+        self.offsets: Dict[str, int] = {}
+        self.by_hash: Dict[str, str] = {}
+        self.by_canonical_url: Dict[str, str] = {}
+        self.memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self.stale_lines = 0
+        self._journal = None
+        self._load_journal()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Iteriert alle Dokumente (Momentaufnahme der URLs)"""
+        for url in list(self.offsets):
+            document = self.get_by_url(url)
+            if document is not None:
+                yield document
+
+    def add(self, record: Dict) -> bool:
+        """
+        Legt ein neues Dokument ab.
+
+        Args:
+            record: Speicherbarer Datensatz mit 'url'
+
+        Returns:
+            bool: False, wenn die URL bereits vorhanden ist
+        """
+        if record["url"] in self.offsets:
+            return False
+        self._write(record)
+        return True
+
+    def update(self, url: str, fields: Dict) -> bool:
+        """Setzt einzelne Felder eines vorhandenen Dokuments"""
+        document = self.get_by_url(url)
+        if document is None:
+            return False
+        self._write({**document, **fields})
+        return True
+
+    def get(self, field: str, value: str) -> Optional[Dict]:
+        """Sucht ein Dokument über url, canonical_url oder hash"""
+        if field == "url":
+            return self.get_by_url(value)
+        index = self.by_hash if field == "hash" else self.by_canonical_url
+        url = index.get(value)
+        return self.get_by_url(url) if url else None
+
+    def get_by_url(self, url: str) -> Optional[Dict]:
+        """Liest ein Dokument aus dem Speicher oder dem Journal"""
+        if url in self.memory:
+            self.memory.move_to_end(url)
+            return self.memory[url]
+
+        offset = self.offsets.get(url)
+        if offset is None:
+            return None
+
+        self._flush_journal()
+        with open(self.journal_file, "rb") as journal:
+            journal.seek(offset)
+            document = json.loads(journal.readline())
+        self._cache(document)
+        return document
+
+    def find_known(
+        self,
+        urls: Iterable[str],
+        hashes: Iterable[str],
+        canonical_urls: Iterable[str]
+    ) -> List[Dict]:
+        """Sucht bekannte Dokumente zu mehreren Schlüsseln"""
+        known_urls = {url for url in urls if url in self.offsets}
+        known_urls.update(self.by_hash[h] for h in hashes if h in self.by_hash)
+        known_urls.update(
+            self.by_canonical_url[c] for c in canonical_urls if c in self.by_canonical_url
+        )
+        return [self.get_by_url(url) for url in known_urls]
+
+    def iter_batches(self, batch_size: int) -> Iterator[List[Dict]]:
+        """
+        Liest die aktuelle Fassung aller Dokumente in Journal-Reihenfolge.
+
+        Args:
+            batch_size: Dokumente je Batch
+
+        Yields:
+            List[Dict]: Dokumente für einen Bulk-Write
+        """
+        self._flush_journal()
+        batch = []
+        with open(self.journal_file, "rb") as journal:
+            for offset in sorted(self.offsets.values()):
+                journal.seek(offset)
+                batch.append(json.loads(journal.readline()))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def clear(self):
+        """Verwirft alle Dokumente und das Journal (nach erfolgreichem Replay)"""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        self.journal_file.unlink(missing_ok=True)
+        self.offsets.clear()
+        self.by_hash.clear()
+        self.by_canonical_url.clear()
+        self.memory.clear()
+        self.stale_lines = 0
+
+    def compact(self, drop: Iterable[str] = ()):
+        """
+        Schreibt das Journal mit der aktuellen Fassung je URL neu.
+
+        Die neue Datei ersetzt das Journal erst, wenn sie vollständig
+        geschrieben ist; ein Absturz lässt das alte Journal unverändert.
+
+        Args:
+            drop: URLs, die nicht übernommen werden (z.B. bereits replizierte)
+        """
+        drop = set(drop)
+        if drop.issuperset(self.offsets):
+            self.clear()
+            return
+
+        self._flush_journal()
+        temp_file = self.journal_file.with_name(self.journal_file.name + ".tmp")
+        with open(self.journal_file, "rb") as journal, open(temp_file, "wb") as target:
+            for url, offset in sorted(self.offsets.items(), key=lambda item: item[1]):
+                if url not in drop:
+                    journal.seek(offset)
+                    target.write(journal.readline())
+            target.flush()
+            os.fsync(target.fileno())
+
+        self.close()
+        os.replace(temp_file, self.journal_file)
+        self.offsets.clear()
+        self.by_hash.clear()
+        self.by_canonical_url.clear()
+        for url in drop:
+            self.memory.pop(url, None)
+        self.stale_lines = 0
+        self._load_journal()
+
+    def close(self):
+        """Schließt das Journal; der Inhalt bleibt für den nächsten Start erhalten"""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _write(self, document: Dict):
+        """Hängt ein Dokument an das Journal an und aktualisiert die Indizes"""
+        if self._journal is None:
+            self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+            self._journal = open(self.journal_file, "ab")
+
+        line = json.dumps(document, default=str, ensure_ascii=False).encode("utf-8") + b"\n"
+        offset = self._journal.tell()
+        self._journal.write(line)
+        self._journal.flush()
+
+        self._index(document, offset)
+        self._cache(document)
+
+        if self.stale_lines > max(len(self.offsets), self.memory_limit):
+            self.compact()
+
+    def _index(self, document: Dict, offset: int):
+        url = document["url"]
+        if url in self.offsets:
+            self.stale_lines += 1
+        self.offsets[url] = offset
+        if document.get("hash"):
+            self.by_hash.setdefault(document["hash"], url)
+        if document.get("canonical_url"):
+            self.by_canonical_url.setdefault(document["canonical_url"], url)
+
+    def _cache(self, document: Dict):
+        """Hält ein Dokument im Speicher und verdrängt das älteste"""
+        self.memory[document["url"]] = document
+        self.memory.move_to_end(document["url"])
+        while len(self.memory) > self.memory_limit:
+            self.memory.popitem(last=False)
+
+    def _flush_journal(self):
+        if self._journal is not None:
+            self._journal.flush()
+
+    def _load_journal(self):
+        """Baut die Indizes aus einem vorhandenen Journal neu auf"""
+        if not self.journal_file.exists():
+            return
+
+        try:
+            with open(self.journal_file, "rb") as journal:
+                offset = 0
+                for line in journal:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        self._index(json.loads(line), offset)
+                    except ValueError:
+                        logger.warning(f"Defekte Journal-Zeile bei Offset {offset} übersprungen")
+                    offset += len(line)
+
+            # Unvollständige letzte Zeile nach einem Absturz abschneiden
+            if offset < self.journal_file.stat().st_size:
+                with open(self.journal_file, "r+b") as journal:
+                    journal.truncate(offset)
+
+            if self.offsets:
+                logger.info(
+                    f"{len(self.offsets)} nicht replizierte Dokumente im Journal gefunden"
+                )
+        except Exception as e:
+            logger.error(f"Fehler beim Laden des Fallback-Journals: {str(e)}")
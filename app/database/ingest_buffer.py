@@ -0,0 +1,140 @@
+"""
+Ingest-Puffer für Document Scraper.
+Sammelt verarbeitete Dokumente und schreibt sie gebündelt in die Datenbank.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.config import INGEST_BATCH_SIZE, INGEST_FLUSH_INTERVAL
+from .manager import db_manager
+
+logger = logging.getLogger(__name__)
+
+class IngestBuffer:
+    """
+    Puffert Dokumente und flusht sie per Bulk-Upsert.
+
+    Geflusht wird, sobald die Batch-Größe erreicht ist oder das älteste
+    gepufferte Dokument länger als das Flush-Intervall wartet. Aufrufer
+    warten nicht auf den Flush: Was nach dem Speichern passieren soll,
+    übergeben sie als Callback, den der Flush für neu gespeicherte
+    Dokumente ausführt.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = INGEST_BATCH_SIZE,
+        flush_interval: float = INGEST_FLUSH_INTERVAL
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: List[Tuple[Dict, Optional[Callable[[], None]]]] = []
+        self._oldest_pending: Optional[float] = None
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.total_flushes = 0
+        self.total_documents = 0
+        self.total_failed = 0
+
+    async def add(self, document: Dict, on_stored: Optional[Callable[[], None]] = None):
+        """
+        Reiht ein Dokument in den nächsten Bulk-Write ein und kehrt sofort zurück.
+
+        Nur der Aufrufer, der die Batch-Größe erreicht, wartet auf den Flush
+        (Gegendruck, falls die Datenbank langsamer schreibt als gescrapt wird).
+
+        Args:
+            document: Zu speichernder Datensatz
+            on_stored: Wird nach dem Flush aufgerufen, wenn das Dokument neu
+                gespeichert wurde
+        """
+        if self._flush_task is None:
+            self.start()
+
+        if not self._pending:
+            self._oldest_pending = time.monotonic()
+        self._pending.append((document, on_stored))
+
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> List[bool]:
+        """
+        Schreibt alle gepufferten Dokumente in die Datenbank.
+
+        Schlägt der Bulk-Write fehl, bleibt der Batch gepuffert und wird
+        beim nächsten Flush erneut geschrieben.
+
+        Returns:
+            List[bool]: Speicherergebnis je geflushtem Dokument
+        """
+        async with self._flush_lock:
+            batch, self._pending = self._pending, []
+            self._oldest_pending = None
+            if not batch:
+                return []
+
+            try:
+                results = await db_manager.store_documents([doc for doc, _ in batch])
+            except Exception as e:
+                logger.error(f"Fehler beim Flush des Ingest-Puffers: {str(e)}")
+                self._pending = batch + self._pending
+                self._oldest_pending = time.monotonic()
+                return [False] * len(batch)
+
+            for (document, on_stored), stored in zip(batch, results):
+                if not stored:
+                    self.total_failed += 1
+                    logger.info(f"Dokument nicht neu gespeichert: {document.get('url')}")
+                elif on_stored:
+                    try:
+                        on_stored()
+                    except Exception as e:
+                        logger.error(f"Fehler nach dem Speichern von {document.get('url')}: {str(e)}")
+
+            self.total_flushes += 1
+            self.total_documents += len(batch)
+            return results
+
+    @property
+    def background_task(self) -> Optional[asyncio.Task]:
+        """Task für den periodischen Flush (None, wenn nicht gestartet)"""
+        return self._flush_task
+
+    def start(self):
+        """Startet den zeitgesteuerten Flush im Hintergrund"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+            logger.info("Ingest-Puffer gestartet")
+
+    async def stop(self):
+        """Stoppt den Hintergrund-Flush und schreibt verbleibende Dokumente"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+        if self._pending:
+            logger.error(f"Ingest-Puffer gestoppt, {len(self._pending)} Dokumente nicht gespeichert")
+        else:
+            logger.info("Ingest-Puffer gestoppt")
+
+    async def _flush_loop(self):
+        """Flusht Dokumente, die länger als das Flush-Intervall warten"""
+        while True:
+            await asyncio.sleep(self.flush_interval / 2)
+            try:
+                if (self._oldest_pending is not None and
+                        time.monotonic() - self._oldest_pending >= self.flush_interval):
+                    await self.flush()
+            except Exception as e:
+                logger.error(f"Fehler im Flush-Loop des Ingest-Puffers: {str(e)}")
+
+# Globale Instanz
+ingest_buffer = IngestBuffer()
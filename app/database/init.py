@@ -4,5 +4,11 @@ Handhabt alle Datenbankoperationen und -verbindungen.
 """
 
 from .manager import DatabaseManager, db_manager
+from .ingest_buffer import IngestBuffer, ingest_buffer
+from .fallback_store import FallbackStore
+from .corpus_counters import CorpusCounters
+from .rollups import IngestRollups
+from .backends import StorageBackend, create_backend
 
-__all__ = ['DatabaseManager', 'db_manager'] 
\ No newline at end of file
+__all__ = ['DatabaseManager', 'db_manager', 'IngestBuffer', 'ingest_buffer', 'FallbackStore',
+    'CorpusCounters', 'IngestRollups', 'StorageBackend', 'create_backend'] 
\ No newline at end of file
@@ -1,61 +1,200 @@
 # app/database.py
+import asyncio
+import base64
+import json
 import logging
-from typing import Optional, Dict, List
+import time
+from typing import Optional, Dict, List, Tuple, AsyncIterator
 from datetime import datetime
-from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import ASCENDING, TEXT
-# app/database.py
-from pymongo.errors import DuplicateKeyError
-from pymongo.errors import ServerSelectionTimeoutError as ConnectionError  # Geändert
 
 
-from app.config import MONGODB_URI, DB_NAME
+from app.config import (
+    STORAGE_BACKEND, CACHE_ENABLED, FALLBACK_REPLAY_BATCH_SIZE,
+    SEARCH_COUNT_CAP, SEARCH_RESULT_FIELDS, PAYLOAD_COLLECTIONS,
+    LOOKUP_CACHE_SIZE, LOOKUP_CACHE_TTL, LOOKUP_CACHE_NEGATIVE_TTL
+)
+from app.utils.cache.ttl_cache import TTLCache, MISSING
+from app.utils.search.bm25_index import bm25_index
+from app.utils.search.passage_index import passage_index
+from app.utils.url.url_canonicalizer import url_canonicalizer
 from app.models.schemas import DocumentMetadata, ScrapingStats
+from .backends import StorageBackend, create_backend
+from .document_codec import DocumentCodec, stored_field
+from .fallback_store import FallbackStore
+from .rollups import IngestRollups
 
 logger = logging.getLogger(__name__)
 
+# Ausgelagerte Felder und ihre Collection
+PAYLOAD_FIELDS = {
+    field: collection
+    for collection, fields in PAYLOAD_COLLECTIONS.items()
+    for field in fields
+}
+# Standard-Projektion für Dokumentabfragen (auch für noch nicht migrierte Dokumente)
+METADATA_PROJECTION = {field: 0 for field in PAYLOAD_FIELDS}
+RECENT_DOCUMENT_FIELDS = {"title": 1, "file_type": 1, "size": 1, "timestamp": 1, "term": 1, "success": 1}
+PAYLOAD_MIGRATION_JOB = "payload_migration"
+ENCODING_MIGRATION_JOB = "document_encoding"
+
 class DatabaseManager:
-    """Verwaltet alle Datenbankoperationen"""
+    """
+    Verwaltet alle Datenbankoperationen.
+    
+    Gelesen und geschrieben wird über ein austauschbares Speicher-Backend
+    (MongoDB oder SQLite); Cache, Fallback-Speicher, Statistiken und die
+    Suchindizes werden hier unabhängig vom Backend gepflegt.
+    
+    Schwere Felder (Volltext, Fingerprints) liegen getrennt von den
+    Metadaten in eigenen Collections (PAYLOAD_COLLECTIONS). Sie werden beim
+    Schreiben automatisch ausgelagert und nur über get_payloads bzw.
+    iter_payloads geladen; Dokumentabfragen verwenden immer eine Projektion.
     
-    def __init__(self):
-        self.client: Optional[AsyncIOMotorClient] = None
-        self.db = None
+    Gespeichert werden die Metadaten in kompakter Form (DocumentCodec):
+    Datensätze, Filter und Projektionen werden hier übersetzt, Ergebnisse
+    dekodiert, so dass alle übrigen Module mit den gewohnten Feldnamen und
+    Werten arbeiten.
+    """
+    
+    def __init__(self, backend: Optional[StorageBackend] = None):
+        self.backend = backend or create_backend(STORAGE_BACKEND)
         self.connected = False
-        self.in_memory_storage = []  # Fallback für fehlende DB-Verbindung
+        self.fallback_store = FallbackStore()  # Fallback für fehlende DB-Verbindung
+        self.counters = self.backend.counters  # Materialisierte Statistiken
+        self.rollups = IngestRollups()  # Zeitreihen für Trendabfragen
+        self.codec = DocumentCodec()  # Kompakte Speicherform der Dokumente
+        self.counters.attach_codec(self.codec)
+        # Read-Through-Cache für Lookups nach url, canonical_url und hash
+        self.lookup_cache = TTLCache(
+            LOOKUP_CACHE_SIZE,
+            LOOKUP_CACHE_TTL,
+            negative_ttl=LOOKUP_CACHE_NEGATIVE_TTL
+        )
+        # Wird bei jedem Schreibzugriff erhöht; zwischengespeicherte API-Antworten verfallen damit
+        self.generation = 0
+        self._encoding_lock = asyncio.Lock()  # Höchstens eine Umstellung der Speicherform je Prozess
+        self._initialized = False  # Indizes und Hintergrund-Migrationen einmal je Prozess
         
     async def connect(self) -> bool:
         """Stellt Verbindung zur Datenbank her"""
-        try:
-            logger.info(f"Versuche Verbindung mit URI: {MONGODB_URI}")
-            self.client = AsyncIOMotorClient(MONGODB_URI)
-            await self.client.server_info()  # Test connection
-            self.db = self.client[DB_NAME]
-            self.connected = True
-            
-            # Erstelle Indizes
-            await self.create_indices()
+        self.connected = await self.backend.connect()
+        if not self.connected:
+            return False
+        self.generation += 1
             
-            logger.info("MongoDB Verbindung erfolgreich hergestellt")
-            return True
+        self.rollups.attach(self.backend)
+        self.codec.attach(self.backend)
+        
+        # Erstelle Indizes
+        await self.create_indices()
+        
+        # Wörterbücher laden; ältere Dokumente werden im Hintergrund umgestellt
+        await self.codec.load()
+        if not await self.check_encoding():
+            asyncio.create_task(self.migrate_encoding())
+        
+        # Während des Ausfalls gespeicherte Dokumente nachtragen
+        if len(self.fallback_store):
+            await self.replay_fallback_store()
             
-        except ConnectionError as e:
-            logger.error(f"MongoDB Verbindungsfehler: {str(e)}")
-            logger.error(f"Verwendete URI: {MONGODB_URI}")
-            self.connected = False
+        # Bestehende Dokumente mit eingebetteten schweren Feldern auslagern
+        state = await self.get_job_state(PAYLOAD_MIGRATION_JOB)
+        if not (state and state.get("completed_at")):
+            asyncio.create_task(self.migrate_payloads())
+        self._initialized = True
+        return True
+
+    async def reconnect(self) -> bool:
+        """
+        Stellt eine unterbrochene Verbindung wieder her.
+        
+        Anders als connect() werden Indizes und Hintergrund-Migrationen nicht
+        erneut angelegt bzw. gestartet, und eine noch genutzte Verbindung wird
+        nicht geschlossen. Ohne vorherige Verbindung wird vollständig verbunden.
+        
+        Returns:
+            bool: True, wenn die Datenbank wieder erreichbar ist
+        """
+        if not self._initialized:
+            return await self.connect()
+        if not await self.backend.reconnect():
             return False
+        self.connected = True
+        self.generation += 1
+        
+        # Wörterbücher anderer Prozesse nachladen, Ausfall-Dokumente nachtragen
+        await self.codec.load()
+        if len(self.fallback_store):
+            await self.replay_fallback_store()
+        return True
+        
+    async def ping(self) -> float:
+        """
+        Prüft die bestehende Verbindung, ohne neu zu verbinden.
+        
+        Returns:
+            float: Antwortzeit in Millisekunden
+            
+        Raises:
+            ConnectionError: Wenn keine Verbindung besteht
+        """
+        if not self.connected:
+            raise ConnectionError("Keine Datenbankverbindung")
+        started = time.perf_counter()
+        await self.backend.ping()
+        return (time.perf_counter() - started) * 1000
+        
+    async def close(self):
+        """Schließt die Verbindung des Speicher-Backends"""
+        await self.backend.close()
+        self.connected = False
+            
+    async def replay_fallback_store(self, batch_size: int = FALLBACK_REPLAY_BATCH_SIZE) -> int:
+        """
+        Schreibt die Dokumente aus dem Fallback-Speicher per Bulk-Insert in die Datenbank.
+        
+        Das Journal wird erst nach vollständigem Replay verworfen; bricht
+        der Replay ab, wird es ohne die bereits übertragenen Dokumente
+        kompaktiert und bleibt für den nächsten Verbindungsaufbau erhalten.
+        
+        Args:
+            batch_size: Dokumente je Bulk-Write
+            
+        Returns:
+            int: Anzahl neu gespeicherter Dokumente
+        """
+        replayed = 0
+        transferred = []
+        try:
+            for batch in self.fallback_store.iter_batches(batch_size):
+                # Duplikate sind bereits vorhanden, alle anderen Fehler brechen ab
+                results = await self._insert_records(batch, strict=True)
+                replayed += sum(results)
+                transferred.extend(record["url"] for record in batch)
+                    
+            logger.info(
+                f"Fallback-Replay: {replayed} von {len(self.fallback_store)} "
+                f"Dokumenten in die Datenbank übertragen"
+            )
+            self.fallback_store.clear()
+            self.lookup_cache.clear()
+            self.generation += 1
+            await self.counters.reconcile()
+            return replayed
+            
+        except Exception as e:
+            logger.error(f"Fehler beim Replay des Fallback-Speichers: {str(e)}")
+            if transferred:
+                try:
+                    self.fallback_store.compact(drop=transferred)
+                except Exception as e:
+                    logger.error(f"Fehler beim Kompaktieren des Fallback-Journals: {str(e)}")
+            return replayed
             
     async def create_indices(self):
         """Erstellt notwendige Datenbankindizes"""
         try:
-            await self.db.documents.create_index([("url", ASCENDING)], unique=True)
-            await self.db.documents.create_index([("term", ASCENDING)])
-            await self.db.documents.create_index([("file_type", ASCENDING)])
-            await self.db.documents.create_index([("hash", ASCENDING)])
-            await self.db.documents.create_index([("timestamp", ASCENDING)])
-            await self.db.documents.create_index([
-                ("snippet", TEXT),
-                ("title", TEXT)
-            ])
+            await self.backend.create_indices()
             
             logger.info("Datenbankindizes erfolgreich erstellt")
             
@@ -64,60 +203,876 @@ class DatabaseManager:
             
     async def store_document(self, document: DocumentMetadata) -> bool:
         """Speichert ein Dokument in der Datenbank"""
+        results = await self.store_documents([document])
+        return results[0]
+        
+    async def store_documents(self, documents: List[DocumentMetadata]) -> List[bool]:
+        """
+        Speichert mehrere Dokumente mit einem ungeordneten Bulk-Upsert.
+        
+        Bereits vorhandene URLs werden nicht überschrieben.
+        
+        Args:
+            documents: Zu speichernde Dokumente (Modelle oder Dicts)
+            
+        Returns:
+            List[bool]: Je Dokument, ob es neu gespeichert wurde
+        """
+        if not documents:
+            return []
+            
+        records = [self._to_record(document) for document in documents]
+        
+        try:
+            if not self.connected:
+                results = self._store_in_memory(records)
+                self.generation += 1
+                return results
+                
+            results = await self._insert_records(records)
+            self.generation += 1
+                
+            # Negativ zwischengespeicherte Lookups sind jetzt veraltet
+            for record in records:
+                self._invalidate_lookups(record)
+            stored_records = [record for record, stored in zip(records, results) if stored]
+            await self.counters.record_ingest([self.codec.encode(record) for record in stored_records])
+            await self.rollups.record_ingest(stored_records)
+                
+            stored = sum(results)
+            logger.info(
+                f"Bulk-Write: {stored} Dokumente gespeichert, "
+                f"{len(records) - stored} bereits vorhanden"
+            )
+            return results
+            
+        except Exception as e:
+            logger.error(f"Fehler beim Speichern der Dokumente: {str(e)}")
+            return [False] * len(records)
+            
+    async def _insert_records(self, records: List[Dict], strict: bool = False) -> List[bool]:
+        """Speichert die Metadaten und danach die ausgelagerten Felder neuer Dokumente"""
+        split = [self._split_payloads(record) for record in records]
+        await self.codec.prepare(metadata for metadata, _ in split)
+        results = await self.backend.insert_documents(
+            [self.codec.encode(metadata) for metadata, _ in split], strict
+        )
+        await self._write_payloads([
+            (record["url"], payloads)
+            for record, (_, payloads), stored in zip(records, split, results)
+            if stored and payloads
+        ])
+        return results
+        
+    @staticmethod
+    def _split_payloads(fields: Dict) -> Tuple[Dict, Dict[str, Dict]]:
+        """Trennt Metadaten und ausgelagerte Felder (je Collection)"""
+        metadata, payloads = {}, {}
+        for field, value in fields.items():
+            collection = PAYLOAD_FIELDS.get(field)
+            if collection:
+                payloads.setdefault(collection, {})[field] = value
+            else:
+                metadata[field] = value
+        return metadata, payloads
+        
+    async def _write_payloads(self, items: List[Tuple[str, Dict[str, Dict]]]):
+        """Schreibt ausgelagerte Felder gebündelt je Collection"""
+        grouped: Dict[str, List[Tuple[str, Dict]]] = {}
+        for url, payloads in items:
+            for collection, fields in payloads.items():
+                grouped.setdefault(collection, []).append((url, fields))
+        for collection, payloads in grouped.items():
+            await self.backend.upsert_payloads(collection, payloads)
+            
+    async def _delete_payloads(self, urls: List[str]):
+        for collection in PAYLOAD_COLLECTIONS:
+            await self.backend.delete_payloads(collection, urls)
+            
+    def _store_in_memory(self, records: List[Dict]) -> List[bool]:
+        """Legt Dokumente im Fallback-Speicher ab (ohne doppelte URLs)"""
+        results = [self.fallback_store.add(record) for record in records]
+        logger.info(f"{sum(results)} Dokumente im Fallback-Speicher abgelegt")
+        return results
+        
+    @staticmethod
+    def _to_record(document) -> Dict:
+        """Wandelt ein Dokument-Modell oder Dict in einen speicherbaren Datensatz um"""
+        record = document.dict() if hasattr(document, "dict") else dict(document)
+        record["url"] = str(record["url"])
+        return record
+            
+    async def update_document(self, url: str, fields: Dict) -> bool:
+        """Aktualisiert einzelne Felder eines Dokuments"""
+        results = await self.update_documents([(url, fields)])
+        return results > 0
+        
+    async def update_documents(self, updates: List[Tuple[str, Dict]]) -> int:
+        """
+        Aktualisiert mehrere Dokumente mit einem ungeordneten Bulk-Write.
+        
+        Args:
+            updates: Liste aus (URL, zu setzende Felder)
+            
+        Returns:
+            int: Anzahl gefundener und aktualisierter Dokumente
+        """
+        if not updates:
+            return 0
+            
         try:
             if self.connected:
-                result = await self.db.documents.insert_one(document.dict())
-                logger.info(f"Dokument gespeichert mit ID: {result.inserted_id}")
-                return True
+                stored = await self._lookup_keys([url for url, _ in updates])
+                split = [(url, self._split_payloads(fields)) for url, fields in updates]
+                metadata_updates = [(url, metadata) for url, (metadata, _) in split if metadata]
+                await self.codec.prepare(metadata for _, metadata in metadata_updates)
+                metadata_updates = [(url, self.codec.encode(metadata)) for url, metadata in metadata_updates]
+                matched = len(updates)
+                # Lookups, die während des Schreibens laufen, dürfen ihr Ergebnis nicht mehr cachen
+                self.generation += 1
+                if metadata_updates:
+                    matched = await self.backend.update_documents(metadata_updates)
+                await self._write_payloads([(url, payloads) for url, (_, payloads) in split if payloads])
+                self.generation += 1
+                for url, fields in updates:
+                    # Alte und neue Schlüssel: ein geänderter Hash darf nicht weiter auf das Dokument zeigen
+                    self._invalidate_lookups(stored.get(url, {"url": url}))
+                    self._invalidate_lookups({**fields, "url": url})
+                return matched
             else:
-                self.in_memory_storage.append(document.dict())
-                logger.info("Dokument im temporären Speicher abgelegt")
-                return True
+                updated = sum(
+                    1 for url, fields in updates
+                    if self.fallback_store.update(url, fields)
+                )
+                self.generation += 1
+                return updated
                 
-        except DuplicateKeyError:
-            logger.warning(f"Dokument existiert bereits: {document.url}")
-            return False
         except Exception as e:
-            logger.error(f"Fehler beim Speichern des Dokuments: {str(e)}")
+            logger.error(f"Fehler beim Aktualisieren der Dokumente: {str(e)}")
+            return 0
+            
+    async def iter_documents(
+        self,
+        query: Optional[Dict] = None,
+        projection: Optional[Dict] = None,
+        batch_size: int = 500,
+        sort: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Iteriert Dokumente über einen Cursor, ohne alle in den Speicher zu laden.
+        
+        Args:
+            query: MongoDB-Filter
+            projection: Zu ladende Felder (Standard: alle Metadaten)
+            batch_size: Dokumente je Cursor-Batch
+            sort: Feld für eine aufsteigende Sortierung (indiziert)
+            
+        Yields:
+            Dict: Einzelne Dokumente
+        """
+        if self.connected:
+            documents = self.backend.iter_documents(
+                self.codec.encode_query(query),
+                self.codec.encode_projection(projection or METADATA_PROJECTION),
+                batch_size,
+                stored_field(sort) if sort else None
+            )
+            try:
+                async for doc in documents:
+                    yield (await self.codec.decode_documents([doc]))[0]
+            finally:
+                await documents.aclose()
+        else:
+            # Im Fallback werden nur einfache Gleichheitsfilter unterstützt
+            documents = [
+                doc for doc in self.fallback_store
+                if all(doc.get(key) == value for key, value in (query or {}).items())
+            ]
+            if sort:
+                documents.sort(key=lambda doc: (doc.get(sort) is not None, doc.get(sort) or ""))
+            for doc in documents:
+                yield doc
+                    
+    async def iter_document_texts(self, batch_size: int = 100) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Iteriert (URL, extrahierter Text) aller Dokumente mit Text.
+        
+        Args:
+            batch_size: Dokumente je Cursor-Batch (Texte sind groß)
+            
+        Yields:
+            Tuple[str, str]: URL und Text
+        """
+        async for doc in self.iter_payloads("document_text", ("text",), batch_size=batch_size):
+            if doc.get("text"):
+                yield doc["url"], doc["text"]
+                    
+    async def iter_payloads(
+        self,
+        collection: str,
+        fields: Tuple[str, ...],
+        query: Optional[Dict] = None,
+        batch_size: int = 500
+    ) -> AsyncIterator[Dict]:
+        """
+        Iteriert die Einträge einer Payload-Collection.
+        
+        Args:
+            collection: Name aus PAYLOAD_COLLECTIONS
+            fields: Zu ladende Felder
+            query: MongoDB-Filter auf den ausgelagerten Feldern
+            batch_size: Einträge je Cursor-Batch
+            
+        Yields:
+            Dict: url und die angeforderten Felder
+        """
+        if self.connected:
+            async for doc in self.backend.iter_payloads(collection, query, fields, batch_size):
+                yield doc
+        else:
+            for doc in self.fallback_store:
+                if any(field in doc for field in fields):
+                    yield {"url": doc["url"], **{field: doc[field] for field in fields if field in doc}}
+                    
+    async def get_payloads(self, urls: List[str], fields: Tuple[str, ...]) -> Dict[str, Dict]:
+        """
+        Lädt ausgelagerte Felder mehrerer Dokumente (ein Roundtrip je Collection).
+        
+        Args:
+            urls: URLs der Dokumente
+            fields: Felder aus PAYLOAD_COLLECTIONS
+            
+        Returns:
+            Dict[str, Dict]: Felder nach URL (fehlende Einträge entfallen)
+        """
+        if not urls:
+            return {}
+            
+        try:
+            if not self.connected:
+                documents = (self.fallback_store.get_by_url(url) for url in urls)
+                return {
+                    doc["url"]: {field: doc[field] for field in fields if field in doc}
+                    for doc in documents if doc
+                }
+                
+            by_collection: Dict[str, List[str]] = {}
+            for field in fields:
+                by_collection.setdefault(PAYLOAD_FIELDS[field], []).append(field)
+                
+            results: Dict[str, Dict] = {}
+            for collection, collection_fields in by_collection.items():
+                found = await self.backend.find_payloads(collection, urls, tuple(collection_fields))
+                for url, doc in found.items():
+                    doc.pop("url", None)
+                    results.setdefault(url, {}).update(doc)
+            return results
+            
+        except Exception as e:
+            logger.error(f"Fehler beim Laden ausgelagerter Felder: {str(e)}")
+            return {}
+            
+    async def get_document_text(self, url: str) -> str:
+        """Lädt den extrahierten Volltext eines Dokuments (leer, wenn keiner vorliegt)"""
+        payloads = await self.get_payloads([url], ("text",))
+        return payloads.get(url, {}).get("text") or ""
+        
+    async def migrate_payloads(self, batch_size: int = 200) -> int:
+        """
+        Lagert eingebettete schwere Felder bestehender Dokumente aus.
+        
+        Läuft einmalig nach dem Verbindungsaufbau im Hintergrund; bereits
+        ausgelagerte Dokumente fallen aus dem Filter, so dass ein
+        abgebrochener Lauf beim nächsten Start fortgesetzt wird.
+        
+        Args:
+            batch_size: Dokumente je Seite
+            
+        Returns:
+            int: Anzahl migrierter Dokumente
+        """
+        query = {"$or": [{field: {"$exists": True}} for field in PAYLOAD_FIELDS]}
+        projection = {"url": 1, **{field: 1 for field in PAYLOAD_FIELDS}}
+        fields = tuple(PAYLOAD_FIELDS)
+        after_id = None
+        migrated = 0
+        
+        try:
+            while True:
+                documents = await self.backend.get_documents_page(query, after_id, batch_size, projection)
+                if not documents:
+                    break
+                    
+                after_id = documents[-1]["_id"]
+                await self._write_payloads([
+                    (doc["url"], self._split_payloads(
+                        {field: doc[field] for field in fields if field in doc}
+                    )[1])
+                    for doc in documents
+                ])
+                migrated += await self.backend.unset_fields([doc["url"] for doc in documents], fields)
+                
+            await self.save_job_state(PAYLOAD_MIGRATION_JOB, {
+                "migrated": migrated,
+                "completed_at": datetime.now()
+            })
+            if migrated:
+                self.lookup_cache.clear()
+                logger.info(f"Schwere Felder von {migrated} Dokumenten ausgelagert")
+            return migrated
+            
+        except Exception as e:
+            logger.error(f"Fehler beim Auslagern der schweren Felder: {str(e)}")
+            return migrated
+                    
+    async def check_encoding(self) -> bool:
+        """
+        Prüft beim Verbindungsaufbau, ob die Speicherform umgestellt ist.
+        
+        Eine leere Datenbank gilt sofort als umgestellt. Bis die Umstellung
+        abgeschlossen ist, stellt der Codec Filter für beide Formen.
+        
+        Returns:
+            bool: True, wenn kein Dokument mehr in der alten Form vorliegt
+        """
+        state = await self.get_job_state(ENCODING_MIGRATION_JOB)
+        if not (state and state.get("completed_at")):
+            if state or await self.backend.get_documents_page(None, None, 1):
+                logger.warning(
+                    "Dokumente liegen noch in der alten Speicherform vor; "
+                    "Filter prüfen bis zum Abschluss der Umstellung beide Formen"
+                )
+                self.codec.legacy = True
+                return False
+            await self.save_job_state(ENCODING_MIGRATION_JOB, {
+                "last_id": None,
+                "migrated": 0,
+                "completed_at": datetime.now()
+            })
+        self.codec.legacy = False
+        return True
+        
+    async def migrate_encoding(self, batch_size: int = 500) -> int:
+        """
+        Überführt bestehende Dokumente in die kompakte Speicherform.
+        
+        Läuft nach dem Verbindungsaufbau im Hintergrund (oder über
+        `cli.py migrate-encoding`). Ein Dokument wird nur ersetzt, solange
+        es seit dem Lesen unverändert ist; zwischenzeitlich geänderte
+        Dokumente holt ein weiterer Durchlauf nach. Der Fortschritt wird je
+        Seite gesichert, ein abgebrochener Lauf setzt dort wieder an. Erst
+        nach dem Abschluss entfallen die Filter auf die alte Form und deren
+        Indizes.
+        
+        Args:
+            batch_size: Dokumente je Seite und Bulk-Write
+            
+        Returns:
+            int: Anzahl umgeschriebener Dokumente
+        """
+        async with self._encoding_lock:
+            return await self._migrate_encoding(batch_size)
+            
+    async def _migrate_encoding(self, batch_size: int) -> int:
+        state = await self.get_job_state(ENCODING_MIGRATION_JOB) or {}
+        if state.get("completed_at"):
+            self.codec.legacy = False
+            return 0
+            
+        after_id = state.get("last_id")
+        migrated = state.get("migrated", 0)
+        try:
+            while True:
+                skipped = 0
+                while True:
+                    documents = await self.backend.get_documents_page(None, after_id, batch_size)
+                    if not documents:
+                        break
+                        
+                    decoded = await self.codec.decode_documents(documents)
+                    await self.codec.prepare(decoded)
+                    changed = [
+                        (encoded, document)
+                        for encoded, document in zip(map(self.codec.encode, decoded), documents)
+                        if encoded != document
+                    ]
+                    replaced = await self.backend.replace_documents(
+                        [encoded for encoded, _ in changed],
+                        expected=[document for _, document in changed]
+                    )
+                    migrated += replaced
+                    skipped += len(changed) - replaced
+                    after_id = documents[-1]["_id"]
+                    await self.save_job_state(ENCODING_MIGRATION_JOB, {
+                        "last_id": after_id,
+                        "migrated": migrated
+                    })
+                    
+                if not skipped:
+                    break
+                # Zwischenzeitlich geänderte Dokumente im nächsten Durchlauf erneut lesen
+                logger.info(f"{skipped} Dokumente während der Umstellung geändert, weiterer Durchlauf")
+                after_id = None
+                
+            await self.save_job_state(ENCODING_MIGRATION_JOB, {
+                "last_id": None,
+                "migrated": migrated,
+                "completed_at": datetime.now()
+            })
+            self.codec.legacy = False
+            await self.backend.drop_legacy_indices()
+            if migrated:
+                # Zähler enthalten noch Klartextwerte der alten Form
+                await self.counters.reconcile()
+                logger.info(f"{migrated} Dokumente in die kompakte Speicherform überführt")
+            return migrated
+            
+        except Exception as e:
+            logger.error(f"Fehler beim Umstellen der Speicherform: {str(e)}")
+            return migrated
+            
+    async def get_documents_page(
+        self,
+        query: Optional[Dict] = None,
+        after_id=None,
+        limit: int = 100,
+        projection: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        Lädt eine Seite von Dokumenten per Keyset-Paginierung über _id.
+        
+        Jede Seite nutzt einen eigenen kurzlebigen Cursor, so dass lange
+        Pausen zwischen den Seiten keine Cursor-Timeouts verursachen.
+        
+        Args:
+            query: MongoDB-Filter
+            after_id: Letzte _id der vorherigen Seite
+            limit: Maximale Anzahl Dokumente
+            projection: Zu ladende Felder
+            
+        Returns:
+            List[Dict]: Dokumente aufsteigend nach _id
+        """
+        try:
+            if not self.connected:
+                return []
+                
+            documents = await self.backend.get_documents_page(
+                self.codec.encode_query(query),
+                after_id,
+                limit,
+                self.codec.encode_projection(projection or METADATA_PROJECTION)
+            )
+            return await self.codec.decode_documents(documents)
+            
+        except Exception as e:
+            logger.error(f"Fehler beim Laden der Dokumentseite: {str(e)}")
+            return []
+            
+    async def get_job_state(self, job_name: str) -> Optional[Dict]:
+        """Lädt den gespeicherten Fortschritt eines Hintergrund-Jobs"""
+        try:
+            if not self.connected:
+                return None
+            return await self.backend.get_job_state(job_name)
+        except Exception as e:
+            logger.error(f"Fehler beim Laden des Job-Status: {str(e)}")
+            return None
+            
+    async def save_job_state(self, job_name: str, state: Dict) -> bool:
+        """Speichert den Fortschritt eines Hintergrund-Jobs (für Resume)"""
+        try:
+            if not self.connected:
+                return False
+            await self.backend.save_job_state(job_name, state)
+            return True
+        except Exception as e:
+            logger.error(f"Fehler beim Speichern des Job-Status: {str(e)}")
             return False
             
+    async def get_document(self, document_id: str, projection: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Sucht ein Dokument anhand seiner ID.
+        
+        Args:
+            document_id: ID des Dokuments (ObjectId bzw. Zeilen-ID als String)
+            projection: Zu ladende Felder (Standard: alle außer den ausgelagerten)
+            
+        Returns:
+            Optional[Dict]: Dokument oder None, wenn es nicht existiert
+        """
+        try:
+            if not self.connected:
+                return None
+            document = await self.backend.get_document(
+                document_id,
+                self.codec.encode_projection(projection or METADATA_PROJECTION)
+            )
+            if document is None:
+                return None
+            return (await self.codec.decode_documents([document]))[0]
+        except Exception as e:
+            logger.error(f"Fehler beim Abrufen des Dokuments: {str(e)}")
+            return None
+            
     async def get_document_by_url(self, url: str) -> Optional[Dict]:
         """Sucht ein Dokument anhand der URL"""
+        return await self._cached_lookup("url", url)
+            
+    async def get_document_by_canonical_url(self, canonical_url: str) -> Optional[Dict]:
+        """Sucht ein Dokument anhand der kanonischen URL"""
+        return await self._cached_lookup("canonical_url", canonical_url)
+            
+    async def get_document_by_hash(self, hash_value: str) -> Optional[Dict]:
+        """Sucht ein Dokument anhand des Hashes"""
+        return await self._cached_lookup("hash", hash_value)
+        
+    async def _cached_lookup(self, field: str, value: str) -> Optional[Dict]:
+        """
+        Sucht ein Dokument über ein eindeutiges Feld mit Read-Through-Cache.
+        
+        Auch "nicht gefunden" wird (kürzer) zwischengespeichert, damit
+        wiederholte Duplikatsprüfungen keinen Roundtrip kosten. Fehler
+        werden nicht gecacht.
+        """
+        use_cache = CACHE_ENABLED and self.connected
+        key = (field, value)
+        generation = self.generation
+        if use_cache:
+            cached = self.lookup_cache.get(key)
+            if cached is not MISSING:
+                return cached
+                
         try:
             if self.connected:
-                return await self.db.documents.find_one({"url": url})
+                projection = self.codec.encode_projection(METADATA_PROJECTION)
+                document = await self.backend.find_one(
+                    stored_field(field),
+                    self.codec.encode_value(field, value),
+                    projection
+                )
+                if document is None and self.codec.legacy and self.codec.has_legacy_form(field):
+                    # Noch nicht umgestellte Dokumente unter altem Namen und Klartextwert
+                    document = await self.backend.find_one(field, value, projection)
+                if document is not None:
+                    document = (await self.codec.decode_documents([document]))[0]
             else:
-                return next((doc for doc in self.in_memory_storage 
-                           if doc["url"] == url), None)
+                return self.fallback_store.get(field, value)
                 
         except Exception as e:
             logger.error(f"Fehler beim Abrufen des Dokuments: {str(e)}")
             return None
             
-    async def get_document_by_hash(self, hash_value: str) -> Optional[Dict]:
-        """Sucht ein Dokument anhand des Hashes"""
+        # Hat sich der Bestand währenddessen geändert, ist das Ergebnis evtl. schon veraltet
+        if use_cache and generation == self.generation:
+            self.lookup_cache.set(key, document)
+        return document
+        
+    async def _lookup_keys(self, urls: List[str]) -> Dict[str, Dict]:
+        """Lädt die gespeicherten Lookup-Schlüssel (url, canonical_url, hash) mehrerer Dokumente"""
+        if not CACHE_ENABLED or not self.lookup_cache.entries:
+            return {}
+        found = await self.backend.find_by_urls(
+            urls, self.codec.stored_fields(("canonical_url", "hash"))
+        )
+        documents = await self.codec.decode_documents(list(found.values()))
+        return {doc["url"]: doc for doc in documents}
+        
+    def _invalidate_lookups(self, document: Dict):
+        """Entfernt alle Cache-Einträge, die auf ein Dokument verweisen können"""
+        self.lookup_cache.invalidate(*[
+            (field, document[field])
+            for field in ("url", "canonical_url", "hash")
+            if document.get(field)
+        ])
+        
+    def get_cache_stats(self) -> Dict:
+        """Gibt die Statistiken des Lookup-Caches zurück"""
+        return self.lookup_cache.get_stats()
+        
+    async def delete_document(self, document_id: str) -> bool:
+        """
+        Löscht ein Dokument anhand seiner ID.
+        
+        Args:
+            document_id: ID des Dokuments (ObjectId bzw. Zeilen-ID als String)
+            
+        Returns:
+            bool: False, wenn kein Dokument gefunden wurde
+        """
+        try:
+            if not self.connected:
+                return False
+                
+            stored = await self.backend.delete_document(document_id)
+            if stored is None:
+                return False
+                
+            self.generation += 1
+            document = (await self.codec.decode_documents([stored]))[0]
+            self._invalidate_lookups(document)
+            await self.counters.record_delete([stored])
+            await self._delete_payloads([document["url"]])
+            bm25_index.delete(document["url"])
+            passage_index.delete(document["url"])
+            return True
+            
+        except Exception as e:
+            logger.error(f"Fehler beim Löschen des Dokuments: {str(e)}")
+            return False
+            
+    async def find_known_documents(
+        self,
+        urls: List[str],
+        hashes: List[str],
+        canonical_urls: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """
+        Sucht bereits gespeicherte Dokumente zu mehreren URLs oder Hashes.
+        
+        Ein einzelner Roundtrip für alle Suchergebnisse eines Begriffs.
+        
+        Args:
+            urls: Zu prüfende URLs
+            hashes: Zu prüfende Snippet-Hashes
+            canonical_urls: Zu prüfende kanonische URLs
+            
+        Returns:
+            List[Dict]: Treffer mit url, canonical_url, hash und size
+        """
+        try:
+            if self.connected:
+                documents = await self.backend.find_known(
+                    urls, hashes, canonical_urls or [], legacy=self.codec.legacy
+                )
+                return await self.codec.decode_documents(documents)
+            else:
+                return self.fallback_store.find_known(urls, hashes, canonical_urls or [])
+                        
+        except Exception as e:
+            logger.error(f"Fehler bei der Suche bekannter Dokumente: {str(e)}")
+            return []
+    
+    async def find_known_content_hashes(self, content_hashes: List[str]) -> set:
+        """
+        Ermittelt, welche Datei-Hashes bereits gespeichert sind.
+        
+        Args:
+            content_hashes: Zu prüfende Hashes des Dateiinhalts
+        
+        Returns:
+            set: Bereits vorhandene Hashes
+        """
+        if not content_hashes:
+            return set()
+        
         try:
             if self.connected:
-                return await self.db.documents.find_one({"hash": hash_value})
+                documents = self.iter_documents(
+                    {"content_hash": {"$in": content_hashes}},
+                    {"_id": 0, "content_hash": 1}
+                )
+                return {doc["content_hash"] async for doc in documents}
             else:
-                return next((doc for doc in self.in_memory_storage 
-                           if doc["hash"] == hash_value), None)
+                wanted = set(content_hashes)
+                return {
+                    doc["content_hash"] for doc in self.fallback_store
+                    if doc.get("content_hash") in wanted
+                }
+        
+        except Exception as e:
+            logger.error(f"Fehler bei der Suche bekannter Datei-Hashes: {str(e)}")
+            return set()
+    
+    async def backfill_canonical_urls(self, only_missing: bool = True, batch_size: int = 500) -> int:
+        """
+        Berechnet die kanonische URL für bestehende Dokumente.
+        
+        Args:
+            only_missing: Nur Dokumente ohne canonical_url bearbeiten;
+                False kanonisiert nach Regeländerungen alle Dokumente neu
+            batch_size: Dokumente je Seite und Bulk-Write
+            
+        Returns:
+            int: Anzahl geänderter Dokumente
+        """
+        if not self.connected:
+            return sum(
+                1 for doc in self.fallback_store
+                if self.fallback_store.update(
+                    doc["url"],
+                    {"canonical_url": url_canonicalizer.canonicalize(doc["url"])}
+                )
+            )
+            
+        query = {"canonical_url": {"$exists": False}} if only_missing else {}
+        projection = {"url": 1, "canonical_url": 1}
+        after_id = None
+        updated = 0
+        
+        while True:
+            documents = await self.get_documents_page(
+                query, after_id=after_id, limit=batch_size, projection=projection
+            )
+            if not documents:
+                break
+                
+            updates = []
+            for doc in documents:
+                canonical_url = url_canonicalizer.canonicalize(doc["url"])
+                if doc.get("canonical_url") != canonical_url:
+                    updates.append((doc["url"], {"canonical_url": canonical_url}))
+                    
+            updated += await self.update_documents(updates)
+            after_id = documents[-1]["_id"]
+            
+        logger.info(f"Kanonische URLs für {updated} Dokumente aktualisiert")
+        return updated
+        
+    async def search_documents(
+        self,
+        query: str,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+        fields: Tuple[str, ...] = SEARCH_RESULT_FIELDS
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Volltextsuche über den Textindex auf snippet und title.
+        
+        Sortiert wird nach Relevanz und _id; geblättert wird per Keyset über
+        das Paar (score, _id) statt mit skip, so dass auch tiefe Seiten nur
+        die angeforderten Treffer übertragen.
+        
+        Args:
+            query: Suchbegriffe
+            cursor: Cursor der vorherigen Seite (None für die erste Seite)
+            limit: Treffer je Seite
+            fields: Zurückgegebene Felder (ohne schwere Felder wie text)
+            
+        Returns:
+            Tuple[List[Dict], Optional[str]]: (Treffer, Cursor der nächsten
+            Seite oder None)
+            
+        Raises:
+            ValueError: Bei ungültigem Cursor
+        """
+        position = self._decode_search_cursor(cursor) if cursor else None
+        
+        if not self.connected:
+            return self._search_in_memory(query, position, limit, fields)
+            
+        try:
+            documents, next_position = await self.backend.search(
+                query, position, limit, self.codec.stored_fields(fields)
+            )
+        except ValueError:
+            raise ValueError(f"Ungültiger Such-Cursor: {cursor}")
+            
+        documents = await self.codec.decode_documents(documents)
+        next_cursor = self._encode_search_cursor(next_position) if next_position else None
+        return documents, next_cursor
+        
+    async def get_documents_by_urls(
+        self,
+        urls: List[str],
+        fields: Tuple[str, ...] = SEARCH_RESULT_FIELDS
+    ) -> Dict[str, Dict]:
+        """
+        Lädt mehrere Dokumente mit einer Abfrage und Projektion.
+        
+        Args:
+            urls: Gesuchte URLs
+            fields: Zu ladende Felder
+            
+        Returns:
+            Dict[str, Dict]: Dokumente nach URL (fehlende URLs entfallen)
+        """
+        try:
+            if self.connected:
+                found = await self.backend.find_by_urls(
+                    urls, self.codec.stored_fields(fields)
+                )
+                documents = await self.codec.decode_documents(list(found.values()))
+                return {doc["url"]: doc for doc in documents}
+            else:
+                documents = (self.fallback_store.get_by_url(url) for url in urls)
+                return {
+                    doc["url"]: {field: doc.get(field) for field in ("url",) + tuple(fields)}
+                    for doc in documents if doc
+                }
                 
         except Exception as e:
-            logger.error(f"Fehler beim Abrufen des Dokuments: {str(e)}")
-            return None
+            logger.error(f"Fehler beim Abrufen der Dokumente: {str(e)}")
+            return {}
+            
+    async def count_search_results(self, query: str, cap: int = SEARCH_COUNT_CAP) -> Tuple[int, bool]:
+        """
+        Zählt Suchtreffer bis zu einer Obergrenze.
+        
+        Args:
+            query: Suchbegriffe
+            cap: Höchstens gezählte Treffer
+            
+        Returns:
+            Tuple[int, bool]: (Anzahl, True wenn die Obergrenze erreicht wurde)
+        """
+        if not self.connected:
+            total = len(self._search_in_memory(query, None, cap + 1, ("url",))[0])
+        else:
+            total = await self.backend.count_search(query, cap)
+            
+        return min(total, cap), total > cap
+        
+    def _search_in_memory(
+        self,
+        query: str,
+        position: Optional[Dict],
+        limit: int,
+        fields: Tuple[str, ...]
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """Einfache Teilstring-Suche im Fallback-Speicher (Cursor = Offset)"""
+        words = query.lower().split()
+        offset = position.get("o", 0) if position else 0
+        matches = [
+            {field: doc.get(field) for field in fields}
+            for doc in self.fallback_store
+            if all(
+                word in f"{doc.get('title') or ''} {doc.get('snippet') or ''}".lower()
+                for word in words
+            )
+        ]
+        page = matches[offset:offset + limit]
+        next_cursor = None
+        if len(matches) > offset + limit:
+            next_cursor = self._encode_search_cursor({"o": offset + limit})
+        return page, next_cursor
+        
+    @staticmethod
+    def _encode_search_cursor(position: Dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+        
+    @staticmethod
+    def _decode_search_cursor(cursor: str) -> Dict:
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if not isinstance(position, dict) or not ("o" in position or "id" in position):
+                raise ValueError
+            return position
+        except Exception:
+            raise ValueError(f"Ungültiger Such-Cursor: {cursor}")
             
     async def get_similar_documents(self, term: str, hash_value: str) -> List[Dict]:
         """Findet ähnliche Dokumente basierend auf Term und Hash"""
         try:
             if self.connected:
-                cursor = self.db.documents.find({
-                    "term": term,
-                    "hash": {"$ne": hash_value}
-                })
-                return await cursor.to_list(length=None)
+                return [
+                    doc async for doc in self.iter_documents({
+                        "term": term,
+                        "hash": {"$ne": hash_value}
+                    })
+                ]
             else:
-                return [doc for doc in self.in_memory_storage 
+                return [doc for doc in self.fallback_store 
                         if doc["term"] == term and doc["hash"] != hash_value]
                 
         except Exception as e:
@@ -125,63 +1080,17 @@ class DatabaseManager:
             return []
             
     async def get_statistics(self) -> ScrapingStats:
-        """Erstellt Statistiken über die gespeicherten Dokumente"""
+        """
+        Gibt Statistiken über die gespeicherten Dokumente zurück.
+        
+        Liest die inkrementell gepflegten Zähler (ein Dokument), statt den
+        gesamten Bestand zu aggregieren.
+        """
         try:
             if self.connected:
-                pipeline = [
-                    {
-                        "$facet": {
-                            "by_type": [
-                                {"$group": {
-                                    "_id": "$file_type",
-                                    "count": {"$sum": 1},
-                                    "total_size": {"$sum": "$size"}
-                                }}
-                            ],
-                            "by_term": [
-                                {"$group": {
-                                    "_id": "$term",
-                                    "count": {"$sum": 1}
-                                }}
-                            ],
-                            "by_language": [
-                                {"$group": {
-                                    "_id": "$language",
-                                    "count": {"$sum": 1}
-                                }}
-                            ],
-                            "overall": [
-                                {"$group": {
-                                    "_id": None,
-                                    "total_docs": {"$sum": 1},
-                                    "total_size": {"$sum": "$size"},
-                                    "unique_domains": {"$addToSet": "$domain"}
-                                }}
-                            ]
-                        }
-                    }
-                ]
-                
-                result = await self.db.documents.aggregate(pipeline).to_list(length=1)
-                
-                if not result:
-                    return ScrapingStats()
-                    
-                stats = result[0]
-                return ScrapingStats(
-                    total_documents=stats["overall"][0]["total_docs"] if stats["overall"] else 0,
-                    documents_per_type={
-                        doc["_id"]: doc["count"] for doc in stats["by_type"]
-                    },
-                    documents_per_term={
-                        doc["_id"]: doc["count"] for doc in stats["by_term"]
-                    },
-                    total_size=stats["overall"][0]["total_size"] if stats["overall"] else 0,
-                    unique_domains=len(stats["overall"][0]["unique_domains"] if stats["overall"] else []),
-                    language_distribution={
-                        doc["_id"]: doc["count"] for doc in stats["by_language"]
-                    }
-                )
+                stats = await self.backend.get_statistics()
+                stats.documents_per_term = await self.codec.decode_counts("term", stats.documents_per_term)
+                return stats
             else:
                 return self._calculate_in_memory_stats()
                 
@@ -191,12 +1100,12 @@ class DatabaseManager:
             
     def _calculate_in_memory_stats(self) -> ScrapingStats:
         """Berechnet Statistiken für In-Memory Storage"""
-        if not self.in_memory_storage:
+        if not len(self.fallback_store):
             return ScrapingStats()
             
         stats = ScrapingStats(
-            total_documents=len(self.in_memory_storage),
-            total_size=sum(doc.get("size", 0) for doc in self.in_memory_storage)
+            total_documents=len(self.fallback_store),
+            total_size=sum(doc.get("size", 0) for doc in self.fallback_store)
         )
         
         # Berechne Dokumentverteilungen
@@ -205,7 +1114,7 @@ class DatabaseManager:
         lang_counts = {}
         domains = set()
         
-        for doc in self.in_memory_storage:
+        for doc in self.fallback_store:
             # Dateitypen
             file_type = doc.get("file_type", "unknown")
             type_counts[file_type] = type_counts.get(file_type, 0) + 1
@@ -231,30 +1140,46 @@ class DatabaseManager:
         
         return stats
         
-    async def cleanup_old_documents(self, days: int = 30) -> int:
-        """Löscht Dokumente, die älter als X Tage sind"""
+    async def delete_documents(self, documents: List[Dict]) -> int:
+        """
+        Löscht mehrere Dokumente mit einem Statement und pflegt Cache,
+        Statistiken und Suchindizes.
+        
+        Args:
+            documents: Dokumente mit _id, url und den gezählten Feldern
+                (hash, size, file_type, term, language)
+            
+        Returns:
+            int: Anzahl gelöschter Dokumente
+        """
+        if not documents or not self.connected:
+            return 0
+            
         try:
-            if not self.connected:
-                return 0
-                
-            cutoff_date = datetime.now() - timedelta(days=days)
-            result = await self.db.documents.delete_many({
-                "timestamp": {"$lt": cutoff_date}
+            deleted = await self.backend.delete_documents({
+                "_id": {"$in": [document["_id"] for document in documents]}
             })
+            self.generation += 1
             
-            return result.deleted_count
+            for document in documents:
+                self._invalidate_lookups(document)
+            await self.counters.record_delete([self.codec.encode(document) for document in documents])
+            urls = [document["url"] for document in documents]
+            await self._delete_payloads(urls)
+            bm25_index.delete_many(urls)
+            passage_index.delete_many(urls)
+            return deleted
             
         except Exception as e:
-            logger.error(f"Fehler beim Bereinigen alter Dokumente: {str(e)}")
+            logger.error(f"Fehler beim Löschen der Dokumente: {str(e)}")
             return 0
 
     async def get_recent_documents(self, limit: int = 10) -> List[Dict]:
         """Holt die neuesten Dokumente, sortiert nach Zeitstempel"""
         try:
-            documents = await self.db.documents.find() \
-                .sort("timestamp", -1) \
-                .limit(limit) \
-                .to_list(length=limit)
+            documents = await self.codec.decode_documents(await self.backend.get_recent_documents(
+                limit, self.codec.encode_projection(RECENT_DOCUMENT_FIELDS)
+            ))
             
             return [{
                 "title": doc.get("title", "Untitled"),
@@ -271,7 +1196,7 @@ class DatabaseManager:
     async def get_document_count(self) -> int:
         """Gibt die Gesamtanzahl der Dokumente zurück"""
         try:
-            return await self.db.documents.count_documents({})
+            return await self.backend.count_documents()
         except Exception as e:
             logger.error(f"Fehler beim Zählen der Dokumente: {str(e)}")
             return 0
@@ -0,0 +1,209 @@
+"""
+Zeitliche Rollups für Document Scraper.
+Verdichtet Ingest-Ereignisse zu Minuten-, Stunden- und Tageswerten je
+Suchbegriff, Dateityp und Domain, damit Trendabfragen keine Rohdokumente
+scannen müssen.
+"""
+
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.config import ROLLUP_MAX_BUCKETS, ROLLUP_RETENTION_DAYS
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ('minute', 'hour', 'day')
+DIMENSIONS = ('all', 'term', 'file_type', 'domain')
+METRICS = ('documents', 'bytes', 'failures')
+
+# Maximale Spanne, für die eine Granularität automatisch gewählt wird
+AUTO_GRANULARITY_SPANS = (
+    ('minute', timedelta(hours=6)),
+    ('hour', timedelta(days=14))
+)
+
+BUCKET_WIDTHS = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1)
+}
+
+def to_utc(timestamp: datetime) -> datetime:
+    """
+    Normalisiert einen Zeitpunkt auf naive UTC-Zeit.
+
+    Naive Werte gelten als lokale Zeit (so schreibt sie der Scraper),
+    zeitzonenbehaftete werden umgerechnet.
+    """
+    return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Rundet einen Zeitpunkt auf den Beginn seines Buckets ab"""
+    if granularity == 'minute':
+        return timestamp.replace(second=0, microsecond=0)
+    if granularity == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+class IngestRollups:
+    """
+    Vorverdichtete Zeitreihen (Collection bzw. Tabelle 'rollups').
+
+    Jedes Ereignis erhöht die Buckets aller drei Granularitäten, jeweils
+    gesamt ('all') und je Suchbegriff, Dateityp und Domain. Feine Buckets
+    tragen ein expires_at und werden vom Speicher-Backend entfernt (TTL-Index
+    bzw. periodisches Löschen), sobald sie älter als ihre Aufbewahrungsfrist
+    sind; die gröberen Buckets bleiben für lange Zeiträume erhalten.
+    Buckets und expires_at liegen in UTC (Tages-Buckets sind UTC-Tage),
+    damit Buckets bei Zeitumstellungen weder doppelt noch lückenhaft sind
+    und der TTL-Index von MongoDB mit derselben Uhr vergleicht.
+    """
+
+    def __init__(self, retention_days: Dict[str, Optional[int]] = ROLLUP_RETENTION_DAYS):
+        self.retention_days = retention_days
+        self.store = None
+
+    def attach(self, store):
+        """Setzt das Speicher-Backend nach erfolgreichem Verbindungsaufbau"""
+        self.store = store
+
+    async def record_ingest(self, documents: List[Dict]):
+        """Zählt gespeicherte Dokumente und ihre Bytes"""
+        increments = Counter()
+        for doc in documents:
+            timestamp = self._parse_timestamp(doc.get('timestamp'))
+            for bucket in self._buckets(timestamp, doc.get('term'), doc.get('file_type'), doc.get('url')):
+                increments[bucket + ('documents',)] += 1
+                increments[bucket + ('bytes',)] += doc.get('size') or 0
+        await self._write(increments)
+
+    async def record_failure(self, term: str, file_type: str, url: str):
+        """Zählt einen fehlgeschlagenen Download"""
+        increments = Counter()
+        for bucket in self._buckets(datetime.now(timezone.utc), term, file_type, url):
+            increments[bucket + ('failures',)] += 1
+        await self._write(increments)
+
+    async def query(
+        self,
+        start: datetime,
+        end: datetime,
+        granularity: Optional[str] = None,
+        dimension: str = 'all',
+        key: Optional[str] = None
+    ) -> Dict:
+        """
+        Liest eine Zeitreihe aus den Rollups.
+
+        Args:
+            start: Beginn des Zeitraums (naiv = lokale Zeit)
+            end: Ende des Zeitraums (naiv = lokale Zeit)
+            granularity: 'minute', 'hour' oder 'day' (Standard: nach Spanne)
+            dimension: 'all', 'term', 'file_type' oder 'domain'
+            key: Wert der Dimension (ohne Angabe alle Werte)
+
+        Returns:
+            Dict: Granularität und Buckets (UTC) mit documents, bytes,
+            failures und failure_rate; truncated, wenn mehr als
+            ROLLUP_MAX_BUCKETS Buckets vorlagen
+
+        Raises:
+            ValueError: Wenn der Zeitraum mehr als ROLLUP_MAX_BUCKETS
+                Zeit-Buckets der Granularität umfasst
+        """
+        start, end = to_utc(start), to_utc(end)
+        granularity = granularity or self.choose_granularity(start, end)
+        first = bucket_start(start, granularity)
+        if (end - first) // BUCKET_WIDTHS[granularity] + 1 > ROLLUP_MAX_BUCKETS:
+            raise ValueError(
+                f"Zeitraum umfasst mehr als {ROLLUP_MAX_BUCKETS} Buckets der Granularität {granularity}"
+            )
+        buckets = await self.store.find_rollups(
+            granularity, dimension, first, end, key, limit=ROLLUP_MAX_BUCKETS + 1
+        )
+        truncated = len(buckets) > ROLLUP_MAX_BUCKETS
+
+        series = []
+        for bucket in buckets[:ROLLUP_MAX_BUCKETS]:
+            attempts = bucket.get('documents', 0) + bucket.get('failures', 0)
+            series.append({
+                "bucket": bucket["bucket"].replace(tzinfo=timezone.utc),
+                "key": bucket["key"],
+                **{metric: bucket.get(metric, 0) for metric in METRICS},
+                "failure_rate": bucket.get('failures', 0) / attempts if attempts else 0
+            })
+
+        return {
+            "granularity": granularity,
+            "dimension": dimension,
+            "start": start.replace(tzinfo=timezone.utc),
+            "end": end.replace(tzinfo=timezone.utc),
+            "buckets": series,
+            "truncated": truncated
+        }
+
+    def choose_granularity(self, start: datetime, end: datetime) -> str:
+        """Wählt die feinste Granularität, die für den Zeitraum noch vorliegt"""
+        start, end = to_utc(start), to_utc(end)
+        span = end - start
+        oldest_needed = to_utc(datetime.now(timezone.utc)) - start
+        for granularity, max_span in AUTO_GRANULARITY_SPANS:
+            retention = self.retention_days.get(granularity)
+            if span <= max_span and (retention is None or oldest_needed <= timedelta(days=retention)):
+                return granularity
+        return 'day'
+
+    def _buckets(
+        self,
+        timestamp: datetime,
+        term: Optional[str],
+        file_type: Optional[str],
+        url: Optional[str]
+    ) -> List[Tuple]:
+        """Alle (Granularität, Bucket, Dimension, Schlüssel) eines Ereignisses"""
+        timestamp = to_utc(timestamp)
+        keys = {
+            'all': 'all',
+            'term': term or 'unknown',
+            'file_type': file_type or 'unknown',
+            'domain': urlparse(url or '').netloc.lower() or 'unknown'
+        }
+        return [
+            (granularity, bucket_start(timestamp, granularity), dimension, keys[dimension])
+            for granularity in GRANULARITIES
+            for dimension in DIMENSIONS
+        ]
+
+    async def _write(self, increments: Counter):
+        """Schreibt alle Inkremente eines Ereignis-Batches in einem Bulk-Upsert"""
+        if not increments or self.store is None:
+            return
+
+        updates: Dict[Tuple, Dict[str, int]] = {}
+        for (granularity, bucket, dimension, key, metric), value in increments.items():
+            updates.setdefault((granularity, bucket, dimension, key), {})[metric] = value
+
+        operations = []
+        for (granularity, bucket, dimension, key), inc in updates.items():
+            retention = self.retention_days.get(granularity)
+            expires_at = None
+            if retention is not None:
+                expires_at = bucket.replace(tzinfo=timezone.utc) + timedelta(days=retention)
+            operations.append(((granularity, bucket, dimension, key), inc, expires_at))
+
+        try:
+            await self.store.increment_rollups(operations)
+        except Exception as e:
+            logger.error(f"Fehler beim Aktualisieren der Rollups: {str(e)}")
+
+    @staticmethod
+    def _parse_timestamp(value) -> datetime:
+        if isinstance(value, datetime):
+            return value
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return datetime.now()
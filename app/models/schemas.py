@@ -45,6 +45,8 @@ class ScrapingStatus(BaseModel):
     downloaded_files: int = 0
     successful_downloads: int = 0
     failed_downloads: int = 0
+    skipped_downloads: int = 0
+    skipped_bytes: int = 0
     total_bytes: int = 0
     processing_speed: float = 0
     class Config:
@@ -5,7 +5,12 @@ Enthält verschiedene Hilfsfunktionen und -klassen für die Verarbeitung.
 
 from .term.term_expander import term_expander, TermExpander
 from .text.text_processor import text_processor, TextProcessor
+from .text.corpus_stats import corpus_stats, CorpusStatistics
+from .text.fingerprint import near_duplicate_index, NearDuplicateIndex
+from .language.language_detector import language_detector, LanguageDetector
 from .file.file_processor import file_processor, FileProcessor
+from .file.text_extractor import text_extractor, TextExtractor
+from .url.url_canonicalizer import url_canonicalizer, UrlCanonicalizer
 from .rate_limit.rate_limiter import rate_limiter, RateLimiter
 from .monitoring.performance import performance_monitor, PerformanceMonitor
 
@@ -14,8 +19,18 @@ __all__ = [
     'TermExpander',
     'text_processor',
     'TextProcessor',
+    'corpus_stats',
+    'CorpusStatistics',
+    'near_duplicate_index',
+    'NearDuplicateIndex',
+    'language_detector',
+    'LanguageDetector',
     'file_processor',
     'FileProcessor',
+    'text_extractor',
+    'TextExtractor',
+    'url_canonicalizer',
+    'UrlCanonicalizer',
     'rate_limiter',
     'RateLimiter',
     'performance_monitor',
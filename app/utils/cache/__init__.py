@@ -0,0 +1,3 @@
+from .ttl_cache import TTLCache, MISSING
+
+__all__ = ['TTLCache', 'MISSING']
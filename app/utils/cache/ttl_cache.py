@@ -0,0 +1,95 @@
+"""
+Cache Utilities.
+Begrenzter LRU-Cache mit Ablaufzeit und Trefferstatistik.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Unterscheidet "nicht im Cache" von einem zwischengespeicherten None
+MISSING = object()
+
+class TTLCache:
+    """
+    LRU-Cache mit Ablaufzeit pro Eintrag.
+
+    Auch None kann als Wert gespeichert werden (negatives Caching); solche
+    Einträge verfallen nach der eigenen, kürzeren negative_ttl.
+    """
+
+    def __init__(self, max_size: int, ttl: float, negative_ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Liest einen Eintrag.
+
+        Args:
+            key: Cache-Schlüssel
+
+        Returns:
+            Any: Gespeicherter Wert (auch None) oder MISSING
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return MISSING
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            if entry[1] is None:
+                self.negative_hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        """Speichert einen Wert und verdrängt bei Bedarf den ältesten Eintrag"""
+        ttl = self.negative_ttl if value is None else self.ttl
+        with self._lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, *keys: Hashable):
+        """Entfernt einzelne Einträge"""
+        with self._lock:
+            for key in keys:
+                if self.entries.pop(key, MISSING) is not MISSING:
+                    self.invalidations += 1
+
+    def clear(self):
+        """Leert den Cache"""
+        with self._lock:
+            self.invalidations += len(self.entries)
+            self.entries.clear()
+
+    def get_stats(self) -> Dict:
+        """
+        Gibt Cache-Statistiken zurück
+
+        Returns:
+            Dict: Größe, Treffer, Fehlzugriffe und Trefferquote
+        """
+        total = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / total if total > 0 else 0
+        }
@@ -1,3 +1,4 @@
 from .file_processor import file_processor, FileProcessor
+from .text_extractor import text_extractor, TextExtractor
 
-__all__ = ['file_processor', 'FileProcessor']
+__all__ = ['file_processor', 'FileProcessor', 'text_extractor', 'TextExtractor']
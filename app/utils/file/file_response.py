@@ -0,0 +1,172 @@
+"""
+File Responses.
+Liefert gespeicherte Dateien (auch gzip-komprimierte) mit Byte-Ranges aus,
+ohne sie vollständig in den Speicher zu laden.
+"""
+
+import asyncio
+import gzip
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
+
+import aiofiles
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from app.config import FILE_SERVE_CHUNK_SIZE
+
+# ASGI-Erweiterung, über die der Server selbst per sendfile() sendet
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+class RangeNotSatisfiable(ValueError):
+    """Angeforderter Bereich liegt außerhalb der Datei (416)"""
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Wertet einen Range-Header mit einem Byte-Bereich aus.
+
+    Ungültige Header und mehrere Bereiche werden ignoriert; dann wird die
+    ganze Datei ausgeliefert.
+
+    Args:
+        header: Wert des Range-Headers (z.B. 'bytes=0-1023' oder 'bytes=-500')
+        size: Dateigröße in Bytes
+
+    Returns:
+        Optional[Tuple[int, int]]: (start, end) inklusive oder None
+
+    Raises:
+        RangeNotSatisfiable: Wenn der Bereich hinter dem Dateiende beginnt
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+
+    first, dash, last = header[len("bytes="):].strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else start
+            if start < 0 or end < start:
+                return None
+            if not last:
+                end = size - 1
+        else:
+            suffix = int(last)
+            if suffix < 0:
+                return None
+            start, end = size - min(suffix, size), size - 1
+            if suffix == 0:
+                start = size
+    except ValueError:
+        return None
+
+    if start >= size:
+        raise RangeNotSatisfiable(f"Bereich {header} außerhalb von {size} Bytes")
+    return start, min(end, size - 1)
+
+def gzip_size(path: Path) -> int:
+    """
+    Unkomprimierte Größe einer gzip-Datei mit einem Member.
+
+    Der Trailer (ISIZE) enthält die Größe nur modulo 4 GiB; wo möglich
+    sollte die beim Komprimieren gespeicherte Größe verwendet werden.
+    """
+    with open(path, "rb") as file:
+        file.seek(-4, os.SEEK_END)
+        return struct.unpack("<I", file.read(4))[0]
+
+def content_disposition(filename: str) -> str:
+    """Content-Disposition 'inline' mit RFC-5987-kodiertem Dateinamen"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"inline; filename*=utf-8''{quoted}"
+    return f'inline; filename="{filename}"'
+
+class FileRangeResponse(Response):
+    """
+    Streamt eine Datei oder einen Byte-Bereich daraus.
+
+    Bietet der ASGI-Server die Erweiterung zerocopysend an, übergibt die
+    Antwort nur Dateideskriptor, Offset und Länge und der Server sendet per
+    sendfile(). Sonst wird in Blöcken von chunk_size gelesen; im Speicher
+    liegt immer nur ein Block. gzip-komprimierte Dateien (compressed=True)
+    werden beim Lesen entpackt, Bereiche beziehen sich dann auf den
+    entpackten Inhalt.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        size: int,
+        media_type: str,
+        headers: Optional[Dict[str, str]] = None,
+        byte_range: Optional[Tuple[int, int]] = None,
+        compressed: bool = False,
+        send_body: bool = True,
+        chunk_size: int = FILE_SERVE_CHUNK_SIZE
+    ):
+        self.path = path
+        self.compressed = compressed
+        self.send_body = send_body
+        self.chunk_size = chunk_size
+        self.background = None
+        self.media_type = media_type
+        self.start, end = byte_range if byte_range else (0, size - 1)
+        self.length = end - self.start + 1
+        self.status_code = 206 if byte_range else 200
+
+        headers = {**(headers or {}), "accept-ranges": "bytes", "content-length": str(self.length)}
+        if byte_range:
+            headers["content-range"] = f"bytes {self.start}-{end}/{size}"
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers
+        })
+        if not self.send_body or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if not self.compressed and ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": file,
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False
+                })
+            return
+
+        if self.compressed:
+            file = await asyncio.to_thread(gzip.open, self.path, "rb")
+            try:
+                if self.start:
+                    # Vorspulen entpackt bis zum Offset, hält aber nur einen Block im Speicher
+                    await asyncio.to_thread(file.seek, self.start)
+                await self._send_chunks(send, lambda size: asyncio.to_thread(file.read, size))
+            finally:
+                file.close()
+        else:
+            async with aiofiles.open(self.path, "rb") as file:
+                await file.seek(self.start)
+                await self._send_chunks(send, file.read)
+
+    async def _send_chunks(self, send: Send, read):
+        remaining = self.length
+        while remaining > 0:
+            chunk = await read(min(self.chunk_size, remaining))
+            if not chunk:
+                # Content-Length ist schon gesendet; Abbruch statt stillschweigend kürzerer Antwort
+                raise OSError(f"{self.path} endet {remaining} Bytes vor der angekündigten Länge")
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
@@ -0,0 +1,81 @@
+"""
+Text Extraction Utilities.
+Extrahiert den Klartext aus heruntergeladenen Dokumenten.
+"""
+
+import logging
+import re
+import zipfile
+from html import unescape
+from pathlib import Path
+
+from pypdf import PdfReader
+
+logger = logging.getLogger(__name__)
+
+DOCX_PARAGRAPH_PATTERN = re.compile(r"</w:p>")
+XML_TAG_PATTERN = re.compile(r"<[^>]+>")
+WHITESPACE_PATTERN = re.compile(r"[ \t\r\f\v]+")
+
+class TextExtractor:
+    """Klasse für die Textextraktion aus PDF- und Word-Dokumenten"""
+
+    def extract(self, file_path: str, file_type: str, max_length: int) -> str:
+        """
+        Extrahiert den Text eines Dokuments.
+
+        Args:
+            file_path: Pfad zur Datei
+            file_type: Dateityp ('pdf', 'doc', 'docx')
+            max_length: Maximale Textlänge in Zeichen
+
+        Returns:
+            str: Extrahierter Text (leer, wenn nicht extrahierbar)
+        """
+        try:
+            path = Path(file_path)
+            if file_type == 'pdf':
+                text = self._extract_pdf(path, max_length)
+            elif file_type == 'docx':
+                text = self._extract_docx(path)
+            else:
+                # Binäres .doc-Format wird nicht unterstützt
+                return ''
+
+            return self._normalize(text)[:max_length]
+
+        except Exception as e:
+            logger.error(f"Fehler bei der Textextraktion aus {file_path}: {str(e)}")
+            return ''
+
+    def _extract_pdf(self, path: Path, max_length: int) -> str:
+        """Liest den Text seitenweise, bis die Maximallänge erreicht ist"""
+        reader = PdfReader(str(path))
+        parts = []
+        length = 0
+
+        for page in reader.pages:
+            page_text = page.extract_text() or ''
+            parts.append(page_text)
+            length += len(page_text)
+            if length >= max_length:
+                break
+
+        return '\n'.join(parts)
+
+    def _extract_docx(self, path: Path) -> str:
+        """Liest den Text aus word/document.xml ohne zusätzliche Abhängigkeiten"""
+        with zipfile.ZipFile(path) as archive:
+            xml = archive.read('word/document.xml').decode('utf-8', errors='ignore')
+
+        xml = DOCX_PARAGRAPH_PATTERN.sub('\n', xml)
+        return unescape(XML_TAG_PATTERN.sub('', xml))
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Vereinheitlicht Leerraum und entfernt leere Zeilen"""
+        lines = (WHITESPACE_PATTERN.sub(' ', line).strip() for line in text.splitlines())
+        return '\n'.join(line for line in lines if line)
+
+# Globale Instanz
+text_extractor = TextExtractor()
@@ -0,0 +1,3 @@
+from .language_detector import language_detector, LanguageDetector
+
+__all__ = ['language_detector', 'LanguageDetector']
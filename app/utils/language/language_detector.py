@@ -0,0 +1,187 @@
+"""
+Language Detection Utilities.
+Schnelle, deterministische Spracherkennung mit Cache und Batch-Unterstützung.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+from langdetect.detector_factory import DetectorFactory, PROFILES_DIRECTORY
+from langdetect.lang_detect_exception import LangDetectException
+
+from app.config import LANGUAGE_CACHE_SIZE, LANGUAGE_MIN_EVIDENCE
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+# Häufige Funktionswörter für den DE/EN-Schnelltest; Wörter, die in beiden
+# Sprachen vorkommen ('in', 'an', 'was', 'will', 'die'), zählen für keine
+GERMAN_MARKERS = frozenset({
+    'der', 'das', 'und', 'ist', 'nicht', 'ein', 'eine', 'mit', 'von', 'dass',
+    'zu', 'den', 'dem', 'des', 'auf', 'für', 'sich', 'im', 'auch', 'als',
+    'werden', 'wird', 'bei', 'oder', 'aus', 'nach', 'wie', 'über', 'sind', 'zur'
+})
+ENGLISH_MARKERS = frozenset({
+    'the', 'and', 'is', 'of', 'to', 'that', 'for', 'with', 'on', 'as', 'were',
+    'are', 'by', 'this', 'be', 'from', 'or', 'been', 'at', 'which', 'not',
+    'have', 'has', 'such', 'it', 'its', 'shall', 'any', 'these', 'their'
+})
+GERMAN_CHARACTERS = frozenset('äöüß')
+
+class LanguageDetector:
+    """Spracherkennung mit DE/EN-Schnelltest und langdetect als Fallback"""
+
+    def __init__(
+        self,
+        cache_size: int = LANGUAGE_CACHE_SIZE,
+        min_evidence: int = LANGUAGE_MIN_EVIDENCE,
+        seed: int = 0
+    ):
+        self.cache_size = cache_size
+        self.min_evidence = min_evidence
+        self.seed = seed
+        self.cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._factory: Optional[DetectorFactory] = None
+        self._lock = threading.Lock()
+
+    def detect(self, text: str) -> str:
+        """
+        Erkennt die Sprache eines Textes.
+
+        Args:
+            text: Zu analysierender Text
+
+        Returns:
+            str: ISO-639-1 Sprachcode oder 'unknown'
+        """
+        return self.detect_batch([text])[0]
+
+    def detect_batch(self, texts: Sequence[str]) -> List[str]:
+        """
+        Erkennt die Sprachen mehrerer Texte.
+
+        Identische Texte werden nur einmal analysiert, bekannte Texte
+        direkt aus dem Cache beantwortet.
+
+        Args:
+            texts: Zu analysierende Texte
+
+        Returns:
+            List[str]: Sprachcodes in Reihenfolge der Texte
+        """
+        keys = [self._cache_key(text) for text in texts]
+        resolved: Dict[bytes, str] = {}
+        pending: Dict[bytes, str] = {}
+
+        with self._lock:
+            for key, text in zip(keys, texts):
+                if key in resolved or key in pending:
+                    continue
+                if key in self.cache:
+                    self.cache.move_to_end(key)
+                    resolved[key] = self.cache[key]
+                    self.cache_hits += 1
+                else:
+                    pending[key] = text
+                    self.cache_misses += 1
+
+        for key, text in pending.items():
+            resolved[key] = self._classify(text)
+
+        with self._lock:
+            for key in pending:
+                self.cache[key] = resolved[key]
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+        return [resolved[key] for key in keys]
+
+    def get_cache_stats(self) -> Dict:
+        """
+        Gibt Cache-Statistiken zurück
+
+        Returns:
+            Dict: Größe, Treffer und Trefferquote des Caches
+        """
+        total = self.cache_hits + self.cache_misses
+        return {
+            'size': len(self.cache),
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'hit_rate': self.cache_hits / total if total > 0 else 0
+        }
+
+    def _classify(self, text: str) -> str:
+        """Klassifiziert einen einzelnen, noch unbekannten Text"""
+        if not text or not text.strip():
+            return 'unknown'
+
+        quick_result = self._classify_german_english(text)
+        if quick_result:
+            return quick_result
+
+        return self._detect_with_profiles(text)
+
+    def _classify_german_english(self, text: str) -> Optional[str]:
+        """
+        Günstiger DE/EN-Klassifikator über Funktionswörter und Umlaute.
+
+        Returns:
+            Optional[str]: 'de' oder 'en' bei eindeutiger Evidenz, sonst None
+        """
+        lowered = text.lower()
+        german = sum(1 for char in lowered if char in GERMAN_CHARACTERS)
+        english = 0
+
+        for word in WORD_PATTERN.findall(lowered):
+            if word in GERMAN_MARKERS:
+                german += 1
+            elif word in ENGLISH_MARKERS:
+                english += 1
+
+        if german + english < self.min_evidence:
+            return None
+        if german >= 4 * english:
+            return 'de'
+        if english >= 4 * german:
+            return 'en'
+        return None
+
+    def _detect_with_profiles(self, text: str) -> str:
+        """Fallback auf langdetect mit festem Seed für deterministische Ergebnisse"""
+        try:
+            detector = self._get_factory().create()
+            detector.append(text)
+            return detector.detect()
+        except LangDetectException:
+            return 'unknown'
+        except Exception as e:
+            logger.error(f"Fehler bei der Spracherkennung: {str(e)}")
+            return 'unknown'
+
+    def _get_factory(self) -> DetectorFactory:
+        """Lädt die Sprachprofile einmalig beim ersten Bedarf"""
+        if self._factory is None:
+            with self._lock:
+                if self._factory is None:
+                    factory = DetectorFactory()
+                    factory.load_profile(PROFILES_DIRECTORY)
+                    factory.set_seed(self.seed)
+                    self._factory = factory
+                    logger.info("Sprachprofile für langdetect geladen")
+        return self._factory
+
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        """Erzeugt einen kompakten Cache-Schlüssel aus dem Text"""
+        return hashlib.blake2b((text or '').encode('utf-8'), digest_size=16).digest()
+
+# Globale Instanz
+language_detector = LanguageDetector()
@@ -0,0 +1,4 @@
+from .bm25_index import bm25_index, BM25Index
+from .passage_index import passage_index, PassageIndex
+
+__all__ = ['bm25_index', 'BM25Index', 'passage_index', 'PassageIndex']
@@ -0,0 +1,444 @@
+"""
+BM25 Full-Text Index.
+Lokaler invertierter Index über den extrahierten Dokumenttext mit
+segmentweisem Aufbau, Tombstones und Hintergrund-Merges.
+"""
+
+import asyncio
+import logging
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import (
+    BM25_INDEX_DIR,
+    BM25_SEGMENT_SIZE,
+    BM25_FLUSH_INTERVAL,
+    BM25_MAX_SEGMENTS,
+    BM25_MERGE_FACTOR,
+    BM25_K1,
+    BM25_B
+)
+from app.utils.text.text_processor import text_processor
+from .postings import Segment, load_manifest, save_manifest
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+
+class BM25Index:
+    """
+    Segmentierter BM25-Index.
+
+    Neue Dokumente landen in einem Speicherpuffer, der ab BM25_SEGMENT_SIZE
+    Dokumenten (oder nach BM25_FLUSH_INTERVAL) als unveränderliches Segment
+    geschrieben wird. Gelöschte oder neu indizierte URLs werden in ihrem
+    alten Segment als Tombstone markiert. Übersteigt die Segmentanzahl
+    BM25_MAX_SEGMENTS, führt ein Hintergrund-Task die kleinsten Segmente
+    zusammen und entfernt dabei die Tombstones endgültig.
+    """
+
+    def __init__(
+        self,
+        directory: Path = BM25_INDEX_DIR,
+        segment_size: int = BM25_SEGMENT_SIZE,
+        flush_interval: float = BM25_FLUSH_INTERVAL,
+        max_segments: int = BM25_MAX_SEGMENTS,
+        merge_factor: int = BM25_MERGE_FACTOR,
+        k1: float = BM25_K1,
+        b: float = BM25_B
+    ):
+        self.directory = Path(directory)
+        self.segment_size = segment_size
+        self.flush_interval = flush_interval
+        self.max_segments = max_segments
+        self.merge_factor = max(2, merge_factor)
+        self.k1 = k1
+        self.b = b
+
+        self.segments: List[Segment] = []
+        self.next_segment = 0
+        # URL -> (Segment oder None für den Puffer, lokale ID)
+        self.locations: Dict[str, Tuple[Optional[Segment], int]] = {}
+        self.live_docs = 0
+        self.total_length = 0
+        self._reset_buffer()
+        self._lock = threading.RLock()
+        self._merge_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._load()
+
+    def add(self, url: str, text: str):
+        """
+        Indiziert ein Dokument (ersetzt eine frühere Fassung derselben URL).
+
+        Args:
+            url: URL des Dokuments
+            text: Zu indizierender Text
+        """
+        term_counts = text_processor.analyze(text)
+        length = sum(term_counts.values())
+
+        with self._lock:
+            self._delete_locked(url)
+            local_id = len(self._buffer_urls)
+            self._buffer_urls.append(url)
+            self._buffer_lengths.append(length)
+            for term, count in term_counts.items():
+                docs, tfs = self._buffer_postings.setdefault(term, ([], []))
+                docs.append(local_id)
+                tfs.append(count)
+            if self._buffer_started is None:
+                self._buffer_started = time.monotonic()
+
+            self.locations[url] = (None, local_id)
+            self.live_docs += 1
+            self.total_length += length
+
+            if len(self._buffer_urls) >= self.segment_size:
+                self._flush_locked()
+
+    def delete(self, url: str) -> bool:
+        """Entfernt ein Dokument aus dem Index (Tombstone bis zum Merge)"""
+        with self._lock:
+            return self._delete_locked(url)
+
+    def delete_many(self, urls: Iterable[str]) -> int:
+        """Entfernt mehrere Dokumente; Tombstones werden je Segment einmal geschrieben"""
+        with self._lock:
+            touched = {}
+            deleted = 0
+            for url in urls:
+                location = self.locations.get(url)
+                if location is None:
+                    continue
+                if location[0] is not None:
+                    touched[id(location[0])] = location[0]
+                deleted += self._delete_locked(url, persist=False)
+            for segment in touched.values():
+                segment.save_deleted()
+            return deleted
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """
+        Sucht die relevantesten Dokumente nach BM25.
+
+        Args:
+            query: Suchanfrage (wird wie der Dokumenttext analysiert)
+            limit: Maximale Trefferanzahl
+
+        Returns:
+            List[Tuple[str, float]]: (URL, Score) absteigend nach Score
+        """
+        terms = list(text_processor.analyze(query))
+        if not terms:
+            return []
+
+        with self._lock:
+            if not self.live_docs:
+                return []
+            segments = list(self.segments)
+            average_length = self.total_length / self.live_docs
+            idf = self._idf(terms, segments)
+
+            # Der Puffer ist klein und veränderlich, daher unter dem Lock
+            candidates = self._search_buffer(terms, idf, average_length, limit)
+
+        for segment in segments:
+            candidates.extend(self._search_segment(segment, terms, idf, average_length, limit))
+
+        candidates.sort(key=lambda item: item[1], reverse=True)
+        return candidates[:limit]
+
+    def flush(self):
+        """Schreibt den Puffer als neues Segment"""
+        with self._lock:
+            self._flush_locked()
+
+    def merge(self) -> bool:
+        """
+        Führt die kleinsten Segmente zu einem zusammen.
+
+        Der Merge läuft ohne Index-Lock; Löschungen, die währenddessen in
+        den Quellsegmenten markiert werden, werden vor dem Umschalten auf
+        das neue Segment übertragen.
+
+        Returns:
+            bool: True, wenn zusammengeführt wurde
+        """
+        with self._merge_lock:
+            with self._lock:
+                if len(self.segments) <= self.max_segments:
+                    return False
+                sources = sorted(self.segments, key=lambda segment: segment.live_docs)
+                sources = sources[:self.merge_factor]
+                deleted_before = [segment.deleted.copy() for segment in sources]
+                name = self._next_segment_name()
+
+            started = time.monotonic()
+            merged, id_maps = self._write_merged(self.directory / name, sources, deleted_before)
+
+            with self._lock:
+                # Zwischenzeitliche Löschungen nachziehen
+                for segment, before, id_map in zip(sources, deleted_before, id_maps):
+                    newly_deleted = np.flatnonzero(segment.deleted & ~before)
+                    newly_deleted = id_map[newly_deleted]
+                    merged.mark_deleted(newly_deleted[newly_deleted >= 0])
+                merged.save_deleted()
+
+                for local_id, url in enumerate(merged.urls):
+                    if not merged.deleted[local_id]:
+                        self.locations[url] = (merged, local_id)
+                self.segments = [s for s in self.segments if s not in sources] + [merged]
+                self._save_manifest()
+
+            for segment in sources:
+                shutil.rmtree(segment.path, ignore_errors=True)
+
+            logger.info(
+                f"BM25-Segmente {', '.join(s.name for s in sources)} zu {name} zusammengeführt "
+                f"({merged.num_docs} Dokumente, {time.monotonic() - started:.1f}s)"
+            )
+            return True
+
+    @property
+    def background_task(self) -> Optional[asyncio.Task]:
+        """Hintergrund-Task für Flush und Merge (None, wenn nicht gestartet)"""
+        return self._task
+
+    def start(self):
+        """Startet den Hintergrund-Task für Flush und Merge"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._maintenance_loop())
+
+    async def stop(self):
+        """Stoppt den Hintergrund-Task und schreibt den Puffer"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+    def get_stats(self) -> Dict:
+        """
+        Gibt den Zustand des Index zurück
+
+        Returns:
+            Dict: Dokumente, Segmente, Puffer und Tombstones
+        """
+        with self._lock:
+            return {
+                'documents': self.live_docs,
+                'segments': len(self.segments),
+                'buffered': len(self._buffer_urls),
+                'tombstones': sum(int(segment.deleted.sum()) for segment in self.segments),
+                'average_length': self.total_length / self.live_docs if self.live_docs else 0
+            }
+
+    def _idf(self, terms: List[str], segments: List[Segment]) -> Dict[str, float]:
+        """BM25-IDF je Term über alle Segmente und den Puffer"""
+        idf = {}
+        for term in terms:
+            df = sum(segment.document_frequency(term) for segment in segments)
+            df += len(self._buffer_postings.get(term, ((), ()))[0])
+            df = min(df, self.live_docs)
+            idf[term] = float(np.log(1 + (self.live_docs - df + 0.5) / (df + 0.5)))
+        return idf
+
+    def _score(
+        self,
+        scores: np.ndarray,
+        docs: np.ndarray,
+        tfs: np.ndarray,
+        doc_lengths: np.ndarray,
+        idf: float,
+        average_length: float
+    ):
+        tfs = tfs.astype(np.float32)
+        norm = self.k1 * (1 - self.b + self.b * doc_lengths[docs] / average_length)
+        scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+
+    def _search_segment(
+        self,
+        segment: Segment,
+        terms: List[str],
+        idf: Dict[str, float],
+        average_length: float,
+        limit: int
+    ) -> List[Tuple[str, float]]:
+        scores = None
+        for term in terms:
+            postings = segment.postings(term)
+            if postings is None:
+                continue
+            if scores is None:
+                scores = np.zeros(segment.num_docs, dtype=np.float32)
+            self._score(scores, postings[0], postings[1], segment.doc_lengths, idf[term], average_length)
+
+        if scores is None:
+            return []
+        scores[segment.deleted] = 0
+        return self._top(scores, segment.urls, limit)
+
+    def _search_buffer(
+        self,
+        terms: List[str],
+        idf: Dict[str, float],
+        average_length: float,
+        limit: int
+    ) -> List[Tuple[str, float]]:
+        if not self._buffer_urls:
+            return []
+
+        scores = np.zeros(len(self._buffer_urls), dtype=np.float32)
+        doc_lengths = np.asarray(self._buffer_lengths, dtype=np.float32)
+        for term in terms:
+            if term in self._buffer_postings:
+                docs, tfs = self._buffer_postings[term]
+                self._score(scores, np.asarray(docs), np.asarray(tfs), doc_lengths, idf[term], average_length)
+
+        if self._buffer_deleted:
+            scores[list(self._buffer_deleted)] = 0
+        return self._top(scores, self._buffer_urls, limit)
+
+    @staticmethod
+    def _top(scores: np.ndarray, urls: List[str], limit: int) -> List[Tuple[str, float]]:
+        matches = np.flatnonzero(scores > 0)
+        if matches.size > limit:
+            matches = matches[np.argpartition(-scores[matches], limit)[:limit]]
+        return [(urls[i], float(scores[i])) for i in matches]
+
+    def _delete_locked(self, url: str, persist: bool = True) -> bool:
+        location = self.locations.pop(url, None)
+        if location is None:
+            return False
+
+        segment, local_id = location
+        if segment is None:
+            self._buffer_deleted.add(local_id)
+            length = self._buffer_lengths[local_id]
+        else:
+            segment.mark_deleted(local_id)
+            if persist:
+                segment.save_deleted()
+            length = int(segment.doc_lengths[local_id])
+
+        self.live_docs -= 1
+        self.total_length -= length
+        return True
+
+    def _flush_locked(self):
+        if not self._buffer_urls:
+            return
+
+        deleted = np.zeros(len(self._buffer_urls), dtype=bool)
+        deleted[list(self._buffer_deleted)] = True
+        segment = Segment.write(
+            self.directory / self._next_segment_name(),
+            self._buffer_urls,
+            self._buffer_lengths,
+            self._buffer_postings,
+            deleted
+        )
+        for local_id, url in enumerate(segment.urls):
+            if not deleted[local_id]:
+                self.locations[url] = (segment, local_id)
+        self.segments.append(segment)
+        self._save_manifest()
+        self._reset_buffer()
+        logger.info(f"BM25-Segment {segment.name} geschrieben ({segment.num_docs} Dokumente)")
+
+    def _write_merged(
+        self,
+        path: Path,
+        sources: List[Segment],
+        deleted: List[np.ndarray]
+    ) -> Tuple[Segment, List[np.ndarray]]:
+        """Schreibt die lebenden Dokumente der Quellsegmente als neues Segment"""
+        urls, doc_lengths, id_maps = [], [], []
+        for segment, segment_deleted in zip(sources, deleted):
+            id_map = np.full(segment.num_docs, -1, dtype=np.int64)
+            live = np.flatnonzero(~segment_deleted)
+            id_map[live] = np.arange(len(urls), len(urls) + live.size)
+            urls.extend(segment.urls[i] for i in live)
+            doc_lengths.extend(segment.doc_lengths[live].tolist())
+            id_maps.append(id_map)
+
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        terms = sorted(set().union(*(segment.term_ids for segment in sources)))
+        for term in terms:
+            merged_docs, merged_tfs = [], []
+            # Quellsegmente in Reihenfolge -> neue IDs bleiben aufsteigend
+            for segment, id_map in zip(sources, id_maps):
+                segment_postings = segment.postings(term)
+                if segment_postings is None:
+                    continue
+                new_ids = id_map[segment_postings[0]]
+                keep = new_ids >= 0
+                merged_docs.append(new_ids[keep])
+                merged_tfs.append(segment_postings[1][keep])
+            if merged_docs:
+                docs = np.concatenate(merged_docs)
+                if docs.size:
+                    postings[term] = (docs, np.concatenate(merged_tfs))
+
+        return Segment.write(path, urls, doc_lengths, postings), id_maps
+
+    def _next_segment_name(self) -> str:
+        name = f"seg_{self.next_segment:06d}"
+        self.next_segment += 1
+        return name
+
+    def _save_manifest(self):
+        save_manifest(self.directory / MANIFEST_FILE, {
+            "segments": [segment.name for segment in self.segments],
+            "next_segment": self.next_segment
+        })
+
+    def _reset_buffer(self):
+        self._buffer_urls: List[str] = []
+        self._buffer_lengths: List[int] = []
+        self._buffer_postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._buffer_deleted = set()
+        self._buffer_started: Optional[float] = None
+
+    def _load(self):
+        """Öffnet die Segmente aus dem Manifest"""
+        try:
+            manifest = load_manifest(self.directory / MANIFEST_FILE)
+            self.next_segment = manifest["next_segment"]
+            for name in manifest["segments"]:
+                segment = Segment(self.directory / name)
+                self.segments.append(segment)
+                for local_id in np.flatnonzero(~segment.deleted):
+                    self.locations[segment.urls[local_id]] = (segment, int(local_id))
+                self.live_docs += segment.live_docs
+                self.total_length += segment.live_length
+
+            if self.segments:
+                logger.info(
+                    f"BM25-Index geladen ({self.live_docs} Dokumente, "
+                    f"{len(self.segments)} Segmente)"
+                )
+        except Exception as e:
+            logger.error(f"Fehler beim Laden des BM25-Index: {str(e)}")
+
+    async def _maintenance_loop(self):
+        """Schreibt alte Puffer und führt Segmente im Hintergrund zusammen"""
+        while True:
+            await asyncio.sleep(min(self.flush_interval, 10))
+            try:
+                if (self._buffer_started is not None
+                        and time.monotonic() - self._buffer_started >= self.flush_interval):
+                    await asyncio.to_thread(self.flush)
+                while await asyncio.to_thread(self.merge):
+                    pass
+            except Exception as e:
+                logger.error(f"Fehler bei der Wartung des BM25-Index: {str(e)}")
+
+# Globale Instanz
+bm25_index = BM25Index()
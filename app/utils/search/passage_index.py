@@ -0,0 +1,471 @@
+"""
+Semantic Passage Index.
+Zerlegt extrahierten Text in Passagen, bettet sie per LSA (lokal trainiert)
+ein und findet ähnliche Passagen über einen IVF-Index.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+import joblib
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+
+from app.config import (
+    PASSAGE_INDEX_DIR,
+    PASSAGE_WORDS,
+    PASSAGE_OVERLAP,
+    PASSAGE_DIMENSIONS,
+    PASSAGE_HASH_FEATURES,
+    PASSAGE_TRAIN_SAMPLE,
+    PASSAGE_NPROBE
+)
+from app.utils.text.text_processor import text_processor
+from .postings import load_manifest, save_manifest
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+EMBED_BATCH_SIZE = 1000
+
+def _analyze(text: str) -> List[str]:
+    """Gestemmte Tokens für den HashingVectorizer (picklebar, ohne Zustand)"""
+    return [stem for stem, count in text_processor.analyze(text).items() for _ in range(count)]
+
+def split_passages(text: str, words: int = PASSAGE_WORDS, overlap: int = PASSAGE_OVERLAP) -> List[str]:
+    """
+    Zerlegt einen Text in überlappende Passagen fester Wortanzahl.
+
+    Args:
+        text: Extrahierter Text
+        words: Wörter je Passage
+        overlap: Wörter, die sich aufeinanderfolgende Passagen teilen
+
+    Returns:
+        List[str]: Passagen in Textreihenfolge
+    """
+    tokens = text.split()
+    step = max(1, words - overlap)
+    passages = []
+    for start in range(0, len(tokens), step):
+        passages.append(' '.join(tokens[start:start + words]))
+        if start + words >= len(tokens):
+            break
+    return passages
+
+class PassageIndex:
+    """
+    Ähnlichkeitssuche über Textpassagen.
+
+    Die Einbettung ist eine LSA (TF-IDF über gehashte Wortstämme, danach
+    TruncatedSVD), die auf einer Stichprobe des eigenen Korpus trainiert
+    wird. Die normierten Vektoren liegen als float32-Matrix in einer
+    Datei, die per memmap gelesen wird. Ein IVF-Index (k-Means-Zentroiden
+    mit invertierten Listen) beschränkt die Suche auf die nächsten Listen.
+
+    Neue Dokumente werden mit dem bestehenden Modell eingebettet und
+    angehängt; ein vollständiger Neuaufbau trainiert Modell und Zentroiden
+    neu und schaltet danach atomar auf den neuen Build um.
+    """
+
+    def __init__(
+        self,
+        directory: Path = PASSAGE_INDEX_DIR,
+        dimensions: int = PASSAGE_DIMENSIONS,
+        nprobe: int = PASSAGE_NPROBE
+    ):
+        self.directory = Path(directory)
+        self.dimensions = dimensions
+        self.nprobe = nprobe
+        self.vectorizer = HashingVectorizer(
+            analyzer=_analyze,
+            n_features=PASSAGE_HASH_FEATURES,
+            alternate_sign=False,
+            norm=None
+        )
+        self._lock = threading.RLock()
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self._added_during_rebuild: Optional[List[Tuple[str, str]]] = None
+        self.status = {"rebuilding": False, "documents": 0, "passages": 0,
+                       "started_at": None, "completed_at": None, "error": None}
+        self._clear_state()
+        self._load()
+
+    @property
+    def ready(self) -> bool:
+        return self.svd is not None
+
+    @property
+    def accepting(self) -> bool:
+        """Ob add() Passagen übernimmt (Build vorhanden oder Neuaufbau läuft)"""
+        return self.ready or self._added_during_rebuild is not None
+
+    def add(self, url: str, text: str) -> int:
+        """
+        Nimmt die Passagen eines Dokuments auf (ersetzt frühere Passagen).
+
+        Vor dem ersten Neuaufbau existiert noch kein Modell; die Dokumente
+        werden dann beim Neuaufbau aus der Datenbank übernommen.
+
+        Args:
+            url: URL des Dokuments
+            text: Extrahierter Text
+
+        Returns:
+            int: Anzahl aufgenommener Passagen
+        """
+        passages = split_passages(text) if text else []
+        with self._lock:
+            if self._added_during_rebuild is not None:
+                self._added_during_rebuild.append((url, text))
+            if not self.ready:
+                return 0
+            model = (self.tfidf, self.svd, self.centroids)
+
+        vectors = self._embed(passages, model[0], model[1]) if passages else None
+
+        with self._lock:
+            # Während der Einbettung wurde auf einen neuen Build umgeschaltet
+            if self.svd is not model[1]:
+                return 0
+            self._delete_locked(url)
+            if vectors is not None:
+                self._append_locked(url, passages, vectors)
+        return len(passages)
+
+    def delete(self, url: str) -> bool:
+        """Entfernt die Passagen eines Dokuments"""
+        with self._lock:
+            return self._delete_locked(url)
+
+    def delete_many(self, urls: Iterable[str]) -> int:
+        """Entfernt die Passagen mehrerer Dokumente"""
+        with self._lock:
+            return sum(self._delete_locked(url) for url in urls)
+
+    def similar(self, text: str, limit: int = 10) -> List[Dict]:
+        """
+        Sucht die ähnlichsten Passagen zu einem Text.
+
+        Args:
+            text: Anfrage, z.B. eine Klausel
+            limit: Maximale Trefferanzahl
+
+        Returns:
+            List[Dict]: Passagen mit url, passage, text und score (Kosinus)
+        """
+        with self._lock:
+            if not self.ready or not self.passage_urls:
+                return []
+            tfidf, svd = self.tfidf, self.svd
+
+        query = self._embed([text], tfidf, svd)[0]
+
+        with self._lock:
+            # Zwischenzeitlich auf einen neuen Build umgeschaltet
+            if self.svd is not svd:
+                return self.similar(text, limit)
+
+            probes = np.argsort(-(self.centroids @ query))[:self.nprobe]
+            candidates = np.concatenate([np.asarray(self.lists[probe], dtype=np.int64) for probe in probes])
+            if self.deleted:
+                candidates = candidates[~np.isin(candidates, list(self.deleted))]
+            if candidates.size == 0:
+                return []
+
+            scores = self._vectors()[candidates] @ query
+            top = np.argsort(-scores)[:limit]
+            return [
+                {**self._read_meta(int(candidates[i])), "score": float(scores[i])}
+                for i in top
+            ]
+
+    def start_rebuild(self, document_source: Callable[[], AsyncIterator[Tuple[str, str]]]) -> bool:
+        """
+        Startet den vollständigen Neuaufbau im Hintergrund.
+
+        Args:
+            document_source: Liefert bei jedem Aufruf einen neuen Iterator
+                über (URL, Text); er wird zweimal durchlaufen
+
+        Returns:
+            bool: False, wenn bereits ein Neuaufbau läuft
+        """
+        if self._rebuild_task is not None and not self._rebuild_task.done():
+            return False
+        self._rebuild_task = asyncio.create_task(self.rebuild(document_source))
+        return True
+
+    async def rebuild(self, document_source: Callable[[], AsyncIterator[Tuple[str, str]]]):
+        """Trainiert Modell und Zentroiden neu und bettet alle Passagen ein"""
+        self.status.update({"rebuilding": True, "documents": 0, "passages": 0,
+                            "started_at": time.time(), "completed_at": None, "error": None})
+        with self._lock:
+            self._added_during_rebuild = []
+            build = f"build_{self.next_build:06d}"
+            self.next_build += 1
+        build_dir = self.directory / build
+
+        try:
+            # Durchlauf 1: Stichprobe von Passagen für das Training
+            sample, seen = [], 0
+            async for _, text in document_source():
+                for passage in split_passages(text):
+                    seen += 1
+                    if len(sample) < PASSAGE_TRAIN_SAMPLE:
+                        sample.append(passage)
+                    elif random.random() < PASSAGE_TRAIN_SAMPLE / seen:
+                        sample[random.randrange(PASSAGE_TRAIN_SAMPLE)] = passage
+            if not sample:
+                raise ValueError("Keine Dokumente mit extrahiertem Text vorhanden")
+
+            tfidf, svd, centroids = await asyncio.to_thread(self._train, sample)
+            del sample
+
+            # Durchlauf 2: alle Passagen einbetten und in den neuen Build schreiben
+            build_dir.mkdir(parents=True, exist_ok=True)
+            joblib.dump((tfidf, svd), build_dir / "model.joblib")
+            np.save(build_dir / "centroids.npy", centroids)
+            writer = _BuildWriter(build_dir)
+            batch: List[Tuple[str, int, str]] = []
+            async for url, text in document_source():
+                batch.extend(
+                    (url, number, passage) for number, passage in enumerate(split_passages(text))
+                )
+                self.status["documents"] += 1
+                if len(batch) >= EMBED_BATCH_SIZE:
+                    await asyncio.to_thread(writer.write, batch, self._embed_batch(tfidf, svd), centroids)
+                    self.status["passages"] += len(batch)
+                    batch = []
+            if batch:
+                await asyncio.to_thread(writer.write, batch, self._embed_batch(tfidf, svd), centroids)
+                self.status["passages"] += len(batch)
+            writer.close()
+
+            with self._lock:
+                old_build = self.build
+                self._open_build(build)
+                save_manifest(self.directory / MANIFEST_FILE, {
+                    "current": build, "next_build": self.next_build
+                })
+                added, self._added_during_rebuild = self._added_during_rebuild, None
+            if old_build:
+                shutil.rmtree(self.directory / old_build, ignore_errors=True)
+
+            # Während des Neuaufbaus angereicherte Dokumente nachtragen
+            for url, text in added:
+                await asyncio.to_thread(self.add, url, text)
+
+            self.status["completed_at"] = time.time()
+            logger.info(
+                f"Passagen-Index neu aufgebaut: {self.status['passages']} Passagen "
+                f"aus {self.status['documents']} Dokumenten"
+            )
+
+        except Exception as e:
+            logger.error(f"Fehler beim Neuaufbau des Passagen-Index: {str(e)}")
+            self.status["error"] = str(e)
+            shutil.rmtree(build_dir, ignore_errors=True)
+        finally:
+            with self._lock:
+                self._added_during_rebuild = None
+            self.status["rebuilding"] = False
+
+    def get_status(self) -> Dict:
+        """Gibt Zustand und Fortschritt des Index zurück"""
+        with self._lock:
+            return {
+                **self.status,
+                "ready": self.ready,
+                "build": self.build,
+                "indexed_passages": len(self.passage_urls) - len(self.deleted),
+                "lists": len(self.lists)
+            }
+
+    def close(self):
+        """Schreibt offene Dateien des aktuellen Builds"""
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def _train(self, sample: List[str]):
+        """Trainiert TF-IDF, SVD und die IVF-Zentroiden auf der Stichprobe"""
+        counts = self.vectorizer.transform(sample)
+        tfidf = TfidfTransformer(sublinear_tf=True).fit(counts)
+        weighted = tfidf.transform(counts)
+        components = min(self.dimensions, weighted.shape[0] - 1, weighted.shape[1] - 1)
+        svd = TruncatedSVD(n_components=max(1, components), random_state=0).fit(weighted)
+
+        embedded = self._normalize(svd.transform(weighted).astype(np.float32))
+        lists = max(1, min(int(np.sqrt(len(sample))), len(sample)))
+        kmeans = MiniBatchKMeans(n_clusters=lists, random_state=0, n_init=3).fit(embedded)
+        centroids = self._normalize(kmeans.cluster_centers_.astype(np.float32))
+        return tfidf, svd, centroids
+
+    def _embed(self, passages: List[str], tfidf, svd) -> np.ndarray:
+        weighted = tfidf.transform(self.vectorizer.transform(passages))
+        return self._normalize(svd.transform(weighted).astype(np.float32))
+
+    def _embed_batch(self, tfidf, svd) -> Callable:
+        return lambda passages: self._embed(passages, tfidf, svd)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _append_locked(self, url: str, passages: List[str], vectors: np.ndarray):
+        first_id = len(self.passage_urls)
+        assignments = np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+        offsets = self._writer.append(url, passages, vectors, assignments)
+
+        for i, (offset, list_id) in enumerate(zip(offsets, assignments)):
+            self.meta_offsets.append(offset)
+            self.passage_urls.append(url)
+            self.lists[int(list_id)].append(first_id + i)
+        self.url_passages[url] = list(range(first_id, first_id + len(passages)))
+
+    def _delete_locked(self, url: str) -> bool:
+        passage_ids = self.url_passages.pop(url, None)
+        if not passage_ids:
+            return False
+        self.deleted.update(passage_ids)
+        # Nur die neuen IDs an das Lösch-Journal anhängen statt die ganze Menge neu zu schreiben
+        self._writer.delete(passage_ids)
+        return True
+
+    def _vectors(self) -> np.ndarray:
+        """Memmap der Vektormatrix in aktueller Größe"""
+        rows = len(self.passage_urls)
+        if self._vector_map is None or self._vector_map.shape[0] != rows:
+            self._writer.flush()
+            self._vector_map = np.memmap(
+                self.directory / self.build / "vectors.f32",
+                dtype=np.float32, mode="r", shape=(rows, self.svd.n_components)
+            )
+        return self._vector_map
+
+    def _read_meta(self, passage_id: int) -> Dict:
+        self._writer.flush()
+        with open(self.directory / self.build / "passages.ndjson", "rb") as meta:
+            meta.seek(self.meta_offsets[passage_id])
+            return json.loads(meta.readline())
+
+    def _clear_state(self):
+        self.build: Optional[str] = None
+        self.next_build = 0
+        self.tfidf = None
+        self.svd = None
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[List[int]] = []
+        self.meta_offsets: List[int] = []
+        self.passage_urls: List[str] = []
+        self.url_passages: Dict[str, List[int]] = {}
+        self.deleted = set()
+        self._vector_map = None
+        self._writer: Optional[_BuildWriter] = None
+
+    def _open_build(self, build: str):
+        """Lädt einen Build (Modell, Zentroiden, Listen, Metadaten-Offsets)"""
+        next_build = self.next_build
+        if self._writer is not None:
+            self._writer.close()
+        self._clear_state()
+        self.next_build = next_build
+        build_dir = self.directory / build
+
+        self.tfidf, self.svd = joblib.load(build_dir / "model.joblib")
+        self.centroids = np.load(build_dir / "centroids.npy")
+        self.lists = [[] for _ in range(len(self.centroids))]
+        assignments = np.fromfile(build_dir / "assignments.i32", dtype=np.int32)
+        for passage_id, list_id in enumerate(assignments):
+            self.lists[int(list_id)].append(passage_id)
+
+        with open(build_dir / "passages.ndjson", "rb") as meta:
+            offset = 0
+            for passage_id, line in enumerate(meta):
+                url = json.loads(line)["url"]
+                self.meta_offsets.append(offset)
+                self.passage_urls.append(url)
+                self.url_passages.setdefault(url, []).append(passage_id)
+                offset += len(line)
+
+        if (build_dir / "deleted.npy").exists():
+            # Löschliste früherer Versionen (vollständig neu geschrieben)
+            self.deleted = set(np.load(build_dir / "deleted.npy").tolist())
+        if (build_dir / "deleted.i64").exists():
+            self.deleted.update(np.fromfile(build_dir / "deleted.i64", dtype=np.int64).tolist())
+        if self.deleted:
+            for url in list(self.url_passages):
+                if all(passage_id in self.deleted for passage_id in self.url_passages[url]):
+                    del self.url_passages[url]
+
+        self.build = build
+        self._writer = _BuildWriter(build_dir)
+
+    def _load(self):
+        try:
+            manifest = load_manifest(self.directory / MANIFEST_FILE)
+            self.next_build = manifest.get("next_build", 0)
+            if manifest.get("current"):
+                self._open_build(manifest["current"])
+                logger.info(f"Passagen-Index geladen ({len(self.passage_urls)} Passagen)")
+        except Exception as e:
+            logger.error(f"Fehler beim Laden des Passagen-Index: {str(e)}")
+
+class _BuildWriter:
+    """Hängt Vektoren, Listenzuordnung, Passagentexte und Löschungen an einen Build an"""
+
+    def __init__(self, build_dir: Path):
+        self.vectors = open(build_dir / "vectors.f32", "ab")
+        self.assignments = open(build_dir / "assignments.i32", "ab")
+        self.meta = open(build_dir / "passages.ndjson", "ab")
+        self.deleted = open(build_dir / "deleted.i64", "ab")
+
+    def write(self, batch: List[Tuple[str, int, str]], embed: Callable, centroids: np.ndarray):
+        """Bettet einen Batch aus (URL, Passagennummer, Passage) ein und schreibt ihn"""
+        vectors = embed([passage for _, _, passage in batch])
+        assignments = np.argmax(vectors @ centroids.T, axis=1).astype(np.int32)
+        self._write(batch, vectors, assignments)
+
+    def append(self, url: str, passages: List[str], vectors: np.ndarray, assignments: np.ndarray) -> List[int]:
+        """Schreibt die Passagen eines Dokuments und liefert die Metadaten-Offsets"""
+        return self._write(
+            [(url, number, passage) for number, passage in enumerate(passages)], vectors, assignments
+        )
+
+    def delete(self, passage_ids: List[int]):
+        """Hängt gelöschte Passagen-IDs an das Lösch-Journal an"""
+        self.deleted.write(np.asarray(passage_ids, dtype=np.int64).tobytes())
+        self.deleted.flush()
+
+    def _write(self, batch, vectors: np.ndarray, assignments: np.ndarray) -> List[int]:
+        offsets = []
+        for url, number, passage in batch:
+            offsets.append(self.meta.tell())
+            line = json.dumps({"url": url, "passage": number, "text": passage}, ensure_ascii=False)
+            self.meta.write(line.encode("utf-8") + b"\n")
+        self.vectors.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        self.assignments.write(assignments.astype(np.int32).tobytes())
+        return offsets
+
+    def flush(self):
+        for handle in (self.vectors, self.assignments, self.meta, self.deleted):
+            handle.flush()
+
+    def close(self):
+        for handle in (self.vectors, self.assignments, self.meta, self.deleted):
+            handle.close()
+
+# Globale Instanz
+passage_index = PassageIndex()
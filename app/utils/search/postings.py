@@ -0,0 +1,209 @@
+"""
+Postings Storage.
+Varint-Kodierung und unveränderliche On-Disk-Segmente des Volltextindex.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Werte bis 2^35 (Dokument-Abstände und Termhäufigkeiten passen in uint32)
+MAX_VARINT_BYTES = 5
+
+def varint_lengths(values: np.ndarray) -> np.ndarray:
+    """Anzahl Bytes je Wert in der 7-Bit-Varint-Kodierung"""
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = np.ones(values.shape, dtype=np.int64)
+    for k in range(1, MAX_VARINT_BYTES):
+        lengths += values >= np.uint64(1 << (7 * k))
+    return lengths
+
+def encode_varints(values: np.ndarray) -> np.ndarray:
+    """
+    Kodiert vorzeichenlose Ganzzahlen als Varints (LEB128), vektorisiert.
+
+    Args:
+        values: Zu kodierende Werte
+
+    Returns:
+        np.ndarray: Kodierte Bytes (uint8)
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = varint_lengths(values)
+    starts = np.cumsum(lengths) - lengths
+    encoded = np.empty(int(lengths.sum()), dtype=np.uint8)
+
+    for k in range(MAX_VARINT_BYTES):
+        mask = lengths > k
+        if not mask.any():
+            break
+        payload = (values[mask] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        continuation = (lengths[mask] > k + 1).astype(np.uint64) << np.uint64(7)
+        encoded[starts[mask] + k] = (payload | continuation).astype(np.uint8)
+
+    return encoded
+
+def decode_varints(data: np.ndarray) -> np.ndarray:
+    """
+    Dekodiert eine Folge von Varints, vektorisiert über alle Bytes.
+
+    Args:
+        data: Kodierte Bytes (uint8, z.B. ein Ausschnitt einer memmap)
+
+    Returns:
+        np.ndarray: Dekodierte Werte (int64)
+    """
+    data = np.asarray(data, dtype=np.uint8)
+    if data.size == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    ends = np.flatnonzero(data < 0x80)
+    lengths = np.diff(ends, prepend=-1)
+    value_ids = np.repeat(np.arange(ends.size), lengths)
+    positions = np.arange(data.size) - np.repeat(ends - lengths + 1, lengths)
+    parts = (data & 0x7F).astype(np.int64) << (7 * positions)
+
+    # Für Werte < 2^53 ist die Summe über float64 exakt
+    return np.bincount(value_ids, weights=parts, minlength=ends.size).astype(np.int64)
+
+class Segment:
+    """
+    Unveränderliches Indexsegment auf der Festplatte.
+
+    Pro Term liegen die Dokument-Abstände und Termhäufigkeiten als Varints
+    hintereinander in postings.bin, das per memmap gelesen wird. Nur das
+    Lexikon und die Dokumentlängen werden in den Speicher geladen; gelöschte
+    Dokumente markiert deleted.npy (Tombstones bis zum nächsten Merge).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.name = self.path.name
+        self.urls: List[str] = (self.path / "urls.txt").read_text(encoding="utf-8").splitlines()
+        self.doc_lengths = np.load(self.path / "doc_lengths.npy")
+        self.deleted = np.load(self.path / "deleted.npy")
+        self.offsets = np.load(self.path / "offsets.npy")
+        self.document_frequencies = np.load(self.path / "df.npy")
+        terms = (self.path / "terms.txt").read_text(encoding="utf-8").splitlines()
+        self.term_ids: Dict[str, int] = {term: i for i, term in enumerate(terms)}
+
+        postings_file = self.path / "postings.bin"
+        if postings_file.stat().st_size:
+            self.postings_data = np.memmap(postings_file, dtype=np.uint8, mode="r")
+        else:
+            self.postings_data = np.zeros(0, dtype=np.uint8)
+
+    @property
+    def num_docs(self) -> int:
+        return len(self.urls)
+
+    @property
+    def live_docs(self) -> int:
+        return int(self.num_docs - self.deleted.sum())
+
+    @property
+    def live_length(self) -> int:
+        return int(self.doc_lengths[~self.deleted].sum())
+
+    def document_frequency(self, term: str) -> int:
+        term_id = self.term_ids.get(term)
+        return 0 if term_id is None else int(self.document_frequencies[term_id])
+
+    def postings(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Liest die Postings eines Terms.
+
+        Returns:
+            Optional[Tuple[np.ndarray, np.ndarray]]: (lokale Dokument-IDs,
+            Termhäufigkeiten) oder None, wenn der Term fehlt
+        """
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return None
+
+        df = int(self.document_frequencies[term_id])
+        values = decode_varints(self.postings_data[self.offsets[term_id]:self.offsets[term_id + 1]])
+        return np.cumsum(values[:df]), values[df:]
+
+    def mark_deleted(self, local_ids):
+        self.deleted[local_ids] = True
+
+    def save_deleted(self):
+        _save_array(self.path / "deleted.npy", self.deleted)
+
+    @classmethod
+    def write(
+        cls,
+        path: Path,
+        urls: List[str],
+        doc_lengths: List[int],
+        postings: Dict[str, Tuple[List[int], List[int]]],
+        deleted: Optional[np.ndarray] = None
+    ) -> "Segment":
+        """
+        Schreibt ein neues Segment.
+
+        Args:
+            path: Zielverzeichnis (wird angelegt)
+            urls: URL je lokaler Dokument-ID
+            doc_lengths: Tokenanzahl je Dokument
+            postings: Term -> (aufsteigende lokale IDs, Termhäufigkeiten)
+            deleted: Bereits gelöschte Dokumente
+
+        Returns:
+            Segment: Das geöffnete Segment
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        terms = sorted(postings)
+
+        values = []
+        value_counts = np.zeros(len(terms), dtype=np.int64)
+        df = np.zeros(len(terms), dtype=np.uint32)
+        for i, term in enumerate(terms):
+            docs, tfs = postings[term]
+            docs = np.asarray(docs, dtype=np.int64)
+            values.append(np.diff(docs, prepend=0))
+            values.append(np.asarray(tfs, dtype=np.int64))
+            df[i] = len(docs)
+            value_counts[i] = 2 * len(docs)
+
+        all_values = np.concatenate(values) if values else np.zeros(0, dtype=np.int64)
+        byte_ends = np.cumsum(varint_lengths(all_values))
+        offsets = np.zeros(len(terms) + 1, dtype=np.uint64)
+        if len(terms):
+            offsets[1:] = byte_ends[np.cumsum(value_counts) - 1]
+
+        encode_varints(all_values).tofile(path / "postings.bin")
+        (path / "terms.txt").write_text("\n".join(terms), encoding="utf-8")
+        (path / "urls.txt").write_text("\n".join(urls), encoding="utf-8")
+        _save_array(path / "offsets.npy", offsets)
+        _save_array(path / "df.npy", df)
+        _save_array(path / "doc_lengths.npy", np.asarray(doc_lengths, dtype=np.uint32))
+        _save_array(
+            path / "deleted.npy",
+            np.zeros(len(urls), dtype=bool) if deleted is None else deleted
+        )
+        return cls(path)
+
+def _save_array(path: Path, array: np.ndarray):
+    """Speichert ein Array atomar"""
+    tmp_path = path.with_name(path.stem + ".tmp.npy")
+    np.save(tmp_path, array)
+    tmp_path.replace(path)
+
+def load_manifest(path: Path) -> Dict:
+    if not path.exists():
+        return {"segments": [], "next_segment": 0}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+def save_manifest(path: Path, manifest: Dict):
+    """Schreibt das Manifest atomar (gültige Segmentliste zu jedem Zeitpunkt)"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(manifest), encoding="utf-8")
+    tmp_path.replace(path)
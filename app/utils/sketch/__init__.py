@@ -0,0 +1,3 @@
+from .hyperloglog import HyperLogLog
+
+__all__ = ['HyperLogLog']
@@ -0,0 +1,82 @@
+"""
+Probabilistic Sketches.
+HyperLogLog für die Schätzung der Anzahl eindeutiger Werte mit festem Speicher.
+"""
+
+import hashlib
+import math
+from typing import Dict, Iterable, Tuple
+
+class HyperLogLog:
+    """
+    HyperLogLog-Sketch (Flajolet et al.) mit 64-Bit-Hashes.
+
+    Bei precision=12 belegen die 4096 Register wenige KB, der relative
+    Standardfehler liegt bei etwa 1,6 %. Register lassen sich einzeln per
+    Maximum zusammenführen, daher kann der Sketch auch als Unterdokument
+    in MongoDB mit $max fortgeschrieben werden.
+    """
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision muss zwischen 4 und 16 liegen")
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+
+    def register_for(self, value: str) -> Tuple[int, int]:
+        """
+        Berechnet Register-Index und Rang für einen Wert.
+
+        Args:
+            value: Zu zählender Wert
+
+        Returns:
+            Tuple[int, int]: (Register-Index, Position des ersten 1-Bits)
+        """
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest()
+        hashed = int.from_bytes(digest, 'big')
+        index = hashed >> (64 - self.precision)
+        remaining = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remaining.bit_length() + 1
+        return index, rank
+
+    def add(self, value: str) -> bool:
+        """Fügt einen Wert hinzu; True, wenn sich ein Register geändert hat"""
+        index, rank = self.register_for(value)
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def update(self, values: Iterable[str]):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "HyperLogLog"):
+        """Vereinigt einen Sketch gleicher Präzision mit diesem"""
+        if other.precision != self.precision:
+            raise ValueError("Sketches mit unterschiedlicher Präzision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        """Schätzt die Anzahl eindeutiger Werte"""
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size ** 2 / sum(2.0 ** -register for register in self.registers)
+
+        # Kleine Kardinalitäten: Linear Counting über leere Register
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.size and zeros:
+            estimate = self.size * math.log(self.size / zeros)
+        return int(round(estimate))
+
+    def to_dict(self) -> Dict[str, int]:
+        """Dünn besetzte Darstellung (nur belegte Register) für die Speicherung"""
+        return {str(index): rank for index, rank in enumerate(self.registers) if rank}
+
+    @classmethod
+    def from_dict(cls, registers: Dict[str, int], precision: int = 12) -> "HyperLogLog":
+        sketch = cls(precision)
+        for index, rank in (registers or {}).items():
+            sketch.registers[int(index)] = rank
+        return sketch
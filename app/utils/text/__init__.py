@@ -1,3 +1,9 @@
 from .text_processor import text_processor, TextProcessor
+from .corpus_stats import corpus_stats, CorpusStatistics
+from .fingerprint import near_duplicate_index, NearDuplicateIndex, simhash
 
-__all__ = ['text_processor', 'TextProcessor']
+__all__ = [
+    'text_processor', 'TextProcessor',
+    'corpus_stats', 'CorpusStatistics',
+    'near_duplicate_index', 'NearDuplicateIndex', 'simhash'
+]
@@ -0,0 +1,147 @@
+"""
+Corpus Statistics.
+Inkrementell gepflegte Dokumentfrequenzen für die TF-IDF-Keyword-Extraktion.
+"""
+
+import logging
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Iterable, List
+
+import numpy as np
+
+from app.config import CORPUS_STATS_FILE, CORPUS_STATS_BUCKETS, CORPUS_STATS_SAVE_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+class CorpusStatistics:
+    """
+    Dokumentfrequenz-Tabelle über den gesamten Korpus.
+
+    Terme werden per CRC32 auf ein festes Zähler-Array abgebildet, so dass
+    Speicherbedarf und Persistenz unabhängig von der Vokabulargröße bleiben.
+    Kollisionen verfälschen die IDF-Werte nur geringfügig.
+    """
+
+    def __init__(
+        self,
+        path: Path = CORPUS_STATS_FILE,
+        num_buckets: int = CORPUS_STATS_BUCKETS,
+        save_interval: int = CORPUS_STATS_SAVE_INTERVAL
+    ):
+        self.path = Path(path)
+        self.num_buckets = num_buckets
+        self.save_interval = save_interval
+        self.document_frequencies = np.zeros(num_buckets, dtype=np.uint32)
+        self.document_count = 0
+        self._unsaved_documents = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def buckets(self, terms: Iterable[str]) -> np.ndarray:
+        """
+        Bildet Terme auf ihre Buckets im Zähler-Array ab.
+
+        Args:
+            terms: Zu hashende Terme
+
+        Returns:
+            np.ndarray: Bucket-Indizes in Reihenfolge der Terme
+        """
+        return np.fromiter(
+            (zlib.crc32(term.encode('utf-8')) % self.num_buckets for term in terms),
+            dtype=np.int64
+        )
+
+    def idf(self, buckets: np.ndarray) -> np.ndarray:
+        """
+        Berechnet geglättete IDF-Werte für die übergebenen Buckets.
+
+        Args:
+            buckets: Bucket-Indizes aus buckets()
+
+        Returns:
+            np.ndarray: IDF-Wert je Bucket
+        """
+        df = self.document_frequencies[buckets].astype(np.float64)
+        return np.log((self.document_count + 1) / (df + 1)) + 1.0
+
+    def add_document(self, tokens: Iterable[str]):
+        """
+        Zählt die Terme eines neu aufgenommenen Dokuments.
+
+        Args:
+            tokens: Tokens des Dokuments (Mehrfachvorkommen zählen einmal)
+        """
+        self.add_documents([tokens])
+
+    def add_documents(self, documents: Iterable[Iterable[str]]):
+        """
+        Zählt die Terme mehrerer Dokumente in einem Schritt.
+
+        Args:
+            documents: Token-Listen je Dokument
+        """
+        bucket_lists: List[np.ndarray] = [
+            np.unique(self.buckets(set(tokens))) for tokens in documents
+        ]
+        if not bucket_lists:
+            return
+
+        with self._lock:
+            for buckets in bucket_lists:
+                self.document_frequencies[buckets] += 1
+            self.document_count += len(bucket_lists)
+            self._unsaved_documents += len(bucket_lists)
+            should_save = self._unsaved_documents >= self.save_interval
+
+        if should_save:
+            self.save()
+
+    def save(self):
+        """Schreibt die Tabelle atomar auf die Festplatte"""
+        try:
+            with self._lock:
+                frequencies = self.document_frequencies.copy()
+                document_count = self.document_count
+                self._unsaved_documents = 0
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.stem + '.tmp.npz')
+            np.savez_compressed(
+                tmp_path,
+                document_frequencies=frequencies,
+                document_count=np.array([document_count], dtype=np.int64)
+            )
+            os.replace(tmp_path, self.path)
+            logger.debug(f"Korpus-Statistiken gespeichert ({document_count} Dokumente)")
+
+        except Exception as e:
+            logger.error(f"Fehler beim Speichern der Korpus-Statistiken: {str(e)}")
+
+    def _load(self):
+        """Lädt eine zuvor gespeicherte Tabelle"""
+        if not self.path.exists():
+            return
+
+        try:
+            with np.load(self.path) as data:
+                frequencies = data['document_frequencies']
+                if frequencies.shape[0] != self.num_buckets:
+                    logger.warning(
+                        "Bucket-Anzahl der Korpus-Statistiken geändert, "
+                        "beginne mit leerer Tabelle"
+                    )
+                    return
+                self.document_frequencies = frequencies.astype(np.uint32)
+                self.document_count = int(data['document_count'][0])
+
+            logger.info(f"Korpus-Statistiken geladen ({self.document_count} Dokumente)")
+
+        except Exception as e:
+            logger.error(f"Fehler beim Laden der Korpus-Statistiken: {str(e)}")
+
+# Globale Instanz
+corpus_stats = CorpusStatistics()
@@ -5,13 +5,24 @@ Enthält Funktionen für Textanalyse und -verarbeitung.
 
 import logging
 import hashlib
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Tuple, Sequence
 import nltk
 import numpy as np
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
+from nltk.stem.snowball import GermanStemmer
+
+from app.config import KEYWORD_TOP_K, STEM_CACHE_SIZE
+from .corpus_stats import corpus_stats
 
 logger = logging.getLogger(__name__)
 
+# Wörter aus mindestens drei Buchstaben (inkl. Umlaute), ohne Ziffern
+TOKEN_PATTERN = re.compile(r"[^\W\d_]{3,}")
+
 class TextProcessor:
     """Klasse für Textverarbeitung und -analyse"""
     
@@ -19,6 +30,8 @@ class TextProcessor:
         self.stop_words = set()
         self.term_cache = {}
         self._initialize_nltk()
+        # Snowball ist reines Python, daher werden Wortstämme zwischengespeichert
+        self._stem = lru_cache(maxsize=STEM_CACHE_SIZE)(GermanStemmer().stem)
         
     def _initialize_nltk(self):
         """Initialisiert NLTK-Komponenten"""
@@ -31,6 +44,96 @@ class TextProcessor:
             logger.error(f"Fehler bei NLTK-Initialisierung: {e}")
             self.stop_words = set()
 
+    def tokenize(self, text: str) -> List[str]:
+        """
+        Zerlegt einen Text in kleingeschriebene Tokens ohne Stoppwörter.
+        
+        Args:
+            text: Zu zerlegender Text
+            
+        Returns:
+            List[str]: Tokens in Textreihenfolge
+        """
+        if not text:
+            return []
+        return [
+            token for token in TOKEN_PATTERN.findall(text.lower())
+            if token not in self.stop_words
+        ]
+
+    def analyze(self, text: str) -> Dict[str, int]:
+        """
+        Zerlegt einen Text in deutsche Wortstämme für die Volltextsuche.
+        
+        Args:
+            text: Zu analysierender Text
+            
+        Returns:
+            Dict[str, int]: Häufigkeit je Wortstamm
+        """
+        stems = Counter()
+        for token, count in Counter(self.tokenize(text)).items():
+            stems[self._stem(token)] += count
+        return dict(stems)
+
+    def extract_keywords(self, text: str, top_k: int = KEYWORD_TOP_K) -> List[Tuple[str, float]]:
+        """
+        Extrahiert Keywords per TF-IDF gegen die Korpus-Statistiken.
+        
+        Args:
+            text: Zu analysierender Text
+            top_k: Maximale Anzahl Keywords
+            
+        Returns:
+            List[Tuple[str, float]]: Keywords mit Score, absteigend sortiert
+        """
+        return self.extract_keywords_batch([text], top_k=top_k)[0]
+
+    def extract_keywords_batch(
+        self,
+        texts: Sequence[str],
+        top_k: int = KEYWORD_TOP_K
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Extrahiert Keywords für mehrere Texte mit einem gemeinsamen IDF-Lookup.
+        
+        Args:
+            texts: Zu analysierende Texte
+            top_k: Maximale Anzahl Keywords je Text
+            
+        Returns:
+            List[List[Tuple[str, float]]]: Keywords je Text
+        """
+        term_counts = [Counter(self.tokenize(text)) for text in texts]
+        
+        # Vokabular des gesamten Batches einmalig nachschlagen
+        vocabulary = {}
+        for counts in term_counts:
+            for term in counts:
+                vocabulary.setdefault(term, len(vocabulary))
+        if not vocabulary:
+            return [[] for _ in texts]
+        idf = corpus_stats.idf(corpus_stats.buckets(vocabulary))
+        
+        results = []
+        for counts in term_counts:
+            if not counts:
+                results.append([])
+                continue
+                
+            terms = list(counts)
+            tf = np.fromiter(counts.values(), dtype=np.float64, count=len(terms))
+            scores = tf / tf.sum() * idf[[vocabulary[term] for term in terms]]
+            
+            if len(terms) > top_k:
+                top = np.argpartition(-scores, top_k)[:top_k]
+            else:
+                top = np.arange(len(terms))
+            top = top[np.argsort(-scores[top], kind='stable')]
+            results.append([(terms[i], float(scores[i])) for i in top])
+            
+        return results
+
     # ... [Rest der TextProcessor Klasse aus utils.py]
 
 # Globale Instanz
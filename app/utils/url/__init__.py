@@ -0,0 +1,3 @@
+from .url_canonicalizer import url_canonicalizer, UrlCanonicalizer
+
+__all__ = ['url_canonicalizer', 'UrlCanonicalizer']
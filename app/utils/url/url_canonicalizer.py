@@ -0,0 +1,113 @@
+"""
+URL Canonicalization Utilities.
+Bildet gleichwertige Schreibweisen einer URL auf eine kanonische Form ab.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from app.config import (
+    URL_IGNORED_PARAMETERS,
+    URL_IGNORED_PARAMETER_PREFIXES,
+    URL_DEFAULT_CANONICALIZATION_RULE,
+    URL_CANONICALIZATION_RULES,
+    URL_RULE_CACHE_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+class UrlCanonicalizer:
+    """Klasse für die Normalisierung von Dokument-URLs"""
+
+    def __init__(self, rules: Optional[Dict[str, Dict]] = None, cache_size: int = URL_RULE_CACHE_SIZE):
+        self.rules = URL_CANONICALIZATION_RULES if rules is None else rules
+        # Begrenzter LRU-Cache: Suchergebnisse bringen laufend neue Hosts
+        self._cached_rule = lru_cache(maxsize=cache_size)(self._resolve_rule)
+
+    def canonicalize(self, url: str) -> str:
+        """
+        Erzeugt die kanonische Form einer URL.
+
+        Schema und Host werden kleingeschrieben, Standard-Ports, Fragmente,
+        Tracking- und Mirror-Parameter entfernt. Weitere Schritte (Schema
+        vereinheitlichen, www entfernen, abschließende Schrägstriche,
+        Parameter sortieren) steuern die Regeln der jeweiligen Domain.
+
+        Args:
+            url: Ursprüngliche URL
+
+        Returns:
+            str: Kanonische URL (bei Fehlern die unveränderte URL)
+        """
+        try:
+            parts = urlsplit(url.strip())
+            scheme = parts.scheme.lower()
+            host = (parts.hostname or '').lower()
+            rule = self.get_rule(host)
+
+            if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+                host = f"{host}:{parts.port}"
+            if rule['unify_scheme'] and scheme in DEFAULT_PORTS:
+                scheme = 'https'
+            if rule['strip_www'] and host.startswith('www.'):
+                host = host[4:]
+
+            path = parts.path or '/'
+            if rule['strip_trailing_slash'] and len(path) > 1:
+                path = path.rstrip('/') or '/'
+
+            return urlunsplit((scheme, host, path, self._canonical_query(parts.query, rule), ''))
+
+        except Exception as e:
+            logger.error(f"Fehler bei der URL-Kanonisierung von {url}: {str(e)}")
+            return url
+
+    def get_rule(self, host: str) -> Dict:
+        """
+        Ermittelt die Regeln für einen Host.
+
+        Regeln einer Domain gelten auch für deren Subdomains; die
+        spezifischste Domain gewinnt.
+
+        Args:
+            host: Hostname ohne Port
+
+        Returns:
+            Dict: Vollständiger Regelsatz
+        """
+        return self._cached_rule(host)
+
+    def _resolve_rule(self, host: str) -> Dict:
+        """Setzt den Regelsatz eines Hosts aus den Domain-Regeln zusammen"""
+        rule = dict(URL_DEFAULT_CANONICALIZATION_RULE)
+        labels = host.split('.')
+        # Von der allgemeinsten zur spezifischsten Domain überschreiben
+        for i in range(len(labels) - 1, -1, -1):
+            domain_rule = self.rules.get('.'.join(labels[i:]))
+            if domain_rule:
+                rule.update(domain_rule)
+        return rule
+
+    def _canonical_query(self, query: str, rule: Dict) -> str:
+        """Entfernt irrelevante Parameter und sortiert die übrigen"""
+        if not query:
+            return ''
+
+        keep = set(rule['keep_parameters'])
+        drop = URL_IGNORED_PARAMETERS.union(rule['drop_parameters'])
+        parameters = [
+            (key, value) for key, value in parse_qsl(query, keep_blank_values=True)
+            if key.lower() in keep or not (
+                key.lower() in drop or key.lower().startswith(URL_IGNORED_PARAMETER_PREFIXES)
+            )
+        ]
+        if rule['sort_query']:
+            parameters.sort()
+        return urlencode(parameters)
+
+# Globale Instanz
+url_canonicalizer = UrlCanonicalizer()
@@ -0,0 +1,158 @@
+"""
+Kommandozeile für Wartungsaufgaben des Document Scrapers.
+Verwendung: python cli.py export --format parquet --output documents.parquet
+            python cli.py import /mnt/archiv --term gutachten
+            python cli.py reconcile --fix
+            python cli.py migrate-encoding
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+async def run_export(args) -> int:
+    from app.core.exporter import corpus_exporter
+    from app.database.manager import db_manager
+
+    if not await db_manager.connect():
+        print("Datenbank nicht erreichbar", file=sys.stderr)
+        return 1
+    try:
+        query = corpus_exporter.build_query(args.term, args.file_type, args.start, args.end)
+        written = await corpus_exporter.export_to_file(
+            args.output, args.format, query, compress=not args.no_compress
+        )
+        print(f"{written} Bytes nach {args.output} geschrieben")
+        return 0
+    finally:
+        await db_manager.close()
+
+async def run_import(args) -> int:
+    from app.core.importer import directory_importer
+    from app.core.reprocessor import corpus_reprocessor
+    from app.database.manager import db_manager
+
+    if not args.directory.is_dir():
+        print(f"Kein Verzeichnis: {args.directory}", file=sys.stderr)
+        return 1
+    if args.workers:
+        directory_importer.workers = args.workers
+    if not await db_manager.connect():
+        print("Datenbank nicht erreichbar", file=sys.stderr)
+        return 1
+
+    async def report_progress():
+        while True:
+            await asyncio.sleep(args.progress_interval)
+            status = directory_importer.get_status()
+            print(
+                f"{status['processed']} Dateien ({status['files_per_second']}/s, "
+                f"{status['mb_per_second']} MB/s), {status['imported']} importiert, "
+                f"{status['duplicates']} Duplikate, zuletzt {status['last_path']}"
+            )
+
+    reporter = asyncio.create_task(report_progress())
+    try:
+        status = await directory_importer.run(
+            args.directory, term=args.term, resume=not args.restart, enrich=not args.no_enrich
+        )
+        print(
+            f"{status['imported']} Dokumente importiert, {status['duplicates']} Duplikate, "
+            f"{status['rejected']} ungültig, {status['failed']} Fehler "
+            f"in {status['elapsed_seconds']} s ({status['files_per_second']} Dateien/s)"
+        )
+        if status["error"]:
+            print(f"Abgebrochen: {status['error']}", file=sys.stderr)
+            return 1
+        if corpus_reprocessor.is_running:
+            print("Nachverarbeitung der importierten Dokumente läuft ...")
+            await corpus_reprocessor.task
+            reprocessed = corpus_reprocessor.get_status()
+            print(f"{reprocessed['processed']} Dokumente nachverarbeitet, {reprocessed['failed']} Fehler")
+        return 0
+    finally:
+        reporter.cancel()
+        await db_manager.close()
+
+async def run_reconcile(args) -> int:
+    from app.core.reconciler import file_reconciler
+    from app.database.manager import db_manager
+
+    if not await db_manager.connect():
+        print("Datenbank nicht erreichbar", file=sys.stderr)
+        return 1
+    try:
+        status = await file_reconciler.run(fix=args.fix, resume=not args.restart)
+        print(
+            f"{status['matched']} zugeordnet, {status['orphaned_files']} verwaiste Dateien "
+            f"({status['files_removed']} gelöscht), {status['dangling_documents']} hängende Verweise "
+            f"({status['documents_flagged']} markiert)"
+        )
+        for path in status["orphan_samples"]:
+            print(f"  verwaist: {path}")
+        for url in status["dangling_samples"]:
+            print(f"  ohne Datei: {url}")
+        if status["error"]:
+            print(f"Abgebrochen: {status['error']}", file=sys.stderr)
+            return 1
+        return 0
+    finally:
+        await db_manager.close()
+
+async def run_migrate_encoding(args) -> int:
+    from app.database.manager import db_manager, ENCODING_MIGRATION_JOB
+
+    if not await db_manager.connect():
+        print("Datenbank nicht erreichbar", file=sys.stderr)
+        return 1
+    try:
+        # Wartet ggf. auf die beim Verbinden gestartete Umstellung im Hintergrund
+        await db_manager.migrate_encoding(batch_size=args.batch_size)
+        state = await db_manager.get_job_state(ENCODING_MIGRATION_JOB) or {}
+        print(f"{state.get('migrated', 0)} Dokumente umgestellt")
+        if not state.get("completed_at"):
+            print("Abgebrochen, erneuter Aufruf setzt am Checkpoint fort", file=sys.stderr)
+            return 1
+        return 0
+    finally:
+        await db_manager.close()
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Document Scraper Wartung")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Dokument-Metadaten exportieren")
+    export.add_argument("--format", choices=("ndjson", "parquet"), default="ndjson")
+    export.add_argument("--output", type=Path, required=True, help="Zieldatei")
+    export.add_argument("--term", help="Nur Dokumente dieses Suchbegriffs")
+    export.add_argument("--file-type", help="Nur Dokumente dieses Dateityps")
+    export.add_argument("--start", type=datetime.fromisoformat, help="Frühester Zeitstempel (ISO)")
+    export.add_argument("--end", type=datetime.fromisoformat, help="Zeitstempel-Obergrenze (ISO, exklusiv)")
+    export.add_argument("--no-compress", action="store_true", help="NDJSON unkomprimiert schreiben")
+    export.set_defaults(handler=run_export)
+
+    importer = commands.add_parser("import", help="Lokales Dokumentverzeichnis importieren")
+    importer.add_argument("directory", type=Path, help="Zu importierendes Verzeichnis")
+    importer.add_argument("--term", help="Suchbegriff der Dokumente (Standard: import:<Verzeichnisname>)")
+    importer.add_argument("--workers", type=int, help="Anzahl Worker-Prozesse")
+    importer.add_argument("--restart", action="store_true", help="Checkpoint verwerfen und von vorne beginnen")
+    importer.add_argument("--no-enrich", action="store_true", help="Keine Nachverarbeitung nach dem Import")
+    importer.add_argument("--progress-interval", type=float, default=30, help="Sekunden zwischen Fortschrittsmeldungen")
+    importer.set_defaults(handler=run_import)
+
+    reconcile = commands.add_parser("reconcile", help="Downloads und Datenbank abgleichen")
+    reconcile.add_argument("--fix", action="store_true", help="Verwaiste Dateien löschen, hängende Verweise markieren")
+    reconcile.add_argument("--restart", action="store_true", help="Checkpoint verwerfen und von vorne beginnen")
+    reconcile.set_defaults(handler=run_reconcile)
+
+    migrate = commands.add_parser("migrate-encoding", help="Dokumente in die kompakte Speicherform überführen")
+    migrate.add_argument("--batch-size", type=int, default=500, help="Dokumente je Seite")
+    migrate.set_defaults(handler=run_migrate_encoding)
+
+    return parser
+
+if __name__ == "__main__":
+    arguments = build_parser().parse_args()
+    sys.exit(asyncio.run(arguments.handler(arguments)))
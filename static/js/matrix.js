@@ -172,7 +172,20 @@ class DashboardController {
     }
     
     startPeriodicUpdates() {
-        setInterval(() => this.forceHealthCheck(), 30000); // Every 30 seconds
+        this.loadSnapshot();
+        setInterval(() => this.loadSnapshot(), 30000); // Every 30 seconds
+    }
+    
+    async loadSnapshot() {
+        // Shared server-side snapshot; the browser revalidates via ETag (304)
+        try {
+            const response = await fetch('/api/dashboard/snapshot', { cache: 'no-cache' });
+            const data = await response.json();
+            this.updateHealthStatus(data.health);
+            this.renderRecentDocuments(data.recent_documents);
+        } catch (error) {
+            console.error('Snapshot error:', error);
+        }
     }
     
     showNotification(message, type = 'info') {
@@ -196,39 +209,41 @@ class DashboardController {
     async updateRecentDocuments() {
         try {
             const response = await fetch('/api/documents/recent');
-            const data = await response.json();
-            
-            const recentDocs = document.getElementById('recentDocuments');
-            document.getElementById('displayedCount').textContent = 
-                data.documents.length;
-            document.getElementById('totalCount').textContent = 
-                data.total_count;
-
-            recentDocs.innerHTML = data.documents
-                .map(doc => `
-                    <div class="matrix-document-item fade-in">
-                        <div class="flex justify-between items-center">
-                            <span class="font-medium truncate" title="${doc.title}">
-                                ${doc.title}
-                            </span>
-                            <span class="text-sm opacity-75">
-                                ${MatrixUtils.format.bytes(doc.size)}
-                            </span>
-                        </div>
-                        <div class="flex justify-between text-sm opacity-75">
-                            <span>${doc.file_type.toUpperCase()}</span>
-                            <span>${new Date(doc.timestamp).toLocaleString()}</span>
-                        </div>
-                        <div class="text-sm opacity-75">
-                            Search term: ${doc.term}
-                        </div>
-                    </div>
-                `)
-                .join('');
+            this.renderRecentDocuments(await response.json());
         } catch (error) {
             this.showNotification('Failed to load recent documents', 'error');
         }
     }
+    
+    renderRecentDocuments(data) {
+        const recentDocs = document.getElementById('recentDocuments');
+        document.getElementById('displayedCount').textContent = 
+            data.documents.length;
+        document.getElementById('totalCount').textContent = 
+            data.total_count;
+
+        recentDocs.innerHTML = data.documents
+            .map(doc => `
+                <div class="matrix-document-item fade-in">
+                    <div class="flex justify-between items-center">
+                        <span class="font-medium truncate" title="${doc.title}">
+                            ${doc.title}
+                        </span>
+                        <span class="text-sm opacity-75">
+                            ${MatrixUtils.format.bytes(doc.size)}
+                        </span>
+                    </div>
+                    <div class="flex justify-between text-sm opacity-75">
+                        <span>${doc.file_type.toUpperCase()}</span>
+                        <span>${new Date(doc.timestamp).toLocaleString()}</span>
+                    </div>
+                    <div class="text-sm opacity-75">
+                        Search term: ${doc.term}
+                    </div>
+                </div>
+            `)
+            .join('');
+    }
 
     handleWebSocketMessage(data) {
         console.log('Processing WebSocket message:', data);
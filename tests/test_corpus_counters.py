@@ -0,0 +1,98 @@
+import pytest
+
+from app.database.corpus_counters import DOMAIN_FIELD, STATS_ID, CorpusCounters, document_domain
+from app.database.document_codec import stored_field
+from app.utils.sketch.hyperloglog import HyperLogLog
+
+FILE_TYPE = stored_field("file_type")
+
+class Result:
+    def __init__(self, items):
+        self.items = items
+        self.matched_count = len(items)
+
+    async def to_list(self, length=None):
+        return list(self.items)
+
+    def __aiter__(self):
+        async def iterate():
+            for item in self.items:
+                yield item
+        return iterate()
+
+class FakeStats:
+    """Statistik-Collection mit einem Dokument und den benötigten Update-Operatoren"""
+
+    def __init__(self):
+        self.document = None
+
+    async def find_one(self, query, projection=None):
+        return dict(self.document) if self.document else None
+
+    async def insert_one(self, document):
+        self.document = dict(document)
+
+    async def update_one(self, query, update, upsert=False):
+        seq = query.get("seq")
+        if self.document is None or (seq is not None and self.document.get("seq") != seq):
+            return Result([])
+        for key, value in update.get("$set", {}).items():
+            self.document[key] = value
+        for key, value in update.get("$inc", {}).items():
+            self.document[key] = self.document.get(key, 0) + value
+        return Result([self.document])
+
+class FakeDocuments:
+    """Liefert feste Aggregationen; on_aggregate simuliert gleichzeitige Ingests"""
+
+    def __init__(self, on_aggregate=None):
+        self.on_aggregate = on_aggregate
+        self.aggregations = 0
+
+    def aggregate(self, pipeline, **kwargs):
+        if "$facet" in pipeline[0]:
+            self.aggregations += 1
+            if self.on_aggregate:
+                self.on_aggregate()
+            return Result([{
+                FILE_TYPE: [{"_id": "pdf", "count": 2}],
+                stored_field("term"): [],
+                stored_field("language"): [],
+                "overall": [{"total_documents": 2, "total_size": 10}]
+            }])
+        return Result([{"_id": 1}, {"_id": None}])
+
+    def find(self, query, projection=None):
+        return Result([{"url": "https://Example.org/alt.pdf"}])
+
+class FakeDatabase:
+    def __init__(self, documents):
+        self.stats = FakeStats()
+        self.documents = documents
+
+def test_domain_codes_and_legacy_urls_share_one_key():
+    assert document_domain({DOMAIN_FIELD: 1}, {1: "example.org"}) == "example.org"
+    assert document_domain({"url": "https://Example.org/alt.pdf"}) == "example.org"
+
+@pytest.mark.asyncio
+async def test_reconcile_retries_when_counters_change():
+    db = FakeDatabase(None)
+
+    def concurrent_ingest():
+        if db.documents.aggregations == 1:
+            db.stats.document["seq"] += 1
+            db.stats.document["total_documents"] += 1
+
+    db.documents = FakeDocuments(concurrent_ingest)
+    db.stats.document = {"_id": STATS_ID, "seq": 4, "total_documents": 1, "total_size": 5}
+    counters = CorpusCounters(precision=4)
+    counters.attach(db)
+    counters.attach_codec(type("Codec", (), {"values": {"domain": {1: "example.org"}}})())
+
+    await counters.reconcile()
+
+    assert db.documents.aggregations == 2
+    assert db.stats.document["total_documents"] == 2
+    assert db.stats.document["file_types.pdf"] == 2
+    # Code und Legacy-URL derselben Domain zählen einmal
+    assert HyperLogLog.from_dict(db.stats.document["domains_hll"], 4).count() == 1
@@ -0,0 +1,131 @@
+import json
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from app.database.backends.sqlite_backend import PROMOTED_FIELDS, compile_filter
+from app.database.document_codec import UNKNOWN_CODE, DocumentCodec, stored_field
+
+class FakeStore:
+    """Wörterbuch-Tabelle mit eindeutigem (Feld, Code)"""
+
+    def __init__(self):
+        self.entries = []
+
+    async def load_dictionaries(self):
+        return list(self.entries)
+
+    async def add_dictionary_entries(self, entries):
+        taken = {(field, code) for field, code, _ in self.entries}
+        if any((field, code) in taken for field, code, _ in entries):
+            return False
+        self.entries.extend(entries)
+        return True
+
+@pytest.fixture
+def codec():
+    codec = DocumentCodec()
+    codec.attach(FakeStore())
+    return codec
+
+@pytest.mark.asyncio
+async def test_round_trip(codec):
+    record = {
+        "url": "https://example.org/a.pdf",
+        "term": "Gutachten",
+        "domain": "example.org",
+        "timestamp": "2026-05-01T12:30:00",
+        "size": 1234,
+    }
+    await codec.prepare([record])
+    encoded = codec.encode(record)
+
+    assert encoded[stored_field("term")] == 1
+    assert encoded[stored_field("timestamp")] == datetime(2026, 5, 1, 12, 30)
+    assert "term" not in encoded
+    assert codec.decode(encoded) == {**record, "timestamp": datetime(2026, 5, 1, 12, 30)}
+
+def test_legacy_documents_pass_through(codec):
+    legacy = {"url": "u", "term": "Gutachten", "timestamp": "2020-01-01T00:00:00", "title": "T"}
+    assert codec.decode(legacy) == legacy
+
+@pytest.mark.asyncio
+async def test_prepare_retries_after_concurrent_assignment(codec):
+    # Ein anderer Prozess hat Code 1 bereits vergeben
+    codec.store.entries.append(("term", 1, "Bebauungsplan"))
+    await codec.prepare([{"term": "Gutachten"}])
+    assert codec.codes["term"] == {"Bebauungsplan": 1, "Gutachten": 2}
+
+@pytest.mark.asyncio
+async def test_unknown_codes_reload_dictionaries(codec):
+    codec.store.entries.append(("term", 7, "Lärmschutz"))
+    decoded = await codec.decode_documents([{stored_field("term"): 7}])
+    assert decoded == [{"term": "Lärmschutz"}]
+
+@pytest.mark.asyncio
+async def test_encode_query(codec):
+    codec.legacy = False
+    await codec.prepare([{"term": "Gutachten", "domain": "example.org"}])
+    query = {
+        "$or": [{"term": "Gutachten"}, {"term": {"$in": ["Gutachten", "unbekannt"]}}],
+        "timestamp": {"$gte": datetime(2026, 1, 1)},
+        "domain": {"$ne": "example.org"},
+    }
+    assert codec.encode_query(query) == {
+        "$or": [{stored_field("term"): 1}, {stored_field("term"): {"$in": [1, UNKNOWN_CODE]}}],
+        stored_field("timestamp"): {"$gte": datetime(2026, 1, 1)},
+        stored_field("domain"): {"$ne": 1},
+    }
+    with pytest.raises(ValueError):
+        codec.encode_query({"term": {"$gt": "A"}})
+
+@pytest.mark.asyncio
+async def test_legacy_query_matches_both_forms(codec):
+    await codec.prepare([{"term": "Gutachten"}])
+    documents = [
+        codec.encode({"url": "neu", "term": "Gutachten", "timestamp": datetime(2026, 2, 1)}),
+        {"url": "alt", "term": "Gutachten", "timestamp": "2026-02-01T00:00:00"},
+        {"url": "alt-anders", "term": "Bericht", "timestamp": "2025-02-01T00:00:00"},
+        codec.encode({"url": "neu-ohne", "timestamp": datetime(2025, 2, 1)}),
+    ]
+    conn = sqlite3.connect(":memory:")
+    columns = "".join(
+        f", {field} {sql_type} GENERATED ALWAYS AS (json_extract(data, '$.{field}')) VIRTUAL"
+        for field, sql_type in PROMOTED_FIELDS.items()
+    )
+    conn.execute(f"CREATE TABLE documents (id INTEGER PRIMARY KEY, data TEXT{columns})")
+    conn.executemany(
+        "INSERT INTO documents (data) VALUES (?)",
+        [(json.dumps(document, default=str),) for document in documents]
+    )
+
+    def urls(query):
+        sql, params = compile_filter(codec.encode_query(query))
+        rows = conn.execute(f"SELECT data FROM documents WHERE {sql} ORDER BY id", params)
+        return [json.loads(row[0])["url"] for row in rows]
+
+    assert urls({"term": "Gutachten"}) == ["neu", "alt"]
+    assert urls({"timestamp": {"$gte": datetime(2026, 1, 1)}}) == ["neu", "alt"]
+    assert urls({"term": {"$ne": "Gutachten"}}) == ["alt-anders", "neu-ohne"]
+    assert urls({"term": {"$exists": False}}) == ["neu-ohne"]
+
+    codec.legacy = False
+    assert urls({"term": "Gutachten"}) == ["neu"]
+
+def test_legacy_projection_includes_old_names(codec):
+    assert codec.encode_projection({"term": 1, "url": 1}) == {
+        stored_field("term"): 1, "term": 1, "url": 1
+    }
+    codec.legacy = False
+    assert codec.encode_projection({"term": 1, "url": 1}) == {stored_field("term"): 1, "url": 1}
+
+@pytest.mark.asyncio
+async def test_decode_counts_merges_codes_and_legacy_values(codec):
+    await codec.prepare([{"term": "Gutachten"}])
+    counts = await codec.decode_counts("term", {"1": 3, "Gutachten": 2, "unknown": 1})
+    assert counts == {"Gutachten": 5, "unknown": 1}
+
+def test_stored_field_maps_nested_paths():
+    assert stored_field("stage_versions.passages") == stored_field("stage_versions") + ".passages"
+    assert stored_field("title") == "title"
@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta, timezone
+
+from app.core.exporter import CorpusExporter, to_local
+from app.database.document_codec import DocumentCodec, stored_field
+
+def test_build_query_uses_local_naive_bounds():
+    start = datetime(2026, 2, 1, tzinfo=timezone(timedelta(hours=5)))
+    query = CorpusExporter.build_query(start=start, end=datetime(2026, 3, 1))
+
+    bounds = query["timestamp"]
+    assert bounds["$gte"].tzinfo is None
+    assert bounds["$gte"] == start.astimezone().replace(tzinfo=None)
+    assert bounds["$lt"] == datetime(2026, 3, 1)
+    assert to_local(bounds["$gte"]) == bounds["$gte"]
+
+def test_export_query_matches_legacy_iso_strings():
+    codec = DocumentCodec()
+    query = CorpusExporter.build_query(start=datetime(2026, 2, 1))
+
+    assert codec.encode_query(query) == {"$and": [{"$or": [
+        {stored_field("timestamp"): {"$gte": datetime(2026, 2, 1)}},
+        {"timestamp": {"$gte": "2026-02-01T00:00:00"}}
+    ]}]}
+
+    codec.legacy = False
+    assert codec.encode_query(query) == {stored_field("timestamp"): {"$gte": datetime(2026, 2, 1)}}
@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.database.fallback_store import FallbackStore
+from app.database.manager import DatabaseManager
+
+def _document(i: int, **fields):
+    return {"url": f"https://example.org/{i}.pdf", "hash": f"h{i}", "canonical_url": f"c{i}", **fields}
+
+def test_journal_is_reloaded_and_truncated(tmp_path):
+    journal = tmp_path / "fallback.ndjson"
+    store = FallbackStore(journal, memory_limit=2)
+    for i in range(5):
+        assert store.add(_document(i))
+    assert not store.add(_document(0))
+    store.update(_document(1)["url"], {"title": "neu"})
+    store.close()
+    with open(journal, "ab") as file:
+        file.write(b'{"url": "abgeschnitten')
+
+    reloaded = FallbackStore(journal, memory_limit=2)
+    assert len(reloaded) == 5
+    assert reloaded.get("hash", "h1")["title"] == "neu"
+    assert reloaded.get("canonical_url", "c4")["url"] == _document(4)["url"]
+    assert journal.read_bytes().endswith(b"\n")
+
+def test_compact_keeps_latest_version_and_drops_urls(tmp_path):
+    journal = tmp_path / "fallback.ndjson"
+    store = FallbackStore(journal, memory_limit=100)
+    for i in range(3):
+        store.add(_document(i))
+    for version in range(3):
+        store.update(_document(0)["url"], {"version": version})
+    assert store.stale_lines == 3
+
+    store.compact(drop=[_document(2)["url"]])
+    assert store.stale_lines == 0
+    assert len(journal.read_bytes().splitlines()) == 2
+    assert store.get_by_url(_document(0)["url"])["version"] == 2
+    assert store.get_by_url(_document(2)["url"]) is None
+    assert store.get("hash", "h2") is None
+
+@pytest.mark.asyncio
+async def test_failed_replay_keeps_only_untransferred_documents(tmp_path):
+    counters = SimpleNamespace(reconcile=AsyncMock(), attach_codec=lambda codec: None)
+    manager = DatabaseManager(backend=SimpleNamespace(counters=counters))
+    manager.fallback_store = FallbackStore(tmp_path / "fallback.ndjson", memory_limit=100)
+    for i in range(5):
+        manager.fallback_store.add(_document(i))
+
+    calls = []
+    async def insert(records, strict=False):
+        calls.append([record["url"] for record in records])
+        if len(calls) == 2:
+            raise ConnectionError("Verbindung verloren")
+        return [True] * len(records)
+    manager._insert_records = insert
+
+    assert await manager.replay_fallback_store(batch_size=2) == 2
+    assert sorted(manager.fallback_store.offsets) == sorted(calls[1] + [_document(4)["url"]])
+
+    manager._insert_records = AsyncMock(side_effect=lambda records, strict=False: [True] * len(records))
+    assert await manager.replay_fallback_store(batch_size=2) == 3
+    assert len(manager.fallback_store) == 0
+    assert not (tmp_path / "fallback.ndjson").exists()
+    manager.counters.reconcile.assert_awaited_once()
@@ -0,0 +1,88 @@
+import asyncio
+import gzip
+
+import pytest
+
+from app.utils.file.file_response import (
+    FileRangeResponse,
+    RangeNotSatisfiable,
+    content_disposition,
+    gzip_size,
+    parse_range
+)
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=10-", (10, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=990-5000", (990, 999)),
+    ("bytes=5-4", None),
+    ("bytes=0-1,5-9", None),
+    ("items=0-1", None),
+    ("bytes=a-b", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=-0"])
+def test_unsatisfiable_range(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, 1000)
+
+def test_gzip_size(tmp_path):
+    path = tmp_path / "a.pdf.gz"
+    with gzip.open(path, "wb") as file:
+        file.write(b"x" * 123_456)
+    assert gzip_size(path) == 123_456
+
+def test_content_disposition_encodes_non_ascii_names():
+    assert content_disposition("a.pdf") == 'inline; filename="a.pdf"'
+    assert content_disposition("Gutachten ä.pdf") == "inline; filename*=utf-8''Gutachten%20%C3%A4.pdf"
+
+def _serve(response):
+    messages = []
+    async def send(message):
+        messages.append(message)
+    asyncio.run(response({"type": "http"}, None, send))
+    return messages
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_range_is_streamed_in_chunks(tmp_path, compressed):
+    content = bytes(range(256)) * 40
+    path = tmp_path / "file.bin"
+    if compressed:
+        with gzip.open(path, "wb") as file:
+            file.write(content)
+    else:
+        path.write_bytes(content)
+
+    response = FileRangeResponse(
+        path, len(content), "application/pdf",
+        byte_range=(1000, 5999), compressed=compressed, chunk_size=1024
+    )
+    messages = _serve(response)
+    assert messages[0]["status"] == 206
+    assert (b"content-range", b"bytes 1000-5999/10240") in messages[0]["headers"]
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    assert body == content[1000:6000]
+    assert max(len(message.get("body", b"")) for message in messages[1:]) <= 1024
+
+def test_short_file_aborts_response(tmp_path):
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"x" * 10)
+    response = FileRangeResponse(path, 20, "application/pdf", chunk_size=4)
+    with pytest.raises(OSError):
+        _serve(response)
+
+def test_archived_file_uses_stored_size(tmp_path):
+    from app.api.routes.documents import _locate_file
+
+    path = tmp_path / "a.pdf.gz"
+    with gzip.open(path, "wb") as file:
+        file.write(b"x" * 100)
+    # Der gzip-Trailer zählt nur modulo 4 GiB
+    located = _locate_file({"archive_path": str(path), "archive_size": 2**32 + 100})
+    assert located[:3] == (path, True, 2**32 + 100)
+    assert _locate_file({"archive_path": str(path)})[2] == 100
@@ -0,0 +1,72 @@
+import random
+
+from app.utils.text.fingerprint import (
+    FINGERPRINT_BITS,
+    NearDuplicateIndex,
+    band_layout,
+    hamming_distance,
+    max_distance,
+    probe_masks,
+    simhash
+)
+
+def _flip(fingerprint: int, bits) -> int:
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+def test_simhash_of_empty_text_is_zero():
+    assert simhash([]) == 0
+
+def test_simhash_is_stable_for_similar_texts():
+    tokens = ("gutachten zur lärmbelastung an der bundesstraße " * 20).split()
+    changed = tokens[:-1] + ["landstraße"]
+    assert simhash(tokens) == simhash(list(tokens))
+    assert hamming_distance(simhash(tokens), simhash(changed)) <= max_distance(0.85)
+
+def test_band_layout_covers_all_bits():
+    layout = band_layout(10)
+    assert len(layout) == 10
+    assert sum(mask.bit_length() for _, mask in layout) == FINGERPRINT_BITS
+    assert layout[-1][0] + layout[-1][1].bit_length() == FINGERPRINT_BITS
+
+def test_bands_follow_threshold():
+    assert max_distance(0.85) == 9
+    assert len(NearDuplicateIndex(0.85).layout) == 4
+    assert len(NearDuplicateIndex(1.0).layout) == 1
+
+def test_probe_masks_cover_radius():
+    assert len(probe_masks(16, 2)) == 1 + 16 + 120
+    assert probe_masks(1, 2) == [0, 1]
+
+def test_find_never_misses_within_threshold():
+    rng = random.Random(7)
+    index = NearDuplicateIndex(0.85)
+    for trial in range(200):
+        fingerprint = rng.getrandbits(FINGERPRINT_BITS)
+        index.add(f"doc-{trial}", fingerprint)
+        probe = _flip(fingerprint, rng.sample(range(FINGERPRINT_BITS), max_distance(0.85)))
+        found = index.find(probe, 0.85)
+        assert found is not None
+        assert found[2] >= 0.85
+
+def test_find_excludes_key_and_respects_removal():
+    index = NearDuplicateIndex(0.85)
+    index.add("a", 0xFFFF_0000_FFFF_0000, family="fam")
+    assert index.find(0xFFFF_0000_FFFF_0000, 0.85) == ("a", "fam", 1.0)
+    assert index.find(0xFFFF_0000_FFFF_0000, 0.85, exclude="a") is None
+
+    index.remove("a")
+    assert len(index) == 0
+    assert index.find(0xFFFF_0000_FFFF_0000, 0.85) is None
+    assert all(not band for band in index.bands)
+
+def test_assign_joins_family_of_closest_match():
+    index = NearDuplicateIndex(0.85)
+    index.add("a", 0xFFFF_0000_FFFF_0000, family="fam")
+    match = index.assign("b", _flip(0xFFFF_0000_FFFF_0000, range(5)), 0.85)
+    assert match[:2] == ("a", "fam")
+    assert index.families["b"] == "fam"
+
+    assert index.assign("c", 0x0123_4567_89AB_CDEF, 0.85) is None
+    assert index.families["c"] == "c"
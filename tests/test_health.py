@@ -0,0 +1,42 @@
+import pytest
+
+from app.core import health
+from app.core.health import HealthMonitor
+
+class FlakyDatabase:
+    def __init__(self, backend):
+        self.backend = backend
+        self.connected = True
+        self.failing = True
+        self.reconnects = 0
+
+    async def ping(self):
+        if self.failing:
+            raise ConnectionError("Ping fehlgeschlagen")
+        return 1.0
+
+    async def reconnect(self):
+        self.reconnects += 1
+        self.connected = True
+        return True
+
+@pytest.mark.asyncio
+async def test_database_disconnects_only_after_consecutive_failures(monkeypatch):
+    database = FlakyDatabase(health.db_manager.backend)
+    monkeypatch.setattr(health, "db_manager", database)
+    monitor = HealthMonitor(failure_threshold=3)
+
+    assert (await monitor._check_database())["status"] == "unstable"
+    database.failing = False
+    assert (await monitor._check_database())["status"] == "ok"
+
+    database.failing = True
+    for _ in range(2):
+        assert (await monitor._check_database())["status"] == "unstable"
+    assert database.connected
+
+    assert (await monitor._check_database())["status"] == "error"
+    assert not database.connected
+    await monitor.reconnect_task
+    assert database.reconnects == 1
+    assert database.connected and monitor.db_failures == 0
@@ -0,0 +1,35 @@
+import pytest
+
+from app.utils.sketch.hyperloglog import HyperLogLog
+
+@pytest.mark.parametrize("cardinality", [10, 1_000, 50_000])
+def test_count_is_within_error_bound(cardinality):
+    sketch = HyperLogLog(precision=12)
+    sketch.update(f"domain-{i}.example.org" for i in range(cardinality))
+    # Drei Standardfehler (1,6 %), bei kleinen Mengen exakt über Linear Counting
+    assert abs(sketch.count() - cardinality) <= max(1, 0.05 * cardinality)
+
+def test_duplicates_do_not_change_registers():
+    sketch = HyperLogLog()
+    assert sketch.add("example.org")
+    assert not sketch.add("example.org")
+    assert sketch.count() == 1
+
+def test_merge_equals_union():
+    left, right, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    left.update(str(i) for i in range(0, 3000))
+    right.update(str(i) for i in range(2000, 5000))
+    union.update(str(i) for i in range(0, 5000))
+    left.merge(right)
+    assert left.registers == union.registers
+
+def test_merge_rejects_other_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(10).merge(HyperLogLog(12))
+
+def test_sparse_dict_round_trip():
+    sketch = HyperLogLog(precision=10)
+    sketch.update(str(i) for i in range(500))
+    restored = HyperLogLog.from_dict(sketch.to_dict(), precision=10)
+    assert restored.registers == sketch.registers
+    assert len(sketch.to_dict()) < sketch.size
@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+from app.core import importer
+from app.core.importer import _next_chunk, _walk
+
+FILES = [
+    ("a", "x", "1.pdf"),
+    ("a", "y.pdf"),
+    ("a-b.pdf",),
+    ("b", "c", "d", "2.docx"),
+    ("b", "z.txt"),
+    ("c.doc",),
+]
+
+@pytest.fixture
+def tree(tmp_path):
+    for parts in FILES:
+        path = tmp_path.joinpath(*parts)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"%PDF")
+    return tmp_path
+
+def test_walk_yields_files_in_tuple_order(tree):
+    walked = [parts for parts, _ in _walk(str(tree), None)]
+    assert walked == sorted(FILES)
+
+@pytest.mark.parametrize("checkpoint", range(len(FILES)))
+def test_resume_continues_after_checkpoint(tree, checkpoint):
+    ordered = sorted(FILES)
+    walked = [parts for parts, _ in _walk(str(tree), ordered[checkpoint])]
+    assert walked == ordered[checkpoint + 1:]
+
+def test_resume_skips_finished_subtrees_without_listing_them(tree, monkeypatch):
+    listed = []
+    scandir = os.scandir
+    def recording_scandir(path):
+        listed.append(os.path.relpath(path, tree))
+        return scandir(path)
+    monkeypatch.setattr(importer.os, "scandir", recording_scandir)
+
+    walked = [parts for parts, _ in _walk(str(tree), ("a-b.pdf",))]
+    assert walked == [("b", "c", "d", "2.docx"), ("b", "z.txt"), ("c.doc",)]
+    assert "a" not in listed
+    assert os.path.join("a", "x") not in listed
+
+def test_resume_from_deleted_checkpoint_file(tree):
+    os.remove(tree / "a" / "y.pdf")
+    walked = [parts for parts, _ in _walk(str(tree), ("a", "y.pdf"))]
+    assert walked == [("a-b.pdf",), ("b", "c", "d", "2.docx"), ("b", "z.txt"), ("c.doc",)]
+
+def test_next_chunk_counts_unsupported_files(tree):
+    paths = _walk(str(tree), None)
+    chunk, ignored = _next_chunk(paths, 4)
+    assert [parts for parts, _ in chunk] == sorted(FILES)[:4]
+    assert ignored == 0
+    chunk, ignored = _next_chunk(paths, 4)
+    assert [parts for parts, _ in chunk] == [("c.doc",)]
+    assert ignored == 1
@@ -0,0 +1,40 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.database import ingest_buffer as module
+from app.database.ingest_buffer import IngestBuffer
+
+def _document(i: int):
+    return {"url": f"https://example.org/{i}.pdf"}
+
+@pytest.mark.asyncio
+async def test_add_returns_before_flush_and_runs_callbacks(monkeypatch):
+    store = AsyncMock(return_value=[True, False])
+    monkeypatch.setattr(module.db_manager, "store_documents", store)
+    buffer = IngestBuffer(batch_size=10, flush_interval=60)
+    stored = []
+
+    await buffer.add(_document(0), lambda: stored.append(0))
+    await buffer.add(_document(1), lambda: stored.append(1))
+    assert not store.called
+
+    await buffer.stop()
+    assert store.await_count == 1
+    assert stored == [0]
+    assert buffer.total_failed == 1
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_batch(monkeypatch):
+    store = AsyncMock(side_effect=[RuntimeError("weg"), [True]])
+    monkeypatch.setattr(module.db_manager, "store_documents", store)
+    buffer = IngestBuffer(batch_size=10, flush_interval=60)
+    stored = []
+
+    await buffer.add(_document(0), lambda: stored.append(0))
+    assert await buffer.flush() == [False]
+    assert stored == []
+
+    assert await buffer.flush() == [True]
+    assert stored == [0]
+    await buffer.stop()
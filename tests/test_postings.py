@@ -0,0 +1,68 @@
+import numpy as np
+
+from app.utils.search.bm25_index import BM25Index
+from app.utils.search.postings import Segment, decode_varints, encode_varints, varint_lengths
+
+TEXTS = {
+    "a": "Lärmschutz Gutachten Autobahn Lärmschutz",
+    "b": "Gutachten zur Wasserqualität",
+    "c": "Bebauungsplan und Lärmschutz",
+    "d": "Protokoll der Sitzung",
+}
+
+def test_varint_round_trip_at_byte_boundaries():
+    values = np.array([0, 1, 127, 128, 16383, 16384, 2**21 - 1, 2**21, 2**32 - 1, 2**35 - 1], dtype=np.uint64)
+    encoded = encode_varints(values)
+    assert encoded.size == varint_lengths(values).sum()
+    assert varint_lengths(values).tolist() == [1, 1, 1, 2, 2, 3, 3, 4, 5, 5]
+    assert decode_varints(encoded).tolist() == values.astype(np.int64).tolist()
+    assert decode_varints(np.zeros(0, dtype=np.uint8)).size == 0
+
+def test_segment_postings_round_trip(tmp_path):
+    segment = Segment.write(
+        tmp_path / "seg",
+        ["u0", "u1", "u2", "u3"],
+        [3, 1, 4, 2],
+        {"alpha": ([0, 2, 3], [1, 200, 3]), "beta": ([1], [70000])}
+    )
+    docs, tfs = segment.postings("alpha")
+    assert docs.tolist() == [0, 2, 3]
+    assert tfs.tolist() == [1, 200, 3]
+    assert segment.postings("beta")[1].tolist() == [70000]
+    assert segment.postings("gamma") is None
+    assert segment.document_frequency("alpha") == 3
+
+def _ranking(index: BM25Index, query: str):
+    return [(url, round(score, 4)) for url, score in sorted(index.search(query), key=lambda hit: (-hit[1], hit[0]))]
+
+def test_search_is_stable_across_flush_merge_and_reload(tmp_path):
+    buffered = BM25Index(directory=tmp_path / "buffered")
+    for url, text in TEXTS.items():
+        buffered.add(url, text)
+    expected = _ranking(buffered, "Lärmschutz Gutachten")
+    assert [url for url, _ in expected] == ["a", "b", "c"]
+
+    index = BM25Index(directory=tmp_path / "segments", segment_size=2, max_segments=1, merge_factor=2)
+    for url, text in TEXTS.items():
+        index.add(url, text)
+    assert index.get_stats()["segments"] == 2
+    assert _ranking(index, "Lärmschutz Gutachten") == expected
+
+    assert index.merge()
+    assert index.get_stats()["segments"] == 1
+    assert _ranking(index, "Lärmschutz Gutachten") == expected
+
+    reloaded = BM25Index(directory=tmp_path / "segments")
+    assert reloaded.get_stats()["documents"] == 4
+    assert _ranking(reloaded, "Lärmschutz Gutachten") == expected
+
+def test_deleted_documents_are_not_found(tmp_path):
+    index = BM25Index(directory=tmp_path, segment_size=2, max_segments=10)
+    for url, text in TEXTS.items():
+        index.add(url, text)
+    assert index.delete_many(["a", "c", "unbekannt"]) == 2
+    assert index.search("Lärmschutz") == []
+
+    reloaded = BM25Index(directory=tmp_path)
+    assert reloaded.get_stats()["documents"] == 2
+    assert reloaded.search("Lärmschutz") == []
@@ -0,0 +1,102 @@
+import os
+import time
+
+import pytest
+
+from app.core import reconciler
+from app.core.reconciler import FileReconciler, _sorted_paths
+
+class FakeDatabase:
+    """Dokumente nach local_path sortiert, wie der Index-Cursor"""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.states = {}
+        self.updates = []
+
+    async def get_job_state(self, job_name):
+        return self.states.get(job_name)
+
+    async def save_job_state(self, job_name, state):
+        self.states[job_name] = state
+        return True
+
+    async def iter_documents(self, query, projection, batch_size, sort):
+        bounds = query["local_path"]
+        for document in sorted(self.documents, key=lambda d: d["local_path"]):
+            path = document["local_path"]
+            if "$gt" in bounds and not path > bounds["$gt"]:
+                continue
+            if "$gte" in bounds and not path >= bounds["$gte"]:
+                continue
+            if path < bounds["$lt"]:
+                yield dict(document)
+
+    async def update_documents(self, updates):
+        self.updates.extend(updates)
+        return len(updates)
+
+@pytest.fixture
+def downloads(tmp_path, monkeypatch):
+    directory = tmp_path / "downloads"
+    directory.mkdir()
+    monkeypatch.setattr(reconciler, "DOWNLOADS_DIR", directory)
+    return directory
+
+def _file(directory, name, age=3600):
+    path = directory / name
+    path.write_bytes(b"%PDF")
+    old = time.time() - age
+    os.utime(path, (old, old))
+    return str(path)
+
+def _install(monkeypatch, documents):
+    database = FakeDatabase(documents)
+    monkeypatch.setattr(reconciler, "db_manager", database)
+    return database
+
+def test_sorted_paths_merges_runs(tmp_path):
+    names = [f"{i:03d}.pdf" for i in range(50)]
+    for name in reversed(names):
+        (tmp_path / name).write_bytes(b"")
+    (tmp_path / "sub").mkdir()
+    expected = [str(tmp_path / name) for name in names]
+    assert list(_sorted_paths(str(tmp_path), None, run_size=7)) == expected
+    assert list(_sorted_paths(str(tmp_path), expected[9], run_size=7)) == expected[10:]
+
+@pytest.mark.asyncio
+async def test_merge_join_classifies_files_and_documents(downloads, monkeypatch):
+    matched = _file(downloads, "b.pdf")
+    orphan = _file(downloads, "a.pdf")
+    _file(downloads, "c.pdf", age=0)
+    (downloads / "sub").mkdir()
+    database = _install(monkeypatch, [
+        {"url": "u1", "local_path": matched},
+        {"url": "u2", "local_path": matched},
+        {"url": "u3", "local_path": str(downloads / "d.pdf")},
+        {"url": "u4", "local_path": str(downloads / "sub" / "e.pdf")},
+        {"url": "u5", "local_path": str(downloads) + "-other/f.pdf"},
+    ])
+
+    status = await FileReconciler(batch_size=2, grace_period=60).run(fix=True, resume=False)
+    assert status["error"] is None
+    assert status["matched"] == 2
+    assert status["orphaned_files"] == 1
+    assert status["recent_files"] == 1
+    assert status["orphan_samples"] == [orphan]
+    assert status["dangling_samples"] == ["u3"]
+    assert database.updates == [("u3", {"file_missing": True})]
+    assert not os.path.exists(orphan)
+    assert os.path.exists(matched)
+    assert database.states[reconciler.JOB_NAME]["last_path"] is None
+
+@pytest.mark.asyncio
+async def test_resume_starts_after_checkpoint(downloads, monkeypatch):
+    first = _file(downloads, "a.pdf")
+    second = _file(downloads, "b.pdf")
+    database = _install(monkeypatch, [{"url": "u1", "local_path": str(downloads / "0.pdf")}])
+    database.states[reconciler.JOB_NAME] = {"last_path": first}
+
+    status = await FileReconciler(grace_period=60).run(resume=True)
+    assert status["orphan_samples"] == [second]
+    assert status["dangling_documents"] == 0
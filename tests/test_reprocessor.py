@@ -0,0 +1,61 @@
+import json
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import ENRICHMENT_STAGE_VERSIONS
+from app.core import enrichment
+from app.core.enrichment import document_enricher
+from app.core.reprocessor import CorpusReprocessor
+from app.database.backends.sqlite_backend import PROMOTED_FIELDS, compile_filter
+from app.database.document_codec import DocumentCodec
+
+WITHOUT_PASSAGES = {stage: v for stage, v in ENRICHMENT_STAGE_VERSIONS.items() if stage != "passages"}
+WITHOUT_KEYWORDS = {stage: v for stage, v in ENRICHMENT_STAGE_VERSIONS.items() if stage != "keywords"}
+
+def _document(state, stage_versions):
+    return {
+        "enrichment_state": state,
+        "enrichment_version": sum(stage_versions.values()),
+        "stage_versions": stage_versions
+    }
+
+DOCUMENTS = [
+    _document("done", WITHOUT_PASSAGES),
+    _document("done", WITHOUT_KEYWORDS),
+    _document("done", dict(ENRICHMENT_STAGE_VERSIONS)),
+    _document("pending", {}),
+    _document("done", {**ENRICHMENT_STAGE_VERSIONS, "language": 0}),
+]
+
+@pytest.fixture
+def conn():
+    codec = DocumentCodec()
+    conn = sqlite3.connect(":memory:")
+    columns = ", ".join(PROMOTED_FIELDS)
+    conn.execute(f"CREATE TABLE documents (id INTEGER PRIMARY KEY, data TEXT, {columns})")
+    for i, document in enumerate(DOCUMENTS, start=1):
+        encoded = codec.encode(document)
+        promoted = [encoded.get(field) for field in PROMOTED_FIELDS]
+        conn.execute(
+            f"INSERT INTO documents VALUES (?, ?, {', '.join('?' * len(PROMOTED_FIELDS))})",
+            [i, json.dumps(encoded), *promoted]
+        )
+    yield conn, codec
+    conn.close()
+
+def _ids(conn, codec, stages):
+    sql, params = compile_filter(codec.encode_query(CorpusReprocessor._build_query(stages)))
+    return [row[0] for row in conn.execute(f"SELECT id FROM documents WHERE {sql} ORDER BY id", params)]
+
+@pytest.mark.parametrize("accepting, expected", [
+    (False, [2, 5]),
+    (True, [1, 2, 5]),
+])
+def test_unavailable_passages_are_not_pending(conn, monkeypatch, accepting, expected):
+    monkeypatch.setattr(enrichment, "passage_index", SimpleNamespace(accepting=accepting))
+    stages = sorted(document_enricher.available_stages())
+    assert ("passages" in stages) is accepting
+    assert _ids(*conn, stages) == expected
+    assert document_enricher.outdated_stages(DOCUMENTS[0]) == (["passages"] if accepting else [])
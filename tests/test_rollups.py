@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.config import ROLLUP_MAX_BUCKETS
+from app.database.rollups import IngestRollups, to_utc
+
+CET = timezone(timedelta(hours=1))
+CEST = timezone(timedelta(hours=2))
+
+class FakeStore:
+    def __init__(self):
+        self.operations = []
+        self.queries = []
+
+    async def increment_rollups(self, operations):
+        self.operations.extend(operations)
+
+    async def find_rollups(self, granularity, dimension, start, end, key, limit=None):
+        self.queries.append((granularity, start, end, limit))
+        return [
+            {"key": "all", "bucket": start + timedelta(hours=i), "documents": 1}
+            for i in range(min(limit, ROLLUP_MAX_BUCKETS + 5))
+        ]
+
+@pytest.fixture
+def rollups():
+    rollups = IngestRollups({'minute': 2, 'hour': 90, 'day': None})
+    rollups.attach(FakeStore())
+    return rollups
+
+@pytest.mark.asyncio
+async def test_buckets_and_expiry_are_utc_across_dst(rollups):
+    # 02:30 CEST und 02:30 CET in der Nacht der Zeitumstellung liegen eine Stunde auseinander
+    await rollups.record_ingest([
+        {"timestamp": datetime(2026, 10, 25, 2, 30, tzinfo=CEST), "url": "https://a.org/1"},
+        {"timestamp": datetime(2026, 10, 25, 2, 30, tzinfo=CET), "url": "https://a.org/2"}
+    ])
+    hours = sorted(
+        bucket for (granularity, bucket, dimension, _), _, _ in rollups.store.operations
+        if granularity == 'hour' and dimension == 'all'
+    )
+    assert hours == [datetime(2026, 10, 25, 0, 0), datetime(2026, 10, 25, 1, 0)]
+
+    for (granularity, bucket, _, _), _, expires_at in rollups.store.operations:
+        if granularity == 'hour':
+            assert expires_at == bucket.replace(tzinfo=timezone.utc) + timedelta(days=90)
+
+def test_choose_granularity_accepts_aware_and_naive(rollups):
+    end = datetime.now(timezone.utc)
+    assert rollups.choose_granularity(end - timedelta(hours=1), end) == 'minute'
+    assert rollups.choose_granularity(to_utc(end) - timedelta(days=3), end) == 'hour'
+
+@pytest.mark.asyncio
+async def test_query_rejects_long_spans_and_caps_buckets(rollups):
+    end = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with pytest.raises(ValueError):
+        await rollups.query(end - timedelta(minutes=ROLLUP_MAX_BUCKETS + 1), end, 'minute')
+
+    result = await rollups.query(end - timedelta(days=60), end, 'hour')
+    assert result["truncated"]
+    assert len(result["buckets"]) == ROLLUP_MAX_BUCKETS
+    assert result["buckets"][0]["bucket"].tzinfo == timezone.utc
+    assert rollups.store.queries[-1][3] == ROLLUP_MAX_BUCKETS + 1
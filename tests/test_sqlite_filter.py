@@ -0,0 +1,66 @@
+import json
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from app.database.backends.sqlite_backend import PROMOTED_FIELDS, compile_filter
+from app.database.document_codec import stored_field
+
+FILE_TYPE = stored_field("file_type")
+TIMESTAMP = stored_field("timestamp")
+
+DOCUMENTS = [
+    {FILE_TYPE: "pdf", TIMESTAMP: "2026-01-05T10:00:00", "pages": 3, "flags": {"ocr": True}},
+    {FILE_TYPE: "docx", TIMESTAMP: "2026-02-01T00:00:00", "pages": 12},
+    {FILE_TYPE: None, TIMESTAMP: "2026-03-01T00:00:00"},
+    {TIMESTAMP: "2025-12-31T23:59:59", "pages": 1},
+]
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    columns = ", ".join(PROMOTED_FIELDS)
+    conn.execute(f"CREATE TABLE documents (id INTEGER PRIMARY KEY, data TEXT, {columns})")
+    for i, document in enumerate(DOCUMENTS, start=1):
+        promoted = [document.get(field) for field in PROMOTED_FIELDS]
+        extra = {k: v for k, v in document.items() if k not in PROMOTED_FIELDS}
+        conn.execute(
+            f"INSERT INTO documents VALUES (?, ?, {', '.join('?' * len(PROMOTED_FIELDS))})",
+            [i, json.dumps(extra), *promoted]
+        )
+    yield conn
+    conn.close()
+
+def _ids(conn, query):
+    sql, params = compile_filter(query)
+    return [row[0] for row in conn.execute(f"SELECT id FROM documents WHERE {sql} ORDER BY id", params)]
+
+@pytest.mark.parametrize("query, expected", [
+    (None, [1, 2, 3, 4]),
+    ({FILE_TYPE: "pdf"}, [1]),
+    ({FILE_TYPE: None}, [3, 4]),
+    ({FILE_TYPE: {"$ne": "pdf"}}, [2, 3, 4]),
+    ({FILE_TYPE: {"$in": ["pdf", "docx"]}}, [1, 2]),
+    ({FILE_TYPE: {"$in": ["pdf", None]}}, [1, 3, 4]),
+    ({FILE_TYPE: {"$nin": ["pdf"]}}, [2, 3, 4]),
+    ({FILE_TYPE: {"$nin": ["pdf", None]}}, [2]),
+    ({"pages": {"$gte": 3, "$lt": 12}}, [1]),
+    ({"pages": {"$exists": False}}, [3]),
+    ({"flags.ocr": True}, [1]),
+    ({"$or": [{FILE_TYPE: "docx"}, {"pages": 1}]}, [2, 4]),
+])
+def test_filter_matches_mongo_semantics(conn, query, expected):
+    assert _ids(conn, query) == expected
+
+def test_datetimes_compare_in_stored_form(conn):
+    query = {TIMESTAMP: {"$gte": datetime(2026, 1, 1), "$lt": datetime(2026, 3, 1)}}
+    assert _ids(conn, query) == [1, 2]
+
+@pytest.mark.parametrize("query", [
+    {"pages": {"$regex": "^1"}},
+    {"data') OR 1=1 --": 1},
+])
+def test_unsupported_filters_are_rejected(query):
+    with pytest.raises(ValueError):
+        compile_filter(query)
@@ -0,0 +1,46 @@
+import pytest
+
+from app.utils.cache import ttl_cache
+from app.utils.cache.ttl_cache import MISSING, TTLCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now[0])
+    return now
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(max_size=10, ttl=5)
+    cache.set("a", 1)
+    clock[0] += 4.9
+    assert cache.get("a") == 1
+    clock[0] += 0.2
+    assert cache.get("a") is MISSING
+    assert cache.get_stats()["size"] == 0
+
+def test_none_is_cached_with_negative_ttl(clock):
+    cache = TTLCache(max_size=10, ttl=60, negative_ttl=1)
+    cache.set("unknown", None)
+    assert cache.get("unknown") is None
+    clock[0] += 2
+    assert cache.get("unknown") is MISSING
+    assert cache.get_stats()["negative_hits"] == 1
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+def test_invalidate_counts_only_present_keys():
+    cache = TTLCache(max_size=10, ttl=60)
+    cache.set("a", 1)
+    cache.invalidate("a", "b")
+    assert cache.get("a") is MISSING
+    stats = cache.get_stats()
+    assert stats["invalidations"] == 1
+    assert stats["hit_rate"] == 0
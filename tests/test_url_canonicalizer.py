@@ -0,0 +1,33 @@
+from app.utils.url.url_canonicalizer import UrlCanonicalizer
+
+def test_equivalent_spellings_share_one_form():
+    canonicalizer = UrlCanonicalizer(rules={})
+    expected = "https://example.org/docs/a.pdf?a=1&b=2"
+    for url in (
+        "http://www.Example.org/docs/a.pdf?b=2&a=1",
+        "https://example.org:443/docs/a.pdf/?a=1&b=2#seite=3",
+        "HTTPS://EXAMPLE.ORG/docs/a.pdf?utm_source=x&a=1&b=2&fbclid=y",
+    ):
+        assert canonicalizer.canonicalize(url) == expected
+
+def test_non_default_port_and_path_case_are_kept():
+    canonicalizer = UrlCanonicalizer(rules={})
+    assert canonicalizer.canonicalize("http://example.org:8080/Docs/") == "https://example.org:8080/Docs"
+
+def test_most_specific_domain_rule_wins():
+    canonicalizer = UrlCanonicalizer(rules={
+        "example.org": {"strip_trailing_slash": False, "drop_parameters": ["session"]},
+        "files.example.org": {"strip_trailing_slash": True, "keep_parameters": ["download"]},
+    })
+    assert canonicalizer.canonicalize("https://www.example.org/a/?session=1") == "https://example.org/a/"
+    assert canonicalizer.canonicalize("https://files.example.org/a/?download=1&session=1") == (
+        "https://files.example.org/a?download=1"
+    )
+
+def test_rule_cache_is_bounded():
+    canonicalizer = UrlCanonicalizer(rules={}, cache_size=4)
+    for i in range(100):
+        canonicalizer.canonicalize(f"https://host{i}.example.org/")
+    info = canonicalizer._cached_rule.cache_info()
+    assert info.currsize == 4
+    assert info.maxsize == 4